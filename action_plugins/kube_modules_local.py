@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+#
+#  Copyright 2017 Red Hat | Ansible
+#
+# This file is part of Ansible
+#
+# Ansible is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Ansible is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Ansible.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Action plugin shared by the modules of the role, loaded by the action plugin generated for each module.
+
+When a task runs on the controller, through the local connection, the module is run in the Ansible worker
+process instead of being packaged, transferred and started in a new interpreter. The role's module_utils are
+imported once, by the Ansible process that loads the plugin, and are inherited by the workers it forks.
+Helpers, with the argument specs and model introspection they hold, are kept for the life of the worker, so
+the items of a loop share them. The generated modules run with the features of k8s_mixins, such as profiling,
+which they do not ship with when they run on a target.
+
+Tasks on remote hosts, tasks that use become or async, controllers without the openshift client, and modules
+that fail to load in-process, run the module as usual. Set KUBE_MODULES_LOCAL_EXECUTION=0 to always run the
+module as usual.
+"""
+
+import json
+import os
+import sys
+
+try:
+    from importlib.util import module_from_spec, spec_from_file_location
+except ImportError:
+    # Python 2
+    from imp import load_source as imp_load_source
+    spec_from_file_location = None
+
+import ansible.module_utils
+from ansible.module_utils import basic
+from ansible.module_utils._text import to_bytes, to_native
+from ansible.module_utils.six import StringIO
+from ansible.plugins.action import ActionBase
+
+try:
+    from __main__ import display
+except ImportError:
+    from ansible.utils.display import Display
+    display = Display()
+
+LOCAL_EXECUTION_ENV = 'KUBE_MODULES_LOCAL_EXECUTION'
+
+ROLE_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load_source(name, path):
+    """ Import the Python source at path as the module name, and return the module """
+    if spec_from_file_location is None:
+        return imp_load_source(name, path)
+    spec = spec_from_file_location(name, path)
+    module = module_from_spec(spec)
+    sys.modules[name] = module
+    try:
+        spec.loader.exec_module(module)
+    except BaseException:
+        del sys.modules[name]
+        raise
+    return module
+
+
+def load_module_utils(path):
+    """ Import the role's module_utils. Return an error message, or None. """
+    # Imports the role's module_utils, rather than those of the same name that ship with Ansible
+    if path not in ansible.module_utils.__path__:
+        ansible.module_utils.__path__.insert(0, path)
+    try:
+        from ansible.module_utils import k8s_common, k8s_dispatch
+        from ansible.module_utils import openshift_common  # noqa: F401
+        from ansible.module_utils.k8s_mixins import KubernetesModuleMixin
+    except Exception as exc:
+        return to_native(exc)
+    if not os.path.realpath(k8s_common.__file__).startswith(os.path.realpath(path)):
+        return "ansible.module_utils.k8s_common was already imported from {0}".format(k8s_common.__file__)
+    if not k8s_common.HAS_K8S_MODULE_HELPER:
+        return "the openshift client is not installed on the controller"
+    # Keep helpers for the life of the process
+    if k8s_common.HELPER_CACHE is None:
+        k8s_common.HELPER_CACHE = {}
+    # The modules are not shipped to a target, so the generated modules can have every feature too
+    k8s_dispatch.EXTRA_MIXINS = (KubernetesModuleMixin,)
+    return None
+
+
+LOAD_ERROR = load_module_utils(os.path.join(ROLE_PATH, 'module_utils'))
+
+LOADED_MODULES = {}
+
+
+class ActionModule(ActionBase):
+
+    def local_execution_error(self):
+        """ The reason the module can not run in-process, or None """
+        if os.environ.get(LOCAL_EXECUTION_ENV, '1').lower() in ('0', 'false', 'no', 'off'):
+            return "disabled by {0}".format(LOCAL_EXECUTION_ENV)
+        if self._connection.transport != 'local':
+            return "the task runs on a remote host"
+        if self._play_context.become:
+            return "the task uses become"
+        if getattr(self._task, 'async_val', None) or getattr(self._task, 'async', None):
+            return "the task runs asynchronously"
+        return LOAD_ERROR
+
+    def task_environment(self):
+        """ The environment variables set on the task and the play, templated """
+        environment = {}
+        for env in self._task.environment or []:
+            env = self._templar.template(env)
+            if isinstance(env, dict):
+                environment.update((to_native(key), to_native(value)) for key, value in env.items())
+        return environment
+
+    def load_module(self, module_name):
+        if module_name not in LOADED_MODULES:
+            module_path = self._shared_loader_obj.module_loader.find_plugin(module_name, '.py')
+            if module_path is None:
+                return None
+            LOADED_MODULES[module_name] = load_source('ansible_kube_module_{0}'.format(module_name), module_path)
+        return LOADED_MODULES[module_name]
+
+    def run_module(self, module, module_args):
+        """ Run the module's main() in this process, and return its result """
+        basic._ANSIBLE_ARGS = to_bytes(json.dumps({'ANSIBLE_MODULE_ARGS': module_args}))
+        # Ansible keeps warnings and deprecations in module level lists on some versions
+        for name in ('_global_warnings', '_global_deprecations'):
+            if isinstance(getattr(basic, name, None), list):
+                del getattr(basic, name)[:]
+        environment = self.task_environment()
+        saved_environment = dict((key, os.environ.get(key)) for key in environment)
+        os.environ.update(environment)
+        stdout, sys.stdout = sys.stdout, StringIO()
+        rc = 0
+        try:
+            module.main()
+        except SystemExit as exc:
+            rc = exc.code or 0
+        finally:
+            output, sys.stdout = sys.stdout.getvalue(), stdout
+            basic._ANSIBLE_ARGS = None
+            for key, value in saved_environment.items():
+                if value is None:
+                    os.environ.pop(key, None)
+                else:
+                    os.environ[key] = value
+        return self._parse_returned_data({'rc': rc, 'stdout': output, 'stdout_lines': output.splitlines(),
+                                          'stderr': ''})
+
+    def run(self, tmp=None, task_vars=None):
+        result = super(ActionModule, self).run(tmp, task_vars)
+        if result.get('skipped'):
+            return result
+
+        module_name = self._task.action
+        reason = self.local_execution_error()
+        module = None
+        if reason is None:
+            try:
+                module = self.load_module(module_name)
+            except Exception as exc:
+                reason = "loading it in-process failed: {0}".format(to_native(exc))
+        if module is None:
+            display.vvv("Running {0} as a module: {1}".format(module_name, reason or "module not found"))
+            result.update(self._execute_module(task_vars=task_vars))
+            return result
+
+        display.vvv("Running {0} in-process on the controller".format(module_name))
+        module_args = self._task.args.copy()
+        self._update_module_args(module_name, module_args, task_vars)
+        result.update(self.run_module(module, module_args))
+        return result
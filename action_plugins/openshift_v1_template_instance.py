@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+# This file is generated by hacking/build_dispatch.py. Do not edit it by hand.
+
+import os
+import sys
+
+# Runs the module in-process when the task runs on the controller. See kube_modules_local.py.
+LOCAL_NAME = 'ansible_kube_modules_local'
+LOCAL_PATH = os.path.join(os.path.dirname(__file__), 'kube_modules_local.py')
+
+
+def load_local():
+    try:
+        from importlib.util import module_from_spec, spec_from_file_location
+    except ImportError:
+        # Python 2
+        from imp import load_source
+        return load_source(LOCAL_NAME, LOCAL_PATH)
+    spec = spec_from_file_location(LOCAL_NAME, LOCAL_PATH)
+    module = module_from_spec(spec)
+    sys.modules[LOCAL_NAME] = module
+    try:
+        spec.loader.exec_module(module)
+    except BaseException:
+        del sys.modules[LOCAL_NAME]
+        raise
+    return module
+
+
+try:
+    ActionModule = (sys.modules.get(LOCAL_NAME) or load_local()).ActionModule
+except Exception:
+    # Run the module as usual
+    from ansible.plugins.action.normal import ActionModule as NormalActionModule
+    ActionModule = NormalActionModule
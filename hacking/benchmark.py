@@ -0,0 +1,212 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Benchmark the modules end to end against the fake API server.
+
+Runs KubernetesAnsibleModule.execute_module for a set of representative modules, through the same dispatch
+as the modules in library/, and reports tasks per second, p50 and p99 latency, and peak RSS. Each object is
+created, applied again unchanged, updated and deleted, and each of those steps is reported separately:
+
+    $ python hacking/benchmark.py --iterations 50 --forks 4 --latency 2
+
+Requires ansible and the openshift client. Modules run in-process, so the times exclude the interpreter
+startup and module transfer measured by benchmark_payload.py. With --forks, tasks run in that many worker
+processes, as Ansible runs them for many hosts.
+"""
+
+from __future__ import print_function
+
+import argparse
+import json
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_apiserver import FakeApiServer  # noqa: E402
+
+import ansible.module_utils  # noqa: E402
+from ansible.module_utils import basic  # noqa: E402
+from ansible.module_utils.six import StringIO  # noqa: E402
+
+# Load the role's module_utils as Ansible does for a role, ahead of the copies Ansible ships
+ansible.module_utils.__path__.insert(0, os.path.join(ROOT, 'module_utils'))
+
+from ansible.module_utils.k8s_dispatch import dispatch  # noqa: E402
+from ansible.module_utils.k8s_object import DISPATCH_TABLE, MODULE_CLASSES  # noqa: E402
+
+monotonic = getattr(time, 'monotonic', time.time)
+
+NAMESPACE = 'benchmark'
+
+STEPS = ('create', 'unchanged', 'update', 'delete')
+
+# Module, namespaced, and a function returning the parameters of object i, before and after an update
+SCENARIOS = [
+    ('k8s_v1_namespace', False, lambda i, rev: {
+        'name': 'benchmark-{0}'.format(i), 'labels': {'rev': str(rev)}}),
+    ('k8s_v1_config_map', True, lambda i, rev: {
+        'name': 'config-{0}'.format(i), 'data': dict(('key{0}'.format(n), 'value{0}'.format(n * rev))
+                                                     for n in range(20))}),
+    ('k8s_v1_secret', True, lambda i, rev: {
+        'name': 'secret-{0}'.format(i), 'string_data': {'password': 'secret{0}'.format(rev)}}),
+    ('k8s_v1_service', True, lambda i, rev: {
+        'name': 'service-{0}'.format(i), 'spec_selector': {'app': 'web'}, 'labels': {'rev': str(rev)},
+        'spec_ports': [{'port': 80, 'target_port': 8080}]}),
+    ('k8s_v1_persistent_volume', False, lambda i, rev: {
+        'name': 'volume-{0}'.format(i), 'spec_capacity': {'storage': '{0}Gi'.format(rev)},
+        'spec_access_modes': ['ReadWriteOnce'], 'spec_host_path_path': '/tmp/volume-{0}'.format(i)}),
+    ('openshift_v1_image_stream', True, lambda i, rev: {
+        'name': 'image-{0}'.format(i), 'labels': {'rev': str(rev)}}),
+]
+
+
+def module_class(module_name, watch_timeout):
+    """ The module's class, with the helper's watch timeout lowered for objects that are never ready """
+    base = MODULE_CLASSES[DISPATCH_TABLE[module_name][2]]
+
+    class BenchmarkModule(base):
+        @staticmethod
+        def get_helper(api_version, kind):
+            helper = base.get_helper(api_version, kind)
+            helper.timeout = watch_timeout
+            return helper
+
+    return BenchmarkModule
+
+
+def run_task(task):
+    """ Run a module in-process. Return (module, step, seconds, failed). """
+    module_name, step, params, kubeconfig, watch_timeout = task
+    params = dict(params, kubeconfig=kubeconfig)
+    kind, api_version = DISPATCH_TABLE[module_name][:2]
+    basic._ANSIBLE_ARGS = json.dumps({'ANSIBLE_MODULE_ARGS': params}).encode('utf-8')
+    stdout, sys.stdout = sys.stdout, StringIO()
+    start = monotonic()
+    error = None
+    try:
+        dispatch(module_class(module_name, watch_timeout), kind, api_version)
+    except SystemExit:
+        pass
+    except Exception as exc:
+        # A module that raises, rather than failing, is a failed task, not the end of the benchmark
+        error = '{0}: {1}'.format(type(exc).__name__, exc)
+    finally:
+        elapsed = monotonic() - start
+        output, sys.stdout = sys.stdout.getvalue(), stdout
+    if error is not None:
+        result = {'failed': True, 'msg': error}
+    else:
+        try:
+            result = json.loads(output)
+        except ValueError:
+            result = {'failed': True, 'msg': output}
+    if result.get('failed'):
+        print("{0} {1} failed: {2}".format(module_name, step, result.get('msg')), file=sys.stderr)
+    return module_name, step, elapsed, bool(result.get('failed'))
+
+
+def build_tasks(step, iterations, kubeconfig, watch_timeout):
+    tasks = []
+    for i in range(iterations):
+        for module_name, namespaced, params_for in SCENARIOS:
+            params = params_for(i, 2 if step == 'update' else 1)
+            params['state'] = 'absent' if step == 'delete' else 'present'
+            if namespaced:
+                params['namespace'] = NAMESPACE
+            tasks.append((module_name, step, params, kubeconfig, watch_timeout))
+    return tasks
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[int(round((len(values) - 1) * fraction))]
+
+
+def summarize(results, elapsed):
+    rows = []
+    for module_name, _, _ in SCENARIOS:
+        for step in STEPS:
+            times = [result[2] for result in results if result[:2] == (module_name, step)]
+            if times:
+                rows.append({
+                    'module': module_name,
+                    'step': step,
+                    'tasks': len(times),
+                    'failed': sum(1 for result in results if result[:2] == (module_name, step) and result[3]),
+                    'mean_ms': sum(times) / len(times) * 1000,
+                    'p50_ms': percentile(times, 0.5) * 1000,
+                    'p99_ms': percentile(times, 0.99) * 1000,
+                })
+    times = [result[2] for result in results]
+    total = {
+        'tasks': len(results),
+        'failed': sum(1 for result in results if result[3]),
+        'seconds': elapsed,
+        'tasks_per_second': len(results) / elapsed if elapsed else 0,
+        'p50_ms': percentile(times, 0.5) * 1000,
+        'p99_ms': percentile(times, 0.99) * 1000,
+    }
+    return rows, total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0].strip())
+    parser.add_argument('--iterations', type=int, default=20, help='objects of each kind (default: 20)')
+    parser.add_argument('--forks', type=int, default=1, help='worker processes (default: 1)')
+    parser.add_argument('--latency', type=float, default=0, help='milliseconds the server adds to each request')
+    parser.add_argument('--error-rate', type=float, default=0, help='fraction of requests the server fails')
+    parser.add_argument('--watch-timeout', type=int, default=1,
+                        help='seconds to wait for a created object to be ready (default: 1, the modules use 20)')
+    parser.add_argument('--kubeconfig', help='run against the cluster in this kubeconfig, not the fake server')
+    parser.add_argument('--json', metavar='PATH', help='also write the results to PATH')
+    args = parser.parse_args()
+
+    server = None
+    kubeconfig = args.kubeconfig
+    if not kubeconfig:
+        server = FakeApiServer(latency=args.latency, error_rate=args.error_rate).start()
+        kubeconfig = os.path.join(tempfile.mkdtemp(), 'kubeconfig')
+        server.write_kubeconfig(kubeconfig)
+
+    setup = run_task(('k8s_v1_namespace', 'setup', {'name': NAMESPACE}, kubeconfig, args.watch_timeout))
+    if setup[3]:
+        return 1
+
+    pool = multiprocessing.Pool(args.forks) if args.forks > 1 else None
+    results = []
+    start = monotonic()
+    for step in STEPS:
+        tasks = build_tasks(step, args.iterations, kubeconfig, args.watch_timeout)
+        results.extend(pool.map(run_task, tasks, chunksize=1) if pool else [run_task(task) for task in tasks])
+    elapsed = monotonic() - start
+    if pool:
+        pool.close()
+        pool.join()
+    if server:
+        server.stop()
+
+    rows, total = summarize(results, elapsed)
+    # ru_maxrss is in kilobytes on Linux, and bytes on macOS
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN if pool else resource.RUSAGE_SELF)
+    total['peak_rss_mb'] = usage.ru_maxrss / (1024.0 * 1024 if sys.platform == 'darwin' else 1024.0)
+
+    print('\t'.join(['module', 'step', 'tasks', 'failed', 'mean ms', 'p50 ms', 'p99 ms']))
+    for row in rows:
+        print('{module}\t{step}\t{tasks}\t{failed}\t{mean_ms:.1f}\t{p50_ms:.1f}\t{p99_ms:.1f}'.format(**row))
+    print("\n{tasks} tasks, {failed} failed, in {seconds:.1f}s: {tasks_per_second:.1f} tasks/s, "
+          "p50 {p50_ms:.1f} ms, p99 {p99_ms:.1f} ms, peak RSS {peak_rss_mb:.1f} MB".format(**total))
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'steps': rows, 'total': total, 'forks': args.forks, 'latency': args.latency}, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,190 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Benchmark the encodings of a large list: JSON, gzip compressed JSON, and the objects' metadata alone, as
+JSON or protobuf, each with and without gzip.
+
+Lists the pods of a namespace with k8s_v1_pod_list, in-process, through the same dispatch as the modules in
+library/, and reports the bytes received per list and the time per list, against plain JSON:
+
+    $ python hacking/benchmark_encoding.py --pods 2000 --iterations 10 --latency 50
+
+The fake API server is filled with pods first. With --kubeconfig, the pods of --namespace in that cluster
+are listed instead. Bytes are counted from the Content-Length of each response, so they are those sent over
+the wire; servers that send compressed lists in chunks have no Content-Length, and are counted decompressed.
+Requires ansible and the openshift client.
+"""
+
+from __future__ import print_function
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_apiserver import FakeApiServer  # noqa: E402
+
+import ansible.module_utils  # noqa: E402
+from ansible.module_utils import basic  # noqa: E402
+from ansible.module_utils.six import StringIO  # noqa: E402
+
+# Load the role's module_utils as Ansible does for a role, ahead of the copies Ansible ships
+ansible.module_utils.__path__.insert(0, os.path.join(ROOT, 'module_utils'))
+
+from ansible.module_utils.k8s_common import KubernetesAnsibleModule  # noqa: E402
+from ansible.module_utils.k8s_dispatch import dispatch  # noqa: E402
+from ansible.module_utils.k8s_mixins import KubernetesModuleMixin  # noqa: E402
+from ansible.module_utils.k8s_raw import MetadataListMixin  # noqa: E402
+
+monotonic = getattr(time, 'monotonic', time.time)
+
+NAMESPACE = 'benchmark'
+
+# Name, and the module options that select the encoding
+MODES = [
+    ('json', {}),
+    ('json gzip', {'compress': True}),
+    ('metadata json', {'metadata_only': True}),
+    ('metadata json gzip', {'metadata_only': True, 'compress': True}),
+    ('metadata protobuf', {'metadata_only': True, 'protobuf': True}),
+    ('metadata protobuf gzip', {'metadata_only': True, 'protobuf': True, 'compress': True}),
+]
+
+
+def pod(i):
+    """ A pod of a ReplicaSet, about 3 KB of JSON, as the API returns one """
+    return {
+        'apiVersion': 'v1',
+        'kind': 'Pod',
+        'metadata': {
+            'generateName': 'web-5d8f7c6b9-',
+            'labels': {'app': 'web', 'pod-template-hash': '5d8f7c6b9', 'tier': 'frontend'},
+            'annotations': {'kubernetes.io/created-by': json.dumps({'kind': 'SerializedReference', 'reference': {
+                'kind': 'ReplicaSet', 'namespace': NAMESPACE, 'name': 'web-5d8f7c6b9'}})},
+            'ownerReferences': [{'apiVersion': 'extensions/v1beta1', 'kind': 'ReplicaSet', 'name': 'web-5d8f7c6b9',
+                                 'uid': '6c1f3f0e-a9d1-11e7-8b6b-0242ac110002', 'controller': True,
+                                 'blockOwnerDeletion': True}],
+        },
+        'spec': {
+            'containers': [{
+                'name': 'web',
+                'image': 'registry.example.com/web/frontend:1.4.{0}'.format(i % 10),
+                'ports': [{'containerPort': 8080, 'protocol': 'TCP'}],
+                'env': [{'name': 'SETTING_{0}'.format(n), 'value': 'value-{0}'.format(n)} for n in range(10)],
+                'resources': {'limits': {'cpu': '500m', 'memory': '512Mi'},
+                              'requests': {'cpu': '100m', 'memory': '128Mi'}},
+                'volumeMounts': [{'name': 'default-token-x2v9k', 'readOnly': True,
+                                  'mountPath': '/var/run/secrets/kubernetes.io/serviceaccount'}],
+                'readinessProbe': {'httpGet': {'path': '/healthz', 'port': 8080, 'scheme': 'HTTP'},
+                                   'periodSeconds': 10, 'timeoutSeconds': 1, 'successThreshold': 1,
+                                   'failureThreshold': 3},
+                'terminationMessagePath': '/dev/termination-log',
+                'imagePullPolicy': 'IfNotPresent',
+            }],
+            'volumes': [{'name': 'default-token-x2v9k', 'secret': {'secretName': 'default-token-x2v9k',
+                                                                   'defaultMode': 420}}],
+            'restartPolicy': 'Always',
+            'terminationGracePeriodSeconds': 30,
+            'dnsPolicy': 'ClusterFirst',
+            'serviceAccountName': 'default',
+            'nodeName': 'node-{0}.example.com'.format(i % 20),
+            'schedulerName': 'default-scheduler',
+        },
+        'status': {
+            'phase': 'Running',
+            'conditions': [{'type': condition, 'status': 'True', 'lastTransitionTime': '2017-10-01T12:00:00Z'}
+                           for condition in ('Initialized', 'Ready', 'PodScheduled')],
+            'hostIP': '10.0.{0}.{1}'.format(i % 20, 10),
+            'podIP': '172.17.{0}.{1}'.format(i // 250, i % 250),
+            'startTime': '2017-10-01T12:00:00Z',
+            'qosClass': 'Burstable',
+            'containerStatuses': [{'name': 'web', 'ready': True, 'restartCount': 0,
+                                   'state': {'running': {'startedAt': '2017-10-01T12:00:05Z'}},
+                                   'image': 'registry.example.com/web/frontend:1.4.{0}'.format(i % 10),
+                                   'imageID': 'docker-pullable://registry.example.com/web/frontend@sha256:' + '0' * 64,
+                                   'containerID': 'docker://' + '{0:064x}'.format(i)}],
+        },
+    }
+
+
+def run_list(params):
+    """ Run k8s_v1_pod_list in-process. Return (seconds, bytes received, number of items). """
+    basic._ANSIBLE_ARGS = json.dumps({'ANSIBLE_MODULE_ARGS': dict(params, profile=True)}).encode('utf-8')
+    stdout, sys.stdout = sys.stdout, StringIO()
+    start = monotonic()
+    try:
+        dispatch(KubernetesAnsibleModule, 'pod_list', 'v1', KubernetesModuleMixin, MetadataListMixin)
+    except SystemExit:
+        pass
+    finally:
+        elapsed = monotonic() - start
+        output, sys.stdout = sys.stdout.getvalue(), stdout
+    result = json.loads(output)
+    if result.get('failed'):
+        raise RuntimeError(result.get('msg'))
+    received = sum(phase['bytes_received'] for phase in result['_timings']['phases'].values())
+    return elapsed, received, len(result['pod_list'].get('items') or [])
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[int(round((len(values) - 1) * fraction))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0].strip())
+    parser.add_argument('--pods', type=int, default=1000, help='pods to create on the fake server (default: 1000)')
+    parser.add_argument('--iterations', type=int, default=10, help='lists in each encoding (default: 10)')
+    parser.add_argument('--latency', type=float, default=0, help='milliseconds the server adds to each request')
+    parser.add_argument('--kubeconfig', help='list the pods of a cluster in this kubeconfig, not the fake server')
+    parser.add_argument('--namespace', default=NAMESPACE, help='namespace to list (default: benchmark)')
+    parser.add_argument('--json', metavar='PATH', help='also write the results to PATH')
+    args = parser.parse_args()
+
+    # Keep the discovery the metadata lists use apart from that of real clusters
+    os.environ['KUBE_MODULES_DISCOVERY_DIR'] = tempfile.mkdtemp()
+    server = None
+    kubeconfig = args.kubeconfig
+    if not kubeconfig:
+        server = FakeApiServer(latency=args.latency).start()
+        kubeconfig = os.path.join(tempfile.mkdtemp(), 'kubeconfig')
+        server.write_kubeconfig(kubeconfig)
+        for i in range(args.pods):
+            server.store.create(('', 'pods', args.namespace, 'web-5d8f7c6b9-{0:05d}'.format(i)), pod(i))
+
+    rows = []
+    for name, options in MODES:
+        params = dict(options, namespace=args.namespace, kubeconfig=kubeconfig)
+        # The first list of each encoding fills the discovery cache, and is not counted
+        run_list(params)
+        runs = [run_list(params) for _ in range(args.iterations)]
+        times = [run[0] for run in runs]
+        rows.append({
+            'encoding': name,
+            'items': runs[-1][2],
+            'bytes': runs[-1][1],
+            'p50_ms': percentile(times, 0.5) * 1000,
+            'p99_ms': percentile(times, 0.99) * 1000,
+        })
+    if server:
+        server.stop()
+
+    baseline = rows[0]
+    print('\t'.join(['encoding', 'items', 'bytes', 'vs json', 'p50 ms', 'p99 ms']))
+    for row in rows:
+        row['bytes_ratio'] = float(row['bytes']) / baseline['bytes'] if baseline['bytes'] else 0
+        print('{encoding:<24}\t{items}\t{bytes}\t{bytes_ratio:.3f}\t{p50_ms:.1f}\t{p99_ms:.1f}'.format(**row))
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'encodings': rows, 'latency': args.latency}, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,239 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Micro-benchmarks of the module_utils hot paths, with baselines to compare against.
+
+Times building the argument spec of the largest modules, converting resource definitions to module
+parameters, loading a resource definition file, and the deepcopy, object_from_params and objects_match steps
+of an update, using synthetic resources of 1 KB and 100 KB, and of 10 MB with --sizes. Save a baseline, then
+compare a later run against it:
+
+    $ python hacking/benchmark_module_utils.py --save
+    $ python hacking/benchmark_module_utils.py --compare
+
+The baseline in hacking/benchmarks/module_utils.json is kept in the repository, and records the Python version
+and machine it was measured on. Timings only compare on the same machine, so save a baseline of your own, with
+--baseline, before changing the code, or update the stored one along with a change that is meant to make things
+faster. A comparison marks each benchmark more than --threshold percent slower than its baseline as a
+regression, and exits with status 1 if there are any. Requires ansible and the openshift client.
+"""
+
+from __future__ import print_function
+
+import argparse
+import copy
+import json
+import os
+import platform
+import re
+import shutil
+import sys
+import tempfile
+import time
+
+import yaml
+from openshift.client import ApiClient
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+import ansible.module_utils  # noqa: E402
+
+# Load the role's module_utils as Ansible does for a role, ahead of the copies Ansible ships
+ansible.module_utils.__path__.insert(0, os.path.join(ROOT, 'module_utils'))
+
+from ansible.module_utils.k8s_object import DISPATCH_TABLE, MODULE_CLASSES  # noqa: E402
+from ansible.module_utils.k8s_profile import monotonic  # noqa: E402
+
+DEFAULT_BASELINE = os.path.join(ROOT, 'hacking', 'benchmarks', 'module_utils.json')
+
+ARGSPEC_MODULES = ('k8s_v1_persistent_volume', 'openshift_v1_build_config', 'openshift_v1_deployment_config')
+
+SIZES = (('1kb', 1024), ('100kb', 100 * 1024), ('10mb', 10 * 1024 * 1024))
+
+# The update of a 10 MB resource takes minutes, so it only runs when asked for
+DEFAULT_SIZES = ('1kb', '100kb')
+
+# Minimum seconds each timing runs for
+MIN_TIME = 0.2
+
+
+def bare_module(module_name):
+    """ A module object with its helper, without parsing task arguments """
+    kind, api_version, family = DISPATCH_TABLE[module_name]
+    module_class = MODULE_CLASSES[family]
+    module = module_class.__new__(module_class)
+    module.kind = kind
+    module.api_version = api_version
+    module.argspec_cache = None
+    module.params = {}
+    module.helper = module_class.get_helper(api_version, kind)
+    return module
+
+
+def model_object(helper, params):
+    """
+    The model object params describe, as read from the API. The object is deserialized from the request body,
+    since object_from_params() sets the attributes of a new object one at a time, and fails on the kinds whose
+    model requires some of them, such as DeploymentConfig.
+    """
+    body = helper.request_body_from_params(params)
+    body['apiVersion'] = helper.api_version
+    # The OpenShift client finds the models of both OpenShift and Kubernetes kinds
+    return ApiClient()._ApiClient__deserialize(body, helper.model.__name__)
+
+
+def config_map(size):
+    """ A ConfigMap definition of about size bytes """
+    count = max(1, size // 1024)
+    return {
+        'apiVersion': 'v1',
+        'kind': 'ConfigMap',
+        'metadata': {'name': 'benchmark', 'namespace': 'benchmark', 'labels': {'app': 'benchmark'}},
+        'data': dict(('key{0}'.format(n), 'x' * 1000) for n in range(count)),
+    }
+
+
+def deployment_config(size, revision=1):
+    """ A DeploymentConfig definition of about size bytes, most of it in container environment variables """
+    count = max(1, size // 64)
+    env = [{'name': 'VARIABLE_{0}'.format(n), 'value': 'value-{0}-{1}'.format(n, revision)} for n in range(count)]
+    return {
+        'apiVersion': 'v1',
+        'kind': 'DeploymentConfig',
+        'metadata': {'name': 'benchmark', 'namespace': 'benchmark', 'labels': {'app': 'benchmark'}},
+        'spec': {
+            'replicas': 1,
+            'selector': {'app': 'benchmark'},
+            'template': {
+                'metadata': {'labels': {'app': 'benchmark'}},
+                'spec': {'containers': [{'name': 'web', 'image': 'nginx:latest', 'env': env,
+                                         'ports': [{'containerPort': 8080}]}]},
+            },
+        },
+    }
+
+
+def measure(func):
+    """ Return the best seconds per call of func over three runs, each of at least MIN_TIME """
+    start = monotonic()
+    func()
+    once = monotonic() - start
+    number = max(1, int(MIN_TIME / once)) if once else 1000
+    best = None
+    for _ in range(3):
+        start = monotonic()
+        for _ in range(number):
+            func()
+        elapsed = (monotonic() - start) / number
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def argspec_benchmarks():
+    for module_name in ARGSPEC_MODULES:
+        module = bare_module(module_name)
+
+        def helper_argspec(module=module):
+            module.helper._argspec_cache = None
+            return module.helper.argspec
+
+        def module_argspec(module=module):
+            module.argspec_cache = None
+            return module.argspec
+
+        yield 'helper_argspec[{0}]'.format(module_name), helper_argspec
+        yield 'argspec[{0}]'.format(module_name), module_argspec
+
+
+def resource_benchmarks(sizes, tmpdir):
+    config_map_module = bare_module('k8s_v1_config_map')
+    deployment_config_module = bare_module('openshift_v1_deployment_config')
+
+    for label, size in sizes:
+        for name, module, resource in (('config_map', config_map_module, config_map(size)),
+                                       ('deployment_config', deployment_config_module, deployment_config(size))):
+            yield ('resource_to_parameters[{0}-{1}]'.format(name, label),
+                   lambda module=module, resource=resource: module.resource_to_parameters(resource))
+
+        path = os.path.join(tmpdir, 'deployment_config_{0}.yml'.format(label))
+        with open(path, 'w') as f:
+            yaml.safe_dump(deployment_config(size), f, default_flow_style=False)
+        yield ('load_resource_definition[deployment_config-{0}]'.format(label),
+               lambda path=path: deployment_config_module.load_resource_definition(path))
+
+        helper = deployment_config_module.helper
+        params = deployment_config_module.resource_to_parameters(deployment_config(size))
+        params.update(name='benchmark', namespace='benchmark')
+        updated_params = deployment_config_module.resource_to_parameters(deployment_config(size, revision=2))
+        updated_params.update(name='benchmark', namespace='benchmark')
+        existing = model_object(helper, params)
+
+        def update(helper=helper, existing=existing, updated_params=updated_params):
+            k8s_obj = copy.deepcopy(existing)
+            helper.object_from_params(updated_params, obj=k8s_obj)
+            return helper.objects_match(existing, k8s_obj)
+
+        yield 'update[deployment_config-{0}]'.format(label), update
+
+
+def compare(results, baseline, threshold):
+    regressions = 0
+    print('\t'.join(['benchmark', 'baseline ms', 'current ms', 'change']))
+    for name, seconds in sorted(results.items()):
+        previous = baseline.get(name)
+        if previous is None:
+            print('{0}\t-\t{1:.3f}\tnew'.format(name, seconds * 1000))
+            continue
+        change = (seconds - previous) / previous * 100
+        regressed = change > threshold
+        regressions += regressed
+        flag = ' REGRESSION' if regressed else ''
+        print('{0}\t{1:.3f}\t{2:.3f}\t{3:+.1f}%{4}'.format(name, previous * 1000, seconds * 1000, change, flag))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0].strip())
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE,
+                        help='baseline file (default: hacking/benchmarks/module_utils.json)')
+    parser.add_argument('--save', action='store_true', help='save the results as the baseline')
+    parser.add_argument('--compare', action='store_true', help='compare the results with the baseline')
+    parser.add_argument('--threshold', type=float, default=10.0,
+                        help='percent slower than the baseline to report as a regression (default: 10)')
+    parser.add_argument('--sizes', default=','.join(DEFAULT_SIZES),
+                        help='resource sizes to run, of 1kb, 100kb and 10mb (default: 1kb,100kb)')
+    parser.add_argument('--filter', help='only run benchmarks whose name matches this regular expression')
+    args = parser.parse_args()
+
+    sizes = [(label, size) for label, size in SIZES if label in args.sizes.split(',')]
+    tmpdir = tempfile.mkdtemp()
+    results = {}
+    try:
+        benchmarks = list(argspec_benchmarks()) + list(resource_benchmarks(sizes, tmpdir))
+        for name, func in benchmarks:
+            if args.filter and not re.search(args.filter, name):
+                continue
+            results[name] = measure(func)
+            if not args.compare:
+                print('{0}\t{1:.3f} ms'.format(name, results[name] * 1000))
+    finally:
+        shutil.rmtree(tmpdir)
+
+    status = 0
+    if args.compare:
+        if not os.path.exists(args.baseline):
+            parser.error("No baseline at {0}. Run with --save first.".format(args.baseline))
+        with open(args.baseline) as f:
+            baseline = json.load(f)['results']
+        status = 1 if compare(results, baseline, args.threshold) else 0
+    if args.save:
+        if not os.path.isdir(os.path.dirname(args.baseline)):
+            os.makedirs(os.path.dirname(args.baseline))
+        with open(args.baseline, 'w') as f:
+            json.dump({'python': sys.version.split()[0], 'machine': platform.machine(), 'timestamp': time.time(),
+                       'results': results}, f, indent=2, sort_keys=True)
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
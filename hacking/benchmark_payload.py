@@ -0,0 +1,129 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Compare the per-task payload of the modules in library/ with their payload-minimal copies.
+
+For each module, the script packages the module and the module_utils it imports the way AnsiballZ does, as a
+deflated zip, base64 encoded, and reports the bytes transferred and the time to decode, unzip and compile the
+payload. With --ssh, each payload is also piped to a remote host, which decodes, unzips and compiles it, and
+the wall clock time of the round trip is reported:
+
+    $ python hacking/build_minimal_payload.py --output build/minimal
+    $ python hacking/benchmark_payload.py --minimal build/minimal --ssh user@remote k8s_v1_pod
+"""
+
+from __future__ import print_function
+
+import argparse
+import base64
+import io
+import os
+import re
+import subprocess
+import sys
+import time
+import zipfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORT_RX = re.compile(r"^\s*from ansible\.module_utils\.(\w+) import", re.M)
+
+DEFAULT_MODULES = ['k8s_v1_pod', 'k8s_v1_persistent_volume', 'openshift_v1_build_config',
+                   'openshift_v1_deployment_config', 'k8s_v1_config_map_list']
+
+# Run on the remote host: read a payload from stdin, then decode, unzip and compile it, as AnsiballZ does
+REMOTE_SCRIPT = '''
+import base64, io, sys, time, zipfile
+start = time.time()
+data = sys.stdin.read()
+read = time.time()
+archive = zipfile.ZipFile(io.BytesIO(base64.b64decode(data)))
+for name in archive.namelist():
+    compile(archive.read(name), name, 'exec')
+done = time.time()
+sys.stdout.write('%f %f\\n' % (read - start, done - read))
+'''
+
+
+def module_utils_closure(source, module_utils_path, seen=None):
+    """ Return the names of the role's module_utils imported by source, directly or indirectly """
+    seen = set() if seen is None else seen
+    for name in IMPORT_RX.findall(source):
+        path = os.path.join(module_utils_path, name + '.py')
+        if name in seen or not os.path.exists(path):
+            continue
+        seen.add(name)
+        with open(path) as f:
+            module_utils_closure(f.read(), module_utils_path, seen)
+    return seen
+
+
+def build_payload(module_path, module_utils_path):
+    """ Return the base64 encoded zip that would be sent for the module """
+    with open(module_path) as f:
+        source = f.read()
+    buf = io.BytesIO()
+    archive = zipfile.ZipFile(buf, 'w', compression=zipfile.ZIP_DEFLATED)
+    archive.writestr('ansible_module_{0}'.format(os.path.basename(module_path)), source)
+    for name in sorted(module_utils_closure(source, module_utils_path)):
+        archive.write(os.path.join(module_utils_path, name + '.py'), 'ansible/module_utils/{0}.py'.format(name))
+    archive.close()
+    return base64.b64encode(buf.getvalue())
+
+
+def local_startup(payload, iterations):
+    """ Average seconds to decode, unzip and compile the payload """
+    start = time.time()
+    for _ in range(iterations):
+        archive = zipfile.ZipFile(io.BytesIO(base64.b64decode(payload)))
+        for name in archive.namelist():
+            compile(archive.read(name), name, 'exec')
+    return (time.time() - start) / iterations
+
+
+def remote_startup(payload, host, python, iterations):
+    """ Average wall clock seconds to send the payload over SSH and have it decoded, unzipped and compiled """
+    quoted_script = "'{0}'".format(REMOTE_SCRIPT.replace("'", "'\\''"))
+    command = ['ssh', host, python, '-c', quoted_script]
+    start = time.time()
+    for _ in range(iterations):
+        process = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+        process.communicate(payload)
+        if process.returncode != 0:
+            raise RuntimeError("ssh to {0} failed with exit code {1}".format(host, process.returncode))
+    return (time.time() - start) / iterations
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0].strip())
+    parser.add_argument('modules', nargs='*', default=DEFAULT_MODULES, help='modules to compare')
+    parser.add_argument('--minimal', default=os.path.join(ROOT, 'build', 'minimal'),
+                        help='output directory of build_minimal_payload.py (default: build/minimal)')
+    parser.add_argument('--iterations', type=int, default=20, help='runs to average (default: 20)')
+    parser.add_argument('--ssh', metavar='HOST', help='also time the round trip to HOST over SSH')
+    parser.add_argument('--python', default='python', help='interpreter on the SSH host (default: python)')
+    args = parser.parse_args()
+
+    if not os.path.isdir(os.path.join(args.minimal, 'library')):
+        parser.error("{0} not found. Run hacking/build_minimal_payload.py first.".format(args.minimal))
+
+    variants = [
+        ('full', os.path.join(ROOT, 'library'), os.path.join(ROOT, 'module_utils')),
+        ('minimal', os.path.join(args.minimal, 'library'), os.path.join(args.minimal, 'module_utils')),
+    ]
+    columns = ['module', 'variant', 'payload bytes', 'local ms']
+    if args.ssh:
+        columns.append('ssh ms')
+    print('\t'.join(columns))
+    for module in args.modules:
+        for variant, library_path, module_utils_path in variants:
+            payload = build_payload(os.path.join(library_path, module + '.py'), module_utils_path)
+            row = [module, variant, str(len(payload)), '{0:.2f}'.format(local_startup(payload, args.iterations) * 1000)]
+            if args.ssh:
+                row.append('{0:.1f}'.format(remote_startup(payload, args.ssh, args.python, args.iterations) * 1000))
+            print('\t'.join(row))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,183 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Generate module_utils/k8s_dispatch_table.py from the generated modules in library/, and reduce the main() of
+each generated module to a call to module_utils.k8s_dispatch.dispatch(). Also writes the action plugin of
+each module in library/, which runs the module in-process when the task runs on the controller.
+
+The table maps each module name to the kind and API version it manages, and the module_utils class family that
+runs it. Only k8s_object imports the table; each generated module passes its own kind to dispatch(). Run it
+from the root of the repository after regenerating the modules:
+
+    $ python hacking/build_dispatch.py
+"""
+
+from __future__ import print_function
+
+import glob
+import os
+import re
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TABLE_PATH = os.path.join(ROOT, 'module_utils', 'k8s_dispatch_table.py')
+ACTION_PLUGINS_PATH = os.path.join(ROOT, 'action_plugins')
+
+NAME_RX = re.compile(r"^(k8s|openshift)_((?:[a-z]+_)?v\d+(?:(?:alpha|beta)\d+)?)_(\w+)$")
+IMPORT_RX = re.compile(r"^(?:from ansible\.module_utils\.\w+ import [\w, ]+\n)+", re.M)
+MAIN_RX = re.compile(r"^def main\(\):\n.*?(?=^if __name__ == '__main__':)", re.M | re.S)
+
+# module_utils module and class that run each family
+FAMILY_CLASSES = {
+    'k8s': ('k8s_common', 'KubernetesAnsibleModule'),
+    'openshift': ('openshift_common', 'OpenShiftAnsibleModule'),
+}
+
+# module_utils module and class that run the modules with options of their own
+MODULE_CLASSES = {
+    'openshift_v1_build_request': ('openshift_build', 'OpenShiftBuildRequestModule'),
+    'openshift_v1_template_instance': ('openshift_template_instance', 'OpenShiftTemplateInstanceModule'),
+}
+
+# module_utils module and class of the mixins that add the options of the list modules
+LIST_MIXINS = (
+    ('k8s_encoding', 'CompressMixin'),
+    ('k8s_raw', 'MetadataListMixin'),
+)
+
+HEADER = '''#
+#  Copyright 2017 Red Hat | Ansible
+#
+# This file is part of Ansible
+#
+# Ansible is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Ansible is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Ansible.  If not, see <http://www.gnu.org/licenses/>.
+
+# This file is generated by hacking/build_dispatch.py. Do not edit it by hand.
+
+# module name: (kind, api_version, family)
+DISPATCH_TABLE = {
+'''
+
+ACTION_PLUGIN = '''# -*- coding: utf-8 -*-
+# This file is generated by hacking/build_dispatch.py. Do not edit it by hand.
+
+import os
+import sys
+
+# Runs the module in-process when the task runs on the controller. See kube_modules_local.py.
+LOCAL_NAME = 'ansible_kube_modules_local'
+LOCAL_PATH = os.path.join(os.path.dirname(__file__), 'kube_modules_local.py')
+
+
+def load_local():
+    try:
+        from importlib.util import module_from_spec, spec_from_file_location
+    except ImportError:
+        # Python 2
+        from imp import load_source
+        return load_source(LOCAL_NAME, LOCAL_PATH)
+    spec = spec_from_file_location(LOCAL_NAME, LOCAL_PATH)
+    module = module_from_spec(spec)
+    sys.modules[LOCAL_NAME] = module
+    try:
+        spec.loader.exec_module(module)
+    except BaseException:
+        del sys.modules[LOCAL_NAME]
+        raise
+    return module
+
+
+try:
+    ActionModule = (sys.modules.get(LOCAL_NAME) or load_local()).ActionModule
+except Exception:
+    # Run the module as usual
+    from ansible.plugins.action.normal import ActionModule as NormalActionModule
+    ActionModule = NormalActionModule
+'''
+
+ALIAS_IMPORTS = '''from ansible.module_utils.{0} import {1}
+from ansible.module_utils.k8s_dispatch import dispatch
+'''
+
+ALIAS_MIXIN_IMPORT = '''from ansible.module_utils.{0} import {1}
+'''
+
+ALIAS_MAIN = '''def main():
+    dispatch({0}, '{1}', '{2}'{3})
+
+
+'''
+
+
+def module_entry(name, source):
+    """ Return the table entry for a generated module, or None for modules that were written by hand """
+    match = NAME_RX.match(name)
+    if not match:
+        return None
+    family, api_version, kind = match.groups()
+    return kind, api_version, family
+
+
+def alias_module(name, entry, source):
+    """ Replace the module's main() with a call to dispatch() """
+    kind, api_version, family = entry
+    module_utils, class_name = MODULE_CLASSES.get(name, FAMILY_CLASSES[family])
+    mixins = LIST_MIXINS if kind.endswith('_list') else ()
+    imports = ALIAS_IMPORTS.format(module_utils, class_name)
+    imports += ''.join(ALIAS_MIXIN_IMPORT.format(*mixin) for mixin in mixins)
+    source = IMPORT_RX.sub(imports, source, count=1)
+    mixin_args = ''.join(', {0}'.format(mixin_class) for mixin_module, mixin_class in mixins)
+    return MAIN_RX.sub(ALIAS_MAIN.format(class_name, kind, api_version, mixin_args), source, count=1)
+
+
+def build(library_path):
+    """ Alias the generated modules found in library_path, and return the source of the table """
+    lines = []
+    for path in sorted(glob.glob(os.path.join(library_path, '*.py'))):
+        name = os.path.splitext(os.path.basename(path))[0]
+        with open(path) as f:
+            source = f.read()
+        entry = module_entry(name, source)
+        if entry is None:
+            continue
+        lines.append("    '{0}':\n        ('{1}', '{2}', '{3}'),".format(name, *entry))
+        aliased = alias_module(name, entry, source)
+        if aliased != source:
+            with open(path, 'w') as f:
+                f.write(aliased)
+    return HEADER + '\n'.join(lines) + '\n}\n'
+
+
+def write_action_plugins(library_path, action_plugins_path):
+    """ Write an action plugin for each module in library_path, and return the number written """
+    count = 0
+    for path in sorted(glob.glob(os.path.join(library_path, '*.py'))):
+        with open(os.path.join(action_plugins_path, os.path.basename(path)), 'w') as f:
+            f.write(ACTION_PLUGIN)
+        count += 1
+    return count
+
+
+def main():
+    table = build(os.path.join(ROOT, 'library'))
+    with open(TABLE_PATH, 'w') as f:
+        f.write(table)
+    print("Wrote {0} entries to {1}".format(table.count('\n        '), os.path.relpath(TABLE_PATH, ROOT)))
+    count = write_action_plugins(os.path.join(ROOT, 'library'), ACTION_PLUGINS_PATH)
+    print("Wrote {0} action plugins to {1}".format(count, os.path.relpath(ACTION_PLUGINS_PATH, ROOT)))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,163 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Build payload-minimal copies of the modules in library/.
+
+Ansible transfers and compiles a module's DOCUMENTATION, EXAMPLES and RETURN strings on every task, though
+nothing reads them on the target. This script writes a copy of each module with those strings removed, and
+moves them to a sidecar YAML file next to the module, where documentation tools can still find them. The
+module_utils the modules import are copied without their docstrings, and the others are left out:
+
+    $ python hacking/build_minimal_payload.py --output build/minimal
+
+    build/minimal/library/k8s_v1_pod.py    module code only
+    build/minimal/library/k8s_v1_pod.yml   DOCUMENTATION, EXAMPLES and RETURN
+    build/minimal/module_utils/            the module_utils the modules import, without docstrings
+
+Point the library and module_utils settings of ansible.cfg at the output directory to use it.
+"""
+
+from __future__ import print_function
+
+import argparse
+import functools
+import glob
+import os
+import re
+import shutil
+import sys
+import tokenize
+
+import yaml
+
+from benchmark_payload import module_utils_closure
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DOC_STRING_RX = re.compile(r"^(DOCUMENTATION|EXAMPLES|RETURN) = '''(.*?)'''\n+", re.M | re.S)
+
+
+class LiteralString(str):
+    pass
+
+
+def literal_representer(dumper, data):
+    return dumper.represent_scalar('tag:yaml.org,2002:str', data, style='|')
+
+
+yaml.SafeDumper.add_representer(LiteralString, literal_representer)
+
+
+def split_module(source):
+    """
+    Separate a module's documentation strings from its code.
+
+    :return: tuple of (code, dict of name: documentation string)
+    """
+    docs = {}
+
+    def remove(match):
+        docs[match.group(1)] = match.group(2)
+        return ''
+
+    code = DOC_STRING_RX.sub(remove, source)
+    code = re.sub(r'\n{2,}(?=def |class )', '\n\n\n', code)
+    return code, docs
+
+
+def sidecar(docs):
+    """ Return the YAML sidecar for a module's documentation strings """
+    data = {}
+    for name in ('DOCUMENTATION', 'RETURN'):
+        if docs.get(name, '').strip():
+            data[name] = yaml.safe_load(docs[name])
+    if docs.get('EXAMPLES', '').strip():
+        data['EXAMPLES'] = LiteralString(docs['EXAMPLES'].strip('\n') + '\n')
+    return yaml.safe_dump(data, default_flow_style=False, width=120)
+
+
+def strip_docstrings(source):
+    """
+    Remove the docstrings of a Python source. A docstring that is the whole body of a class or function is
+    replaced by pass. Comments, such as the license header, are kept.
+    """
+    lines = source.splitlines(True)
+    offsets = [0]
+    for line in lines:
+        offsets.append(offsets[-1] + len(line))
+    removals = []
+    previous = tokenize.NEWLINE
+    # A string that starts a statement, and one that is the whole statement, a docstring
+    pending = docstring = None
+    for tok_type, _, start, end, _ in tokenize.generate_tokens(functools.partial(next, iter(lines), '')):
+        if tok_type in (tokenize.COMMENT, tokenize.NL):
+            continue
+        if docstring is not None:
+            (start_row, start_col), (end_row, end_col) = docstring
+            if tok_type in (tokenize.DEDENT, tokenize.ENDMARKER):
+                removals.append((offsets[start_row - 1] + start_col, offsets[end_row - 1] + end_col, 'pass'))
+            else:
+                removals.append((offsets[start_row - 1], offsets[end_row], ''))
+            docstring = None
+        if pending is not None:
+            if tok_type == tokenize.NEWLINE:
+                docstring = pending
+            pending = None
+        elif tok_type == tokenize.STRING and previous in (tokenize.NEWLINE, tokenize.INDENT, tokenize.DEDENT):
+            pending = (start, end)
+        previous = tok_type
+    for start, end, replacement in reversed(removals):
+        source = source[:start] + replacement + source[end:]
+    return source
+
+
+def build(library_path, module_utils_path, output):
+    library_output = os.path.join(output, 'library')
+    if not os.path.isdir(library_output):
+        os.makedirs(library_output)
+
+    totals = {'modules': 0, 'before': 0, 'after': 0, 'module_utils': 0}
+    imported = set()
+    for path in sorted(glob.glob(os.path.join(library_path, '*.py'))):
+        with open(path) as f:
+            source = f.read()
+        module_utils_closure(source, module_utils_path, imported)
+        code, docs = split_module(source)
+        name = os.path.splitext(os.path.basename(path))[0]
+        with open(os.path.join(library_output, name + '.py'), 'w') as f:
+            f.write(code)
+        if docs:
+            with open(os.path.join(library_output, name + '.yml'), 'w') as f:
+                f.write(sidecar(docs))
+        totals['modules'] += 1
+        totals['before'] += len(source)
+        totals['after'] += len(code)
+
+    module_utils_output = os.path.join(output, 'module_utils')
+    if os.path.isdir(module_utils_output):
+        shutil.rmtree(module_utils_output)
+    os.makedirs(module_utils_output)
+    for name in sorted(imported):
+        with open(os.path.join(module_utils_path, name + '.py')) as f:
+            source = f.read()
+        with open(os.path.join(module_utils_output, name + '.py'), 'w') as f:
+            f.write(strip_docstrings(source))
+        totals['module_utils'] += 1
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0].strip())
+    parser.add_argument('--output', default=os.path.join(ROOT, 'build', 'minimal'),
+                        help='directory to write the minimal library to (default: build/minimal)')
+    parser.add_argument('--library', default=os.path.join(ROOT, 'library'), help='directory of modules to strip')
+    args = parser.parse_args()
+
+    totals = build(args.library, os.path.join(ROOT, 'module_utils'), args.output)
+    print("Stripped {modules} modules: {before} bytes of source reduced to {after}. Copied {module_utils} "
+          "module_utils.".format(**totals))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
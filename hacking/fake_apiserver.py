@@ -0,0 +1,1118 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+An in-memory stand-in for the Kubernetes and OpenShift API, for running the modules without a cluster.
+
+Serves the /api, /apis and /oapi paths for any resource, keeping objects in memory. Supports create, get,
+list with label and field selectors and limit/continue pagination, replace, merge, strategic merge and JSON
+patches, delete, the eviction of pods within their PodDisruptionBudgets, the approval of certificate signing
+requests, builds started by instantiating a BuildConfig and their logs, the processing and instantiation of
+templates, the import of images, and watch, with resourceVersions that increase with each change. Latency
+and server errors can be injected into every request:
+
+    $ python hacking/fake_apiserver.py --port 8443 --kubeconfig /tmp/fake.kubeconfig --latency 5 --error-rate 0.01
+    $ ansible-playbook tests/test.yml -e os_kubeconfig=/tmp/fake.kubeconfig -e os_host=http://127.0.0.1:8443
+
+Objects are given a status on creation, so the modules that wait for an object to be ready see it as ready,
+and Routes are given a host. The server does not validate objects, and it does not run controllers: deleting
+a namespace, for example, does not delete the objects in it. Discovery serves a fixed set of common kinds, and
+the kinds defined by the CustomResourceDefinitions created on the server, with ETags.
+
+Requests are authorized by a fixed set of RBAC rules, which allow everything, or with --read-only, only
+the verbs that read. Access reviews and rules reviews answer from the same rules. Token reviews authenticate
+the token of the kubeconfig the server writes, and the tokens of service account token secrets.
+
+Responses are compressed with gzip when the request asks for it, other than watches. Lists are served as a
+PartialObjectMetadataList when asked for one, in JSON, or in protobuf for the kinds that are not custom
+resources.
+"""
+
+from __future__ import print_function
+
+import argparse
+import base64
+import copy
+import gzip
+import hashlib
+import io
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+
+try:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
+    from urllib.parse import parse_qs, urlparse
+except ImportError:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from SocketServer import ThreadingMixIn
+    from urlparse import parse_qs, urlparse
+
+# The protobuf encoder and template processor of the role's module_utils, which import nothing from Ansible
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'module_utils'))
+from k8s_encoding import PROTOBUF, encode_object  # noqa: E402
+from openshift_template import TemplateError, process_template, processed_template  # noqa: E402
+
+# Number of changes kept for watches that start from a resourceVersion
+HISTORY_SIZE = 10000
+
+# Address of the integrated registry the ImageStreams are pushed to
+REGISTRY = '172.30.1.1:5000'
+
+# The log of the builds started by instantiating a BuildConfig, a line written every BUILD_STEP seconds
+BUILD_LOG = ['Cloning "https://github.com/openshift/ruby-hello-world.git" ...',
+             'Step 1/4 : FROM centos/ruby-22-centos7',
+             'Step 2/4 : COPY . /opt/app-root/src',
+             'Step 3/4 : RUN bundle install',
+             'Step 4/4 : CMD ["ruby", "app.rb"]',
+             'Successfully built 9b1d3c1a8e2f',
+             'Pushing image {0}/myproject/ruby-hello-world:latest ...'.format(REGISTRY),
+             'Push successful']
+BUILD_STEP = 0.1
+
+# Kinds that have no status. The status given to other kinds on creation marks them as ready.
+KINDS_WITHOUT_STATUS = ('ConfigMap', 'Secret', 'ServiceAccount', 'Endpoints', 'Event', 'LimitRange',
+                        'PodTemplate', 'Role', 'RoleBinding', 'ClusterRole', 'ClusterRoleBinding', 'StorageClass',
+                        'PodSecurityPolicy', 'PriorityClass', 'SecurityContextConstraints', 'Template',
+                        'ImageStreamTag', 'ImageStreamImage')
+
+# The spec the server defaults for kinds whose model requires one
+DEFAULT_SPECS = {'ImageStream': {'lookupPolicy': {'local': False}}}
+
+# Domain of the hosts generated for Routes
+ROUTER_DOMAIN = 'apps.example.com'
+
+# Kinds whose status counts their replicas
+REPLICATED_KINDS = ('Deployment', 'DeploymentConfig', 'StatefulSet', 'ReplicaSet', 'ReplicationController')
+
+# (group, version): resources served, as (name, kind, namespaced). The group of legacy OpenShift kinds is oapi.
+DISCOVERY = {
+    ('', 'v1'): [('namespaces', 'Namespace', False), ('nodes', 'Node', False),
+                 ('persistentvolumes', 'PersistentVolume', False), ('configmaps', 'ConfigMap', True),
+                 ('endpoints', 'Endpoints', True), ('events', 'Event', True), ('pods', 'Pod', True),
+                 ('persistentvolumeclaims', 'PersistentVolumeClaim', True), ('secrets', 'Secret', True),
+                 ('serviceaccounts', 'ServiceAccount', True), ('services', 'Service', True)],
+    ('apps', 'v1beta1'): [('deployments', 'Deployment', True), ('statefulsets', 'StatefulSet', True)],
+    ('extensions', 'v1beta1'): [('deployments', 'Deployment', True), ('ingresses', 'Ingress', True)],
+    ('apiextensions.k8s.io', 'v1beta1'): [('customresourcedefinitions', 'CustomResourceDefinition', False)],
+    ('policy', 'v1beta1'): [('poddisruptionbudgets', 'PodDisruptionBudget', True)],
+    ('rbac.authorization.k8s.io', 'v1beta1'): [('roles', 'Role', True), ('rolebindings', 'RoleBinding', True),
+                                               ('clusterroles', 'ClusterRole', False),
+                                               ('clusterrolebindings', 'ClusterRoleBinding', False)],
+    ('certificates.k8s.io', 'v1beta1'): [('certificatesigningrequests', 'CertificateSigningRequest', False)],
+    ('authentication.k8s.io', 'v1'): [('tokenreviews', 'TokenReview', False)],
+    ('authorization.k8s.io', 'v1'): [('subjectaccessreviews', 'SubjectAccessReview', False),
+                                     ('selfsubjectaccessreviews', 'SelfSubjectAccessReview', False),
+                                     ('localsubjectaccessreviews', 'LocalSubjectAccessReview', True),
+                                     ('selfsubjectrulesreviews', 'SelfSubjectRulesReview', False)],
+    ('oapi', 'v1'): [('projects', 'Project', False), ('projectrequests', 'ProjectRequest', False),
+                     ('buildconfigs', 'BuildConfig', True), ('builds', 'Build', True),
+                     ('deploymentconfigs', 'DeploymentConfig', True), ('imagestreams', 'ImageStream', True),
+                     ('routes', 'Route', True), ('processedtemplates', 'Template', True),
+                     ('templateinstances', 'TemplateInstance', True), ('templates', 'Template', True),
+                     ('imagestreamimports', 'ImageStreamImport', True)],
+}
+
+VERBS = ['create', 'delete', 'deletecollection', 'get', 'list', 'patch', 'update', 'watch']
+
+# Reviews, which are answered rather than stored
+REVIEW_RESOURCES = ('subjectaccessreviews', 'selfsubjectaccessreviews', 'localsubjectaccessreviews',
+                    'selfsubjectrulesreviews', 'tokenreviews')
+
+READ_VERBS = ('get', 'list', 'watch')
+
+# The token of the kubeconfig the server writes
+FAKE_TOKEN = 'fake-token'
+
+# The rules every request is authorized by
+ALL_RULES = [{'verbs': ['*'], 'apiGroups': ['*'], 'resources': ['*']},
+             {'verbs': ['*'], 'nonResourceURLs': ['*']}]
+READ_ONLY_RULES = [{'verbs': list(READ_VERBS), 'apiGroups': ['*'], 'resources': ['*']},
+                   {'verbs': ['get'], 'nonResourceURLs': ['*']}]
+
+# The verb of a request, by method
+METHOD_VERBS = {'GET': 'get', 'POST': 'create', 'PUT': 'update', 'PATCH': 'patch', 'DELETE': 'delete'}
+
+PATCH_TYPES = ('application/merge-patch+json', 'application/strategic-merge-patch+json',
+               'application/json-patch+json')
+
+
+def now():
+    return time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
+
+
+def sort_key(item):
+    """ Order stored objects by key. Cluster scoped objects have no namespace, and sort first. """
+    return tuple(part or '' for part in item[0])
+
+
+def status_object(code, reason, message):
+    return {
+        'kind': 'Status',
+        'apiVersion': 'v1',
+        'metadata': {},
+        'status': 'Failure' if code >= 400 else 'Success',
+        'message': message,
+        'reason': reason,
+        'code': code,
+    }
+
+
+def image_repository(metadata):
+    """ The pull spec of an ImageStream in the integrated registry """
+    return '{0}/{1}/{2}'.format(REGISTRY, metadata.get('namespace'), metadata.get('name'))
+
+
+def default_status(obj):
+    kind = obj.get('kind')
+    if kind in KINDS_WITHOUT_STATUS:
+        return None
+    if kind == 'ImageStream':
+        return {'dockerImageRepository': image_repository(obj.get('metadata') or {})}
+    if kind == 'Build':
+        return {'phase': 'Complete', 'startTimestamp': now(), 'completionTimestamp': now()}
+    if kind == 'BuildConfig':
+        return {'lastVersion': 0}
+    if kind == 'CustomResourceDefinition':
+        # Its kind is served at once
+        return {'acceptedNames': (obj.get('spec') or {}).get('names') or {}, 'conditions': [
+            {'type': condition, 'status': 'True', 'lastTransitionTime': now()}
+            for condition in ('NamesAccepted', 'Established')]}
+    if kind in ('CertificateSigningRequest', 'TemplateInstance'):
+        # Pending, until approved, or instantiated
+        return {}
+    if kind in ('Namespace', 'Project'):
+        return {'phase': 'Active'}
+    if kind == 'Service':
+        return {'loadBalancer': {}}
+    if kind == 'Route':
+        return {'ingress': [{'conditions': [{'type': 'Admitted', 'status': 'True'}]}]}
+    if kind == 'PersistentVolumeClaim':
+        return {'phase': 'Bound'}
+    if kind == 'Job':
+        return {'conditions': [{'type': 'Complete', 'status': 'True', 'lastTransitionTime': now()}], 'succeeded': 1}
+    status = {'conditions': [{'type': 'Ready', 'status': 'True', 'lastTransitionTime': now()}]}
+    if kind in REPLICATED_KINDS:
+        # Rolled out
+        replicas = (obj.get('spec') or {}).get('replicas', 1)
+        status.update(observedGeneration=1, replicas=replicas, updatedReplicas=replicas, readyReplicas=replicas,
+                      availableReplicas=replicas)
+    if kind == 'DeploymentConfig':
+        # Rolled out once
+        status.update(latestVersion=1, unavailableReplicas=0)
+    if kind == 'Pod':
+        status['phase'] = 'Running'
+    return status
+
+
+def served_resource(api_version, kind):
+    """ The (group, resource) DISCOVERY serves kind at api_version by """
+    group, _, version = api_version.rpartition('/')
+    for candidate in ([group] if group else ['', 'oapi']):
+        for name, served_kind, _ in DISCOVERY.get((candidate, version)) or []:
+            if served_kind == kind:
+                return candidate, name
+    raise ApiError(404, 'NotFound', 'the server does not serve {0} at {1}'.format(kind, api_version))
+
+
+def merge_patch(target, patch, strategic=False):
+    """ Apply a JSON merge patch. A strategic merge patch also merges lists of objects by their name. """
+    if not isinstance(patch, dict):
+        return copy.deepcopy(patch)
+    result = copy.deepcopy(target) if isinstance(target, dict) else {}
+    for key, value in patch.items():
+        if value is None:
+            result.pop(key, None)
+        elif strategic and isinstance(value, list) and isinstance(result.get(key), list) \
+                and all(isinstance(item, dict) and 'name' in item for item in value + result[key]):
+            merged = copy.deepcopy(result[key])
+            names = [item['name'] for item in merged]
+            for item in value:
+                if item['name'] in names:
+                    index = names.index(item['name'])
+                    merged[index] = merge_patch(merged[index], item, strategic)
+                else:
+                    merged.append(copy.deepcopy(item))
+            result[key] = merged
+        else:
+            result[key] = merge_patch(result.get(key), value, strategic)
+    return result
+
+
+def json_patch(target, operations):
+    """ Apply the add, replace and remove operations of a JSON patch """
+    result = copy.deepcopy(target)
+    for operation in operations:
+        path = [part.replace('~1', '/').replace('~0', '~') for part in operation['path'].split('/')[1:]]
+        parent = result
+        for part in path[:-1]:
+            parent = parent[int(part)] if isinstance(parent, list) else parent[part]
+        key = path[-1]
+        if isinstance(parent, list):
+            index = len(parent) if key == '-' else int(key)
+            if operation['op'] == 'add':
+                parent.insert(index, operation['value'])
+            elif operation['op'] == 'replace':
+                parent[index] = operation['value']
+            elif operation['op'] == 'remove':
+                del parent[index]
+        elif operation['op'] in ('add', 'replace'):
+            parent[key] = operation['value']
+        elif operation['op'] == 'remove':
+            del parent[key]
+    return result
+
+
+def parse_selector(selector):
+    """ Parse an equality based selector, e.g. app=web,tier!=db, into a list of (key, operator, value) """
+    requirements = []
+    for term in (selector or '').split(','):
+        match = re.match(r'^\s*([^!=\s]+)\s*(!=|==|=)\s*(\S*)\s*$', term)
+        if match:
+            requirements.append((match.group(1), match.group(2) != '!=', match.group(3)))
+    return requirements
+
+
+def budget_selects(selector, labels):
+    """ True when the matchLabels of a PodDisruptionBudget's selector select labels """
+    match_labels = (selector or {}).get('matchLabels')
+    return bool(match_labels) and all(labels.get(key) == value for key, value in match_labels.items())
+
+
+class ApiError(Exception):
+    def __init__(self, code, reason, message):
+        super(ApiError, self).__init__(message)
+        self.code = code
+        self.reason = reason
+        self.message = message
+
+
+def rules_allow(rules, verb, group=None, resource=None, path=None):
+    """ Whether rules allow verb on resource in group, or on the non resource path """
+    for rule in rules:
+        if not {'*', verb} & set(rule.get('verbs') or []):
+            continue
+        if path is not None:
+            if {'*', path} & set(rule.get('nonResourceURLs') or []):
+                return True
+        elif {'*', group} & set(rule.get('apiGroups') or []) and {'*', resource} & set(rule.get('resources') or []):
+            return True
+    return False
+
+
+class Store(object):
+    """ Objects by (group, resource, namespace, name), and a history of changes for watches """
+
+    def __init__(self):
+        self.objects = {}
+        self.kinds = {}
+        self.history = []
+        self.resource_version = 0
+        self.changed = threading.Condition()
+
+    def _next_version(self):
+        self.resource_version += 1
+        return str(self.resource_version)
+
+    def _record(self, event_type, key, obj):
+        self.history.append((self.resource_version, event_type, key, copy.deepcopy(obj)))
+        del self.history[:-HISTORY_SIZE]
+        self.changed.notify_all()
+
+    def get(self, key):
+        with self.changed:
+            if key not in self.objects:
+                raise ApiError(404, 'NotFound', '{0} "{1}" not found'.format(key[1], key[3]))
+            return copy.deepcopy(self.objects[key])
+
+    def list(self, group, resource, namespace):
+        with self.changed:
+            items = [copy.deepcopy(obj) for key, obj in sorted(self.objects.items(), key=sort_key)
+                     if key[:2] == (group, resource) and namespace in (None, key[2])]
+            return items, str(self.resource_version), self.kinds.get((group, resource))
+
+    def create(self, key, obj):
+        with self.changed:
+            if key in self.objects:
+                raise ApiError(409, 'AlreadyExists', '{0} "{1}" already exists'.format(key[1], key[3]))
+            metadata = obj.setdefault('metadata', {})
+            metadata['name'] = key[3]
+            if key[2]:
+                metadata['namespace'] = key[2]
+            metadata['uid'] = str(uuid.uuid4())
+            metadata['creationTimestamp'] = now()
+            metadata['generation'] = 1
+            metadata['resourceVersion'] = self._next_version()
+            if obj.get('spec') is None and obj.get('kind') in DEFAULT_SPECS:
+                obj['spec'] = copy.deepcopy(DEFAULT_SPECS[obj['kind']])
+            if obj.get('kind') == 'Route' and not (obj.get('spec') or {}).get('host'):
+                # The router generates a host from the name and namespace
+                obj.setdefault('spec', {})['host'] = '{0}-{1}.{2}'.format(key[3], key[2], ROUTER_DOMAIN)
+            if obj.get('status') is None:
+                status = default_status(obj)
+                if status is not None:
+                    obj['status'] = status
+            self.kinds[key[:2]] = obj.get('kind')
+            self.objects[key] = obj
+            self._record('ADDED', key, obj)
+            return copy.deepcopy(obj)
+
+    def update(self, key, update):
+        """ Replace the object with update(existing), unless it returns an object with a stale resourceVersion """
+        with self.changed:
+            if key not in self.objects:
+                raise ApiError(404, 'NotFound', '{0} "{1}" not found'.format(key[1], key[3]))
+            existing = self.objects[key]
+            obj = update(copy.deepcopy(existing))
+            metadata = obj.setdefault('metadata', {})
+            if metadata.get('resourceVersion') not in (None, existing['metadata']['resourceVersion']):
+                raise ApiError(409, 'Conflict', 'the object has been modified; please apply your changes to the '
+                                                'latest version and try again')
+            for field in ('name', 'namespace', 'uid', 'creationTimestamp'):
+                if field in existing['metadata']:
+                    metadata[field] = existing['metadata'][field]
+            if obj.get('spec') != existing.get('spec'):
+                metadata['generation'] = existing['metadata'].get('generation', 1) + 1
+            if obj.get('status') is None and existing.get('status') is not None:
+                obj['status'] = existing['status']
+            metadata['resourceVersion'] = self._next_version()
+            self.objects[key] = obj
+            self._record('MODIFIED', key, obj)
+            return copy.deepcopy(obj)
+
+    def delete(self, key):
+        with self.changed:
+            if key not in self.objects:
+                raise ApiError(404, 'NotFound', '{0} "{1}" not found'.format(key[1], key[3]))
+            obj = self.objects.pop(key)
+            obj['metadata']['resourceVersion'] = self._next_version()
+            self._record('DELETED', key, obj)
+            return obj
+
+    def events_since(self, resource_version):
+        """ Changes after resource_version, or None if they are no longer in the history """
+        resource_version = int(resource_version)
+        if self.history and self.history[0][0] > resource_version + 1 and resource_version < self.resource_version:
+            return None
+        return [event for event in self.history if event[0] > resource_version]
+
+
+class ApiRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            BaseHTTPRequestHandler.log_message(self, format, *args)
+
+    def do_GET(self):
+        self.handle_api('GET')
+
+    def do_POST(self):
+        self.handle_api('POST')
+
+    def do_PUT(self):
+        self.handle_api('PUT')
+
+    def do_PATCH(self):
+        self.handle_api('PATCH')
+
+    def do_DELETE(self):
+        self.handle_api('DELETE')
+
+    def send_json(self, code, data, etag=False):
+        body = json.dumps(data, sort_keys=etag).encode('utf-8')
+        if etag:
+            etag = '"{0}"'.format(hashlib.md5(body).hexdigest())
+            if self.headers.get('If-None-Match') == etag:
+                code, body = 304, b''
+        self.send_body(code, body, 'application/json', etag)
+
+    def send_body(self, code, body, content_type, etag=None):
+        compress = body and 'gzip' in (self.headers.get('Accept-Encoding') or '')
+        if compress:
+            buf = io.BytesIO()
+            with gzip.GzipFile(fileobj=buf, mode='wb') as f:
+                f.write(body)
+            body = buf.getvalue()
+        self.send_response(code)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        if compress:
+            self.send_header('Content-Encoding', 'gzip')
+        if etag:
+            self.send_header('ETag', etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def negotiate(self, group, version):
+        """
+        The (media type, version of meta.k8s.io) to answer a list with, from the Accept header. The version is
+        None for the list of whole objects.
+        """
+        builtin = (group, version) in DISCOVERY
+        for media_range in (self.headers.get('Accept') or 'application/json').split(','):
+            parts = [part.strip() for part in media_range.split(';')]
+            params = dict(part.split('=', 1) for part in parts[1:] if '=' in part)
+            if params.get('as') == 'PartialObjectMetadataList' and params.get('g') == 'meta.k8s.io' and \
+                    params.get('v') in ('v1', 'v1beta1'):
+                if parts[0] == 'application/json' or parts[0] == PROTOBUF and builtin:
+                    return parts[0], params['v']
+            elif not params.get('as') and parts[0] in ('application/json', '*/*'):
+                return 'application/json', None
+        raise ApiError(406, 'NotAcceptable', 'only application/json is supported')
+
+    def send_list(self, group, version, resource, namespace, query):
+        """ Send a list, or the list of the objects' metadata, as the Accept header asks """
+        media_type, meta_version = self.negotiate(group, version)
+        result = self.list(group, version, resource, namespace, query)
+        if meta_version is None:
+            return self.send_json(200, result)
+        api_version = 'meta.k8s.io/' + meta_version
+        result = {'kind': 'PartialObjectMetadataList', 'apiVersion': api_version, 'metadata': result['metadata'],
+                  'items': [{'kind': 'PartialObjectMetadata', 'apiVersion': api_version, 'metadata': item['metadata']}
+                            for item in result['items']]}
+        if media_type == PROTOBUF:
+            return self.send_body(200, encode_object(result), PROTOBUF)
+        return self.send_json(200, result)
+
+    def read_body(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        if not length:
+            return None
+        try:
+            return json.loads(self.rfile.read(length).decode('utf-8'))
+        except ValueError as exc:
+            raise ApiError(400, 'BadRequest', 'invalid JSON: {0}'.format(exc))
+
+    def parse_path(self, path):
+        """ Return (group, version, namespace, resource, name, subresource), or None for a non resource path """
+        parts = [part for part in path.split('/') if part]
+        if parts[:1] == ['api'] and len(parts) > 1:
+            group, version, rest = '', parts[1], parts[2:]
+        elif parts[:1] == ['oapi'] and len(parts) > 1:
+            group, version, rest = 'oapi', parts[1], parts[2:]
+        elif parts[:1] == ['apis'] and len(parts) > 2:
+            group, version, rest = parts[1], parts[2], parts[3:]
+        else:
+            return None
+        if not rest:
+            return None
+        namespace = None
+        if rest[0] == 'namespaces' and len(rest) > 2 and rest[2] not in ('status', 'finalize'):
+            namespace, rest = rest[1], rest[2:]
+        rest = rest + [None] * (3 - len(rest))
+        return group, version, namespace, rest[0], rest[1], rest[2]
+
+    def handle_api(self, method):
+        url = urlparse(self.path)
+        query = dict((key, values[-1]) for key, values in parse_qs(url.query).items())
+        try:
+            body = self.read_body()
+            self.server.inject_faults()
+            if url.path == '/version':
+                return self.send_json(200, {'major': '1', 'minor': '7', 'gitVersion': 'v1.7.0+fake'})
+            document = self.discovery(url.path) if method == 'GET' else None
+            if document is not None:
+                return self.send_json(200, document, etag=True)
+            parsed = self.parse_path(url.path)
+            if parsed is None:
+                return self.send_json(200, {'kind': 'APIVersions', 'versions': ['v1']})
+            group, version, namespace, resource, name, subresource = parsed
+            if subresource not in (None, 'status', 'finalize', 'eviction', 'approval', 'instantiate', 'log'):
+                raise ApiError(404, 'NotFound', 'the server could not find the requested resource')
+            self.authorize(method, group, namespace, resource, name, subresource, query)
+            if method == 'GET' and name is None:
+                if query.get('watch') in ('1', 'true', 'True'):
+                    return self.watch(group, resource, namespace, query)
+                return self.send_list(group, version, resource, namespace, query)
+            if method == 'POST' and name is None and resource in REVIEW_RESOURCES:
+                return self.send_json(201, self.review(resource, body))
+            if method == 'POST' and name is None and resource == 'processedtemplates':
+                return self.send_json(201, self.process(body))
+            if method == 'POST' and name is None and resource == 'imagestreamimports':
+                return self.send_json(201, self.import_images(group, version, namespace, body))
+            if method == 'POST' and name is None:
+                return self.send_json(201, self.create(group, version, namespace, resource, body))
+            if name is None:
+                raise ApiError(405, 'MethodNotAllowed', 'the server does not allow this method on the requested '
+                                                        'resource')
+            key = (group, resource, namespace, name)
+            if subresource == 'eviction':
+                if method != 'POST' or resource != 'pods':
+                    raise ApiError(405, 'MethodNotAllowed', 'only pods may be evicted, with a POST')
+                return self.send_json(201, self.evict(key))
+            if subresource == 'instantiate':
+                if method != 'POST' or resource != 'buildconfigs':
+                    raise ApiError(405, 'MethodNotAllowed', 'only build configs may be instantiated, with a POST')
+                return self.send_json(201, self.instantiate(group, version, namespace, name))
+            if subresource == 'log':
+                if method != 'GET' or resource != 'builds':
+                    raise ApiError(405, 'MethodNotAllowed', 'only the logs of builds may be read, with a GET')
+                return self.send_log(key, query)
+            if subresource == 'approval':
+                if method != 'PUT' or resource != 'certificatesigningrequests':
+                    raise ApiError(405, 'MethodNotAllowed', 'only certificate signing requests may be approved, '
+                                                            'with a PUT')
+                return self.send_json(200, self.approve(key, body))
+            if method == 'GET':
+                return self.send_json(200, self.server.store.get(key))
+            if method == 'PUT':
+                if not isinstance(body, dict):
+                    raise ApiError(400, 'BadRequest', 'a request body is required')
+                return self.send_json(200, self.server.store.update(key, lambda existing: body))
+            if method == 'PATCH':
+                return self.send_json(200, self.patch(key, body))
+            if method == 'DELETE':
+                self.server.store.delete(key)
+                return self.send_json(200, status_object(200, '', ''))
+            raise ApiError(405, 'MethodNotAllowed', 'method {0} not allowed'.format(method))
+        except ApiError as exc:
+            self.send_json(exc.code, status_object(exc.code, exc.reason, exc.message))
+
+    def served_resources(self):
+        """ DISCOVERY, with the kinds defined by CustomResourceDefinitions added """
+        served = dict((key, list(resources)) for key, resources in DISCOVERY.items())
+        crds, _, _ = self.server.store.list('apiextensions.k8s.io', 'customresourcedefinitions', None)
+        for crd in crds:
+            spec = crd.get('spec') or {}
+            names = spec.get('names') or {}
+            if not (spec.get('group') and spec.get('version') and names.get('kind')):
+                continue
+            served.setdefault((spec.get('group'), spec.get('version')), []).append(
+                (names.get('plural'), names.get('kind'), spec.get('scope') != 'Cluster'))
+        return served
+
+    def discovery(self, path):
+        """ The discovery document at path, or None """
+        served = self.served_resources()
+        if path == '/api':
+            return {'kind': 'APIVersions', 'versions': ['v1']}
+        if path == '/apis':
+            groups = {}
+            for group, version in sorted(served):
+                if group not in ('', 'oapi'):
+                    groups.setdefault(group, []).append({'groupVersion': '{0}/{1}'.format(group, version),
+                                                         'version': version})
+            return {'kind': 'APIGroupList', 'apiVersion': 'v1', 'groups': [
+                {'name': group, 'versions': versions, 'preferredVersion': versions[0]}
+                for group, versions in sorted(groups.items())]}
+        if path == '/openapi/v2':
+            return {'swagger': '2.0', 'info': {'title': 'Fake API', 'version': 'v1.7.0+fake'}, 'paths': {},
+                    'definitions': dict(
+                        ('{0}.{1}.{2}'.format(group or 'core', version, kind), {
+                            'type': 'object',
+                            'x-kubernetes-group-version-kind': [{'group': '' if group == 'oapi' else group,
+                                                                 'version': version, 'kind': kind}]})
+                        for (group, version), resources in served.items() for _, kind, _ in resources)}
+        parts = [part for part in path.split('/') if part]
+        if len(parts) == 2 and parts[0] in ('api', 'oapi'):
+            key = ('' if parts[0] == 'api' else 'oapi', parts[1])
+        elif len(parts) == 3 and parts[0] == 'apis':
+            key = (parts[1], parts[2])
+        else:
+            return None
+        if key not in served:
+            raise ApiError(404, 'NotFound', 'the server could not find the requested resource')
+        return {
+            'kind': 'APIResourceList',
+            'apiVersion': 'v1',
+            'groupVersion': '/'.join(part for part in key if part not in ('', 'oapi')),
+            'resources': [{'name': name, 'singularName': '', 'namespaced': namespaced, 'kind': kind,
+                           'verbs': VERBS} for name, kind, namespaced in served[key]],
+        }
+
+    def create(self, group, version, namespace, resource, body):
+        if not isinstance(body, dict):
+            raise ApiError(400, 'BadRequest', 'a request body is required')
+        if resource == 'projectrequests':
+            # OpenShift creates a Project in place of the ProjectRequest
+            project = {'kind': 'Project', 'apiVersion': 'v1', 'metadata': body.get('metadata', {})}
+            annotations = project['metadata'].setdefault('annotations', {})
+            for field, annotation in (('displayName', 'openshift.io/display-name'),
+                                      ('description', 'openshift.io/description')):
+                if body.get(field):
+                    annotations[annotation] = body[field]
+            return self.create(group, version, None, 'projects', project)
+        name = body.get('metadata', {}).get('name')
+        if not name:
+            raise ApiError(422, 'Invalid', 'metadata.name: Required value')
+        created = self.server.store.create((group, resource, namespace, name), body)
+        if resource == 'templateinstances':
+            self.server.run_template_instance((group, resource, namespace, name))
+        return created
+
+    def authorize(self, method, group, namespace, resource, name, subresource, query):
+        """ Raise a 403 unless the server's rules allow the request. Anyone may ask for a review. """
+        verb = METHOD_VERBS.get(method, method.lower())
+        if method == 'GET' and name is None:
+            verb = 'watch' if query.get('watch') in ('1', 'true', 'True') else 'list'
+        if subresource == 'eviction':
+            verb = 'create'
+        if resource in REVIEW_RESOURCES:
+            return
+        full_resource = resource + '/' + subresource if subresource else resource
+        if rules_allow(self.server.rules, verb, '' if group == 'oapi' else group, full_resource):
+            return
+        raise ApiError(403, 'Forbidden', 'User "fake" cannot {0} {1}{2}'.format(
+            verb, full_resource, ' in the namespace "{0}"'.format(namespace) if namespace else ' at the cluster scope'))
+
+    def authenticate(self, token):
+        """ The status of a TokenReview of token """
+        if token == FAKE_TOKEN:
+            return {'authenticated': True, 'user': {'username': 'fake', 'groups': ['system:authenticated']}}
+        secrets, _, _ = self.server.store.list('', 'secrets', None)
+        for secret in secrets:
+            data = secret.get('data') or {}
+            if secret.get('type') != 'kubernetes.io/service-account-token' or 'token' not in data:
+                continue
+            try:
+                matches = base64.b64decode(data['token']).decode('utf-8') == token
+            except (TypeError, ValueError):
+                continue
+            if matches:
+                metadata = secret['metadata']
+                account = (metadata.get('annotations') or {}).get('kubernetes.io/service-account.name', '')
+                return {'authenticated': True, 'user': {
+                    'username': 'system:serviceaccount:{0}:{1}'.format(metadata.get('namespace'), account),
+                    'uid': metadata.get('uid'),
+                    'groups': ['system:serviceaccounts', 'system:serviceaccounts:' + metadata.get('namespace', ''),
+                               'system:authenticated']}}
+        return {'authenticated': False, 'error': 'fake API server: invalid bearer token'}
+
+    def review(self, resource, body):
+        """ Answer a review from the server's rules. Reviews are not stored. """
+        if not isinstance(body, dict):
+            raise ApiError(400, 'BadRequest', 'a request body is required')
+        if resource == 'tokenreviews':
+            return dict(body, status=self.authenticate((body.get('spec') or {}).get('token')))
+        rules = self.server.rules
+        if resource == 'selfsubjectrulesreviews':
+            return dict(body, status={
+                'resourceRules': [rule for rule in rules if 'resources' in rule],
+                'nonResourceRules': [rule for rule in rules if 'nonResourceURLs' in rule],
+                'incomplete': False,
+            })
+        spec = body.get('spec') or {}
+        if spec.get('nonResourceAttributes'):
+            attributes = spec['nonResourceAttributes']
+            allowed = rules_allow(rules, attributes.get('verb'), path=attributes.get('path'))
+        else:
+            attributes = spec.get('resourceAttributes') or {}
+            resource = attributes.get('resource')
+            if attributes.get('subresource'):
+                resource += '/' + attributes['subresource']
+            allowed = rules_allow(rules, attributes.get('verb'), attributes.get('group') or '', resource)
+        return dict(body, status={'allowed': allowed, 'reason': 'fake API server: {0} by its rules'.format(
+            'allowed' if allowed else 'denied')})
+
+    def process(self, body):
+        """ Process a template, as the server does. Processed templates are not stored. """
+        try:
+            return processed_template(body)
+        except TemplateError as exc:
+            raise ApiError(422, 'Invalid', str(exc))
+
+    def import_images(self, group, version, namespace, body):
+        """
+        Import the images of an ImageStreamImport into the tags of its ImageStream, which is created if need be.
+        The digest of an image is that of its name, and images with missing in their name are not found. With
+        spec.import false, the images are resolved without being imported. Imports are not stored.
+        """
+        if not isinstance(body, dict):
+            raise ApiError(400, 'BadRequest', 'a request body is required')
+        spec = body.get('spec') or {}
+        statuses = []
+        imported = []
+        for image in spec.get('images') or []:
+            source = (image.get('from') or {}).get('name') or ''
+            tag = (image.get('to') or {}).get('name')
+            if 'missing' in source:
+                statuses.append({'tag': tag, 'status': {'status': 'Failure', 'reason': 'NotFound',
+                                                        'message': 'image {0} was not found'.format(source)}})
+                continue
+            digest = 'sha256:' + hashlib.sha256(source.encode('utf-8')).hexdigest()
+            repository = source.split('@')[0]
+            if ':' in repository.rpartition('/')[2]:
+                repository = repository.rsplit(':', 1)[0]
+            reference = '{0}@{1}'.format(repository, digest)
+            statuses.append({'tag': tag, 'status': {'status': 'Success'}, 'image': {
+                'metadata': {'name': digest}, 'dockerImageReference': reference,
+                'dockerImageMetadata': {'kind': 'DockerImage', 'Size': len(source) * 1024 * 1024}}})
+            imported.append((tag, reference, digest))
+
+        def update(stream):
+            status = stream.setdefault('status', {})
+            status.setdefault('dockerImageRepository', image_repository(
+                {'namespace': namespace, 'name': (body.get('metadata') or {}).get('name')}))
+            entries = status.setdefault('tags', [])
+            for tag, reference, digest in imported:
+                entry = [entry for entry in entries if entry.get('tag') == tag]
+                if not entry:
+                    entry = [{'tag': tag, 'items': []}]
+                    entries.append(entry[0])
+                items = entry[0].setdefault('items', [])
+                if not items or items[0].get('image') != digest:
+                    items.insert(0, {'created': now(), 'dockerImageReference': reference, 'image': digest,
+                                     'generation': stream['metadata'].get('generation', 1)})
+            return stream
+
+        key = (group, 'imagestreams', namespace, (body.get('metadata') or {}).get('name'))
+        while spec.get('import') and imported:
+            try:
+                self.server.store.update(key, update)
+                break
+            except ApiError as exc:
+                if exc.code != 404:
+                    raise
+            try:
+                self.server.store.create(key, update({
+                    'apiVersion': body.get('apiVersion'), 'kind': 'ImageStream', 'metadata': {}, 'spec': {}}))
+                break
+            except ApiError as exc:
+                # Created by a concurrent import
+                if exc.code != 409:
+                    raise
+        return dict(body, status={'images': statuses})
+
+    def instantiate(self, group, version, namespace, name):
+        """ Start a build of a BuildConfig, which runs in the background, as a build pod would """
+        store = self.server.store
+        config = store.update((group, 'buildconfigs', namespace, name), lambda obj: dict(obj, status=dict(
+            obj.get('status') or {}, lastVersion=int((obj.get('status') or {}).get('lastVersion') or 0) + 1)))
+        build_name = '{0}-{1}'.format(name, config['status']['lastVersion'])
+        key = (group, 'builds', namespace, build_name)
+        build = store.create(key, {
+            'apiVersion': '{0}/{1}'.format(group, version) if group and group != 'oapi' else version,
+            'kind': 'Build',
+            'metadata': {'name': build_name, 'namespace': namespace, 'labels': {'buildconfig': name},
+                         'annotations': {'openshift.io/build-config.name': name,
+                                         'openshift.io/build.number': str(config['status']['lastVersion'])}},
+            'spec': config.get('spec') or {},
+            'status': {'phase': 'New'},
+        })
+        self.server.run_build(key)
+        return build
+
+    def send_log(self, key, query):
+        """ Send the log of a build, and with follow, the lines written to it until the build ends """
+        store = self.server.store
+        store.get(key)
+        follow = query.get('follow') in ('1', 'true', 'True')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        sent = 0
+        try:
+            while True:
+                with store.changed:
+                    log = self.server.build_logs.get(key) or []
+                    lines, sent = log[sent:], len(log)
+                    ended = key not in self.server.running_builds
+                    if not lines and follow and not ended:
+                        store.changed.wait(1)
+                if lines:
+                    self.write_chunk(''.join(line + '\n' for line in lines).encode('utf-8'))
+                elif not follow or ended:
+                    break
+            self.write_chunk(b'')
+        except (IOError, OSError):
+            # The client went away
+            pass
+        self.close_connection = True
+
+    def approve(self, key, body):
+        """ Set the conditions of a CertificateSigningRequest, as its approval subresource does """
+        if not isinstance(body, dict):
+            raise ApiError(400, 'BadRequest', 'a request body is required')
+        conditions = (body.get('status') or {}).get('conditions') or []
+
+        def update(existing):
+            # The store refuses a stale resourceVersion
+            version = (body.get('metadata') or {}).get('resourceVersion')
+            metadata = dict(existing['metadata'], resourceVersion=version or existing['metadata']['resourceVersion'])
+            return dict(existing, metadata=metadata, status=dict(existing.get('status') or {}, conditions=conditions))
+        return self.server.store.update(key, update)
+
+    def evict(self, key):
+        """
+        Delete a pod, unless a PodDisruptionBudget of its namespace that selects it, by matchLabels, allows no
+        more disruptions. The budgets that allow it are given one disruption less.
+        """
+        store = self.server.store
+        with store.changed:
+            labels = store.get(key)['metadata'].get('labels') or {}
+            budgets, _, _ = store.list('policy', 'poddisruptionbudgets', key[2])
+            budgets = [budget for budget in budgets
+                       if budget_selects((budget.get('spec') or {}).get('selector'), labels)]
+            if any((budget.get('status') or {}).get('disruptionsAllowed', 0) <= 0 for budget in budgets):
+                raise ApiError(429, 'TooManyRequests',
+                               "Cannot evict pod as it would violate the pod's disruption budget.")
+            for budget in budgets:
+                status = dict(budget['status'], disruptionsAllowed=budget['status']['disruptionsAllowed'] - 1)
+                store.update(('policy', 'poddisruptionbudgets', key[2], budget['metadata']['name']),
+                             lambda obj: dict(obj, status=status))
+            store.delete(key)
+        return status_object(201, '', '')
+
+    def patch(self, key, body):
+        content_type = (self.headers.get('Content-Type') or '').split(';')[0].strip()
+        if content_type not in PATCH_TYPES:
+            raise ApiError(415, 'UnsupportedMediaType', 'the body of the request was in an unknown format')
+        if content_type == 'application/json-patch+json':
+            return self.server.store.update(key, lambda existing: json_patch(existing, body))
+        strategic = content_type == 'application/strategic-merge-patch+json'
+        return self.server.store.update(key, lambda existing: merge_patch(existing, body, strategic))
+
+    @staticmethod
+    def matches(obj, label_selector, field_selector):
+        labels = obj.get('metadata', {}).get('labels') or {}
+        for key, equals, value in label_selector:
+            if (labels.get(key) == value) != equals:
+                return False
+        for key, equals, value in field_selector:
+            current = obj
+            for part in key.split('.'):
+                current = current.get(part) if isinstance(current, dict) else None
+            if ((current or '') == value) != equals:
+                return False
+        return True
+
+    def list(self, group, version, resource, namespace, query):
+        items, resource_version, kind = self.server.store.list(group, resource, namespace)
+        label_selector = parse_selector(query.get('labelSelector'))
+        field_selector = parse_selector(query.get('fieldSelector'))
+        items = [item for item in items if self.matches(item, label_selector, field_selector)]
+        metadata = {'resourceVersion': resource_version}
+        start = 0
+        if query.get('continue'):
+            try:
+                token = json.loads(base64.b64decode(query['continue']).decode('utf-8'))
+            except (TypeError, ValueError):
+                raise ApiError(400, 'BadRequest', 'invalid continue token')
+            metadata['resourceVersion'] = token['rv']
+            start = token['start']
+        limit = int(query.get('limit') or 0)
+        if limit and start + limit < len(items):
+            token = {'rv': metadata['resourceVersion'], 'start': start + limit}
+            metadata['continue'] = base64.b64encode(json.dumps(token).encode('utf-8')).decode('ascii')
+            items = items[start:start + limit]
+        else:
+            items = items[start:]
+        return {
+            'kind': '{0}List'.format(kind) if kind else 'List',
+            'apiVersion': '{0}/{1}'.format(group, version) if group and group != 'oapi' else version,
+            'metadata': metadata,
+            'items': items,
+        }
+
+    def write_chunk(self, data):
+        self.wfile.write('{0:x}\r\n'.format(len(data)).encode('ascii') + data + b'\r\n')
+        self.wfile.flush()
+
+    def watch(self, group, resource, namespace, query):
+        store = self.server.store
+        label_selector = parse_selector(query.get('labelSelector'))
+        field_selector = parse_selector(query.get('fieldSelector'))
+        timeout = float(query.get('timeoutSeconds') or self.server.watch_timeout or 0) or None
+        deadline = time.time() + timeout if timeout else None
+
+        with store.changed:
+            if query.get('resourceVersion') not in (None, '', '0'):
+                pending = store.events_since(query['resourceVersion'])
+                if pending is None:
+                    pending = [(None, 'ERROR', None, status_object(410, 'Expired', 'too old resource version'))]
+            else:
+                pending = [(store.resource_version, 'ADDED', key, copy.deepcopy(obj))
+                           for key, obj in sorted(store.objects.items(), key=sort_key)]
+            last_version = store.resource_version
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        try:
+            while True:
+                for version, event_type, key, obj in pending:
+                    if event_type != 'ERROR' and (key[:2] != (group, resource) or namespace not in (None, key[2])
+                                                  or not self.matches(obj, label_selector, field_selector)):
+                        continue
+                    self.write_chunk(json.dumps({'type': event_type, 'object': obj}).encode('utf-8') + b'\n')
+                    if event_type == 'ERROR':
+                        deadline = time.time()
+                if deadline is not None and time.time() >= deadline:
+                    break
+                with store.changed:
+                    if store.resource_version == last_version:
+                        store.changed.wait(1 if deadline is None else max(0, min(1, deadline - time.time())))
+                    pending = store.events_since(last_version) or []
+                    last_version = store.resource_version
+            self.write_chunk(b'')
+        except (IOError, OSError):
+            # The client went away
+            pass
+        self.close_connection = True
+
+
+class FakeApiServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+    def __init__(self, host='127.0.0.1', port=0, latency=0, jitter=0, error_rate=0, error_code=500,
+                 watch_timeout=None, verbose=False, rules=None):
+        HTTPServer.__init__(self, (host, port), ApiRequestHandler)
+        self.store = Store()
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_code = error_code
+        self.watch_timeout = watch_timeout
+        self.verbose = verbose
+        self.rules = ALL_RULES if rules is None else rules
+        self.build_logs = {}
+        self.running_builds = set()
+        self.thread = None
+
+    @property
+    def url(self):
+        return 'http://{0}:{1}'.format(*self.server_address[:2])
+
+    def inject_faults(self):
+        """ Delay the request by the configured latency, and fail it at the configured error rate """
+        delay = self.latency + random.uniform(-self.jitter, self.jitter)
+        if delay > 0:
+            time.sleep(delay / 1000.0)
+        if self.error_rate and random.random() < self.error_rate:
+            reason = 'TooManyRequests' if self.error_code == 429 else 'InternalError'
+            raise ApiError(self.error_code, reason, 'injected error')
+
+    def run_build(self, key):
+        """ Run a build in the background: start it, write BUILD_LOG to its log, and complete it """
+        self.running_builds.add(key)
+
+        def run():
+            log = self.build_logs.setdefault(key, [])
+            try:
+                time.sleep(BUILD_STEP)
+                self.store.update(key, lambda obj: dict(obj, status={'phase': 'Running', 'startTimestamp': now()}))
+                for line in BUILD_LOG:
+                    time.sleep(BUILD_STEP)
+                    with self.store.changed:
+                        log.append(line)
+                        self.store.changed.notify_all()
+                self.store.update(key, lambda obj: dict(obj, status=dict(obj['status'], phase='Complete',
+                                                                         completionTimestamp=now())))
+            except ApiError:
+                # The build was deleted
+                pass
+            finally:
+                with self.store.changed:
+                    self.running_builds.discard(key)
+                    self.store.changed.notify_all()
+
+        thread = threading.Thread(target=run)
+        thread.daemon = True
+        thread.start()
+
+    def run_template_instance(self, key):
+        """
+        Instantiate a TemplateInstance in the background, as its controller does: process its template with the
+        parameters of its secret, create the objects, one every BUILD_STEP seconds, and mark it Ready
+        """
+        def run():
+            namespace = key[2]
+            conditions = []
+            refs = []
+            try:
+                spec = self.store.get(key).get('spec') or {}
+                values = {}
+                if (spec.get('secret') or {}).get('name'):
+                    secret = self.store.get(('', 'secrets', namespace, spec['secret']['name']))
+                    values = dict((name, base64.b64decode(value).decode('utf-8'))
+                                  for name, value in (secret.get('data') or {}).items())
+                    values.update(secret.get('stringData') or {})
+                objects, _, _ = process_template(spec.get('template') or {}, values, ignore_unknown=True)
+                for obj in objects:
+                    time.sleep(BUILD_STEP)
+                    group, resource = served_resource(obj.get('apiVersion', ''), obj.get('kind'))
+                    obj = self.store.create((group, resource, namespace, obj['metadata']['name']), obj)
+                    refs.append({'ref': {'apiVersion': obj.get('apiVersion'), 'kind': obj.get('kind'),
+                                         'namespace': namespace, 'name': obj['metadata']['name'],
+                                         'uid': obj['metadata']['uid']}})
+                    self.store.update(key, lambda instance: dict(instance, status={'objects': list(refs)}))
+                conditions.append({'type': 'Ready', 'status': 'True', 'reason': 'Created',
+                                   'lastTransitionTime': now()})
+            except (ApiError, TemplateError, KeyError, TypeError, ValueError) as exc:
+                conditions.append({'type': 'InstantiateFailure', 'status': 'True', 'reason': 'Failed',
+                                   'message': getattr(exc, 'message', str(exc)), 'lastTransitionTime': now()})
+            try:
+                self.store.update(key, lambda instance: dict(instance, status={'objects': refs,
+                                                                               'conditions': conditions}))
+            except ApiError:
+                # The TemplateInstance was deleted
+                pass
+
+        thread = threading.Thread(target=run)
+        thread.daemon = True
+        thread.start()
+
+    def kubeconfig(self):
+        """ A kubeconfig document for a client of the server """
+        return {
+            'apiVersion': 'v1',
+            'kind': 'Config',
+            'clusters': [{'name': 'fake', 'cluster': {'server': self.url}}],
+            'users': [{'name': 'fake', 'user': {'token': FAKE_TOKEN}}],
+            'contexts': [{'name': 'fake', 'context': {'cluster': 'fake', 'user': 'fake', 'namespace': 'default'}}],
+            'current-context': 'fake',
+        }
+
+    def write_kubeconfig(self, path):
+        # JSON is valid YAML
+        with open(path, 'w') as f:
+            json.dump(self.kubeconfig(), f, indent=2)
+
+    def start(self):
+        """ Serve requests in a background thread """
+        self.thread = threading.Thread(target=self.serve_forever)
+        self.thread.daemon = True
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0].strip())
+    parser.add_argument('--host', default='127.0.0.1', help='address to listen on (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8443, help='port to listen on (default: 8443)')
+    parser.add_argument('--kubeconfig', help='write a kubeconfig for the server to this path')
+    parser.add_argument('--latency', type=float, default=0, help='milliseconds to delay each request')
+    parser.add_argument('--jitter', type=float, default=0, help='random variation of the latency, in milliseconds')
+    parser.add_argument('--error-rate', type=float, default=0, help='fraction of requests to fail (default: 0)')
+    parser.add_argument('--error-code', type=int, default=500, help='status of failed requests (default: 500)')
+    parser.add_argument('--watch-timeout', type=float, help='seconds after which watches are closed')
+    parser.add_argument('--read-only', action='store_true', help='allow only the verbs that read')
+    parser.add_argument('--verbose', action='store_true', help='log each request')
+    args = parser.parse_args()
+
+    server = FakeApiServer(args.host, args.port, args.latency, args.jitter, args.error_rate, args.error_code,
+                           args.watch_timeout, args.verbose, READ_ONLY_RULES if args.read_only else None)
+    if args.kubeconfig:
+        server.write_kubeconfig(args.kubeconfig)
+    print("Serving on {0}".format(server.url))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
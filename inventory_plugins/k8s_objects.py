@@ -0,0 +1,202 @@
+# -*- coding: utf-8 -*-
+#
+#  Copyright 2017 Red Hat | Ansible
+#
+# This file is part of Ansible
+#
+# Ansible is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Ansible is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Ansible.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+
+import ansible.module_utils
+from ansible.errors import AnsibleParserError
+from ansible.module_utils._text import to_native
+from ansible.plugins.inventory import BaseInventoryPlugin
+
+try:
+    from ansible.plugins.inventory import Constructable
+except ImportError:
+    Constructable = object
+
+DOCUMENTATION = '''
+name: k8s_objects
+plugin_type: inventory
+short_description: Hosts from the objects of a kind, e.g. Nodes
+description:
+- Adds a host for each object of I(kind), named after the object, to a group named after the kind, e.g.
+  C(k8s_node). The object is available to the host as the C(k8s_object) variable.
+- Reads the objects through the same controller side cache as the C(k8s_objects) lookup.
+- The inventory source is a YAML file whose name ends with C(k8s_objects.yml) or C(k8s_objects.yaml).
+version_added: 2.3.0
+author: OpenShift (@openshift)
+options:
+  plugin:
+    description:
+    - Must be C(k8s_objects).
+    required: true
+  kind:
+    description:
+    - Kind of the objects, e.g. C(Node).
+    required: true
+  api_version:
+    description:
+    - API version of the kind, with or without the API group.
+    default: v1
+  namespace:
+    description:
+    - Namespace to list. Omit to list all namespaces, or for a cluster scoped kind.
+  label_selector:
+    description:
+    - Label selector, e.g. C(node-role.kubernetes.io/compute=true).
+  field_selector:
+    description:
+    - Field selector, e.g. C(spec.unschedulable=false).
+  cache_ttl:
+    description:
+    - Seconds to keep the list. Set to 0 to always read from the API.
+    default: 30
+  compress:
+    description:
+    - Ask the API server for a gzip compressed response, for large lists read over slow links. Also enabled by
+      setting the KUBE_MODULES_COMPRESS environment variable.
+    default: false
+  compose:
+    description:
+    - Create vars from Jinja2 expressions, e.g. C(ansible_host) from the object's addresses.
+    default: {}
+  groups:
+    description:
+    - Add hosts to a group when a Jinja2 condition is true.
+    default: {}
+  keyed_groups:
+    description:
+    - Add hosts to groups based on the values of variables.
+    default: []
+  strict:
+    description:
+    - Fail when a Jinja2 expression of I(compose), I(groups) or I(keyed_groups) can not be evaluated.
+    default: false
+  kubeconfig:
+    description:
+    - Path to an existing Kubernetes config file. If not provided, and no other connection
+      options are provided, the openshift client will attempt to load the default
+      configuration file from I(~/.kube/config.json).
+  context:
+    description:
+    - The name of a context found in the Kubernetes config file.
+  host:
+    description:
+    - Provide a URL for acessing the Kubernetes API.
+  api_key:
+    description:
+    - Token used to connect to the API.
+  username:
+    description:
+    - Provide a username for connecting to the API.
+  password:
+    description:
+    - Provide a password for connecting to the API. Use in conjunction with I(username).
+  ssl_ca_cert:
+    description:
+    - Path to a CA certificate used to authenticate with the API.
+  cert_file:
+    description:
+    - Path to a certificate used to authenticate with the API.
+  key_file:
+    description:
+    - Path to a key file used to authenticate with the API.
+  verify_ssl:
+    description:
+    - Whether or not to verify the API server's SSL certificates.
+requirements:
+- openshift == 0.4.0.a1
+'''
+
+EXAMPLES = '''
+# nodes.k8s_objects.yml
+plugin: k8s_objects
+kind: Node
+label_selector: node-role.kubernetes.io/compute=true
+compose:
+  ansible_host: (k8s_object.status.addresses | selectattr('type', 'equalto', 'InternalIP') | first).address
+keyed_groups:
+- key: k8s_object.metadata.labels.zone
+  prefix: zone
+'''
+
+# Imports the role's module_utils, rather than those of the same name that ship with Ansible
+ROLE_MODULE_UTILS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'module_utils')
+if ROLE_MODULE_UTILS not in ansible.module_utils.__path__:
+    ansible.module_utils.__path__.insert(0, ROLE_MODULE_UTILS)
+
+try:
+    from ansible.module_utils.k8s_cache import AUTH_OPTIONS, DEFAULT_TTL, ListCache, list_objects
+    from ansible.module_utils.k8s_object import kind_to_snake
+    HAS_K8S_CACHE = True
+except ImportError as exc:
+    K8S_CACHE_IMPORT_ERROR = to_native(exc)
+    HAS_K8S_CACHE = False
+
+# Options of the inventory source, besides those that select the cluster and credentials
+INVENTORY_OPTIONS = ('plugin', 'kind', 'api_version', 'namespace', 'label_selector', 'field_selector', 'cache_ttl',
+                     'compress', 'compose', 'groups', 'keyed_groups', 'strict')
+
+
+class InventoryModule(BaseInventoryPlugin, Constructable):
+    NAME = 'k8s_objects'
+
+    def verify_file(self, path):
+        return super(InventoryModule, self).verify_file(path) and \
+            path.endswith(('k8s_objects.yml', 'k8s_objects.yaml'))
+
+    def parse(self, inventory, loader, path, cache=True):
+        super(InventoryModule, self).parse(inventory, loader, path, cache)
+        config = self.loader.load_from_file(path) or {}
+        if config.get('plugin') != self.NAME:
+            raise AnsibleParserError("{0} is not a {1} inventory source".format(path, self.NAME))
+        if not config.get('kind'):
+            raise AnsibleParserError("{0} requires a kind".format(path))
+        if not HAS_K8S_CACHE:
+            raise AnsibleParserError("The k8s_objects inventory requires the openshift client: {0}".format(
+                K8S_CACHE_IMPORT_ERROR))
+        unknown = sorted(key for key in config if key not in INVENTORY_OPTIONS + AUTH_OPTIONS)
+        if unknown:
+            raise AnsibleParserError("Unsupported options for the k8s_objects inventory in {0}: {1}".format(
+                path, ', '.join(unknown)))
+
+        auth = dict((key, config[key]) for key in AUTH_OPTIONS if config.get(key) is not None)
+        try:
+            objects = list_objects(config['kind'], config.get('api_version', 'v1'), config.get('namespace'),
+                                   config.get('label_selector'), config.get('field_selector'),
+                                   cache=ListCache(ttl=int(config.get('cache_ttl', DEFAULT_TTL))),
+                                   compress=config.get('compress'), **auth)
+        except Exception as exc:
+            raise AnsibleParserError("Failed to list {0}: {1}".format(config['kind'], to_native(exc)))
+
+        group = 'k8s_' + kind_to_snake(config['kind'])
+        self.inventory.add_group(group)
+        for obj in objects:
+            metadata = obj.get('metadata', {})
+            name = metadata['name']
+            if config.get('namespace') is None and metadata.get('namespace'):
+                # Names are unique only within a namespace
+                name = '{0}.{1}'.format(metadata['namespace'], name)
+            self.inventory.add_host(name, group=group)
+            self.inventory.set_variable(name, 'k8s_object', obj)
+            if Constructable is not object:
+                variables = self.inventory.get_host(name).get_vars()
+                strict = config.get('strict', False)
+                self._set_composite_vars(config.get('compose'), variables, name, strict=strict)
+                self._add_host_to_composed_groups(config.get('groups'), variables, name, strict=strict)
+                self._add_host_to_keyed_groups(config.get('keyed_groups'), variables, name, strict=strict)
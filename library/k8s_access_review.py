@@ -0,0 +1,169 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+from ansible.module_utils.k8s_common import KubernetesAnsibleException
+from ansible.module_utils.k8s_access_review import KubernetesAccessReviewModule
+
+DOCUMENTATION = '''
+module: k8s_access_review
+short_description: Check what a user, or the module's credentials, may do
+description:
+- Evaluates many access checks in one task, with a SubjectAccessReview for a user or groups, or a
+  SelfSubjectAccessReview for the module's own credentials.
+- Identical checks are reviewed once, and the reviews are made concurrently.
+- Results are cached on disk, for the cluster, credentials and subject, until I(cache_ttl) passes or the RBAC
+  roles and bindings change, so that plays that repeat the same checks do not review them again.
+- Never changes the cluster, and so supports check mode.
+version_added: 2.3.0
+author: OpenShift (@openshift)
+options:
+  api_key:
+    description:
+    - Token used to connect to the API.
+  cache_ttl:
+    description:
+    - Seconds the results are cached for. The cache is also discarded whenever a Role, RoleBinding, ClusterRole
+      or ClusterRoleBinding changes. Set to 0 to review every check.
+    default: 600
+    type: int
+  cert_file:
+    description:
+    - Path to a certificate used to authenticate with the API.
+    type: path
+  checks:
+    description:
+    - The checks, as dicts with a I(verb), and either a I(resource), with optional I(group), I(version),
+      I(subresource), I(name) and I(namespace), or a non-resource I(path), such as C(/healthz).
+    required: true
+    type: list
+  context:
+    description:
+    - The name of a context found in the Kubernetes config file.
+  debug:
+    description:
+    - Enable debug output from the OpenShift helper. Logging info is written to KubeObjHelper.log
+    default: false
+    type: bool
+  extra:
+    description:
+    - Extra attributes of the user, as a dict of lists, as an authenticator would return them.
+    type: dict
+  groups:
+    description:
+    - Groups of the subject.
+    type: list
+  host:
+    description:
+    - Provide a URL for acessing the Kubernetes API.
+  key_file:
+    description:
+    - Path to a key file used to authenticate with the API.
+    type: path
+  kubeconfig:
+    description:
+    - Path to an existing Kubernetes config file. If not provided, and no other connection
+      options are provided, the openshift client will attempt to load the default
+      configuration file from I(~/.kube/config.json).
+    type: path
+  namespace:
+    description:
+    - Namespace of the resource checks that do not set one.
+  password:
+    description:
+    - Provide a password for connecting to the API. Use in conjunction with I(username).
+  ssl_ca_cert:
+    description:
+    - Path to a CA certificate used to authenticate with the API.
+    type: path
+  uid:
+    description:
+    - UID of the user.
+  user:
+    description:
+    - The user to review access for. When none of I(user), I(groups), I(uid) or I(extra) are set, access is
+      reviewed for the credentials of the module, with SelfSubjectAccessReviews.
+  username:
+    description:
+    - Provide a username for connecting to the API.
+  verify_ssl:
+    description:
+    - Whether or not to verify the API server's SSL certificates.
+    type: bool
+  workers:
+    description:
+    - Maximum number of reviews in flight at once.
+    default: 10
+    type: int
+requirements:
+- openshift == 0.4.0.a1
+'''
+
+EXAMPLES = '''
+- name: Check that the deployer may manage the application
+  k8s_access_review:
+    user: system:serviceaccount:ci:deployer
+    namespace: web
+    checks:
+    - verb: create
+      group: apps
+      resource: deployments
+    - verb: patch
+      resource: configmaps
+    - verb: get
+      resource: secrets
+      name: tls
+  register: review
+
+- assert:
+    that: review.denied == 0
+
+- name: Check the credentials of the play
+  k8s_access_review:
+    checks:
+    - verb: list
+      resource: nodes
+    - verb: get
+      path: /metrics
+'''
+
+RETURN = '''
+results:
+  description: The result of each check, in the order of I(checks), as the check with I(allowed), I(denied),
+    I(reason), I(evaluation_error), and I(cached), true when the result was read from the cache. Checks whose
+    review failed have an I(error) instead.
+  type: list
+  returned: always
+unique:
+  description: Number of distinct checks.
+  type: int
+  returned: always
+reviews:
+  description: Number of reviews sent to the API server, the distinct checks that were not cached.
+  type: int
+  returned: always
+allowed:
+  description: Number of checks allowed.
+  type: int
+  returned: always
+denied:
+  description: Number of checks not allowed.
+  type: int
+  returned: always
+'''
+
+
+def main():
+    try:
+        module = KubernetesAccessReviewModule()
+    except KubernetesAnsibleException as exc:
+        # The helper failed to init, so there is no module object. All we can do is raise the error.
+        raise Exception(exc.message)
+
+    try:
+        module.execute_module()
+    except KubernetesAnsibleException as exc:
+        module.fail_json(msg="Module failed!", error=str(exc))
+
+
+if __name__ == '__main__':
+    main()
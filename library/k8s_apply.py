@@ -0,0 +1,183 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+from ansible.module_utils.k8s_common import KubernetesAnsibleException
+from ansible.module_utils.k8s_apply import KubernetesApplyModule
+
+DOCUMENTATION = '''
+module: k8s_apply
+short_description: Apply a set of Kubernetes and OpenShift resources of mixed kinds
+description:
+- Create, patch or delete a set of objects of any kind in a single task. The objects are ordered into levels
+  by their dependencies, and the objects within each level are applied concurrently, so that the number of
+  rounds is the depth of the dependency graph, rather than the number of objects.
+- Namespaced objects depend on a Namespace or Project of the same name in the set, custom resources on the
+  CustomResourceDefinition that defines them, and pod workloads on the ServiceAccounts, RBAC bindings,
+  ConfigMaps, Secrets, PersistentVolumeClaims and Services in their namespace.
+- Kinds that have no kind specific module, such as custom resources, are resolved through API discovery and
+  patched with a JSON merge patch.
+- Supports check mode, and diff mode for patched objects.
+version_added: 2.3.0
+author: OpenShift (@openshift)
+options:
+  api_key:
+    description:
+    - Token used to connect to the API.
+  cert_file:
+    description:
+    - Path to a certificate used to authenticate with the API.
+    type: path
+  context:
+    description:
+    - The name of a context found in the Kubernetes config file.
+  debug:
+    description:
+    - Enable debug output from the OpenShift helper. Logging info is written to KubeObjHelper.log
+    default: false
+    type: bool
+  host:
+    description:
+    - Provide a URL for acessing the Kubernetes API.
+  key_file:
+    description:
+    - Path to a key file used to authenticate with the API.
+    type: path
+  kubeconfig:
+    description:
+    - Path to an existing Kubernetes config file. If not provided, and no other connection
+      options are provided, the openshift client will attempt to load the default
+      configuration file from I(~/.kube/config.json).
+    type: path
+  namespace:
+    description:
+    - Namespace for namespaced objects that do not set I(metadata.namespace).
+  password:
+    description:
+    - Provide a password for connecting to the API. Use in conjunction with I(username).
+  preflight:
+    description:
+    - Before any object is changed, check that the credentials are allowed every operation the task needs,
+      with one SelfSubjectRulesReview per namespace, and fail without changing anything when they are not.
+      Skipped, with a warning, when the server does not serve SelfSubjectRulesReview, or when its rules are
+      incomplete, as they are with authorizers other than RBAC.
+    default: true
+    type: bool
+  resource_definitions:
+    description:
+    - List of object definitions. Each requires I(apiVersion), I(kind) and I(metadata.name). Objects of a
+      C(List) kind are expanded into their items.
+    type: list
+  src:
+    description:
+    - Path to a YAML file containing one or more object definitions, separated by C(---). Combined with
+      I(resource_definitions), if both are provided.
+    type: path
+  ssl_ca_cert:
+    description:
+    - Path to a CA certificate used to authenticate with the API.
+    type: path
+  state:
+    description:
+    - When C(present), objects that do not exist are created, and existing objects that differ from their
+      definition are patched. When C(absent), objects are deleted, dependent objects first.
+    default: present
+    choices:
+    - present
+    - absent
+  username:
+    description:
+    - Provide a username for connecting to the API.
+  verify_ssl:
+    description:
+    - Whether or not to verify the API server's SSL certificates.
+    type: bool
+  workers:
+    description:
+    - Maximum number of API requests in flight at once.
+    default: 10
+    type: int
+requirements:
+- openshift == 0.4.0.a1
+'''
+
+EXAMPLES = '''
+- name: Bring up the hello application
+  k8s_apply:
+    src: files/hello.yml
+    namespace: hello
+
+- name: Create a namespace and its service account
+  k8s_apply:
+    resource_definitions:
+    - apiVersion: v1
+      kind: Namespace
+      metadata:
+        name: hello
+    - apiVersion: v1
+      kind: ServiceAccount
+      metadata:
+        name: deployer
+        namespace: hello
+'''
+
+RETURN = '''
+denied:
+  description: The operations the credentials are not allowed, as dicts with I(verb), I(group), I(resource),
+    I(name), I(namespace) and I(kind), when the pre-flight fails.
+  type: list
+  returned: on pre-flight failure
+levels:
+  description: Number of dependency levels the objects were ordered into.
+  type: int
+  returned: always
+results:
+  description: One entry per object applied, in the order the objects were given.
+  type: complex
+  returned: always
+  contains:
+    api_version:
+      description: apiVersion of the object.
+      type: str
+    kind:
+      description: Kind of the object.
+      type: str
+    name:
+      description: Name of the object.
+      type: str
+    namespace:
+      description: Namespace of the object, or null for cluster scoped objects.
+      type: str
+    changed:
+      description: Whether the object was created, patched or deleted.
+      type: bool
+    method:
+      description: The operation performed, one of C(create), C(patch) or C(delete).
+      type: str
+    result:
+      description: The object, as returned by the API. In check mode, the existing object with the changes
+        merged into it, and omitted for objects that would be created.
+      type: complex
+    diff:
+      description: The object before and after a patch, in diff mode.
+      type: complex
+    error:
+      description: Error message, when the operation failed.
+      type: str
+'''
+
+
+def main():
+    try:
+        module = KubernetesApplyModule()
+    except KubernetesAnsibleException as exc:
+        # The helper failed to init, so there is no module object. All we can do is raise the error.
+        raise Exception(exc.message)
+
+    try:
+        module.execute_module()
+    except KubernetesAnsibleException as exc:
+        module.fail_json(msg="Module failed!", error=str(exc))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,7 +1,8 @@
 #!/usr/bin/python
 # -*- coding: utf-8 -*-
 
-from ansible.module_utils.k8s_common import KubernetesAnsibleModule, KubernetesAnsibleException
+from ansible.module_utils.k8s_common import KubernetesAnsibleModule
+from ansible.module_utils.k8s_dispatch import dispatch
 
 DOCUMENTATION = '''
 module: k8s_apps_v1beta1_deployment
@@ -564,16 +565,7 @@ deployment:
 
 
 def main():
-    try:
-        module = KubernetesAnsibleModule('deployment', 'apps_v1beta1')
-    except KubernetesAnsibleException as exc:
-        # The helper failed to init, so there is no module object. All we can do is raise the error.
-        raise Exception(exc.message)
-
-    try:
-        module.execute_module()
-    except KubernetesAnsibleException as exc:
-        module.fail_json(msg="Module failed!", error=str(exc))
+    dispatch(KubernetesAnsibleModule, 'deployment', 'apps_v1beta1')
 
 
 if __name__ == '__main__':
@@ -1,7 +1,10 @@
 #!/usr/bin/python
 # -*- coding: utf-8 -*-
 
-from ansible.module_utils.k8s_common import KubernetesAnsibleModule, KubernetesAnsibleException
+from ansible.module_utils.k8s_common import KubernetesAnsibleModule
+from ansible.module_utils.k8s_dispatch import dispatch
+from ansible.module_utils.k8s_encoding import CompressMixin
+from ansible.module_utils.k8s_raw import MetadataListMixin
 
 DOCUMENTATION = '''
 module: k8s_apps_v1beta1_deployment_list
@@ -149,16 +152,7 @@ deployment_list:
 
 
 def main():
-    try:
-        module = KubernetesAnsibleModule('deployment_list', 'apps_v1beta1')
-    except KubernetesAnsibleException as exc:
-        # The helper failed to init, so there is no module object. All we can do is raise the error.
-        raise Exception(exc.message)
-
-    try:
-        module.execute_module()
-    except KubernetesAnsibleException as exc:
-        module.fail_json(msg="Module failed!", error=str(exc))
+    dispatch(KubernetesAnsibleModule, 'deployment_list', 'apps_v1beta1', CompressMixin, MetadataListMixin)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,143 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+from ansible.module_utils.k8s_common import KubernetesAnsibleException
+from ansible.module_utils.k8s_build_trigger import KubernetesBuildTriggerModule
+
+DOCUMENTATION = '''
+module: k8s_build_trigger
+short_description: Trigger the builds of many BuildConfigs at once
+description:
+- Starts a build of each BuildConfig named in I(build_configs), or selected by I(label_selector), as
+  openshift_v1_build_request does for one. Builds are triggered concurrently, up to I(workers) at a time.
+- With I(wait), every build is tracked to its end with one watch of builds, and the outcome and timings of
+  each are returned.
+- Supports check mode, in which the BuildConfigs that would be triggered are returned.
+version_added: 2.3.0
+author: OpenShift (@openshift)
+options:
+  api_key:
+    description:
+    - Token used to connect to the API.
+  build_configs:
+    description:
+    - Names of the BuildConfigs to trigger, in I(namespace), or as C(namespace/name).
+    type: list
+  cert_file:
+    description:
+    - Path to a certificate used to authenticate with the API.
+    type: path
+  context:
+    description:
+    - The name of a context found in the Kubernetes config file.
+  debug:
+    description:
+    - Enable debug output from the OpenShift helper. Logging info is written to KubeObjHelper.log
+    default: false
+    type: bool
+  host:
+    description:
+    - Provide a URL for acessing the Kubernetes API.
+  key_file:
+    description:
+    - Path to a key file used to authenticate with the API.
+    type: path
+  kubeconfig:
+    description:
+    - Path to an existing Kubernetes config file. If not provided, and no other connection
+      options are provided, the openshift client will attempt to load the default
+      configuration file from I(~/.kube/config.json).
+    type: path
+  label_selector:
+    description:
+    - Trigger the BuildConfigs this label selector selects, in I(namespace), or in all namespaces.
+  message:
+    description:
+    - Message recorded as the cause of each build.
+    default: Triggered by the k8s_build_trigger module
+  namespace:
+    description:
+    - Namespace of the BuildConfigs.
+  password:
+    description:
+    - Provide a password for connecting to the API. Use in conjunction with I(username).
+  ssl_ca_cert:
+    description:
+    - Path to a CA certificate used to authenticate with the API.
+    type: path
+  timeout:
+    description:
+    - Seconds to wait for the builds to end, after which the module fails.
+    default: 3600
+    type: int
+  username:
+    description:
+    - Provide a username for connecting to the API.
+  verify_ssl:
+    description:
+    - Whether or not to verify the API server's SSL certificates.
+    type: bool
+  wait:
+    description:
+    - Wait for the builds to end, and fail unless they all complete.
+    default: true
+    type: bool
+  workers:
+    description:
+    - Maximum number of builds triggered at once.
+    default: 10
+    type: int
+requirements:
+- openshift == 0.4.0.a1
+'''
+
+EXAMPLES = '''
+- name: Rebuild every image built from the ruby base image
+  k8s_build_trigger:
+    namespace: apps
+    label_selector: base-image=ruby-24
+    workers: 20
+    timeout: 5400
+  register: rebuild
+
+- debug:
+    msg: "{{ rebuild.builds | map(attribute='duration') | list }}"
+'''
+
+RETURN = '''
+builds:
+  description: One entry per BuildConfig, as dicts with I(build_config), I(namespace), and the I(build) started,
+    or the I(error) that prevented it. With I(wait), also the build's I(phase) and I(reason), the seconds it
+    was I(queued), its I(duration), and the seconds I(elapsed) from the first trigger to its last change.
+  type: list
+  returned: always
+complete:
+  description: Number of builds that completed.
+  type: int
+  returned: when wait is true
+failed:
+  description: Number of builds that did not complete.
+  type: int
+  returned: when wait is true
+triggered:
+  description: Number of builds started.
+  type: int
+  returned: always
+'''
+
+
+def main():
+    try:
+        module = KubernetesBuildTriggerModule()
+    except KubernetesAnsibleException as exc:
+        # The helper failed to init, so there is no module object. All we can do is raise the error.
+        raise Exception(exc.message)
+
+    try:
+        module.execute_module()
+    except KubernetesAnsibleException as exc:
+        module.fail_json(msg="Module failed!", error=str(exc))
+
+
+if __name__ == '__main__':
+    main()
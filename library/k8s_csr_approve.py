@@ -0,0 +1,150 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+from ansible.module_utils.k8s_common import KubernetesAnsibleException
+from ansible.module_utils.k8s_csr_approve import KubernetesCSRApproveModule
+
+DOCUMENTATION = '''
+module: k8s_csr_approve
+short_description: Approve the certificate signing requests of joining nodes
+description:
+- Approves pending CertificateSigningRequests that match a set of rules, the user that requested them, the key
+  usages they ask for, and the name of the node in their subject, which must be in the C(system:nodes)
+  organization. The others are left pending, and reported with the reason they did not match.
+- Pending requests are listed, then watched as nodes join, and matching requests are approved concurrently
+  through the approval subresource, until I(count) have been approved or I(timeout) passes.
+- Supports check mode, in which the requests pending when the task starts are reported, without waiting.
+version_added: 2.3.0
+author: OpenShift (@openshift)
+options:
+  api_key:
+    description:
+    - Token used to connect to the API.
+  cert_file:
+    description:
+    - Path to a certificate used to authenticate with the API.
+    type: path
+  context:
+    description:
+    - The name of a context found in the Kubernetes config file.
+  count:
+    description:
+    - Number of requests to approve. The task watches for new requests until that many have been approved, and
+      fails if they have not been by I(timeout). Without it, the requests pending when the task starts are
+      approved, and the task returns.
+    type: int
+  debug:
+    description:
+    - Enable debug output from the OpenShift helper. Logging info is written to KubeObjHelper.log
+    default: false
+    type: bool
+  host:
+    description:
+    - Provide a URL for acessing the Kubernetes API.
+  key_file:
+    description:
+    - Path to a key file used to authenticate with the API.
+    type: path
+  kubeconfig:
+    description:
+    - Path to an existing Kubernetes config file. If not provided, and no other connection
+      options are provided, the openshift client will attempt to load the default
+      configuration file from I(~/.kube/config.json).
+    type: path
+  node_name:
+    description:
+    - Regular expression the whole name of the node, from the C(system:node:<name>) common name of the request's
+      subject, must match.
+    required: true
+  password:
+    description:
+    - Provide a password for connecting to the API. Use in conjunction with I(username).
+  requestors:
+    description:
+    - Shell style patterns of the users allowed to request certificates. A node, C(system:node:<name>), may only
+      request a certificate for itself.
+    type: list
+    default:
+    - system:bootstrap:*
+    - system:serviceaccount:openshift-infra:node-bootstrapper
+    - system:node:*
+  ssl_ca_cert:
+    description:
+    - Path to a CA certificate used to authenticate with the API.
+    type: path
+  timeout:
+    description:
+    - Seconds to wait for I(count) requests to be approved.
+    default: 600
+    type: int
+  usages:
+    description:
+    - Key usages a request may ask for. Requests asking for any other are not approved.
+    - C(server auth) is only approved when a node, C(system:node:<name>), requests a certificate for itself, so
+      bootstrap tokens and service accounts get client certificates only.
+    type: list
+    default:
+    - digital signature
+    - key encipherment
+    - client auth
+    - server auth
+  username:
+    description:
+    - Provide a username for connecting to the API.
+  verify_ssl:
+    description:
+    - Whether or not to verify the API server's SSL certificates.
+    type: bool
+  workers:
+    description:
+    - Maximum number of approvals in flight at once.
+    default: 10
+    type: int
+requirements:
+- openshift == 0.4.0.a1
+'''
+
+EXAMPLES = '''
+- name: Approve the client certificates of the new workers as they join
+  k8s_csr_approve:
+    node_name: 'worker-[0-9]+\\.example\\.com'
+    usages:
+    - digital signature
+    - key encipherment
+    - client auth
+    count: "{{ groups['new_workers'] | length }}"
+    timeout: 1200
+'''
+
+RETURN = '''
+approved:
+  description: The requests approved, or in check mode, those that would be, as dicts with I(name), I(username)
+    and I(node).
+  type: list
+  returned: always
+failed:
+  description: The requests whose approval failed, with the I(error).
+  type: list
+  returned: always
+skipped:
+  description: The pending requests that did not match the rules, with the I(reason).
+  type: list
+  returned: always
+'''
+
+
+def main():
+    try:
+        module = KubernetesCSRApproveModule()
+    except KubernetesAnsibleException as exc:
+        # The helper failed to init, so there is no module object. All we can do is raise the error.
+        raise Exception(exc.message)
+
+    try:
+        module.execute_module()
+    except KubernetesAnsibleException as exc:
+        module.fail_json(msg="Module failed!", error=str(exc))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,207 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+from ansible.module_utils.k8s_common import KubernetesAnsibleException
+from ansible.module_utils.k8s_custom_resource import KubernetesCustomResourceModule
+
+DOCUMENTATION = '''
+module: k8s_custom_resource
+short_description: Manage objects of any kind the cluster serves, such as custom resources
+description:
+- Create, patch or delete objects of a kind given at run time. The kind is resolved through API discovery,
+  which is cached on disk, so objects of kinds that have no kind specific module, such as the custom
+  resources defined by a CustomResourceDefinition, are managed without a generated model.
+- Objects are handled as dicts. Many objects can be applied in one task, concurrently, and the task can wait
+  for them to become ready, with one watch per namespace.
+- Supports check mode, and diff mode for patched objects.
+version_added: 2.3.0
+author: OpenShift (@openshift)
+options:
+  api_key:
+    description:
+    - Token used to connect to the API.
+  api_version:
+    description:
+    - API version of the objects, including the API group, e.g. C(stable.example.com/v1).
+    required: true
+  cert_file:
+    description:
+    - Path to a certificate used to authenticate with the API.
+    type: path
+  context:
+    description:
+    - The name of a context found in the Kubernetes config file.
+  debug:
+    description:
+    - Enable debug output from the OpenShift helper. Logging info is written to KubeObjHelper.log
+    default: false
+    type: bool
+  host:
+    description:
+    - Provide a URL for acessing the Kubernetes API.
+  key_file:
+    description:
+    - Path to a key file used to authenticate with the API.
+    type: path
+  kind:
+    description:
+    - Kind of the objects, e.g. C(CronTab). Resolved through API discovery, so any kind the cluster serves
+      is supported, including custom resources and kinds of aggregated APIs.
+    required: true
+  kubeconfig:
+    description:
+    - Path to an existing Kubernetes config file. If not provided, and no other connection
+      options are provided, the openshift client will attempt to load the default
+      configuration file from I(~/.kube/config.json).
+    type: path
+  name:
+    description:
+    - Name of the object, when it is not set in I(resource_definition).
+  namespace:
+    description:
+    - Namespace of namespaced objects that do not set I(metadata.namespace).
+  password:
+    description:
+    - Provide a password for connecting to the API. Use in conjunction with I(username).
+  resource_definition:
+    description:
+    - Definition of the object. I(apiVersion) and I(kind) default to I(api_version) and I(kind).
+    type: dict
+  resource_definitions:
+    description:
+    - List of object definitions, applied concurrently.
+    type: list
+  src:
+    description:
+    - Path to a YAML file containing one or more object definitions, separated by C(---).
+    type: path
+  ssl_ca_cert:
+    description:
+    - Path to a CA certificate used to authenticate with the API.
+    type: path
+  state:
+    description:
+    - When C(present), objects that do not exist are created, and existing objects that differ from their
+      definition are patched with a JSON merge patch. When C(absent), objects are deleted.
+    default: present
+    choices:
+    - present
+    - absent
+  username:
+    description:
+    - Provide a username for connecting to the API.
+  verify_ssl:
+    description:
+    - Whether or not to verify the API server's SSL certificates.
+    type: bool
+  wait:
+    description:
+    - Wait for the objects to be ready, or with I(state=absent), to be deleted. An object is ready when it
+      has the condition in I(wait_condition), or without I(wait_condition), when it has a status.
+    default: false
+    type: bool
+  wait_condition:
+    description:
+    - Condition that marks an object as ready, as a dict with I(type), e.g. C(Ready), and I(status),
+      C(True) by default.
+    type: dict
+  wait_timeout:
+    description:
+    - Seconds to wait for the objects.
+    default: 120
+    type: int
+  workers:
+    description:
+    - Maximum number of API requests in flight at once.
+    default: 10
+    type: int
+requirements:
+- openshift == 0.4.0.a1
+'''
+
+EXAMPLES = '''
+- name: Create a CronTab
+  k8s_custom_resource:
+    api_version: stable.example.com/v1
+    kind: CronTab
+    namespace: hello
+    resource_definition:
+      metadata:
+        name: nightly
+      spec:
+        cronSpec: "0 2 * * *"
+        image: hello/backup
+
+- name: Create the clusters of an operator, and wait for them to be ready
+  k8s_custom_resource:
+    api_version: etcd.database.coreos.com/v1beta2
+    kind: EtcdCluster
+    namespace: hello
+    src: files/etcd-clusters.yml
+    wait: true
+    wait_condition:
+      type: Available
+'''
+
+RETURN = '''
+api_version:
+  description: Requested API version.
+  type: string
+  returned: always
+result:
+  description: The object, as returned by the API, when a single object was given.
+  type: complex
+  returned: when a single object was given
+results:
+  description: One entry per object, in the order the objects were given.
+  type: complex
+  returned: always
+  contains:
+    api_version:
+      description: apiVersion of the object.
+      type: str
+    kind:
+      description: Kind of the object.
+      type: str
+    name:
+      description: Name of the object.
+      type: str
+    namespace:
+      description: Namespace of the object, or null for cluster scoped objects.
+      type: str
+    changed:
+      description: Whether the object was created, patched or deleted.
+      type: bool
+    method:
+      description: The operation performed, one of C(create), C(patch) or C(delete).
+      type: str
+    result:
+      description: The object, as returned by the API.
+      type: complex
+    diff:
+      description: The object before and after a patch, in diff mode.
+      type: complex
+    ready:
+      description: Whether the object was ready, or deleted, before I(wait_timeout), when I(wait) is set.
+      type: bool
+    error:
+      description: Error message, when the operation failed.
+      type: str
+'''
+
+
+def main():
+    try:
+        module = KubernetesCustomResourceModule()
+    except KubernetesAnsibleException as exc:
+        # The helper failed to init, so there is no module object. All we can do is raise the error.
+        raise Exception(exc.message)
+
+    try:
+        module.execute_module()
+    except KubernetesAnsibleException as exc:
+        module.fail_json(msg="Module failed!", error=str(exc))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,171 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+from ansible.module_utils.k8s_common import KubernetesAnsibleException
+from ansible.module_utils.k8s_drain import KubernetesDrainModule
+
+DOCUMENTATION = '''
+module: k8s_drain
+short_description: Drain, cordon or uncordon a node
+description:
+- Drains a node as C(kubectl drain) does. The node is cordoned, and its pods are evicted, concurrently, through
+  the eviction subresource, so that PodDisruptionBudgets are honored. DaemonSet pods and mirror pods are left
+  on the node.
+- Pods covered by a budget are evicted as the budget allows, in rounds, as the pods evicted earlier are
+  replaced elsewhere. Evictions the server refuses with a 429 are retried with exponential backoff.
+- The task waits for the evicted pods to terminate, with one watch of the node's pods.
+- Supports check mode.
+version_added: 2.3.0
+author: OpenShift (@openshift)
+options:
+  api_key:
+    description:
+    - Token used to connect to the API.
+  cert_file:
+    description:
+    - Path to a certificate used to authenticate with the API.
+    type: path
+  context:
+    description:
+    - The name of a context found in the Kubernetes config file.
+  debug:
+    description:
+    - Enable debug output from the OpenShift helper. Logging info is written to KubeObjHelper.log
+    default: false
+    type: bool
+  delete_local_data:
+    description:
+    - Evict pods that use emptyDir volumes, whose data is lost. Without it, such pods prevent the drain.
+    default: false
+    type: bool
+  force:
+    description:
+    - Evict pods that are not managed by a controller, and so are not recreated elsewhere. Without it, such
+      pods prevent the drain.
+    default: false
+    type: bool
+  grace_period:
+    description:
+    - Seconds each pod is given to terminate. Defaults to the pod's own termination grace period.
+    type: int
+  host:
+    description:
+    - Provide a URL for acessing the Kubernetes API.
+  key_file:
+    description:
+    - Path to a key file used to authenticate with the API.
+    type: path
+  kubeconfig:
+    description:
+    - Path to an existing Kubernetes config file. If not provided, and no other connection
+      options are provided, the openshift client will attempt to load the default
+      configuration file from I(~/.kube/config.json).
+    type: path
+  node:
+    description:
+    - Name of the node.
+    required: true
+  password:
+    description:
+    - Provide a password for connecting to the API. Use in conjunction with I(username).
+  ssl_ca_cert:
+    description:
+    - Path to a CA certificate used to authenticate with the API.
+    type: path
+  state:
+    description:
+    - When C(drained), the node is cordoned and its pods are evicted. When C(cordoned), the node is marked
+      unschedulable only, and when C(uncordoned), it is marked schedulable again.
+    default: drained
+    choices:
+    - drained
+    - cordoned
+    - uncordoned
+  timeout:
+    description:
+    - Seconds to evict the pods and wait for them to terminate, after which the module fails.
+    default: 600
+    type: int
+  username:
+    description:
+    - Provide a username for connecting to the API.
+  verify_ssl:
+    description:
+    - Whether or not to verify the API server's SSL certificates.
+    type: bool
+  wait:
+    description:
+    - Wait for the evicted pods to terminate.
+    default: true
+    type: bool
+  workers:
+    description:
+    - Maximum number of evictions in flight at once.
+    default: 10
+    type: int
+requirements:
+- openshift == 0.4.0.a1
+'''
+
+EXAMPLES = '''
+- name: Drain the node before patching its kernel
+  k8s_drain:
+    node: "{{ inventory_hostname }}"
+    delete_local_data: true
+    timeout: 900
+
+- name: Return the node to service
+  k8s_drain:
+    node: "{{ inventory_hostname }}"
+    state: uncordoned
+'''
+
+RETURN = '''
+node:
+  description: Name of the node.
+  type: string
+  returned: always
+unschedulable:
+  description: Whether the node is cordoned.
+  type: bool
+  returned: always
+evicted:
+  description: The pods evicted, or in check mode, the pods that would be, as dicts with I(name) and
+    I(namespace).
+  type: list
+  returned: when state is drained
+skipped:
+  description: The DaemonSet and mirror pods left on the node, with the I(reason).
+  type: list
+  returned: when state is drained
+failed:
+  description: The pods whose eviction failed, with the I(error).
+  type: list
+  returned: when pods were evicted
+blocked:
+  description: The pods not evicted before I(timeout), as their disruption budgets allowed no more
+    disruptions.
+  type: list
+  returned: when pods were evicted
+not_terminated:
+  description: The evicted pods that had not terminated before I(timeout).
+  type: list
+  returned: when pods were evicted
+'''
+
+
+def main():
+    try:
+        module = KubernetesDrainModule()
+    except KubernetesAnsibleException as exc:
+        # The helper failed to init, so there is no module object. All we can do is raise the error.
+        raise Exception(exc.message)
+
+    try:
+        module.execute_module()
+    except KubernetesAnsibleException as exc:
+        module.fail_json(msg="Module failed!", error=str(exc))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,176 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+from ansible.module_utils.k8s_common import KubernetesAnsibleException
+from ansible.module_utils.k8s_image_import import KubernetesImageImportModule
+
+DOCUMENTATION = '''
+module: k8s_image_import
+short_description: Import many image tags into ImageStreams at once
+description:
+- Imports many image tags in one task, rather than one openshift_v1_image_stream_import task per tag. The tags
+  are grouped by ImageStream, and the tags of each stream are imported with one ImageStreamImport request, up
+  to I(batch_size) tags at a time. The requests for different streams are made concurrently, up to I(workers)
+  at a time.
+- Only the digest and status of each tag are returned, not the image metadata.
+- Supports check mode, in which the images are resolved by the server, without being imported, and the tags
+  whose digest would change are reported as changed.
+version_added: 2.3.0
+author: OpenShift (@openshift)
+options:
+  api_key:
+    description:
+    - Token used to connect to the API.
+  batch_size:
+    description:
+    - Maximum number of tags imported by one ImageStreamImport request. The tags of an ImageStream with more
+      images are imported in several requests.
+    default: 50
+    type: int
+  cert_file:
+    description:
+    - Path to a certificate used to authenticate with the API.
+    type: path
+  context:
+    description:
+    - The name of a context found in the Kubernetes config file.
+  debug:
+    description:
+    - Enable debug output from the OpenShift helper. Logging info is written to KubeObjHelper.log
+    default: false
+    type: bool
+  host:
+    description:
+    - Provide a URL for acessing the Kubernetes API.
+  images:
+    description:
+    - The images to import, as dicts with I(from), the image to import, such as C(registry.example.com/app:1.0),
+      and I(to), the C(stream:tag) to import it to. I(to) defaults to the last part of the image's repository,
+      and its tag. I(namespace), I(insecure), I(scheduled) and I(reference_policy) may be set per image.
+    required: true
+    type: list
+  insecure:
+    description:
+    - Allow the images to be imported from registries served over HTTP, or with certificates that are not
+      trusted.
+    default: false
+    type: bool
+  key_file:
+    description:
+    - Path to a key file used to authenticate with the API.
+    type: path
+  kubeconfig:
+    description:
+    - Path to an existing Kubernetes config file. If not provided, and no other connection
+      options are provided, the openshift client will attempt to load the default
+      configuration file from I(~/.kube/config.json).
+    type: path
+  namespace:
+    description:
+    - Namespace of the ImageStreams of the images that do not set one.
+  password:
+    description:
+    - Provide a password for connecting to the API. Use in conjunction with I(username).
+  reference_policy:
+    description:
+    - How the imported tags are referenced by pods. C(Source) pulls from the source registry, and C(Local)
+      from the integrated registry.
+    default: Source
+    choices:
+    - Source
+    - Local
+  scheduled:
+    description:
+    - Have the server import the tags again periodically.
+    default: false
+    type: bool
+  ssl_ca_cert:
+    description:
+    - Path to a CA certificate used to authenticate with the API.
+    type: path
+  timeout:
+    description:
+    - Seconds to wait for the ImageStreams to show the imports, after which the module fails.
+    default: 600
+    type: int
+  username:
+    description:
+    - Provide a username for connecting to the API.
+  verify_ssl:
+    description:
+    - Whether or not to verify the API server's SSL certificates.
+    type: bool
+  wait:
+    description:
+    - Wait for the ImageStreams to show each import, with one watch of the ImageStreams per namespace. Imports
+      whose requests timed out while the server went on importing are completed by the watch.
+    default: true
+    type: bool
+  workers:
+    description:
+    - Maximum number of ImageStreamImport requests in flight at once.
+    default: 10
+    type: int
+requirements:
+- openshift == 0.4.0.a1
+'''
+
+EXAMPLES = '''
+- name: Mirror the tags of the base images
+  k8s_image_import:
+    namespace: mirror
+    reference_policy: Local
+    images:
+    - from: registry.example.com/base/ruby:2.4
+    - from: registry.example.com/base/ruby:2.5
+    - from: registry.example.com/base/nodejs:8
+      to: node:8
+    workers: 20
+  register: mirror
+
+- debug:
+    msg: "{{ mirror.images | selectattr('changed') | map(attribute='digest') | list }}"
+'''
+
+RETURN = '''
+failed:
+  description: Number of images that failed to import.
+  type: int
+  returned: always
+images:
+  description: One entry per image, as dicts with I(from), I(image_stream), I(tag) and I(namespace), the
+    I(status) of the import, C(Success), C(Failure) or C(Pending), the imported I(digest), the I(reason) and
+    I(message) of a failure, and whether the tag I(changed).
+  type: list
+  returned: always
+imported:
+  description: Number of images imported.
+  type: int
+  returned: always
+pending:
+  description: Number of images whose import requests timed out, and whose imports the ImageStreams did not
+    show before the timeout.
+  type: int
+  returned: always
+requests:
+  description: Number of ImageStreamImport requests made.
+  type: int
+  returned: always
+'''
+
+
+def main():
+    try:
+        module = KubernetesImageImportModule()
+    except KubernetesAnsibleException as exc:
+        # The helper failed to init, so there is no module object. All we can do is raise the error.
+        raise Exception(exc.message)
+
+    try:
+        module.execute_module()
+    except KubernetesAnsibleException as exc:
+        module.fail_json(msg="Module failed!", error=str(exc))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+from ansible.module_utils.k8s_object import dispatch_object
+
+DOCUMENTATION = '''
+module: k8s_object
+short_description: Manage an object of any kind supported by the kind specific modules
+description:
+- Looks up the module that manages I(kind) at I(api_version) in the dispatch table, and runs it with the
+  remaining options. Accepts the same options, and returns the same data, as that module.
+- Ships only the dispatcher and its table, rather than the documentation of a kind specific module, so
+  the payload transferred to the target for each task is smaller.
+version_added: 2.3.0
+author: OpenShift (@openshift)
+options:
+  api_version:
+    description:
+    - API version of the object, with or without the API group, e.g. C(v1) or C(apps/v1beta1).
+    default: v1
+  kind:
+    description:
+    - Kind of the object, e.g. C(ConfigMap) or C(config_map).
+    required: true
+requirements:
+- openshift == 0.4.0.a1
+'''
+
+EXAMPLES = '''
+- name: Create a config map
+  k8s_object:
+    kind: ConfigMap
+    name: hello-config
+    namespace: hello
+    data:
+      greeting: Hello
+'''
+
+RETURN = '''
+api_version:
+  description: Requested API version
+  type: string
+'''
+
+
+def main():
+    dispatch_object()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,206 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+from ansible.module_utils.k8s_common import KubernetesAnsibleException
+from ansible.module_utils.k8s_template_instantiate import KubernetesTemplateInstantiateModule
+
+DOCUMENTATION = '''
+module: k8s_template_instantiate
+short_description: Instantiate an OpenShift Template, applying the objects it generates at once
+description:
+- Processes a Template, and creates or patches the objects it generates in one task, rather than one task per
+  object. The objects are applied as k8s_apply applies them, in dependency order, with the objects of each
+  level applied concurrently.
+- By default the template is processed by the module, which substitutes the parameters, generates the values
+  of parameters with C(generate=expression), and checks that required parameters have a value. With
+  C(process=server) the server processes it instead.
+- Supports check mode, and diff mode for patched objects.
+version_added: 2.3.0
+author: OpenShift (@openshift)
+options:
+  api_key:
+    description:
+    - Token used to connect to the API.
+  cert_file:
+    description:
+    - Path to a certificate used to authenticate with the API.
+    type: path
+  context:
+    description:
+    - The name of a context found in the Kubernetes config file.
+  debug:
+    description:
+    - Enable debug output from the OpenShift helper. Logging info is written to KubeObjHelper.log
+    default: false
+    type: bool
+  host:
+    description:
+    - Provide a URL for acessing the Kubernetes API.
+  ignore_unknown_parameters:
+    description:
+    - Ignore values in I(parameters) for parameters the template does not define, rather than failing.
+    default: false
+    type: bool
+  key_file:
+    description:
+    - Path to a key file used to authenticate with the API.
+    type: path
+  kubeconfig:
+    description:
+    - Path to an existing Kubernetes config file. If not provided, and no other connection
+      options are provided, the openshift client will attempt to load the default
+      configuration file from I(~/.kube/config.json).
+    type: path
+  namespace:
+    description:
+    - Namespace of the generated objects that do not set one, and where the template is processed with
+      C(process=server).
+  parameters:
+    description:
+    - Values of the template's parameters, by name. Parameters without a value take the template's value, or
+      one generated from their expression.
+    default: {}
+    type: dict
+  password:
+    description:
+    - Provide a password for connecting to the API. Use in conjunction with I(username).
+  preflight:
+    description:
+    - Before any object is changed, check that the credentials are allowed every operation the task needs,
+      with one SelfSubjectRulesReview per namespace, and fail without changing anything when they are not.
+      Skipped, with a warning, when the server does not serve SelfSubjectRulesReview, or when its rules are
+      incomplete, as they are with authorizers other than RBAC.
+    default: true
+    type: bool
+  process:
+    description:
+    - Where the template is processed. C(local) processes it in the module, without a request to the server.
+      C(server) posts it to the server's processedtemplates resource, as C(oc process) does.
+    default: local
+    choices:
+    - local
+    - server
+  src:
+    description:
+    - Path to a YAML file holding the Template. One of I(template) or I(src) is required.
+    type: path
+  ssl_ca_cert:
+    description:
+    - Path to a CA certificate used to authenticate with the API.
+    type: path
+  state:
+    description:
+    - When C(present), generated objects that do not exist are created, and existing objects that differ from
+      their definition are patched. When C(absent), the generated objects are deleted, dependent objects first.
+    default: present
+    choices:
+    - present
+    - absent
+  template:
+    description:
+    - The Template to instantiate, as a definition, or the name of a Template on the server, in
+      I(template_namespace).
+    type: raw
+  template_namespace:
+    description:
+    - Namespace of the Template named by I(template). Defaults to I(namespace).
+  username:
+    description:
+    - Provide a username for connecting to the API.
+  verify_ssl:
+    description:
+    - Whether or not to verify the API server's SSL certificates.
+    type: bool
+  workers:
+    description:
+    - Maximum number of API requests in flight at once.
+    default: 10
+    type: int
+requirements:
+- openshift == 0.4.0.a1
+'''
+
+EXAMPLES = '''
+- name: Instantiate the application template
+  k8s_template_instantiate:
+    template: "{{ lookup('file', 'templates/shop.yml') | from_yaml }}"
+    namespace: shop
+    parameters:
+      APPLICATION_NAME: shop
+      REPLICAS: 3
+    workers: 20
+
+- name: Instantiate a template of the openshift namespace, processed by the server
+  k8s_template_instantiate:
+    template: postgresql-persistent
+    template_namespace: openshift
+    namespace: shop
+    process: server
+    parameters:
+      DATABASE_SERVICE_NAME: shop-db
+'''
+
+RETURN = '''
+denied:
+  description: The operations the credentials are not allowed, as dicts with I(verb), I(group), I(resource),
+    I(name), I(namespace) and I(kind), when the pre-flight fails.
+  type: list
+  returned: on pre-flight failure
+generated_parameters:
+  description: Names of the parameters whose values were generated. The values are not returned.
+  type: list
+  returned: when the objects are applied
+levels:
+  description: Number of dependency levels the objects were ordered into.
+  type: int
+  returned: always
+results:
+  description: One entry per object applied, in the order of the template's objects.
+  type: complex
+  returned: always
+  contains:
+    api_version:
+      description: apiVersion of the object.
+      type: str
+    kind:
+      description: Kind of the object.
+      type: str
+    name:
+      description: Name of the object.
+      type: str
+    namespace:
+      description: Namespace of the object, or null for cluster scoped objects.
+      type: str
+    changed:
+      description: Whether the object was created, patched or deleted.
+      type: bool
+    method:
+      description: The operation performed, one of C(create), C(patch) or C(delete).
+      type: str
+    result:
+      description: The object, as returned by the API.
+      type: complex
+    diff:
+      description: The object before and after a patch, in diff mode.
+      type: complex
+    error:
+      description: Error message, when the operation failed.
+      type: str
+'''
+
+
+def main():
+    try:
+        module = KubernetesTemplateInstantiateModule()
+    except KubernetesAnsibleException as exc:
+        # The helper failed to init, so there is no module object. All we can do is raise the error.
+        raise Exception(exc.message)
+
+    try:
+        module.execute_module()
+    except KubernetesAnsibleException as exc:
+        module.fail_json(msg="Module failed!", error=str(exc))
+
+
+if __name__ == '__main__':
+    main()
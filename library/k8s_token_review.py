@@ -0,0 +1,136 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+from ansible.module_utils.k8s_common import KubernetesAnsibleException
+from ansible.module_utils.k8s_token_review import KubernetesTokenReviewModule
+
+DOCUMENTATION = '''
+module: k8s_token_review
+short_description: Validate many bearer tokens
+description:
+- Validates a list of tokens in one task, with a TokenReview for each. A token given more than once is
+  reviewed once, and the reviews are made concurrently.
+- Results are cached on disk for I(cache_ttl) seconds, per cluster, credentials and audiences, keyed by the
+  SHA-256 of each token, so the same tokens validated from many hosts are reviewed once. Tokens are never
+  written to the cache, nor returned.
+- Never changes the cluster, and so supports check mode.
+version_added: 2.3.0
+author: OpenShift (@openshift)
+options:
+  api_key:
+    description:
+    - Token used to connect to the API.
+  audiences:
+    description:
+    - Audiences the tokens must be valid for. Defaults to the audiences of the API server.
+    type: list
+  cache_ttl:
+    description:
+    - Seconds the results are cached for. A deleted token may still be reported as authenticated until they
+      pass. Set to 0 to review every token.
+    default: 60
+    type: int
+  cert_file:
+    description:
+    - Path to a certificate used to authenticate with the API.
+    type: path
+  context:
+    description:
+    - The name of a context found in the Kubernetes config file.
+  debug:
+    description:
+    - Enable debug output from the OpenShift helper. Logging info is written to KubeObjHelper.log
+    default: false
+    type: bool
+  host:
+    description:
+    - Provide a URL for acessing the Kubernetes API.
+  key_file:
+    description:
+    - Path to a key file used to authenticate with the API.
+    type: path
+  kubeconfig:
+    description:
+    - Path to an existing Kubernetes config file. If not provided, and no other connection
+      options are provided, the openshift client will attempt to load the default
+      configuration file from I(~/.kube/config.json).
+    type: path
+  password:
+    description:
+    - Provide a password for connecting to the API. Use in conjunction with I(username).
+  ssl_ca_cert:
+    description:
+    - Path to a CA certificate used to authenticate with the API.
+    type: path
+  tokens:
+    description:
+    - The bearer tokens to validate.
+    required: true
+    type: list
+  username:
+    description:
+    - Provide a username for connecting to the API.
+  verify_ssl:
+    description:
+    - Whether or not to verify the API server's SSL certificates.
+    type: bool
+  workers:
+    description:
+    - Maximum number of reviews in flight at once.
+    default: 10
+    type: int
+requirements:
+- openshift == 0.4.0.a1
+'''
+
+EXAMPLES = '''
+- name: Validate the token each host uses
+  k8s_token_review:
+    tokens: "{{ ansible_play_hosts | map('extract', hostvars, 'registry_token') | list }}"
+  run_once: true
+  register: review
+
+- fail:
+    msg: "{{ ansible_play_hosts[item.0] }} has an invalid token"
+  when: not item.1.authenticated
+  with_indexed_items: "{{ review.results }}"
+'''
+
+RETURN = '''
+authenticated:
+  description: Number of tokens authenticated.
+  type: int
+  returned: always
+results:
+  description: The result of each token, in the order of I(tokens), as dicts with I(token_sha256), the SHA-256
+    of the token, I(authenticated), the I(user) with I(username), I(uid), I(groups) and I(extra), the
+    I(audiences), I(review_error), and I(cached), true when the result was read from the cache. Tokens whose
+    review failed have an I(error) instead.
+  type: list
+  returned: always
+reviews:
+  description: Number of reviews sent to the API server, the distinct tokens that were not cached.
+  type: int
+  returned: always
+unique:
+  description: Number of distinct tokens.
+  type: int
+  returned: always
+'''
+
+
+def main():
+    try:
+        module = KubernetesTokenReviewModule()
+    except KubernetesAnsibleException as exc:
+        # The helper failed to init, so there is no module object. All we can do is raise the error.
+        raise Exception(exc.message)
+
+    try:
+        module.execute_module()
+    except KubernetesAnsibleException as exc:
+        module.fail_json(msg="Module failed!", error=str(exc))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,7 +1,10 @@
 #!/usr/bin/python
 # -*- coding: utf-8 -*-
 
-from ansible.module_utils.k8s_common import KubernetesAnsibleModule, KubernetesAnsibleException
+from ansible.module_utils.k8s_common import KubernetesAnsibleModule
+from ansible.module_utils.k8s_dispatch import dispatch
+from ansible.module_utils.k8s_encoding import CompressMixin
+from ansible.module_utils.k8s_raw import MetadataListMixin
 
 DOCUMENTATION = '''
 module: k8s_v1_component_status_list
@@ -141,16 +144,7 @@ component_status_list:
 
 
 def main():
-    try:
-        module = KubernetesAnsibleModule('component_status_list', 'v1')
-    except KubernetesAnsibleException as exc:
-        # The helper failed to init, so there is no module object. All we can do is raise the error.
-        raise Exception(exc.message)
-
-    try:
-        module.execute_module()
-    except KubernetesAnsibleException as exc:
-        module.fail_json(msg="Module failed!", error=str(exc))
+    dispatch(KubernetesAnsibleModule, 'component_status_list', 'v1', CompressMixin, MetadataListMixin)
 
 
 if __name__ == '__main__':
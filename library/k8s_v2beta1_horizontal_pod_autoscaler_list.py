@@ -1,7 +1,10 @@
 #!/usr/bin/python
 # -*- coding: utf-8 -*-
 
-from ansible.module_utils.k8s_common import KubernetesAnsibleModule, KubernetesAnsibleException
+from ansible.module_utils.k8s_common import KubernetesAnsibleModule
+from ansible.module_utils.k8s_dispatch import dispatch
+from ansible.module_utils.k8s_encoding import CompressMixin
+from ansible.module_utils.k8s_raw import MetadataListMixin
 
 DOCUMENTATION = '''
 module: k8s_v2beta1_horizontal_pod_autoscaler_list
@@ -149,16 +152,7 @@ horizontal_pod_autoscaler_list:
 
 
 def main():
-    try:
-        module = KubernetesAnsibleModule('horizontal_pod_autoscaler_list', 'v2beta1')
-    except KubernetesAnsibleException as exc:
-        # The helper failed to init, so there is no module object. All we can do is raise the error.
-        raise Exception(exc.message)
-
-    try:
-        module.execute_module()
-    except KubernetesAnsibleException as exc:
-        module.fail_json(msg="Module failed!", error=str(exc))
+    dispatch(KubernetesAnsibleModule, 'horizontal_pod_autoscaler_list', 'v2beta1', CompressMixin, MetadataListMixin)
 
 
 if __name__ == '__main__':
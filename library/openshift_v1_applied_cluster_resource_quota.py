@@ -1,7 +1,8 @@
 #!/usr/bin/python
 # -*- coding: utf-8 -*-
 
-from ansible.module_utils.openshift_common import OpenShiftAnsibleModule, OpenShiftAnsibleException
+from ansible.module_utils.openshift_common import OpenShiftAnsibleModule
+from ansible.module_utils.k8s_dispatch import dispatch
 
 DOCUMENTATION = '''
 module: openshift_v1_applied_cluster_resource_quota
@@ -161,16 +162,7 @@ applied_cluster_resource_quota:
 
 
 def main():
-    try:
-        module = OpenShiftAnsibleModule('applied_cluster_resource_quota', 'v1')
-    except OpenShiftAnsibleException as exc:
-        # The helper failed to init, so there is no module object. All we can do is raise the error.
-        raise Exception(exc.message)
-
-    try:
-        module.execute_module()
-    except OpenShiftAnsibleException as exc:
-        module.fail_json(msg="Module failed!", error=str(exc))
+    dispatch(OpenShiftAnsibleModule, 'applied_cluster_resource_quota', 'v1')
 
 
 if __name__ == '__main__':
@@ -1,7 +1,10 @@
 #!/usr/bin/python
 # -*- coding: utf-8 -*-
 
-from ansible.module_utils.openshift_common import OpenShiftAnsibleModule, OpenShiftAnsibleException
+from ansible.module_utils.openshift_common import OpenShiftAnsibleModule
+from ansible.module_utils.k8s_dispatch import dispatch
+from ansible.module_utils.k8s_encoding import CompressMixin
+from ansible.module_utils.k8s_raw import MetadataListMixin
 
 DOCUMENTATION = '''
 module: openshift_v1_broker_template_instance_list
@@ -145,16 +148,7 @@ broker_template_instance_list:
 
 
 def main():
-    try:
-        module = OpenShiftAnsibleModule('broker_template_instance_list', 'v1')
-    except OpenShiftAnsibleException as exc:
-        # The helper failed to init, so there is no module object. All we can do is raise the error.
-        raise Exception(exc.message)
-
-    try:
-        module.execute_module()
-    except OpenShiftAnsibleException as exc:
-        module.fail_json(msg="Module failed!", error=str(exc))
+    dispatch(OpenShiftAnsibleModule, 'broker_template_instance_list', 'v1', CompressMixin, MetadataListMixin)
 
 
 if __name__ == '__main__':
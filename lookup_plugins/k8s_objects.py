@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+#
+#  Copyright 2017 Red Hat | Ansible
+#
+# This file is part of Ansible
+#
+# Ansible is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Ansible is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Ansible.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+
+import ansible.module_utils
+from ansible.errors import AnsibleError
+from ansible.module_utils._text import to_native
+from ansible.plugins.lookup import LookupBase
+
+DOCUMENTATION = '''
+lookup: k8s_objects
+short_description: List objects of a kind, through a cache shared by the hosts of a play
+description:
+- Returns the objects of I(kind) as dicts, as the API returns them.
+- Results are cached on the controller for I(cache_ttl) seconds, keyed by the cluster and credentials, kind,
+  namespace and selectors. When many hosts ask for the same objects at once, one of them lists the objects
+  and the others wait for its result, so the API server sees a single LIST.
+version_added: 2.3.0
+author: OpenShift (@openshift)
+options:
+  kind:
+    description:
+    - Kind of the objects, e.g. C(Route). May also be given as the first term.
+    required: true
+  api_version:
+    description:
+    - API version of the kind, with or without the API group.
+    default: v1
+  namespace:
+    description:
+    - Namespace to list. Omit to list all namespaces, or for a cluster scoped kind.
+  label_selector:
+    description:
+    - Label selector, e.g. C(app=web).
+  field_selector:
+    description:
+    - Field selector, e.g. C(status.phase=Running).
+  cache_ttl:
+    description:
+    - Seconds to keep the result. Set to 0 to always read from the API.
+    default: 30
+  compress:
+    description:
+    - Ask the API server for a gzip compressed response, for large lists read over slow links. Also enabled by
+      setting the KUBE_MODULES_COMPRESS environment variable.
+    default: false
+  kubeconfig:
+    description:
+    - Path to an existing Kubernetes config file. If not provided, and no other connection
+      options are provided, the openshift client will attempt to load the default
+      configuration file from I(~/.kube/config.json).
+  context:
+    description:
+    - The name of a context found in the Kubernetes config file.
+  host:
+    description:
+    - Provide a URL for acessing the Kubernetes API.
+  api_key:
+    description:
+    - Token used to connect to the API.
+  username:
+    description:
+    - Provide a username for connecting to the API.
+  password:
+    description:
+    - Provide a password for connecting to the API. Use in conjunction with I(username).
+  ssl_ca_cert:
+    description:
+    - Path to a CA certificate used to authenticate with the API.
+  cert_file:
+    description:
+    - Path to a certificate used to authenticate with the API.
+  key_file:
+    description:
+    - Path to a key file used to authenticate with the API.
+  verify_ssl:
+    description:
+    - Whether or not to verify the API server's SSL certificates.
+requirements:
+- openshift == 0.4.0.a1
+'''
+
+EXAMPLES = '''
+- name: Register the routes of every application
+  debug:
+    msg: "{{ item.spec.host }}"
+  loop: "{{ query('k8s_objects', 'Route', namespace='hello', label_selector='app=hello') }}"
+'''
+
+RETURN = '''
+_list:
+  description: Objects of the kind, as dicts
+  type: list
+'''
+
+# Imports the role's module_utils, rather than those of the same name that ship with Ansible
+ROLE_MODULE_UTILS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'module_utils')
+if ROLE_MODULE_UTILS not in ansible.module_utils.__path__:
+    ansible.module_utils.__path__.insert(0, ROLE_MODULE_UTILS)
+
+try:
+    from ansible.module_utils.k8s_cache import AUTH_OPTIONS, DEFAULT_TTL, ListCache, list_objects
+    HAS_K8S_CACHE = True
+except ImportError as exc:
+    K8S_CACHE_IMPORT_ERROR = to_native(exc)
+    HAS_K8S_CACHE = False
+
+# Options of the lookup, besides those that select the cluster and credentials
+LOOKUP_OPTIONS = ('kind', 'api_version', 'namespace', 'label_selector', 'field_selector', 'cache_ttl', 'compress')
+
+CACHES = {}
+
+
+class LookupModule(LookupBase):
+
+    def run(self, terms, variables=None, **kwargs):
+        if not HAS_K8S_CACHE:
+            raise AnsibleError("The k8s_objects lookup requires the openshift client: {0}".format(
+                K8S_CACHE_IMPORT_ERROR))
+        unknown = sorted(key for key in kwargs if key not in LOOKUP_OPTIONS + AUTH_OPTIONS)
+        if unknown:
+            raise AnsibleError("Unsupported options for the k8s_objects lookup: {0}".format(', '.join(unknown)))
+
+        kind = kwargs.pop('kind', None) or (terms[0] if terms else None)
+        if not kind:
+            raise AnsibleError("The k8s_objects lookup requires a kind")
+        ttl = int(kwargs.pop('cache_ttl', DEFAULT_TTL))
+        if ttl not in CACHES:
+            CACHES[ttl] = ListCache(ttl=ttl)
+        try:
+            return list_objects(kind, kwargs.pop('api_version', 'v1'), kwargs.pop('namespace', None),
+                                kwargs.pop('label_selector', None), kwargs.pop('field_selector', None),
+                                cache=CACHES[ttl], **kwargs)
+        except Exception as exc:
+            raise AnsibleError("Failed to list {0}: {1}".format(kind, to_native(exc)))
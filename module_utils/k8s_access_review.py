@@ -0,0 +1,273 @@
+#
+#  Copyright 2017 Red Hat | Ansible
+#
+# This file is part of Ansible
+#
+# Ansible is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Ansible is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Ansible.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Access reviews in batches.
+
+Each check, a verb on a resource or a non-resource path, is evaluated with a SubjectAccessReview for a given
+user or groups, or a SelfSubjectAccessReview for the credentials of the module. Identical checks are reviewed
+once, and the reviews are made concurrently on the reconcile engine.
+
+Results are cached on disk, in a file per cluster, credentials, subject and RBAC fingerprint. The fingerprint
+is a hash of the uid and resourceVersion of every Role, RoleBinding, ClusterRole and ClusterRoleBinding,
+read as metadata only, so any change to RBAC starts a new cache. Authorizers other than RBAC, such as
+webhooks, are not covered by the fingerprint, so the cache also expires after a TTL.
+"""
+
+import fcntl
+import hashlib
+import json
+import os
+import tempfile
+import time
+
+from collections import OrderedDict
+
+from ansible.module_utils.k8s_cache import AUTH_OPTIONS, CACHE_DIR_ENV, DEFAULT_CACHE_DIR, cache_key
+from ansible.module_utils.k8s_common import KubernetesAnsibleModule
+from ansible.module_utils.k8s_discovery import DiscoveryError, Resource
+from ansible.module_utils.k8s_engine import DEFAULT_WORKERS
+from ansible.module_utils.k8s_mixins import KubernetesModuleMixin
+from ansible.module_utils.k8s_raw import METADATA_ACCEPT, RawResourceHelper
+
+try:
+    from openshift.helper.exceptions import KubernetesException
+    HAS_K8S_MODULE_HELPER = True
+except ImportError:
+    HAS_K8S_MODULE_HELPER = False
+
+DEFAULT_CACHE_TTL = 600
+
+RBAC_GROUP = 'rbac.authorization.k8s.io'
+RBAC_KINDS = ('Role', 'RoleBinding', 'ClusterRole', 'ClusterRoleBinding')
+
+SUBJECT_ACCESS_REVIEWS = Resource('authorization.k8s.io/v1', '/apis/authorization.k8s.io/v1',
+                                  {'kind': 'SubjectAccessReview', 'name': 'subjectaccessreviews'})
+SELF_SUBJECT_ACCESS_REVIEWS = Resource('authorization.k8s.io/v1', '/apis/authorization.k8s.io/v1',
+                                       {'kind': 'SelfSubjectAccessReview', 'name': 'selfsubjectaccessreviews'})
+
+# Fields of a check. A check has a verb, and either a resource or a non-resource path.
+CHECK_FIELDS = ('verb', 'group', 'version', 'resource', 'subresource', 'name', 'namespace', 'path')
+
+# Fields of the subject of a SubjectAccessReview
+SUBJECT_FIELDS = ('user', 'groups', 'uid', 'extra')
+
+
+def normalize_check(check, namespace=None):
+    """
+    Return the check with every field of CHECK_FIELDS, and namespace as the namespace of resource checks
+    that do not set one. Raises ValueError for an invalid check.
+    """
+    if not isinstance(check, dict):
+        raise ValueError("Every check must be a dict, not {0}".format(check))
+    unknown = sorted(set(check) - set(CHECK_FIELDS))
+    if unknown:
+        raise ValueError("Unknown fields {0} in check {1}".format(', '.join(unknown), check))
+    if not check.get('verb'):
+        raise ValueError("Check {0} requires a verb".format(check))
+    if bool(check.get('resource')) == bool(check.get('path')):
+        raise ValueError("Check {0} requires one of resource or path".format(check))
+    result = dict((field, check.get(field)) for field in CHECK_FIELDS)
+    if result['resource'] and result['namespace'] is None:
+        result['namespace'] = namespace
+    return result
+
+
+def review_spec(check, subject):
+    """ The spec of the access review of a check, for subject, which is empty for a self review """
+    if check['path']:
+        spec = {'nonResourceAttributes': {'path': check['path'], 'verb': check['verb']}}
+    else:
+        attributes = dict((field, check[field]) for field in CHECK_FIELDS if check[field] is not None)
+        attributes.setdefault('group', '')
+        spec = {'resourceAttributes': attributes}
+    spec.update(subject)
+    return spec
+
+
+class ReviewCache(object):
+    """
+    The results of the access reviews of one subject, or of other reviews, in a file of the directory name
+    shared by processes. The file expires a TTL after it was created; results added later do not extend it.
+    """
+
+    def __init__(self, key, ttl, path=None, name='access_reviews'):
+        directory = os.path.expanduser(path or os.environ.get(CACHE_DIR_ENV) or DEFAULT_CACHE_DIR)
+        self.path = os.path.join(directory, name, key + '.json')
+        self.ttl = ttl
+        self.results = self._read()['results']
+
+    def _read(self):
+        try:
+            with open(self.path) as f:
+                entry = json.load(f)
+        except (IOError, OSError, ValueError):
+            entry = None
+        if entry is None or entry['expires'] < time.time():
+            entry = {'expires': time.time() + self.ttl, 'results': {}}
+        return entry
+
+    def get(self, key):
+        return self.results.get(key)
+
+    def update(self, results):
+        """ Add results, and write them, with the results other processes wrote since the file was read """
+        self.results.update(results)
+        directory = os.path.dirname(self.path)
+        try:
+            if not os.path.isdir(directory):
+                os.makedirs(directory, 0o700)
+            with open(self.path + '.lock', 'a') as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    entry = self._read()
+                    entry['results'].update(results)
+                    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.' + os.path.basename(self.path))
+                    with os.fdopen(fd, 'w') as f:
+                        json.dump(entry, f)
+                    os.rename(tmp_path, self.path)
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+        except (IOError, OSError):
+            # Another process created the directory, or it is not writable. The cache is only an optimization.
+            pass
+
+
+class KubernetesAccessReviewModule(KubernetesModuleMixin, KubernetesAnsibleModule):
+    """ Evaluates many access checks, for a user or groups, or for the module's own credentials """
+
+    def __init__(self):
+        self.review_argspec = {
+            'checks': {'type': 'list', 'required': True},
+            'user': {},
+            'groups': {'type': 'list'},
+            'uid': {},
+            'extra': {'type': 'dict'},
+            'namespace': {},
+            'cache_ttl': {'type': 'int', 'default': DEFAULT_CACHE_TTL},
+            'workers': {'type': 'int', 'default': DEFAULT_WORKERS},
+        }
+        super(KubernetesAccessReviewModule, self).__init__('subject_access_review', 'v1')
+
+    @property
+    def argspec(self):
+        if not self.argspec_cache:
+            spec = self.auth_argspec
+            spec.update(self.review_argspec)
+            self.argspec_cache = spec
+        return self.argspec_cache
+
+    def rbac_fingerprint(self):
+        """
+        A hash of the uid and resourceVersion of every RBAC object, which changes with any role or binding.
+        None when the server does not serve RBAC, or the objects may not be listed.
+        """
+        try:
+            with self.phase('discovery'):
+                discovery = self.get_discovery()
+                versions = discovery.group_versions().get(RBAC_GROUP) or []
+                if not versions:
+                    return None
+                resources = [discovery.resolve(versions[0], kind) for kind in RBAC_KINDS]
+            digest = hashlib.sha256()
+            with self.phase('get'):
+                for resource in resources:
+                    entries = []
+                    for page in RawResourceHelper(self.helper.api_client, resource).pages(accept=METADATA_ACCEPT):
+                        entries.extend('{0}/{1}'.format(item['metadata'].get('uid'),
+                                                        item['metadata'].get('resourceVersion'))
+                                       for item in page.get('items') or [])
+                    digest.update('{0}\n{1}\n'.format(resource.kind, '\n'.join(sorted(entries))).encode('utf-8'))
+            return digest.hexdigest()
+        except (DiscoveryError, KubernetesException):
+            return None
+
+    def review(self, check, subject):
+        """ Review one check. Returns the status of the review. """
+        resource = SUBJECT_ACCESS_REVIEWS if subject else SELF_SUBJECT_ACCESS_REVIEWS
+        body = {'apiVersion': resource.api_version, 'kind': resource.kind, 'spec': review_spec(check, subject)}
+        status = RawResourceHelper(self.helper.api_client, resource).create_object(None, body).get('status') or {}
+        return {
+            'allowed': bool(status.get('allowed')),
+            'denied': bool(status.get('denied')),
+            'reason': status.get('reason'),
+            'evaluation_error': status.get('evaluationError'),
+        }
+
+    def execute_module(self):
+        if self.params.get('debug'):
+            self.enable_debug()
+
+        try:
+            checks = [normalize_check(check, self.params.get('namespace')) for check in self.params['checks']]
+        except ValueError as exc:
+            self.fail_json(msg=str(exc))
+        subject = dict((field, self.params[field]) for field in SUBJECT_FIELDS if self.params.get(field))
+
+        try:
+            self.configure_client()
+        except KubernetesException as exc:
+            self.fail_json(msg='Error loading config', error=str(exc))
+
+        keys = [cache_key(**check) for check in checks]
+        unique = OrderedDict(zip(keys, checks))
+
+        cache = None
+        if self.params['cache_ttl'] > 0:
+            fingerprint = self.rbac_fingerprint()
+            if fingerprint is None:
+                self.warn("Access review results are not cached, as the RBAC roles and bindings could not be listed")
+            else:
+                auth = dict((key, self.params.get(key)) for key in AUTH_OPTIONS if self.params.get(key) is not None)
+                cache = ReviewCache(cache_key(host=self.helper.api_client.configuration.host, auth=auth,
+                                              subject=subject, rbac=fingerprint), self.params['cache_ttl'])
+
+        results = {}
+        if cache:
+            results = dict((key, cache.get(key)) for key in unique if cache.get(key) is not None)
+        pending = [key for key in unique if key not in results]
+        engine = self.get_engine(self.params['workers'])
+        with self.phase('create'):
+            reviews = engine.map(lambda key: self.review(unique[key], subject), pending, return_exceptions=True)
+        errors = {}
+        reviewed = {}
+        for key, review in zip(pending, reviews):
+            if isinstance(review, Exception):
+                errors[key] = getattr(review, 'message', str(review))
+            else:
+                reviewed[key] = review
+        if cache and reviewed:
+            cache.update(reviewed)
+
+        return_results = []
+        for key, check in zip(keys, checks):
+            result = dict((field, value) for field, value in check.items() if value is not None)
+            if key in errors:
+                result['error'] = errors[key]
+            else:
+                result.update(results.get(key) or reviewed[key], cached=key in results)
+            return_results.append(result)
+
+        return_attributes = dict(changed=False, results=return_results, unique=len(unique), reviews=len(pending),
+                                 allowed=sum(1 for result in return_results if result.get('allowed')),
+                                 denied=sum(1 for result in return_results if 'error' not in result and
+                                            not result.get('allowed')))
+        if errors:
+            self.fail_json(msg="{0} of {1} access reviews failed".format(len(errors), len(pending)),
+                           **return_attributes)
+        self.exit_json(**return_attributes)
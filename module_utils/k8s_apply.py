@@ -0,0 +1,581 @@
+#
+#  Copyright 2017 Red Hat | Ansible
+#
+# This file is part of Ansible
+#
+# Ansible is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Ansible is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Ansible.  If not, see <http://www.gnu.org/licenses/>.
+
+import copy
+import inspect
+import os
+
+from ansible.module_utils.k8s_discovery import DiscoveryError, ResourceNotFoundError
+from ansible.module_utils.k8s_engine import DEFAULT_WORKERS, error_message
+from ansible.module_utils.k8s_mixins import KubernetesModuleMixin
+from ansible.module_utils.k8s_raw import RawResourceHelper
+from ansible.module_utils.k8s_rules import review_rules, rules_review_resource
+from ansible.module_utils.openshift_common import OpenShiftAnsibleModule
+
+try:
+    from openshift.helper.ansible import KubernetesAnsibleModuleHelper, OpenShiftAnsibleModuleHelper
+    from openshift.helper.exceptions import KubernetesException
+    from kubernetes.client.rest import ApiException
+    HAS_K8S_MODULE_HELPER = True
+except ImportError:
+    HAS_K8S_MODULE_HELPER = False
+
+try:
+    import yaml
+    HAS_YAML = True
+except ImportError:
+    HAS_YAML = False
+
+# inspect.getargspec is gone from Python 3.11
+getargspec = getattr(inspect, 'getfullargspec', None) or inspect.getargspec
+
+NAMESPACE_KINDS = ('Namespace', 'Project')
+
+# Cluster scoped kinds that namespaced objects may depend on
+CLUSTER_KINDS = ('ClusterRole', 'PersistentVolume', 'StorageClass', 'PodSecurityPolicy', 'SecurityContextConstraints',
+                 'PriorityClass')
+
+# Kinds that run pods, and so need their service accounts, configuration and storage to exist first
+WORKLOAD_KINDS = ('Pod', 'ReplicationController', 'ReplicaSet', 'Deployment', 'DeploymentConfig', 'StatefulSet',
+                  'DaemonSet', 'Job', 'CronJob', 'BuildConfig')
+
+# kind: kinds it depends on, when both appear in the same resource set. Namespaced dependencies must be in the
+# same namespace as the dependent object.
+KIND_DEPENDENCIES = {
+    'RoleBinding': ('Role', 'ClusterRole', 'ServiceAccount'),
+    'ClusterRoleBinding': ('ClusterRole', 'ServiceAccount'),
+    'PersistentVolumeClaim': ('PersistentVolume', 'StorageClass'),
+    'Route': ('Service',),
+    'Ingress': ('Service',),
+    'HorizontalPodAutoscaler': WORKLOAD_KINDS,
+}
+for _kind in WORKLOAD_KINDS:
+    KIND_DEPENDENCIES[_kind] = ('ServiceAccount', 'ConfigMap', 'Secret', 'PersistentVolumeClaim', 'Service',
+                                'RoleBinding', 'ClusterRoleBinding', 'LimitRange', 'ResourceQuota', 'PodPreset',
+                                'PodSecurityPolicy', 'SecurityContextConstraints', 'PriorityClass', 'ImageStream')
+
+
+class ApplyError(Exception):
+    pass
+
+
+class UnknownKindError(ApplyError):
+    """ The cluster does not serve the kind, and there is no model for it """
+
+
+def api_group(api_version):
+    """ Return the API group of an apiVersion string. The core group is an empty string. """
+    return api_version.split('/')[0] if '/' in api_version else ''
+
+
+def find_helper(api_version, kind):
+    """
+    Return a helper for the kind at api_version, from the Kubernetes models, or else the OpenShift models.
+
+    :param api_version: an apiVersion, with or without the API group
+    :param kind: kind, in CamelCase
+    :return: KubernetesAnsibleModuleHelper or OpenShiftAnsibleModuleHelper
+    """
+    kind_snake = KubernetesAnsibleModuleHelper.attribute_to_snake(kind)
+    # Models of kinds served by more than one group carry the group in their name, e.g.
+    # AppsV1beta1Deployment, so try the group qualified version first
+    version = api_version.split('/')[-1]
+    versions = [version]
+    if '/' in api_version:
+        versions.insert(0, '{0}_{1}'.format(api_group(api_version).split('.')[0], version))
+    for helper_class in (KubernetesAnsibleModuleHelper, OpenShiftAnsibleModuleHelper):
+        for candidate in versions:
+            try:
+                return helper_class(candidate, kind_snake)
+            except KubernetesException:
+                continue
+    raise ApplyError("No model found for {0} {1}".format(api_version, kind))
+
+
+def load_resource_definitions(path):
+    """ Load all of the documents in a YAML file, skipping empty ones """
+    with open(os.path.normpath(path), 'r') as f:
+        return [doc for doc in yaml.safe_load_all(f) if doc]
+
+
+def flatten_resources(resources):
+    """ Expand any List kinds into their items """
+    result = []
+    for resource in resources:
+        if resource.get('kind', '').endswith('List') and 'items' in resource:
+            result.extend(flatten_resources(resource['items'] or []))
+        else:
+            result.append(resource)
+    return result
+
+
+def is_subset(desired, existing):
+    """ True when every value in desired is already set to the same value in existing """
+    if isinstance(desired, dict):
+        if not isinstance(existing, dict):
+            return False
+        return all(is_subset(value, existing.get(key)) for key, value in desired.items())
+    if isinstance(desired, list):
+        if not isinstance(existing, list) or len(desired) != len(existing):
+            return False
+        return all(is_subset(a, b) for a, b in zip(desired, existing))
+    if desired is None:
+        return True
+    if isinstance(existing, (int, float)) and not isinstance(existing, bool):
+        return str(desired) == str(existing)
+    return desired == existing
+
+
+def merge_objects(existing, desired):
+    """ The object existing would become when patched with desired, as a JSON merge patch """
+    if not isinstance(desired, dict) or not isinstance(existing, dict):
+        return copy.deepcopy(desired)
+    result = copy.deepcopy(existing)
+    for key, value in desired.items():
+        if value is None:
+            result.pop(key, None)
+        else:
+            result[key] = merge_objects(existing.get(key), value)
+    return result
+
+
+def build_levels(resources, default_namespace=None):
+    """
+    Order resources into levels, such that every object only depends on objects in earlier levels. Objects in
+    the same level do not depend on each other, and can be applied concurrently. A resource's level is the
+    length of the longest chain of dependencies leading to it.
+
+    Dependencies are only drawn between objects in the set: namespaced objects depend on their Namespace or
+    Project, custom resources on the CustomResourceDefinition that defines them, and the kinds listed in
+    KIND_DEPENDENCIES on the kinds they reference.
+
+    :param resources: list of resource definitions
+    :param default_namespace: namespace of objects that do not set one
+    :return: list of lists of indexes into resources
+    """
+    def namespace_of(resource):
+        return resource.get('metadata', {}).get('namespace') or default_namespace
+
+    namespaces = {}
+    crds = {}
+    by_kind = {}
+    for index, resource in enumerate(resources):
+        kind = resource.get('kind')
+        name = resource.get('metadata', {}).get('name')
+        if kind in NAMESPACE_KINDS:
+            namespaces[name] = index
+        elif kind == 'CustomResourceDefinition':
+            spec = resource.get('spec', {})
+            crds[(spec.get('group'), spec.get('names', {}).get('kind'))] = index
+        by_kind.setdefault(kind, []).append(index)
+
+    dependencies = []
+    for index, resource in enumerate(resources):
+        kind = resource.get('kind')
+        namespace = None if kind in NAMESPACE_KINDS else namespace_of(resource)
+        depends_on = set()
+        if namespace in namespaces:
+            depends_on.add(namespaces[namespace])
+        crd = crds.get((api_group(resource.get('apiVersion', '')), kind))
+        if crd is not None:
+            depends_on.add(crd)
+        for dependency_kind in KIND_DEPENDENCIES.get(kind, ()):
+            for candidate in by_kind.get(dependency_kind, []):
+                if kind == 'ClusterRoleBinding' or dependency_kind in CLUSTER_KINDS or \
+                        namespace_of(resources[candidate]) == namespace:
+                    depends_on.add(candidate)
+        depends_on.discard(index)
+        dependencies.append(depends_on)
+
+    levels = {}
+
+    def level_of(index, visiting):
+        if index in levels:
+            return levels[index]
+        if index in visiting:
+            raise ApplyError("Circular dependency involving {0} {1}".format(
+                resources[index].get('kind'), resources[index].get('metadata', {}).get('name')))
+        visiting.add(index)
+        level = 0
+        for dependency in dependencies[index]:
+            level = max(level, level_of(dependency, visiting) + 1)
+        visiting.discard(index)
+        levels[index] = level
+        return level
+
+    result = []
+    for index in range(len(resources)):
+        level = level_of(index, set())
+        while len(result) <= level:
+            result.append([])
+        result[level].append(index)
+    return result
+
+
+class ResourceApplier(object):
+    """
+    Creates, patches and deletes resource definitions of any kind, one level of a dependency ordered set at a
+    time, with the objects in each level applied concurrently on the module's ReconcileEngine. Kinds without a
+    generated model, such as custom resources, are found through discovery and handled as dicts.
+    """
+
+    def __init__(self, module, engine, default_namespace=None, use_models=True):
+        self.module = module
+        self.engine = engine
+        self.default_namespace = default_namespace
+        self.use_models = use_models
+        self.api_client = module.helper.api_client
+        self.helpers = {}
+
+    def helper_for(self, resource):
+        """ Return a helper for the resource's kind, sharing the module's API client """
+        api_version = resource.get('apiVersion', '')
+        kind = resource.get('kind', '')
+        key = (api_version, kind)
+        if key not in self.helpers:
+            helper = None
+            if self.use_models:
+                try:
+                    helper = find_helper(api_version, kind)
+                    helper.api_client = self.api_client
+                except ApplyError:
+                    pass
+            if helper is None:
+                try:
+                    helper = RawResourceHelper(self.api_client, self.module.get_discovery().resolve(api_version, kind))
+                except ResourceNotFoundError as exc:
+                    # Not cached, as the kind is served once its CRD, in an earlier level, is established
+                    raise UnknownKindError(str(exc))
+                except DiscoveryError as exc:
+                    helper = ApplyError(str(exc))
+            self.helpers[key] = helper
+        if isinstance(self.helpers[key], ApplyError):
+            raise self.helpers[key]
+        return self.helpers[key]
+
+    def identify(self, resource):
+        metadata = resource.get('metadata', {})
+        namespace = None
+        if resource.get('kind') not in NAMESPACE_KINDS and self.is_namespaced(resource):
+            namespace = metadata.get('namespace') or self.default_namespace
+        return metadata.get('name'), namespace
+
+    def is_namespaced(self, resource):
+        helper = self.helper_for(resource)
+        if not hasattr(helper, 'namespaced'):
+            try:
+                helper.lookup_method('read', 'namespace')
+                helper.namespaced = True
+            except KubernetesException:
+                helper.namespaced = False
+        return helper.namespaced
+
+    def _call(self, helper, operation, name, namespace, body):
+        """ Call an API method directly, without the watch that helper.create_object() opens """
+        if isinstance(helper, RawResourceHelper):
+            return helper.call(operation, name, namespace, body)
+        method = helper.lookup_method(operation, namespace)
+        args = [] if operation == 'create' else [name]
+        if namespace:
+            args.append(namespace)
+        # Some delete methods, such as that of services, take no DeleteOptions
+        if operation != 'delete' or 'body' in getargspec(method).args:
+            args.append(body)
+        try:
+            return method(*args)
+        except ApiException as exc:
+            raise helper.get_exception_class()(error_message(exc), status=exc.status)
+
+    def result_for(self, resource, changed=False, method=None, obj=None, error=None):
+        try:
+            name, namespace = self.identify(resource)
+        except ApplyError:
+            metadata = resource.get('metadata', {})
+            name, namespace = metadata.get('name'), metadata.get('namespace') or self.default_namespace
+        result = dict(kind=resource.get('kind'), api_version=resource.get('apiVersion'), name=name,
+                      namespace=namespace, changed=changed)
+        if method:
+            result['method'] = method
+        if obj is not None:
+            result['result'] = obj.to_dict() if hasattr(obj, 'to_dict') else obj
+        if error is not None:
+            result['error'] = error
+        return result
+
+    def apply(self, resource):
+        """ Create the object if it does not exist, otherwise patch it when it differs from resource """
+        helper = self.helper_for(resource)
+        name, namespace = self.identify(resource)
+        body = copy.deepcopy(resource)
+        if namespace:
+            body.setdefault('metadata', {})['namespace'] = namespace
+        existing = helper.get_object(name, namespace)
+        if not existing:
+            if self.module.check_mode:
+                # Without a server side dry run, the object the server would create is not known
+                return self.result_for(resource, True, 'create')
+            if resource.get('kind') == 'Project' and hasattr(helper, 'create_project'):
+                metadata = body.get('metadata', {})
+                annotations = metadata.get('annotations') or {}
+                meta_obj = helper.model_class_from_name('V1ObjectMeta')(
+                    name=name, labels=metadata.get('labels'), annotations=metadata.get('annotations'))
+                obj = helper.create_project(meta_obj,
+                                            display_name=annotations.get('openshift.io/display-name'),
+                                            description=annotations.get('openshift.io/description'))
+            else:
+                obj = self._call(helper, 'create', name, namespace, body)
+            return self.result_for(resource, True, 'create', obj)
+
+        existing_dict = self.api_client.sanitize_for_serialization(existing)
+        if is_subset(body, existing_dict):
+            return self.result_for(resource, False, None, existing)
+        if self.module.check_mode:
+            obj = merge_objects(existing_dict, body)
+            result = self.result_for(resource, True, 'patch', obj)
+        else:
+            body.get('metadata', {}).pop('resourceVersion', None)
+            obj = self._call(helper, 'patch', name, namespace, body)
+            result = self.result_for(resource, True, 'patch', obj)
+        if getattr(self.module, '_diff', False):
+            result['diff'] = dict(before=existing_dict, after=self.api_client.sanitize_for_serialization(obj))
+        return result
+
+    def delete(self, resource):
+        """ Delete the object, if it exists """
+        helper = self.helper_for(resource)
+        name, namespace = self.identify(resource)
+        if not helper.get_object(name, namespace):
+            return self.result_for(resource)
+        if not self.module.check_mode:
+            delete_options = {'apiVersion': 'v1', 'kind': 'DeleteOptions', 'propagationPolicy': 'Foreground'}
+            self._call(helper, 'delete', name, namespace, delete_options)
+        return self.result_for(resource, True, 'delete')
+
+    def wait_for_crds(self, resources):
+        """ Custom resources cannot be created until their CustomResourceDefinition is Established """
+        crds = [resource for resource in resources if resource.get('kind') == 'CustomResourceDefinition']
+        if not crds or self.module.check_mode:
+            return
+
+        def established(obj):
+            conditions = obj.status.conditions if obj and obj.status else None
+            return any(c.type == 'Established' and c.status == 'True' for c in conditions or [])
+
+        helper = self.helper_for(crds[0])
+        refs = [self.identify(crd) for crd in crds]
+        ready = self.engine.wait_for_objects(helper, refs, established)
+        missing = [name for name, namespace in refs if (name, namespace) not in ready]
+        if missing:
+            raise ApplyError("Timed out waiting for CustomResourceDefinitions to be established: {0}".format(
+                ', '.join(missing)))
+
+    def required_access(self, resource, state='present'):
+        """
+        The (verb, API group, resource, name) the operation on resource needs. Kinds not served yet, such as
+        those of CRDs in the same set, are skipped.
+        """
+        try:
+            served = self.module.get_discovery().resolve(resource.get('apiVersion', ''), resource.get('kind', ''))
+        except DiscoveryError:
+            return []
+        group = api_group(served.api_version)
+        name = resource.get('metadata', {}).get('name')
+        if state == 'absent':
+            return [('get', group, served.name, name), ('delete', group, served.name, name)]
+        if resource.get('kind') == 'Project':
+            # Projects are created through project requests
+            return [('get', group, served.name, name), ('create', group, 'projectrequests', name)]
+        return [('get', group, served.name, name), ('create', group, served.name, name),
+                ('patch', group, served.name, name)]
+
+    def preflight(self, resources, state='present'):
+        """
+        Check the access every operation needs against the rules of the module's credentials, with one
+        SelfSubjectRulesReview per namespace, before any object is changed.
+
+        :return: tuple of (list of denied checks, as dicts, list of warnings)
+        """
+        try:
+            review_resource = rules_review_resource(self.module.get_discovery())
+        except DiscoveryError as exc:
+            return [], ["Skipped the permission pre-flight: {0}".format(exc)]
+        if review_resource is None:
+            return [], ["Skipped the permission pre-flight, as the server does not serve SelfSubjectRulesReview"]
+
+        checks = {}
+        for resource in resources:
+            try:
+                name, namespace = self.identify(resource)
+            except ApplyError:
+                continue
+            for check in self.required_access(resource, state):
+                checks.setdefault(namespace or '', {}).setdefault(check, resource)
+
+        warnings = []
+        if review_resource.namespaced and '' in checks:
+            # OpenShift reviews the rules of a namespace only
+            del checks['']
+            warnings.append("Skipped the permission pre-flight of cluster scoped objects, as the server only "
+                            "reviews the rules of namespaces")
+
+        namespaces = sorted(checks)
+        indexes = self.engine.map(lambda namespace: review_rules(self.api_client, review_resource, namespace or None),
+                                  namespaces, return_exceptions=True)
+        denied = []
+        for namespace, index in zip(namespaces, indexes):
+            if isinstance(index, Exception):
+                warnings.append("Skipped the permission pre-flight of namespace {0}: {1}".format(
+                    namespace or '(cluster)', getattr(index, 'message', str(index))))
+                continue
+            refused = [(check, resource) for check, resource in sorted(checks[namespace].items(), key=lambda c: c[0])
+                       if not index.allows(*check)]
+            if refused and index.incomplete:
+                # Another authorizer may allow what the rules do not
+                warnings.append("The rules of namespace {0} are incomplete, and may not allow {1} operations "
+                                "that the server allows".format(namespace or '(cluster)', len(refused)))
+                continue
+            for (verb, group, resource_name, name), resource in refused:
+                denied.append(dict(verb=verb, group=group, resource=resource_name, name=name,
+                                   namespace=namespace or None, kind=resource.get('kind')))
+        return denied, warnings
+
+    def run(self, resources, state='present'):
+        """
+        Apply or delete resources level by level. Deletion visits the levels in reverse, so that dependent
+        objects are removed first. Processing stops after the first level with a failure.
+
+        :return: tuple of (list of per-object result dicts, number of levels, bool failed)
+        """
+        levels = build_levels(resources, self.default_namespace)
+        if state == 'absent':
+            levels = list(reversed(levels))
+        operation = self.delete if state == 'absent' else self.apply
+        unresolved = {}
+
+        def run_one(index):
+            resource = resources[index]
+            if isinstance(unresolved.get(index), UnknownKindError):
+                if state == 'absent':
+                    # There are no objects of a kind the cluster does not serve
+                    return self.result_for(resource)
+                if self.module.check_mode:
+                    # The kind of a custom resource is served once its CRD, in an earlier level, is created
+                    return self.result_for(resource, True, 'create')
+            if index in unresolved:
+                return self.result_for(resource, error=str(unresolved[index]))
+            try:
+                return operation(resource)
+            except (KubernetesException, ApplyError) as exc:
+                return self.result_for(resource, error=getattr(exc, 'message', str(exc)))
+
+        results = [None] * len(resources)
+        for level in levels:
+            # Resolve helpers on this thread, so workers only share fully built helpers. The kinds of custom
+            # resources are only served once the CRDs of earlier levels are established.
+            for index in level:
+                try:
+                    self.is_namespaced(resources[index])
+                except ApplyError as exc:
+                    unresolved[index] = exc
+            for index, result in zip(level, self.engine.map(run_one, level)):
+                results[index] = result
+            if any('error' in results[index] for index in level):
+                return [result for result in results if result is not None], len(levels), True
+            if state == 'present':
+                self.wait_for_crds([resources[index] for index in level])
+        return results, len(levels), False
+
+
+# Based on OpenShiftAnsibleModule, as the helpers of every kind share its API client, which reads the models of
+# both Kubernetes and OpenShift
+class KubernetesApplyModule(KubernetesModuleMixin, OpenShiftAnsibleModule):
+    """ Applies a set of resource definitions of mixed kinds, in dependency order """
+
+    def __init__(self):
+        self.resource_argspec = {
+            'resource_definitions': {'type': 'list'},
+            'src': {'type': 'path'},
+            'namespace': {},
+            'state': {'default': 'present', 'choices': ['present', 'absent']},
+            'preflight': {'type': 'bool', 'default': True},
+            'workers': {'type': 'int', 'default': DEFAULT_WORKERS},
+        }
+        super(KubernetesApplyModule, self).__init__('namespace', 'v1')
+
+    @property
+    def argspec(self):
+        if not self.argspec_cache:
+            spec = self.auth_argspec
+            spec.update(self.resource_argspec)
+            self.argspec_cache = spec
+        return self.argspec_cache
+
+    def load_resources(self):
+        resources = list(self.params.get('resource_definitions') or [])
+        if self.params.get('src'):
+            if not os.path.exists(self.params['src']):
+                self.fail_json(msg="Error accessing {0}. Does the file exist?".format(self.params['src']))
+            try:
+                resources.extend(load_resource_definitions(self.params['src']))
+            except (IOError, yaml.YAMLError) as exc:
+                self.fail_json(msg="Error loading resource definitions: {0}".format(exc))
+        return self.check_resources(flatten_resources(resources))
+
+    def check_resources(self, resources):
+        for resource in resources:
+            if not isinstance(resource, dict) or not resource.get('kind') or not resource.get('apiVersion') \
+                    or not resource.get('metadata', {}).get('name'):
+                self.fail_json(msg="Every resource definition requires apiVersion, kind and metadata.name",
+                               resource=resource)
+        return resources
+
+    def execute_module(self):
+        if self.params.get('debug'):
+            self.enable_debug()
+
+        resources = self.load_resources()
+
+        try:
+            self.configure_client()
+        except KubernetesException as exc:
+            self.fail_json(msg='Error loading config', error=str(exc))
+
+        self.apply_resources(resources)
+
+    def apply_resources(self, resources, **return_attributes):
+        """ Apply or delete resources, and exit with their results, and return_attributes """
+        applier = ResourceApplier(self, self.get_engine(self.params['workers']), self.params.get('namespace'))
+        if self.params['preflight']:
+            with self.phase('preflight'):
+                denied, warnings = applier.preflight(resources, self.params['state'])
+            for warning in warnings:
+                self.warn(warning)
+            if denied:
+                self.fail_json(msg="The credentials are not allowed {0} of the operations needed, and no objects "
+                               "were changed".format(len(denied)), denied=denied)
+        try:
+            results, levels, failed = applier.run(resources, self.params['state'])
+        except (ApplyError, KubernetesException) as exc:
+            self.fail_json(msg="Failed to apply resources: {0}".format(getattr(exc, 'message', str(exc))))
+
+        return_attributes.update(changed=any(result['changed'] for result in results),
+                                 levels=levels,
+                                 results=results)
+        if failed:
+            self.fail_json(msg="Failed to apply one or more resources", **return_attributes)
+        self.exit_json(**return_attributes)
@@ -0,0 +1,215 @@
+#
+#  Copyright 2017 Red Hat | Ansible
+#
+# This file is part of Ansible
+#
+# Ansible is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Ansible is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Ansible.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Triggers the builds of many BuildConfigs at once, and tracks every build they start with one watch of builds.
+
+The BuildConfigs are named, or selected by label. Their builds are started concurrently, up to the number of
+workers, through the instantiate subresource, as openshift_v1_build_request does for one. The watch starts
+from a resourceVersion read before the first build is triggered, so no change to a build is missed.
+"""
+
+import time
+
+from ansible.module_utils.k8s_discovery import DiscoveryError
+from ansible.module_utils.k8s_engine import DEFAULT_WORKERS
+from ansible.module_utils.k8s_mixins import KubernetesModuleMixin
+from ansible.module_utils.k8s_raw import ObjectTracker, RawResourceHelper
+from ansible.module_utils.openshift_build import (TERMINAL_PHASES, BuildError, parse_time,
+                                                  resolve_build_resource)
+from ansible.module_utils.openshift_common import OpenShiftAnsibleModule
+
+try:
+    from openshift.helper.exceptions import KubernetesException
+    HAS_K8S_MODULE_HELPER = True
+except ImportError:
+    HAS_K8S_MODULE_HELPER = False
+
+DEFAULT_TRIGGER_TIMEOUT = 3600
+
+
+def build_outcome(build, triggered):
+    """ The outcome of a build, with the seconds it was queued and ran for, and since it was triggered """
+    metadata = build.get('metadata') or {}
+    status = build.get('status') or {}
+    created = parse_time(metadata.get('creationTimestamp'))
+    start = parse_time(status.get('startTimestamp'))
+    completion = parse_time(status.get('completionTimestamp'))
+    return {
+        'build': metadata.get('name'),
+        'phase': status.get('phase'),
+        'reason': status.get('reason'),
+        'queued': start - created if start is not None and created is not None else None,
+        'duration': completion - start if completion is not None and start is not None else None,
+        'elapsed': round(time.time() - triggered, 3),
+    }
+
+
+class BuildTracker(ObjectTracker):
+    """
+    Records the latest state of builds, by (namespace, name), with one watch of the builds of a namespace. The
+    watch starts from a resourceVersion read before the builds are triggered, so no change to them is missed.
+    """
+
+    def __init__(self, helper, namespace=None):
+        page = helper.request('GET', namespace=namespace, query={'limit': 1})
+        super(BuildTracker, self).__init__(helper, namespace,
+                                           resource_version=(page.get('metadata') or {}).get('resourceVersion'))
+
+    def finished(self, keys):
+        return [key for key in keys if ((self.objects.get(key) or {}).get('status') or {}).get('phase')
+                in TERMINAL_PHASES]
+
+    def wait(self, keys, deadline):
+        """ Wait for the builds with keys to end. Returns the latest state of each, by key. """
+        super(BuildTracker, self).wait(lambda: len(self.finished(keys)) == len(keys), deadline)
+        with self.condition:
+            return dict((key, self.objects.get(key)) for key in keys)
+
+
+class KubernetesBuildTriggerModule(KubernetesModuleMixin, OpenShiftAnsibleModule):
+    """ Triggers the builds of many BuildConfigs concurrently, and waits for them to end """
+
+    def __init__(self):
+        self.trigger_argspec = {
+            'build_configs': {'type': 'list'},
+            'label_selector': {},
+            'namespace': {},
+            'message': {'default': 'Triggered by the k8s_build_trigger module'},
+            'wait': {'type': 'bool', 'default': True},
+            'timeout': {'type': 'int', 'default': DEFAULT_TRIGGER_TIMEOUT},
+            'workers': {'type': 'int', 'default': DEFAULT_WORKERS},
+        }
+        super(KubernetesBuildTriggerModule, self).__init__('build_config', 'v1')
+
+    @property
+    def argspec(self):
+        if not self.argspec_cache:
+            spec = self.auth_argspec
+            spec.update(self.trigger_argspec)
+            self.argspec_cache = spec
+        return self.argspec_cache
+
+    def select_configs(self, configs):
+        """
+        The (namespace, name) of each BuildConfig to trigger: those named in build_configs, as name or
+        namespace/name, and those label_selector selects.
+        """
+        selected = []
+        for config in self.params.get('build_configs') or []:
+            namespace, _, name = str(config).rpartition('/')
+            namespace = namespace or self.params.get('namespace')
+            if not namespace:
+                raise BuildError("BuildConfig {0} requires a namespace, as namespace/name or with the namespace "
+                                 "option".format(config))
+            selected.append((namespace, name))
+        if self.params.get('label_selector'):
+            items, _ = configs.list_objects(self.params.get('namespace'),
+                                            labelSelector=self.params['label_selector'])
+            selected.extend((item['metadata'].get('namespace'), item['metadata']['name']) for item in items)
+        # Each BuildConfig is triggered once
+        return sorted(set(selected), key=selected.index)
+
+    def instantiate(self, configs, namespace, name):
+        """ Start a build of a BuildConfig. Returns the build. """
+        body = {
+            'apiVersion': configs.api_version,
+            'kind': 'BuildRequest',
+            'metadata': {'name': name, 'namespace': namespace},
+            'triggeredBy': [{'message': self.params['message']}],
+        }
+        return configs.request('POST', name + '/instantiate', namespace, body=body)
+
+    def execute_module(self):
+        if self.params.get('debug'):
+            self.enable_debug()
+
+        if not self.params.get('build_configs') and not self.params.get('label_selector'):
+            self.fail_json(msg="One of build_configs or label_selector is required")
+
+        try:
+            self.configure_client()
+        except KubernetesException as exc:
+            self.fail_json(msg='Error loading config', error=str(exc))
+
+        try:
+            with self.phase('discovery'):
+                discovery = self.get_discovery()
+                configs = RawResourceHelper(self.helper.api_client, resolve_build_resource(discovery, 'BuildConfig'))
+                builds = RawResourceHelper(self.helper.api_client, resolve_build_resource(discovery, 'Build'))
+            with self.phase('get'):
+                selected = self.select_configs(configs)
+        except (BuildError, DiscoveryError, KubernetesException) as exc:
+            self.fail_json(msg="Failed to select BuildConfigs: {0}".format(getattr(exc, 'message', str(exc))))
+
+        results = [dict(build_config=name, namespace=namespace) for namespace, name in selected]
+        if self.check_mode or not selected:
+            self.exit_json(changed=bool(selected), builds=results)
+
+        # One watch covers the namespace of every BuildConfig, or all namespaces when they are in several
+        namespaces = set(namespace for namespace, _ in selected)
+        try:
+            tracker = BuildTracker(builds, namespaces.pop() if len(namespaces) == 1 else None)
+        except KubernetesException as exc:
+            self.fail_json(msg="Failed to list builds: {0}".format(exc.message), error=exc.value.get('status'))
+        if self.params['wait']:
+            tracker.start()
+
+        triggered = time.time()
+        engine = self.get_engine(self.params['workers'])
+        with self.phase('create'):
+            started = engine.map(lambda ref: self.instantiate(configs, *ref), selected, return_exceptions=True)
+        keys = {}
+        for index, build in enumerate(started):
+            if isinstance(build, Exception):
+                results[index]['error'] = getattr(build, 'message', str(build))
+            else:
+                metadata = build.get('metadata') or {}
+                results[index]['build'] = metadata.get('name')
+                keys[index] = (metadata.get('namespace') or results[index]['namespace'], metadata.get('name'))
+
+        if self.params['wait'] and keys:
+            try:
+                with self.phase('wait'):
+                    states = tracker.wait(list(keys.values()), triggered + self.params['timeout'])
+            except KubernetesException as exc:
+                self.fail_json(msg="Failed to watch builds: {0}".format(exc.message), error=exc.value.get('status'),
+                               builds=results)
+            finally:
+                tracker.stop()
+            for index, key in keys.items():
+                results[index].update(build_outcome(states[key] or {'metadata': {'name': key[1]}}, triggered))
+
+        errors = [result for result in results if 'error' in result]
+        return_attributes = dict(changed=bool(keys), builds=results, triggered=len(keys))
+        if self.params['wait']:
+            phases = [result.get('phase') for result in results if 'build' in result]
+            return_attributes.update(complete=phases.count('Complete'),
+                                     failed=len(phases) - phases.count('Complete'))
+            unfinished = [result['build'] for result in results if 'build' in result and
+                          result.get('phase') not in TERMINAL_PHASES]
+            if unfinished:
+                self.fail_json(msg="{0} builds did not end before the timeout".format(len(unfinished)),
+                               **return_attributes)
+            if return_attributes['failed']:
+                msg = "{0} of {1} builds did not complete".format(return_attributes['failed'], len(phases))
+                self.fail_json(msg=msg, **return_attributes)
+        if errors:
+            self.fail_json(msg="Failed to trigger {0} of {1} builds".format(len(errors), len(selected)),
+                           **return_attributes)
+        self.exit_json(**return_attributes)
@@ -0,0 +1,195 @@
+#
+#  Copyright 2017 Red Hat | Ansible
+#
+# This file is part of Ansible
+#
+# Ansible is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Ansible is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Ansible.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Cached reads of cluster state, shared by the processes of an Ansible run on the controller.
+
+List results are cached on disk, keyed by the cluster and credentials, kind, namespace and selectors, for a
+TTL. A lock file per key coalesces identical reads in flight: the first process to ask lists the objects,
+and the others wait for it and read its result, so the API server sees one LIST however many hosts or tasks
+ask for the same objects. Expired entries are removed as new ones are written. Secrets are cached in memory
+only, so their data is never written to disk.
+"""
+
+import fcntl
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+
+from ansible.module_utils.k8s_apply import find_helper
+from ansible.module_utils.k8s_encoding import compression_enabled, set_compression
+from ansible.module_utils.k8s_engine import ReconcileEngine
+
+CACHE_DIR_ENV = 'KUBE_MODULES_CACHE_DIR'
+DEFAULT_CACHE_DIR = '~/.ansible/tmp/kube_modules_cache'
+DEFAULT_TTL = 30
+
+# Kinds whose lists are never written to disk, in lower case
+MEMORY_ONLY_KINDS = ('secret',)
+
+# Options that select the cluster and credentials
+AUTH_OPTIONS = ('kubeconfig', 'context', 'host', 'api_key', 'username', 'password', 'cert_file', 'key_file',
+                'ssl_ca_cert', 'verify_ssl')
+
+
+def cache_key(**fields):
+    return hashlib.sha256(json.dumps(fields, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+class ListCache(object):
+    """ A TTL cache of list results in a directory, safe for concurrent use by processes and threads """
+
+    def __init__(self, path=None, ttl=DEFAULT_TTL):
+        self.path = os.path.expanduser(path or os.environ.get(CACHE_DIR_ENV) or DEFAULT_CACHE_DIR)
+        self.ttl = ttl
+        self.memory = {}
+        self.locks = {}
+        self.lock = threading.Lock()
+
+    def _read(self, key, persist=True):
+        entry = self.memory.get(key)
+        if entry is None and persist:
+            try:
+                with open(os.path.join(self.path, key + '.json')) as f:
+                    entry = json.load(f)
+            except (IOError, OSError, ValueError):
+                return None
+        if entry is None:
+            return None
+        if entry['expires'] < time.time():
+            self.memory.pop(key, None)
+            return None
+        self.memory[key] = entry
+        return entry['items']
+
+    def _write(self, key, items):
+        entry = {'expires': time.time() + self.ttl, 'items': items}
+        fd, tmp_path = tempfile.mkstemp(dir=self.path, prefix='.' + key)
+        with os.fdopen(fd, 'w') as f:
+            json.dump(entry, f)
+        # Readers see either the old entry or the new one, never part of one
+        os.rename(tmp_path, os.path.join(self.path, key + '.json'))
+        self.memory[key] = entry
+
+    def purge(self):
+        """ Remove the expired entries, from memory and from the directory """
+        now = time.time()
+        for key, entry in list(self.memory.items()):
+            if entry['expires'] < now:
+                self.memory.pop(key, None)
+        try:
+            names = os.listdir(self.path)
+        except OSError:
+            return
+        for name in names:
+            if not name.endswith('.json'):
+                continue
+            path = os.path.join(self.path, name)
+            try:
+                with open(path) as f:
+                    expired = json.load(f)['expires'] < now
+            except (IOError, OSError, ValueError, KeyError, TypeError):
+                # Being replaced, or not an entry
+                continue
+            if expired:
+                try:
+                    os.remove(path)
+                except OSError:
+                    # Removed or replaced by another process
+                    pass
+
+    def get(self, key, fetch, persist=True):
+        """
+        Return the cached items for key, or call fetch() to get them. Only one caller at a time, across
+        processes, fetches the items for a key; concurrent callers wait, then read its result. With persist
+        False, the items are kept in memory only, and callers in other processes fetch them for themselves.
+        """
+        if self.ttl <= 0:
+            return fetch()
+        items = self._read(key, persist)
+        if items is not None:
+            return items
+        with self.lock:
+            thread_lock = self.locks.setdefault(key, threading.Lock())
+        if not persist:
+            with thread_lock:
+                items = self._read(key, persist)
+                if items is None:
+                    items = fetch()
+                    self.memory[key] = {'expires': time.time() + self.ttl, 'items': items}
+            return items
+        if not os.path.isdir(self.path):
+            try:
+                os.makedirs(self.path, 0o700)
+            except OSError:
+                # Created by another process
+                pass
+        with thread_lock:
+            with open(os.path.join(self.path, key + '.lock'), 'a') as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    # Read again, in case another process fetched the items while we waited for the lock
+                    items = self._read(key)
+                    if items is None:
+                        items = fetch()
+                        self._write(key, items)
+                        self.purge()
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+        return items
+
+
+def list_objects(kind, api_version='v1', namespace=None, label_selector=None, field_selector=None, cache=None,
+                 compress=None, **auth):
+    """
+    List the objects of a kind as dicts, as the API returns them, through the cache.
+
+    :param kind: kind, in CamelCase
+    :param api_version: an apiVersion, with or without the API group
+    :param namespace: namespace to list, or None for all namespaces, or for a cluster scoped kind
+    :param label_selector: a label selector, e.g. app=web
+    :param field_selector: a field selector, e.g. status.phase=Running
+    :param cache: ListCache, or None to read from the API
+    :param compress: ask for a gzip compressed response. Defaults to the KUBE_MODULES_COMPRESS environment variable.
+    :param auth: authentication options, as accepted by the modules
+    :return: list of dicts
+    """
+    auth = dict((key, value) for key, value in auth.items() if key in AUTH_OPTIONS and value is not None)
+    # Key on the credentials as well as the cluster, as what may be read depends on who reads it
+    key = cache_key(kind=kind, api_version=api_version, namespace=namespace, label_selector=label_selector,
+                    field_selector=field_selector, auth=auth)
+
+    def fetch():
+        helper = find_helper(api_version, kind)
+        helper.set_client_config(**auth)
+        set_compression(helper.api_client, compression_enabled(compress))
+        list_kwargs = {}
+        if label_selector:
+            list_kwargs['label_selector'] = label_selector
+        if field_selector:
+            list_kwargs['field_selector'] = field_selector
+        with ReconcileEngine(1) as engine:
+            items = engine.list_objects(helper, [namespace], **list_kwargs)[namespace]
+        return [helper.api_client.sanitize_for_serialization(item) for item in items]
+
+    if cache is None:
+        return fetch()
+    return cache.get(key, fetch, persist=kind.lower() not in MEMORY_ONLY_KINDS)
@@ -0,0 +1,296 @@
+#
+#  Copyright 2017 Red Hat | Ansible
+#
+# This file is part of Ansible
+#
+# Ansible is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Ansible is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Ansible.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Record and replay of API traffic.
+
+With KUBE_MODULES_CASSETTE set to a path, every request made through the API client is intercepted. In
+record mode, the request and its response are appended to the cassette, a gzip compressed file of JSON
+lines. In replay mode, responses are served from the cassette and no request reaches a cluster.
+
+KUBE_MODULES_CASSETTE_MODE is 'record' or 'replay' (the default). KUBE_MODULES_CASSETTE_LATENCY, in replay
+mode, is a factor applied to the recorded response times, so 1 reproduces the original latencies and 0, the
+default, replays as fast as possible.
+
+Requests are matched on the task that made them, identified by its module and arguments, and on their method,
+path, query and a hash of their body, ignoring the resourceVersion and timeoutSeconds of watches. A request
+whose body changed since it was recorded, such as one holding a timestamp, falls back to a match without the
+body. Since each task only sees the responses recorded for it, tasks replay correctly whatever order they run
+in, and in whichever process. Requests of a task that match the same recording, such as the GET of an object
+before and after it is patched, are served its responses in the order they were recorded, and the last one is
+repeated once they run out. Tasks that run more than once with the same arguments all replay the first run.
+"""
+
+import gzip
+import hashlib
+import io
+import json
+import os
+import threading
+import time
+
+from ansible.module_utils.k8s_profile import monotonic
+
+try:
+    from kubernetes.client.rest import ApiException
+    HAS_K8S_CLIENT = True
+except ImportError:
+    HAS_K8S_CLIENT = False
+
+try:
+    from urllib.parse import urlparse
+except ImportError:
+    from urlparse import urlparse
+
+CASSETTE_ENV = 'KUBE_MODULES_CASSETTE'
+CASSETTE_MODE_ENV = 'KUBE_MODULES_CASSETTE_MODE'
+CASSETTE_LATENCY_ENV = 'KUBE_MODULES_CASSETTE_LATENCY'
+
+RECORD = 'record'
+REPLAY = 'replay'
+
+# Query parameters that change between runs without changing the response
+VOLATILE_QUERY_PARAMS = ('resourceVersion', 'timeoutSeconds')
+
+# Response headers worth keeping
+RECORDED_HEADERS = ('content-type', 'etag', 'retry-after')
+
+
+class CassetteError(Exception):
+    pass
+
+
+def body_digest(body):
+    """ A short hash of a request body, or of any JSON serializable value, with keys in a stable order """
+    if body is None:
+        return ''
+    if not isinstance(body, (bytes, str)):
+        body = json.dumps(body, sort_keys=True, separators=(',', ':'), default=str)
+    if not isinstance(body, bytes):
+        body = body.encode('utf-8')
+    return hashlib.sha1(body).hexdigest()[:16]
+
+
+def request_key(method, url, query_params, body=None):
+    """ The key of a request, and the key without its body to fall back to """
+    query = sorted((str(key), str(value)) for key, value in (query_params or [])
+                   if key not in VOLATILE_QUERY_PARAMS)
+    base_key = '{0} {1}?{2}'.format(method, urlparse(url).path, '&'.join('='.join(pair) for pair in query))
+    return '{0} #{1}'.format(base_key, body_digest(body)), base_key
+
+
+def to_text(data):
+    if isinstance(data, bytes):
+        return data.decode('utf-8', 'replace')
+    return data
+
+
+class ReplayedResponse(io.IOBase):
+    """ Stands in for a RESTResponse, or for the urllib3 response of a watch """
+
+    def __init__(self, entry, latency):
+        self.status = entry['status']
+        self.reason = entry['reason']
+        self.data = entry.get('body') or ''
+        self.headers = entry.get('headers') or {}
+        self.chunks = entry.get('chunks') or []
+        self.tail = entry.get('tail') or 0
+        self.latency = latency
+
+    def getheaders(self):
+        return self.headers
+
+    def getheader(self, name, default=None):
+        return self.headers.get(name.lower(), default)
+
+    def read_chunked(self, amt=None, decode_content=None):
+        for delay, chunk in self.chunks:
+            if self.latency:
+                time.sleep(delay * self.latency)
+            yield chunk
+        if self.latency:
+            time.sleep(self.tail * self.latency)
+
+    def release_conn(self):
+        pass
+
+
+class RecordingStream(object):
+    """ Wraps the urllib3 response of a watch, recording the chunks read from it """
+
+    def __init__(self, response, entry, cassette):
+        self.response = response
+        self.entry = entry
+        self.cassette = cassette
+
+    def read_chunked(self, *args, **kwargs):
+        last = monotonic()
+        try:
+            for chunk in self.response.read_chunked(*args, **kwargs):
+                now = monotonic()
+                self.entry['chunks'].append([round(now - last, 4), to_text(chunk)])
+                last = now
+                yield chunk
+        finally:
+            # Time from the last event to the end of the watch, usually a timeout
+            self.entry['tail'] = round(monotonic() - last, 4)
+            self.cassette.write(self.entry)
+
+    def __getattr__(self, name):
+        return getattr(self.response, name)
+
+
+class Cassette(object):
+    def __init__(self, path, mode=REPLAY, latency=0.0, scope=None):
+        if not HAS_K8S_CLIENT:
+            raise CassetteError("The cassette requires the kubernetes client. Try `pip install openshift`")
+        if mode not in (RECORD, REPLAY):
+            raise CassetteError("{0} must be '{1}' or '{2}', not '{3}'".format(
+                CASSETTE_MODE_ENV, RECORD, REPLAY, mode))
+        self.path = os.path.expanduser(path)
+        self.mode = mode
+        self.latency = latency
+        self.scope = scope
+        self.lock = threading.Lock()
+        self.recordings = {}
+        self.positions = {}
+        if mode == REPLAY:
+            self.load()
+
+    @classmethod
+    def from_environment(cls, scope=None):
+        """ The cassette configured by the environment, or None. Requests are recorded and replayed in scope. """
+        path = os.environ.get(CASSETTE_ENV)
+        if not path:
+            return None
+        try:
+            latency = float(os.environ.get(CASSETTE_LATENCY_ENV) or 0)
+        except ValueError:
+            raise CassetteError("{0} must be a number".format(CASSETTE_LATENCY_ENV))
+        return cls(path, os.environ.get(CASSETTE_MODE_ENV) or REPLAY, latency, scope)
+
+    def load(self):
+        if not os.path.exists(self.path):
+            raise CassetteError("Cassette {0} not found. Record it with {1}={2}.".format(
+                self.path, CASSETTE_MODE_ENV, RECORD))
+        with gzip.open(self.path, 'rb') as f:
+            for line in f:
+                entry = json.loads(line.decode('utf-8'))
+                if entry.get('scope') != self.scope:
+                    continue
+                self.recordings.setdefault(entry['key'], []).append(entry)
+                self.recordings.setdefault(entry['base_key'], []).append(entry)
+
+    def write(self, entry):
+        """ Append the entry as a gzip member of its own, in a single write, so processes may share a cassette """
+        buf = io.BytesIO()
+        with gzip.GzipFile(fileobj=buf, mode='wb') as member:
+            member.write((json.dumps(entry, separators=(',', ':')) + '\n').encode('utf-8'))
+        with self.lock:
+            fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+            try:
+                os.write(fd, buf.getvalue())
+            finally:
+                os.close(fd)
+
+    def replay(self, key, base_key):
+        with self.lock:
+            if key not in self.recordings:
+                key = base_key
+            entries = self.recordings.get(key)
+            if not entries:
+                exc = ApiException(status=0, reason="No response recorded for {0}".format(key))
+                exc.body = exc.reason
+                raise exc
+            position = self.positions.get(key, 0)
+            self.positions[key] = position + 1
+        entry = entries[min(position, len(entries) - 1)]
+        if self.latency and not entry.get('chunks'):
+            time.sleep(entry['elapsed'] * self.latency)
+        response = ReplayedResponse(entry, self.latency)
+        if not 200 <= response.status <= 299:
+            raise ApiException(http_resp=response)
+        return response
+
+    def record(self, key, base_key, request, method, url, **kwargs):
+        body = kwargs.get('body')
+        entry = {'key': key, 'base_key': base_key, 'scope': self.scope, 'method': method,
+                 'request_bytes': len(json.dumps(body)) if body is not None else 0}
+        start = monotonic()
+        try:
+            response = request(method, url, **kwargs)
+        except ApiException as exc:
+            entry.update(status=exc.status, reason=exc.reason, body=to_text(exc.body),
+                         headers=self.recorded_headers(exc.headers), elapsed=round(monotonic() - start, 4))
+            self.write(entry)
+            raise
+        entry.update(status=response.status, reason=response.reason, elapsed=round(monotonic() - start, 4),
+                     headers=self.recorded_headers(response.getheaders()))
+        if kwargs.get('_preload_content', True):
+            entry['body'] = to_text(response.data)
+            self.write(entry)
+            return response
+        entry['chunks'] = []
+        return RecordingStream(response, entry, self)
+
+    @staticmethod
+    def recorded_headers(headers):
+        return dict((name.lower(), value) for name, value in (headers or {}).items()
+                    if name.lower() in RECORDED_HEADERS)
+
+    def attach(self, api_client):
+        """ Route the requests of api_client through the cassette """
+        if getattr(api_client, '_cassette', None) is self:
+            return
+        request = api_client.request
+        cassette = self
+
+        def cassette_request(method, url, query_params=None, headers=None, post_params=None, body=None,
+                             _preload_content=True, _request_timeout=None):
+            key, base_key = request_key(method, url, query_params, body)
+            if cassette.mode == REPLAY:
+                return cassette.replay(key, base_key)
+            return cassette.record(key, base_key, request, method, url, query_params=query_params,
+                                   headers=headers, post_params=post_params, body=body,
+                                   _preload_content=_preload_content, _request_timeout=_request_timeout)
+
+        api_client.request = cassette_request
+        api_client._cassette = self
+
+
+class CassetteMixin(object):
+    """ Records or replays the API traffic of a KubernetesAnsibleModule, when KUBE_MODULES_CASSETTE is set """
+
+    cassette = None
+
+    def configure_client(self):
+        super(CassetteMixin, self).configure_client()
+        if self.cassette is None:
+            try:
+                self.cassette = Cassette.from_environment(self.cassette_scope()) or False
+            except CassetteError as exc:
+                self.fail_json(msg=str(exc))
+        if self.cassette:
+            self.cassette.attach(self.helper.api_client)
+
+    def cassette_scope(self):
+        """ Identifies the task by its module and arguments, leaving out those that only say how to connect """
+        auth_options = [name for name, spec in self.helper.argspec.items() if spec.get('auth_option')]
+        params = dict((name, value) for name, value in self.params.items()
+                      if name not in auth_options and name != 'debug')
+        return body_digest({'kind': self.kind, 'api_version': self.api_version, 'params': params})
@@ -19,12 +19,18 @@
 import copy
 import json
 import os
+import time
+
+from contextlib import contextmanager
 
 from ansible.module_utils.basic import AnsibleModule
 
+IMPORTS_STARTED = time.time()
+
 try:
     from openshift.helper.ansible import KubernetesAnsibleModuleHelper, ARG_ATTRIBUTES_BLACKLIST
     from openshift.helper.exceptions import KubernetesException
+    from kubernetes.client.rest import ApiException
     HAS_K8S_MODULE_HELPER = True
 except ImportError as exc:
     HAS_K8S_MODULE_HELPER = False
@@ -35,12 +41,20 @@ try:
 except ImportError:
     HAS_YAML = False
 
+IMPORTS_SECONDS = time.time() - IMPORTS_STARTED
+
+# Helpers by (get_helper, api_version, kind). Set to a dict by callers that run many modules in one process.
+HELPER_CACHE = None
+
 
 class KubernetesAnsibleException(Exception):
     pass
 
 
 class KubernetesAnsibleModule(AnsibleModule):
+    # Seconds spent importing the module's dependencies, reported by k8s_profile.ProfileMixin
+    imports_seconds = IMPORTS_SECONDS
+
     @staticmethod
     def get_helper(api_version, kind):
         return KubernetesAnsibleModuleHelper(api_version, kind)
@@ -61,7 +75,8 @@ class KubernetesAnsibleModule(AnsibleModule):
             )
 
         try:
-            self.helper = self.get_helper(api_version, kind)
+            with self.phase('helper_init'):
+                self.helper = self.cached_helper(api_version, kind)
         except Exception as exc:
             raise KubernetesAnsibleException(
                 "Error initializing AnsibleModuleHelper: {}".format(exc)
@@ -71,10 +86,23 @@ class KubernetesAnsibleModule(AnsibleModule):
             ('resource_definition', 'src'),
         )
 
-        AnsibleModule.__init__(self,
-                               argument_spec=self.argspec,
-                               supports_check_mode=True,
-                               mutually_exclusive=mutually_exclusive)
+        with self.phase('argspec'):
+            argument_spec = self.argspec
+
+        with self.phase('params'):
+            AnsibleModule.__init__(self,
+                                   argument_spec=argument_spec,
+                                   supports_check_mode=True,
+                                   mutually_exclusive=mutually_exclusive)
+
+    def cached_helper(self, api_version, kind):
+        """ Return a new helper, or the one in HELPER_CACHE """
+        if HELPER_CACHE is None:
+            return self.get_helper(api_version, kind)
+        key = (self.get_helper, api_version, kind)
+        if key not in HELPER_CACHE:
+            HELPER_CACHE[key] = self.get_helper(api_version, kind)
+        return HELPER_CACHE[key]
 
     @property
     def argspec(self):
@@ -95,6 +123,14 @@ class KubernetesAnsibleModule(AnsibleModule):
                     ]
                 }
             }
+            spec.update(self.extra_argspec)
+            if self.kind.endswith('_list'):
+                spec['namespace'] = {
+                    'type': 'str',
+                    'description': [
+                        "The namespace to list the objects of. Lists the objects of every namespace when omitted."
+                    ]
+                }
 
             for arg_name, arg_properties in self.helper.argspec.items():
                 spec[arg_name] = {}
@@ -111,6 +147,67 @@ class KubernetesAnsibleModule(AnsibleModule):
             self.argspec_cache = spec
         return self.argspec_cache
 
+    @property
+    def extra_argspec(self):
+        """
+        The options handled by the module class rather than the helper, such as those added by the mixins in
+        k8s_mixins. Extended by each mixin that adds options.
+
+        :return: dict: a valid Ansible argument spec
+        """
+        return {}
+
+    @property
+    def auth_argspec(self):
+        """
+        The authentication and debug options from helper.argspec, and the extra options, for modules that define
+        their own arguments rather than those of a model object.
+
+        :return: dict: a valid Ansible argument spec
+        """
+        spec = self.extra_argspec
+        for arg_name, arg_properties in self.helper.argspec.items():
+            if arg_properties.get('auth_option') or arg_name == 'debug':
+                spec[arg_name] = dict((option, option_value) for option, option_value in arg_properties.items()
+                                      if option not in ARG_ATTRIBUTES_BLACKLIST)
+        return spec
+
+    def configure_client(self):
+        """ Point the helper's API client at the cluster described by the module's auth options """
+        auth_options = {}
+        for key, value in self.helper.argspec.items():
+            if value.get('auth_option') and self.params.get(key) is not None:
+                auth_options[key] = self.params[key]
+        with self.phase('kubeconfig'):
+            self.helper.set_client_config(**auth_options)
+
+    @contextmanager
+    def phase(self, name):
+        """ Context of a phase of the run, such as get or patch, timed by k8s_profile.ProfileMixin """
+        yield
+
+    def enable_debug(self):
+        """ Write debug messages to the helper's log file. k8s_logging.LoggingMixin writes them as JSON lines. """
+        self.helper.enable_debug(reset_logfile=False)
+
+    def log_debug(self, msg, **fields):
+        """
+        Log a debug message, with any structured data as fields. Nothing is formatted unless the debug option is
+        set.
+        """
+        if not self.params.get('debug'):
+            return
+        self.helper.log(msg)
+        for name, value in fields.items():
+            if hasattr(value, 'to_dict'):
+                value = value.to_dict()
+            self.helper.log("{0}: {1}".format(name, json.dumps(value, indent=4, default=str)))
+
+    def to_dict(self, k8s_obj):
+        """ Convert a model object to the dict returned by the module """
+        with self.phase('to_dict'):
+            return k8s_obj.to_dict() if k8s_obj else {}
+
     def execute_module(self):
         """
         Performs basic CRUD operations on the model object. Ends by calling
@@ -123,7 +220,7 @@ class KubernetesAnsibleModule(AnsibleModule):
         """
 
         if self.params.get('debug'):
-            self.helper.enable_debug(reset_logfile=False)
+            self.enable_debug()
             self.helper.log_argspec()
 
         resource_definition = self.params.get('resource_definition')
@@ -137,7 +234,11 @@ class KubernetesAnsibleModule(AnsibleModule):
         force = self.params.get('force', False)
         dry_run = self.params.pop('dry_run', False)
         name = self.params.get('name')
-        namespace = self.params.get('namespace', None)
+        if self.kind.endswith('_list'):
+            # The helper rejects the namespace option of the list modules, which it does not know about
+            namespace = self.params.pop('namespace', None)
+        else:
+            namespace = self.params.get('namespace', None)
         existing = None
 
         return_attributes = dict(changed=False,
@@ -149,33 +250,31 @@ class KubernetesAnsibleModule(AnsibleModule):
             self.exit_json(**return_attributes)
 
         try:
-            auth_options = {}
-            for key, value in self.helper.argspec.items():
-                if value.get('auth_option') and self.params.get(key) is not None:
-                    auth_options[key] = self.params[key]
-            self.helper.set_client_config(**auth_options)
+            self.configure_client()
         except KubernetesException as e:
             self.fail_json(msg='Error loading config', error=str(e))
 
+        if self.kind.endswith('_list'):
+            # For list modules, execute a GET, and exit. The helper gives them a state option, which is ignored.
+            return_attributes[self.kind] = self._read_list(namespace)
+            self.exit_json(**return_attributes)
+
         if state is None:
-            # This is a list, rollback or ? module with no 'state' param
-            if self.helper.base_model_name_snake.endswith('list'):
-                # For list modules, execute a GET, and exit
-                k8s_obj = self._read(name, namespace)
-                return_attributes[self.kind] = k8s_obj.to_dict() if k8s_obj else {}
-                self.exit_json(**return_attributes)
-            elif self.helper.has_method('create'):
+            # This is a rollback or ? module with no 'state' param
+            if self.helper.has_method('create'):
                 # For a rollback, execute a POST, and exit
                 k8s_obj = self._create(namespace)
-                return_attributes[self.kind] = k8s_obj.to_dict() if k8s_obj else {}
+                return_attributes[self.kind] = self.to_dict(k8s_obj)
                 return_attributes['changed'] = True
+                self._after_create(k8s_obj, return_attributes)
                 self.exit_json(**return_attributes)
             else:
                 self.fail_json(msg="Missing state parameter. Expected one of: present, absent")
 
         # CRUD modules
         try:
-            existing = self.helper.get_object(name, namespace)
+            with self.phase('get'):
+                existing = self.helper.get_object(name, namespace)
         except KubernetesException as exc:
             self.fail_json(msg='Failed to retrieve requested object: {}'.format(exc.message),
                            error=exc.value.get('status'))
@@ -188,7 +287,8 @@ class KubernetesAnsibleModule(AnsibleModule):
                 # Delete the object
                 if not self.check_mode:
                     try:
-                        self.helper.delete_object(name, namespace)
+                        with self.phase('delete'):
+                            self.helper.delete_object(name, namespace)
                     except KubernetesException as exc:
                         self.fail_json(msg="Failed to delete object: {}".format(exc.message),
                                        error=exc.value.get('status'))
@@ -197,8 +297,9 @@ class KubernetesAnsibleModule(AnsibleModule):
         else:
             if not existing:
                 k8s_obj = self._create(namespace)
-                return_attributes[self.kind] = k8s_obj.to_dict() if k8s_obj else {}
+                return_attributes[self.kind] = self.to_dict(k8s_obj)
                 return_attributes['changed'] = True
+                self._after_present(k8s_obj, return_attributes)
                 self.exit_json(**return_attributes)
 
             if existing and force:
@@ -206,37 +307,40 @@ class KubernetesAnsibleModule(AnsibleModule):
                 request_body = self.helper.request_body_from_params(self.params)
                 if not self.check_mode:
                     try:
-                        k8s_obj = self.helper.replace_object(name, namespace, body=request_body)
+                        with self.phase('replace'):
+                            k8s_obj = self.helper.replace_object(name, namespace, body=request_body)
                     except KubernetesException as exc:
                         self.fail_json(msg="Failed to replace object: {}".format(exc.message),
                                        error=exc.value.get('status'))
-                return_attributes[self.kind] = k8s_obj.to_dict() if k8s_obj else {}
+                return_attributes[self.kind] = self.to_dict(k8s_obj)
                 return_attributes['changed'] = True
+                self._after_present(k8s_obj, return_attributes)
                 self.exit_json(**return_attributes)
 
             # Check if existing object should be patched
-            k8s_obj = copy.deepcopy(existing)
-            try:
-                self.helper.object_from_params(self.params, obj=k8s_obj)
-            except KubernetesException as exc:
-                self.fail_json(msg="Failed to patch object: {}".format(exc.message))
-            match, diff = self.helper.objects_match(existing, k8s_obj)
+            with self.phase('diff'):
+                k8s_obj = copy.deepcopy(existing)
+                try:
+                    self.helper.object_from_params(self.params, obj=k8s_obj)
+                except KubernetesException as exc:
+                    self.fail_json(msg="Failed to patch object: {}".format(exc.message))
+                match, diff = self.helper.objects_match(existing, k8s_obj)
             if match:
-                return_attributes[self.kind] = existing.to_dict()
+                return_attributes[self.kind] = self.to_dict(existing)
+                self._after_present(existing, return_attributes)
                 self.exit_json(**return_attributes)
             else:
-                self.helper.log('Existing:')
-                self.helper.log(existing.to_str())
-                self.helper.log('\nDifferences:')
-                self.helper.log(json.dumps(diff, indent=4))
+                self.log_debug("Differences found", existing=existing, diff=diff)
             # Differences exist between the existing obj and requested params
             if not self.check_mode:
                 try:
-                    k8s_obj = self.helper.patch_object(name, namespace, k8s_obj)
+                    with self.phase('patch'):
+                        k8s_obj = self.helper.patch_object(name, namespace, k8s_obj)
                 except KubernetesException as exc:
                     self.fail_json(msg="Failed to patch object: {}".format(exc.message))
-            return_attributes[self.kind] = k8s_obj.to_dict() if k8s_obj else {}
+            return_attributes[self.kind] = self.to_dict(k8s_obj)
             return_attributes['changed'] = True
+            self._after_present(k8s_obj, return_attributes)
             self.exit_json(**return_attributes)
 
     def _create(self, namespace):
@@ -248,26 +352,62 @@ class KubernetesAnsibleModule(AnsibleModule):
             self.fail_json(msg="Failed to create object: {}".format(exc.message))
         if not self.check_mode:
             try:
-                k8s_obj = self.helper.create_object(namespace, body=request_body)
+                with self.phase('create'):
+                    k8s_obj = self.helper.create_object(namespace, body=request_body)
             except KubernetesException as exc:
                 self.fail_json(msg="Failed to create object: {}".format(exc.message),
                                error=exc.value.get('status'))
         return k8s_obj
 
+    def _after_create(self, k8s_obj, return_attributes):
+        """ Called once a module with no state, such as a rollback, has created its object """
+        pass
+
+    def _after_present(self, k8s_obj, return_attributes):
+        """
+        Called before a module with state present exits, with the object it created, replaced, patched, or found
+        unchanged. In check mode, k8s_obj is None when the object would have been created.
+        """
+        pass
+
     def _read(self, name, namespace):
         k8s_obj = None
         try:
-            k8s_obj = self.helper.get_object(name, namespace)
+            with self.phase('get'):
+                k8s_obj = self.helper.get_object(name, namespace)
         except KubernetesException as exc:
             self.fail_json(msg='Failed to retrieve requested object',
                            error=exc.value.get('status'))
         return k8s_obj
 
+    def _list_method(self, namespace):
+        """ The API method listing the objects in namespace, or in every namespace when namespace is None """
+        try:
+            return self.helper.lookup_method('list', namespace)
+        except KubernetesException:
+            if namespace:
+                raise
+            kind = self.kind[:-len('_list')]
+            return self.helper.lookup_method(method_name='list_{0}_for_all_namespaces'.format(kind))
+
+    def _read_list(self, namespace):
+        """ List the objects in namespace, or in every namespace, and return the list in the form of to_dict() """
+        k8s_obj = None
+        try:
+            list_method = self._list_method(namespace)
+            with self.phase('get'):
+                k8s_obj = list_method(namespace) if namespace else list_method()
+        except KubernetesException as exc:
+            self.fail_json(msg='Failed to retrieve requested object: {}'.format(exc.message))
+        except ApiException as exc:
+            self.fail_json(msg='Failed to retrieve requested object: {}'.format(exc.reason), error=exc.status)
+        return self.to_dict(k8s_obj)
+
     def load_resource_definition(self, src):
         """ Load the requested src path """
         result = None
         path = os.path.normpath(src)
-        self.helper.log("Reading definition from {}".format(path))
+        self.log_debug("Reading definition from {0}".format(path))
         if not os.path.exists(path):
             self.fail_json(msg="Error accessing {}. Does the file exist?".format(path))
         try:
@@ -290,7 +430,7 @@ class KubernetesAnsibleModule(AnsibleModule):
                     parameters[key] = value
             elif isinstance(value, dict):
                 self._add_parameter(value, [key], parameters)
-        self.helper.log("Request to parameters: {}".format(json.dumps(parameters)))
+        self.log_debug("Request to parameters", parameters=parameters)
         return parameters
 
     def _add_parameter(self, request, path, parameters):
@@ -0,0 +1,326 @@
+#
+#  Copyright 2017 Red Hat | Ansible
+#
+# This file is part of Ansible
+#
+# Ansible is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Ansible is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Ansible.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Approves the certificate signing requests of joining nodes in bulk.
+
+Pending CertificateSigningRequests are listed, then watched, and each is checked against the rules of the
+module: who requested it, the usages it asks for, and the node named in its subject. Those that match are
+approved concurrently through the approval subresource, until the expected number have been approved or the
+timeout passes. The subject is read from the request's DER encoding here, so no X.509 library is needed.
+"""
+
+import base64
+import binascii
+import fnmatch
+import re
+import time
+
+from ansible.module_utils.k8s_common import KubernetesAnsibleModule
+from ansible.module_utils.k8s_discovery import Resource, api_request
+from ansible.module_utils.k8s_engine import DEFAULT_WORKERS, restart_watch
+from ansible.module_utils.k8s_mixins import KubernetesModuleMixin
+from ansible.module_utils.k8s_raw import RawResourceHelper, error_message
+
+try:
+    from openshift.helper.exceptions import KubernetesException
+    from kubernetes.client.rest import ApiException
+    HAS_K8S_MODULE_HELPER = True
+except ImportError:
+    HAS_K8S_MODULE_HELPER = False
+
+DEFAULT_APPROVE_TIMEOUT = 600
+
+# Seconds each watch of the requests lasts before it is started again
+WATCH_TIMEOUT = 60
+
+# Attempts to approve a request that another client changed meanwhile
+MAX_CONFLICTS = 5
+
+CSRS = Resource('certificates.k8s.io/v1beta1', '/apis/certificates.k8s.io/v1beta1',
+                {'kind': 'CertificateSigningRequest', 'name': 'certificatesigningrequests', 'namespaced': False})
+
+# The requestors of kubelet certificates: bootstrap tokens, OpenShift's node bootstrapper, and nodes renewing
+# their own
+DEFAULT_REQUESTORS = ['system:bootstrap:*', 'system:serviceaccount:openshift-infra:node-bootstrapper',
+                      'system:node:*']
+
+# The usages of kubelet client and serving certificates
+DEFAULT_USAGES = ['digital signature', 'key encipherment', 'client auth', 'server auth']
+
+# Usages only approved for a node requesting a certificate for itself. Anyone holding a bootstrap token could
+# otherwise get a certificate to serve as any node.
+SERVING_USAGES = ('server auth',)
+
+NODE_PREFIX = 'system:node:'
+NODES_GROUP = 'system:nodes'
+
+# DER encoded object identifiers of the attributes of a subject
+COMMON_NAME = b'\x55\x04\x03'
+ORGANIZATION = b'\x55\x04\x0a'
+
+
+class CSRError(Exception):
+    pass
+
+
+def read_der(data, pos=0):
+    """ Return (tag, value, position after the element) of the DER element at pos of a bytearray """
+    if pos + 2 > len(data):
+        raise CSRError("Truncated DER element")
+    tag, length = data[pos], data[pos + 1]
+    pos += 2
+    if length & 0x80:
+        size = length & 0x7f
+        length = 0
+        for byte in data[pos:pos + size]:
+            length = length << 8 | byte
+        pos += size
+    if pos + length > len(data):
+        raise CSRError("Truncated DER element")
+    return tag, data[pos:pos + length], pos + length
+
+
+def der_children(data):
+    """ Yield (tag, value) of each element in the value of a DER sequence or set """
+    pos = 0
+    while pos < len(data):
+        tag, value, pos = read_der(data, pos)
+        yield tag, value
+
+
+def csr_subject(request):
+    """
+    The subject of a CSR, as a dict of common_name and organizations.
+
+    :param request: spec.request of a CertificateSigningRequest, a base64 encoded PEM document
+    """
+    try:
+        pem = base64.b64decode(request).decode('ascii')
+        lines = [line for line in pem.strip().splitlines() if line and not line.startswith('-----')]
+        der = bytearray(base64.b64decode(''.join(lines)))
+    except (TypeError, ValueError, binascii.Error, UnicodeDecodeError):
+        raise CSRError("The request is not a PEM encoded certificate request")
+    subject = {'common_name': None, 'organizations': []}
+    try:
+        # CertificationRequest: certificationRequestInfo: version, subject
+        info = next(der_children(read_der(der)[1]))[1]
+        children = der_children(info)
+        next(children)
+        for _, name in der_children(next(children)[1]):
+            for _, attribute in der_children(name):
+                (_, oid), (_, value) = list(der_children(attribute))[:2]
+                value = bytes(value).decode('utf-8')
+                if bytes(oid) == COMMON_NAME:
+                    subject['common_name'] = value
+                elif bytes(oid) == ORGANIZATION:
+                    subject['organizations'].append(value)
+    except (StopIteration, ValueError, UnicodeDecodeError):
+        raise CSRError("The request is not a valid certificate request")
+    return subject
+
+
+def is_pending(csr):
+    conditions = (csr.get('status') or {}).get('conditions') or []
+    return not any(condition.get('type') in ('Approved', 'Denied') for condition in conditions)
+
+
+def csr_ref(csr, **extra):
+    spec = csr.get('spec') or {}
+    return dict(name=csr['metadata']['name'], username=spec.get('username'), **extra)
+
+
+def check_csr(csr, requestors, usages, node_name):
+    """
+    Check a CSR against the rules. Returns the name of the node it is for, or raises CSRError with the reason
+    it does not match.
+
+    :param requestors: shell patterns of the users that may request certificates
+    :param usages: the usages that may be requested. SERVING_USAGES are only approved when the requestor is
+        the node the certificate is for.
+    :param node_name: a regular expression the whole node name must match
+    """
+    spec = csr.get('spec') or {}
+    username = spec.get('username') or ''
+    if not any(fnmatch.fnmatchcase(username, pattern) for pattern in requestors):
+        raise CSRError("Requestor {0} is not allowed".format(username))
+    extra_usages = sorted(set(spec.get('usages') or []) - set(usages))
+    if extra_usages:
+        raise CSRError("Usages {0} are not allowed".format(', '.join(extra_usages)))
+    subject = csr_subject(spec.get('request') or '')
+    common_name = subject['common_name'] or ''
+    if not common_name.startswith(NODE_PREFIX):
+        raise CSRError("Subject {0} is not a node".format(common_name))
+    if subject['organizations'] != [NODES_GROUP]:
+        raise CSRError("Subject organizations {0} are not {1}".format(subject['organizations'], NODES_GROUP))
+    if username.startswith(NODE_PREFIX) and username != common_name:
+        # A node may only request certificates for itself
+        raise CSRError("Node {0} requested a certificate for {1}".format(username, common_name))
+    serving_usages = sorted(set(spec.get('usages') or []) & set(SERVING_USAGES))
+    if serving_usages and username != common_name:
+        raise CSRError("Usages {0} are only allowed for node {1} itself, not requestor {2}".format(
+            ', '.join(serving_usages), common_name, username))
+    node = common_name[len(NODE_PREFIX):]
+    if not re.match('(?:{0})$'.format(node_name), node):
+        raise CSRError("Node name {0} does not match {1}".format(node, node_name))
+    return node
+
+
+class KubernetesCSRApproveModule(KubernetesModuleMixin, KubernetesAnsibleModule):
+    """ Approves the pending certificate signing requests that match a set of rules """
+
+    def __init__(self):
+        self.approve_argspec = {
+            'requestors': {'type': 'list', 'default': DEFAULT_REQUESTORS},
+            'usages': {'type': 'list', 'default': DEFAULT_USAGES},
+            'node_name': {'required': True},
+            'count': {'type': 'int'},
+            'timeout': {'type': 'int', 'default': DEFAULT_APPROVE_TIMEOUT},
+            'workers': {'type': 'int', 'default': DEFAULT_WORKERS},
+        }
+        super(KubernetesCSRApproveModule, self).__init__('certificate_signing_request', 'v1beta1')
+
+    @property
+    def argspec(self):
+        if not self.argspec_cache:
+            spec = self.auth_argspec
+            spec.update(self.approve_argspec)
+            self.argspec_cache = spec
+        return self.argspec_cache
+
+    def approve(self, csr):
+        """
+        Approve a CSR, reading it again when another client changed it meanwhile. Returns False when it is no
+        longer pending, or no longer exists.
+        """
+        helper = RawResourceHelper(self.helper.api_client, CSRS)
+        name = csr['metadata']['name']
+        for _ in range(MAX_CONFLICTS):
+            status = dict(csr.get('status') or {})
+            status['conditions'] = list(status.get('conditions') or []) + [{
+                'type': 'Approved',
+                'reason': 'AnsibleApprove',
+                'message': 'This CSR was approved by the k8s_csr_approve module.',
+                'lastUpdateTime': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+            }]
+            try:
+                api_request(self.helper.api_client, 'PUT', CSRS.path(name) + '/approval',
+                            body=dict(csr, status=status))
+                return True
+            except ApiException as exc:
+                if exc.status != 409:
+                    raise KubernetesException(error_message(exc), status=exc.status)
+            csr = helper.get_object(name)
+            if csr is None or not is_pending(csr):
+                return False
+        raise KubernetesException("Gave up approving {0} after {1} conflicts".format(name, MAX_CONFLICTS),
+                                  status=409)
+
+    def execute_module(self):
+        if self.params.get('debug'):
+            self.enable_debug()
+
+        try:
+            re.compile(self.params['node_name'])
+        except re.error as exc:
+            self.fail_json(msg="Invalid node_name pattern: {0}".format(exc))
+
+        try:
+            self.configure_client()
+        except KubernetesException as exc:
+            self.fail_json(msg='Error loading config', error=str(exc))
+
+        helper = RawResourceHelper(self.helper.api_client, CSRS)
+        engine = self.get_engine(self.params['workers'])
+        count = self.params.get('count')
+        deadline = time.time() + self.params['timeout']
+        seen = set()
+        futures = []
+        skipped = []
+
+        def consider(csr):
+            """ Submit the approval of a pending CSR seen for the first time, if it matches the rules """
+            name = csr['metadata']['name']
+            if name in seen or not is_pending(csr):
+                return
+            seen.add(name)
+            try:
+                node = check_csr(csr, self.params['requestors'], self.params['usages'], self.params['node_name'])
+            except CSRError as exc:
+                skipped.append(csr_ref(csr, reason=str(exc)))
+                return
+            ref = csr_ref(csr, node=node)
+            if self.check_mode:
+                futures.append((ref, None))
+            else:
+                futures.append((ref, engine.submit(self.approve, csr)))
+
+        try:
+            with self.phase('get'):
+                items, resource_version = helper.list_objects()
+            for csr in items:
+                consider(csr)
+            # Approvals submitted are counted as they will succeed; failures are reported rather than replaced
+            with self.phase('wait'):
+                while count and len(futures) < count and time.time() < deadline and not self.check_mode:
+                    if resource_version is None:
+                        items, resource_version = helper.list_objects()
+                        for csr in items:
+                            consider(csr)
+                        continue
+                    events = helper.watch(None, resource_version, max(1, min(WATCH_TIMEOUT, deadline - time.time())))
+                    try:
+                        for event in events:
+                            obj = event.get('object') or {}
+                            if event.get('type') == 'ERROR':
+                                # The resourceVersion expired
+                                raise KubernetesException(obj.get('message', 'watch failed'), status=obj.get('code'))
+                            resource_version = obj['metadata'].get('resourceVersion')
+                            if event['type'] in ('ADDED', 'MODIFIED'):
+                                consider(obj)
+                            if len(futures) >= count:
+                                break
+                    except Exception as exc:
+                        if not restart_watch(exc):
+                            raise
+                        # Start again from a list
+                        resource_version = None
+                        time.sleep(1)
+                    finally:
+                        events.close()
+        except KubernetesException as exc:
+            self.fail_json(msg="Failed to read certificate signing requests: {0}".format(exc.message),
+                           error=exc.value.get('status'))
+
+        approved, failed = [], []
+        with self.phase('approve'):
+            for ref, future in futures:
+                try:
+                    if future is None or future.result():
+                        approved.append(ref)
+                except Exception as exc:
+                    failed.append(dict(ref, error=getattr(exc, 'message', str(exc))))
+
+        return_attributes = dict(changed=bool(approved), approved=approved, skipped=skipped, failed=failed)
+        if failed:
+            self.fail_json(msg="Failed to approve {0} certificate signing requests".format(len(failed)),
+                           **return_attributes)
+        if count and len(approved) < count and not self.check_mode:
+            self.fail_json(msg="Approved {0} of {1} certificate signing requests before the timeout".format(
+                len(approved), count), **return_attributes)
+        self.exit_json(**return_attributes)
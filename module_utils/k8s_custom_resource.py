@@ -0,0 +1,183 @@
+#
+#  Copyright 2017 Red Hat | Ansible
+#
+# This file is part of Ansible
+#
+# Ansible is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Ansible is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Ansible.  If not, see <http://www.gnu.org/licenses/>.
+
+import copy
+import os
+
+from ansible.module_utils.k8s_apply import ApplyError, ResourceApplier, flatten_resources, load_resource_definitions
+from ansible.module_utils.k8s_common import KubernetesAnsibleModule
+from ansible.module_utils.k8s_engine import DEFAULT_WORKERS
+from ansible.module_utils.k8s_mixins import KubernetesModuleMixin
+
+try:
+    from openshift.helper.exceptions import KubernetesException
+    HAS_K8S_MODULE_HELPER = True
+except ImportError:
+    HAS_K8S_MODULE_HELPER = False
+
+try:
+    import yaml
+    HAS_YAML = True
+except ImportError:
+    HAS_YAML = False
+
+DEFAULT_WAIT_TIMEOUT = 120
+
+
+def condition_check(wait_condition):
+    """ A check that an object has the condition of type wait_condition['type'], in wait_condition['status'] """
+    condition_type = wait_condition.get('type')
+    status = str(wait_condition.get('status', True))
+
+    def check(obj):
+        conditions = ((obj or {}).get('status') or {}).get('conditions') or []
+        return any(c.get('type') == condition_type and str(c.get('status')) == status for c in conditions)
+
+    return check
+
+
+class KubernetesCustomResourceModule(KubernetesModuleMixin, KubernetesAnsibleModule):
+    """
+    Manages objects of a kind given at run time, such as a custom resource, as dicts. The kind is resolved
+    through cached discovery, rather than a generated model.
+    """
+
+    def __init__(self):
+        self.resource_argspec = {
+            'api_version': {'required': True},
+            'kind': {'required': True},
+            'name': {},
+            'namespace': {},
+            'resource_definition': {'type': 'dict'},
+            'resource_definitions': {'type': 'list'},
+            'src': {'type': 'path'},
+            'state': {'default': 'present', 'choices': ['present', 'absent']},
+            'wait': {'type': 'bool', 'default': False},
+            'wait_condition': {'type': 'dict'},
+            'wait_timeout': {'type': 'int', 'default': DEFAULT_WAIT_TIMEOUT},
+            'workers': {'type': 'int', 'default': DEFAULT_WORKERS},
+        }
+        super(KubernetesCustomResourceModule, self).__init__('namespace', 'v1')
+
+    @property
+    def argspec(self):
+        if not self.argspec_cache:
+            spec = self.auth_argspec
+            spec.update(self.resource_argspec)
+            self.argspec_cache = spec
+        return self.argspec_cache
+
+    def load_resources(self):
+        """ The definitions to apply, with the module's apiVersion, kind and name filled in where not set """
+        resources = list(self.params.get('resource_definitions') or [])
+        if self.params.get('resource_definition'):
+            resources.append(self.params['resource_definition'])
+        if self.params.get('src'):
+            if not os.path.exists(self.params['src']):
+                self.fail_json(msg="Error accessing {0}. Does the file exist?".format(self.params['src']))
+            try:
+                resources.extend(load_resource_definitions(self.params['src']))
+            except (IOError, yaml.YAMLError) as exc:
+                self.fail_json(msg="Error loading resource definitions: {0}".format(exc))
+        resources = [copy.deepcopy(resource) for resource in flatten_resources(resources)]
+        if not resources and self.params.get('name'):
+            resources = [{}]
+        if not resources:
+            self.fail_json(msg="One of name, resource_definition, resource_definitions or src is required")
+        for resource in resources:
+            if not isinstance(resource, dict):
+                self.fail_json(msg="Every resource definition must be a dict", resource=resource)
+            resource.setdefault('apiVersion', self.params['api_version'])
+            resource.setdefault('kind', self.params['kind'])
+            metadata = resource.setdefault('metadata', {})
+            if len(resources) == 1 and self.params.get('name'):
+                metadata.setdefault('name', self.params['name'])
+            if not metadata.get('name'):
+                self.fail_json(msg="Every resource definition requires metadata.name", resource=resource)
+        return resources
+
+    def wait_for(self, applier, resources, results):
+        """
+        Wait for the objects to be ready, or deleted, with one watch per kind and namespace. Adds ready to each
+        result. Returns the number of objects that were not ready before wait_timeout.
+        """
+        if self.params['state'] == 'absent':
+            condition = lambda obj: obj is None  # noqa: E731
+        elif self.params.get('wait_condition'):
+            condition = condition_check(self.params['wait_condition'])
+        else:
+            # As the generated modules do after a create, wait for the object to have a status
+            condition = lambda obj: bool(obj and obj.get('status'))  # noqa: E731
+
+        by_helper = {}
+        for resource, result in zip(resources, results):
+            try:
+                by_helper.setdefault(applier.helper_for(resource), []).append(result)
+            except ApplyError:
+                # The cluster does not serve the kind, so no objects of it are left to wait for
+                result['ready'] = True
+        not_ready = 0
+        with self.phase('wait'):
+            for helper, helper_results in by_helper.items():
+                refs = [(result['name'], result['namespace']) for result in helper_results]
+                try:
+                    ready = helper.wait_for_objects(refs, condition, self.params['wait_timeout'], applier.engine)
+                except KubernetesException as exc:
+                    self.fail_json(msg="Failed to wait for {0} objects: {1}".format(helper.resource.kind, exc.message),
+                                   error=exc.value.get('status'), results=results)
+                for result in helper_results:
+                    ref = (result['name'], result['namespace'])
+                    result['ready'] = ref in ready
+                    if ready.get(ref) is not None:
+                        result['result'] = ready[ref]
+                    not_ready += not result['ready']
+        return not_ready
+
+    def execute_module(self):
+        if self.params.get('debug'):
+            self.enable_debug()
+
+        resources = self.load_resources()
+
+        try:
+            self.configure_client()
+        except KubernetesException as exc:
+            self.fail_json(msg='Error loading config', error=str(exc))
+
+        applier = ResourceApplier(self, self.get_engine(self.params['workers']), self.params.get('namespace'),
+                                  use_models=False)
+        try:
+            results, _, failed = applier.run(resources, self.params['state'])
+        except (ApplyError, KubernetesException) as exc:
+            self.fail_json(msg="Failed to apply resources: {0}".format(getattr(exc, 'message', str(exc))))
+
+        return_attributes = dict(changed=any(result['changed'] for result in results),
+                                 api_version=self.params['api_version'],
+                                 results=results)
+        if failed:
+            self.fail_json(msg="Failed to apply one or more resources", **return_attributes)
+
+        not_ready = 0
+        if self.params['wait'] and not self.check_mode:
+            not_ready = self.wait_for(applier, resources, results)
+        if len(results) == 1:
+            return_attributes['result'] = results[0].get('result') or {}
+        if not_ready:
+            self.fail_json(msg="Timed out waiting for {0} of {1} objects".format(not_ready, len(results)),
+                           **return_attributes)
+        self.exit_json(**return_attributes)
@@ -0,0 +1,338 @@
+#
+#  Copyright 2017 Red Hat | Ansible
+#
+# This file is part of Ansible
+#
+# Ansible is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Ansible is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Ansible.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+API discovery and OpenAPI schema, cached on disk.
+
+Resolving a kind that has no generated model, such as a custom resource or a kind served by an aggregated
+API, takes the list of API groups and the resource list of a group version. Like kubectl, the responses are
+cached under ~/.kube/cache, in a directory per server host and server version, so that they are fetched once
+per cluster rather than once per task. Entries older than the TTL are revalidated with the ETag the server
+sent, so an unchanged document costs a 304 and no body. A kind missing from a cached resource list refreshes
+it once, to pick up CustomResourceDefinitions created since it was fetched.
+
+KUBE_MODULES_DISCOVERY_DIR overrides the cache directory, and KUBE_MODULES_DISCOVERY_TTL the TTL in seconds.
+A TTL of 0 revalidates every document on each use.
+"""
+
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+
+try:
+    from kubernetes.client.rest import ApiException
+    HAS_K8S_CLIENT = True
+except ImportError:
+    HAS_K8S_CLIENT = False
+
+try:
+    from urllib.parse import urlparse
+except ImportError:
+    from urlparse import urlparse
+
+DISCOVERY_DIR_ENV = 'KUBE_MODULES_DISCOVERY_DIR'
+DISCOVERY_TTL_ENV = 'KUBE_MODULES_DISCOVERY_TTL'
+DEFAULT_DISCOVERY_DIR = '~/.kube/cache'
+DEFAULT_TTL = 600
+
+# Name of a generated client API class: API group, in CamelCase, and version, e.g. RbacAuthorizationV1beta1Api
+API_CLASS_RX = re.compile(r'^(\w+?)(V\d+(?:alpha\d+|beta\d+)?)?Api$')
+
+# Documents read by this process, by cache file path, so modules run in-process share them
+MEMORY = {}
+MEMORY_LOCK = threading.Lock()
+
+
+class DiscoveryError(Exception):
+    pass
+
+
+class ResourceNotFoundError(DiscoveryError):
+    """ The server does not serve the kind """
+
+
+def api_request(api_client, method, path, query_params=None, headers=None, body=None, _preload_content=True,
+                _request_timeout=None):
+    """
+    Make a request to a path of the API server through api_client, with its credentials, and without
+    deserializing the response into a model.
+
+    :return: RESTResponse, with status, data and getheader(), or with _preload_content=False, the urllib3
+        response to read a stream from
+    """
+    header_params = dict(api_client.default_headers)
+    header_params.setdefault('Accept', 'application/json')
+    header_params.update(headers or {})
+    if body is not None:
+        header_params.setdefault('Content-Type', 'application/json')
+    query_params = list(query_params or [])
+    api_client.update_params_for_auth(header_params, query_params, ['BearerToken'])
+    return api_client.request(method, api_client.configuration.host + path, query_params=query_params,
+                              headers=header_params, body=body, _preload_content=_preload_content,
+                              _request_timeout=_request_timeout)
+
+
+def host_directory(host):
+    """ The directory name kubectl uses for a server URL, e.g. 10.0.0.1_8443 for https://10.0.0.1:8443 """
+    parsed = urlparse(host)
+    if parsed.netloc:
+        host = parsed.netloc + parsed.path.rstrip('/')
+    return re.sub(r'[^\w.]', '_', host)
+
+
+def kind_matches(kind, resource_kind):
+    """ True when kind, in CamelCase or snake_case, is resource_kind """
+    return kind == resource_kind or kind.replace('_', '').lower() == resource_kind.lower()
+
+
+class Resource(object):
+    """ A resource found by discovery, and the paths of its objects """
+
+    def __init__(self, api_version, prefix, resource):
+        self.api_version = api_version
+        self.prefix = prefix
+        self.kind = resource['kind']
+        self.name = resource['name']
+        self.namespaced = resource.get('namespaced', False)
+        self.verbs = resource.get('verbs') or []
+
+    def path(self, name=None, namespace=None):
+        """ The path of the collection in namespace, or of the named object in it """
+        parts = [self.prefix]
+        if self.namespaced and namespace:
+            parts.extend(['namespaces', namespace])
+        parts.append(self.name)
+        if name:
+            parts.append(name)
+        return '/'.join(parts)
+
+    def to_dict(self):
+        return dict(api_version=self.api_version, kind=self.kind, name=self.name, namespaced=self.namespaced,
+                    verbs=self.verbs)
+
+
+class DiscoveryCache(object):
+    """ Discovery documents and the OpenAPI schema of the cluster an API client points at """
+
+    def __init__(self, api_client, path=None, ttl=None):
+        if not HAS_K8S_CLIENT:
+            raise DiscoveryError("Discovery requires the kubernetes client. Try `pip install openshift`")
+        self.api_client = api_client
+        self.path = os.path.expanduser(path or os.environ.get(DISCOVERY_DIR_ENV) or DEFAULT_DISCOVERY_DIR)
+        if ttl is None:
+            try:
+                ttl = int(os.environ.get(DISCOVERY_TTL_ENV) or DEFAULT_TTL)
+            except ValueError:
+                raise DiscoveryError("{0} must be a number of seconds".format(DISCOVERY_TTL_ENV))
+        self.ttl = ttl
+        self.host = host_directory(api_client.configuration.host)
+        self.resources = {}
+        self.schemas = None
+        self._version = None
+
+    def _read(self, path):
+        with MEMORY_LOCK:
+            entry = MEMORY.get(path)
+        if entry is None:
+            try:
+                with open(path) as f:
+                    entry = json.load(f)
+            except (IOError, OSError, ValueError):
+                return None
+        return entry
+
+    def _write(self, path, entry):
+        with MEMORY_LOCK:
+            MEMORY[path] = entry
+        directory = os.path.dirname(path)
+        try:
+            if not os.path.isdir(directory):
+                os.makedirs(directory, 0o750)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.' + os.path.basename(path))
+            with os.fdopen(fd, 'w') as f:
+                json.dump(entry, f, separators=(',', ':'))
+            os.rename(tmp_path, path)
+        except (IOError, OSError):
+            # Another process created the directory, or it is not writable. Either way the cache is only an
+            # optimization, and the document is kept in memory.
+            pass
+
+    def fetch(self, api_path, cache_path, refresh=False):
+        """
+        Return the document at api_path, from the cache file cache_path when it is younger than the TTL,
+        otherwise from the server, revalidating with the cached ETag.
+
+        :param refresh: revalidate the cached document even when it is younger than the TTL
+        :return: the document, or None when the server does not serve api_path
+        """
+        path = os.path.join(self.path, cache_path)
+        entry = self._read(path)
+        if entry is not None and not refresh and entry['fetched'] + self.ttl > time.time():
+            return entry['data']
+        headers = {}
+        if entry is not None and entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        try:
+            response = api_request(self.api_client, 'GET', api_path, headers=headers)
+        except ApiException as exc:
+            if exc.status == 304 and entry is not None:
+                entry['fetched'] = time.time()
+                self._write(path, entry)
+                return entry['data']
+            if exc.status in (403, 404):
+                # Remember that the server does not serve the path, e.g. /oapi on Kubernetes
+                self._write(path, {'fetched': time.time(), 'etag': None, 'data': None})
+                return None
+            raise DiscoveryError("Discovery of {0} failed: {1} {2}".format(api_path, exc.status, exc.reason))
+        entry = {'fetched': time.time(), 'etag': response.getheader('ETag'), 'data': json.loads(response.data)}
+        self._write(path, entry)
+        return entry['data']
+
+    @property
+    def version(self):
+        """ The server's version, e.g. v1.7.6 """
+        if self._version is None:
+            info = self.fetch('/version', os.path.join('discovery', self.host, 'version.json')) or {}
+            self._version = re.sub(r'[^\w.+-]', '_', info.get('gitVersion') or 'unknown')
+        return self._version
+
+    def discovery_path(self, *parts):
+        return os.path.join('discovery', self.host, self.version, *parts)
+
+    def group_versions(self, refresh=False):
+        """ Return a dict of API group: list of group versions, the preferred version first """
+        result = {}
+        core = self.fetch('/api', self.discovery_path('api.json'), refresh) or {}
+        result[''] = core.get('versions') or []
+        groups = self.fetch('/apis', self.discovery_path('servergroups.json'), refresh) or {}
+        for group in groups.get('groups') or []:
+            preferred = (group.get('preferredVersion') or {}).get('groupVersion')
+            versions = [version['groupVersion'] for version in group.get('versions') or []]
+            result[group['name']] = sorted(versions, key=lambda version: version != preferred)
+        return result
+
+    def resource_list(self, prefix, group_version, refresh=False):
+        """ The resources served at prefix, e.g. /apis/apps/v1beta1, skipping subresources """
+        if refresh or prefix not in self.resources:
+            cache_path = self.discovery_path(*(prefix.strip('/').split('/') + ['serverresources.json']))
+            document = self.fetch(prefix, cache_path, refresh) or {}
+            self.resources[prefix] = [Resource(group_version, prefix, resource)
+                                      for resource in document.get('resources') or [] if '/' not in resource['name']]
+        return self.resources[prefix]
+
+    def prefixes(self, api_version, refresh=False):
+        """ The paths that may serve api_version. Legacy OpenShift kinds are served at /oapi/v1. """
+        if '/' in api_version:
+            group = api_version.split('/')[0]
+            if api_version not in self.group_versions(refresh).get(group, []):
+                return []
+            return ['/apis/' + api_version]
+        return ['/api/' + api_version, '/oapi/' + api_version]
+
+    def resolve(self, api_version, kind):
+        """
+        Find the resource of kind at api_version.
+
+        :param api_version: an apiVersion, e.g. v1 or stable.example.com/v1
+        :param kind: kind, in CamelCase or snake_case
+        :return: Resource
+        """
+        for refresh in (False, True):
+            for prefix in self.prefixes(api_version, refresh):
+                for resource in self.resource_list(prefix, api_version, refresh):
+                    if kind_matches(kind, resource.kind):
+                        return resource
+        raise ResourceNotFoundError("The server does not serve {0} at apiVersion {1}".format(kind, api_version))
+
+    def resolve_api_class(self, api_class_name, kind):
+        """
+        Find the resource of kind served by the API of a generated client class, for a kind that has a model.
+
+        :param api_class_name: name of the class of the model's API methods, e.g. RbacAuthorizationV1beta1Api
+        :param kind: kind, in CamelCase or snake_case
+        :return: Resource
+        """
+        match = API_CLASS_RX.match(api_class_name)
+        if not match:
+            raise ResourceNotFoundError("{0} is not the name of an API class".format(api_class_name))
+        group, version = match.group(1).lower(), (match.group(2) or 'v1').lower()
+        if group in ('core', 'oapi'):
+            return self.resolve(version, kind)
+        for name in self.group_versions():
+            # The classes of rbac.authorization.k8s.io are named RbacAuthorization
+            if re.sub(r'\.k8s\.io$', '', name).replace('.', '') == group:
+                return self.resolve('{0}/{1}'.format(name, version), kind)
+        raise ResourceNotFoundError("The server does not serve the API of {0}".format(api_class_name))
+
+    def openapi(self):
+        """ The server's OpenAPI document, from /openapi/v2, or /swagger.json on servers older than 1.8 """
+        cache_path = os.path.join('openapi', self.host, self.version)
+        document = self.fetch('/openapi/v2', os.path.join(cache_path, 'openapi.json'))
+        if document is None:
+            document = self.fetch('/swagger.json', os.path.join(cache_path, 'swagger.json'))
+        if document is None:
+            raise DiscoveryError("The server does not serve an OpenAPI document")
+        return document
+
+    def schema(self, api_version, kind):
+        """ The OpenAPI definition of kind at api_version, or None """
+        if self.schemas is None:
+            self.schemas = {}
+            for definition in (self.openapi().get('definitions') or {}).values():
+                for gvk in definition.get('x-kubernetes-group-version-kind') or []:
+                    group_version = '/'.join(part for part in (gvk.get('group'), gvk.get('version')) if part)
+                    self.schemas[(group_version, gvk.get('kind'))] = definition
+        return self.schemas.get((api_version, kind))
+
+
+class DiscoveryMixin(object):
+    """ Resolves kinds through the cached discovery of the cluster a KubernetesAnsibleModule points at """
+
+    discovery_cache = None
+
+    def get_discovery(self):
+        """
+        Return the discovery cache of the cluster the module's API client points at. Call after
+        configure_client().
+
+        :return: DiscoveryCache
+        """
+        if self.discovery_cache is None:
+            try:
+                self.discovery_cache = DiscoveryCache(self.helper.api_client)
+            except DiscoveryError as exc:
+                self.fail_json(msg=str(exc))
+        return self.discovery_cache
+
+    def resolve_resource(self, api_version, kind):
+        """
+        Find the resource that serves kind at api_version through cached discovery, for kinds with no
+        generated model, such as custom resources.
+
+        :param api_version: an apiVersion, e.g. v1 or stable.example.com/v1
+        :param kind: kind, in CamelCase or snake_case
+        :return: Resource
+        """
+        with self.phase('discovery'):
+            try:
+                return self.get_discovery().resolve(api_version, kind)
+            except DiscoveryError as exc:
+                self.fail_json(msg=str(exc))
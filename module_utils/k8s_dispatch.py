@@ -0,0 +1,58 @@
+#
+#  Copyright 2017 Red Hat | Ansible
+#
+# This file is part of Ansible
+#
+# Ansible is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Ansible is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Ansible.  If not, see <http://www.gnu.org/licenses/>.
+
+from ansible.module_utils.k8s_common import KubernetesAnsibleException
+
+# Mixins added to the class of every module run by dispatch(). The local action plugin sets these when it
+# runs a module in-process, so controller-only options reach the generated modules.
+EXTRA_MIXINS = ()
+
+
+def module_class_with(base_class, *mixins):
+    """ Return base_class extended with mixins, keeping the name of base_class """
+    mixins = mixins + tuple(EXTRA_MIXINS)
+    # Drop the mixins that base_class or another mixin already extends, which would break the MRO
+    mixins = tuple(mixin for mixin in mixins if not issubclass(base_class, mixin) and
+                   not any(other is not mixin and issubclass(other, mixin) for other in mixins))
+    if not mixins:
+        return base_class
+    return type(base_class.__name__, mixins + (base_class,), {})
+
+
+def dispatch(module_class, kind, api_version, *mixins):
+    """
+    Run a module that manages kind at api_version.
+
+    :param module_class: the module_utils class that runs the module
+    :param kind: kind, in snake_case, e.g. pod
+    :param api_version: version of the API, e.g. v1
+    :param mixins: optional classes that extend module_class
+    :return: None
+    """
+    module_class = module_class_with(module_class, *mixins)
+
+    try:
+        module = module_class(kind, api_version)
+    except KubernetesAnsibleException as exc:
+        # The helper failed to init, so there is no module object. All we can do is raise the error.
+        raise Exception(str(exc))
+
+    try:
+        module.execute_module()
+    except KubernetesAnsibleException as exc:
+        module.fail_json(msg="Module failed!", error=str(exc))
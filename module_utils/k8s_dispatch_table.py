@@ -0,0 +1,465 @@
+#
+#  Copyright 2017 Red Hat | Ansible
+#
+# This file is part of Ansible
+#
+# Ansible is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Ansible is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Ansible.  If not, see <http://www.gnu.org/licenses/>.
+
+# This file is generated by hacking/build_dispatch.py. Do not edit it by hand.
+
+# module name: (kind, api_version, family)
+DISPATCH_TABLE = {
+    'k8s_apps_v1beta1_deployment':
+        ('deployment', 'apps_v1beta1', 'k8s'),
+    'k8s_apps_v1beta1_deployment_list':
+        ('deployment_list', 'apps_v1beta1', 'k8s'),
+    'k8s_apps_v1beta1_scale':
+        ('scale', 'apps_v1beta1', 'k8s'),
+    'k8s_extensions_v1beta1_deployment':
+        ('deployment', 'extensions_v1beta1', 'k8s'),
+    'k8s_extensions_v1beta1_deployment_list':
+        ('deployment_list', 'extensions_v1beta1', 'k8s'),
+    'k8s_extensions_v1beta1_scale':
+        ('scale', 'extensions_v1beta1', 'k8s'),
+    'k8s_v1_binding':
+        ('binding', 'v1', 'k8s'),
+    'k8s_v1_cluster_role':
+        ('cluster_role', 'v1', 'k8s'),
+    'k8s_v1_cluster_role_binding':
+        ('cluster_role_binding', 'v1', 'k8s'),
+    'k8s_v1_cluster_role_binding_list':
+        ('cluster_role_binding_list', 'v1', 'k8s'),
+    'k8s_v1_cluster_role_list':
+        ('cluster_role_list', 'v1', 'k8s'),
+    'k8s_v1_component_status':
+        ('component_status', 'v1', 'k8s'),
+    'k8s_v1_component_status_list':
+        ('component_status_list', 'v1', 'k8s'),
+    'k8s_v1_config_map':
+        ('config_map', 'v1', 'k8s'),
+    'k8s_v1_config_map_list':
+        ('config_map_list', 'v1', 'k8s'),
+    'k8s_v1_endpoints':
+        ('endpoints', 'v1', 'k8s'),
+    'k8s_v1_endpoints_list':
+        ('endpoints_list', 'v1', 'k8s'),
+    'k8s_v1_event':
+        ('event', 'v1', 'k8s'),
+    'k8s_v1_event_list':
+        ('event_list', 'v1', 'k8s'),
+    'k8s_v1_horizontal_pod_autoscaler':
+        ('horizontal_pod_autoscaler', 'v1', 'k8s'),
+    'k8s_v1_horizontal_pod_autoscaler_list':
+        ('horizontal_pod_autoscaler_list', 'v1', 'k8s'),
+    'k8s_v1_job':
+        ('job', 'v1', 'k8s'),
+    'k8s_v1_job_list':
+        ('job_list', 'v1', 'k8s'),
+    'k8s_v1_limit_range':
+        ('limit_range', 'v1', 'k8s'),
+    'k8s_v1_limit_range_list':
+        ('limit_range_list', 'v1', 'k8s'),
+    'k8s_v1_local_subject_access_review':
+        ('local_subject_access_review', 'v1', 'k8s'),
+    'k8s_v1_namespace':
+        ('namespace', 'v1', 'k8s'),
+    'k8s_v1_namespace_list':
+        ('namespace_list', 'v1', 'k8s'),
+    'k8s_v1_network_policy':
+        ('network_policy', 'v1', 'k8s'),
+    'k8s_v1_network_policy_list':
+        ('network_policy_list', 'v1', 'k8s'),
+    'k8s_v1_node':
+        ('node', 'v1', 'k8s'),
+    'k8s_v1_node_list':
+        ('node_list', 'v1', 'k8s'),
+    'k8s_v1_persistent_volume':
+        ('persistent_volume', 'v1', 'k8s'),
+    'k8s_v1_persistent_volume_claim':
+        ('persistent_volume_claim', 'v1', 'k8s'),
+    'k8s_v1_persistent_volume_claim_list':
+        ('persistent_volume_claim_list', 'v1', 'k8s'),
+    'k8s_v1_persistent_volume_list':
+        ('persistent_volume_list', 'v1', 'k8s'),
+    'k8s_v1_pod':
+        ('pod', 'v1', 'k8s'),
+    'k8s_v1_pod_list':
+        ('pod_list', 'v1', 'k8s'),
+    'k8s_v1_pod_template':
+        ('pod_template', 'v1', 'k8s'),
+    'k8s_v1_pod_template_list':
+        ('pod_template_list', 'v1', 'k8s'),
+    'k8s_v1_replication_controller':
+        ('replication_controller', 'v1', 'k8s'),
+    'k8s_v1_replication_controller_list':
+        ('replication_controller_list', 'v1', 'k8s'),
+    'k8s_v1_resource_quota':
+        ('resource_quota', 'v1', 'k8s'),
+    'k8s_v1_resource_quota_list':
+        ('resource_quota_list', 'v1', 'k8s'),
+    'k8s_v1_role':
+        ('role', 'v1', 'k8s'),
+    'k8s_v1_role_binding':
+        ('role_binding', 'v1', 'k8s'),
+    'k8s_v1_role_binding_list':
+        ('role_binding_list', 'v1', 'k8s'),
+    'k8s_v1_role_list':
+        ('role_list', 'v1', 'k8s'),
+    'k8s_v1_scale':
+        ('scale', 'v1', 'k8s'),
+    'k8s_v1_secret':
+        ('secret', 'v1', 'k8s'),
+    'k8s_v1_secret_list':
+        ('secret_list', 'v1', 'k8s'),
+    'k8s_v1_self_subject_access_review':
+        ('self_subject_access_review', 'v1', 'k8s'),
+    'k8s_v1_self_subject_rules_review':
+        ('self_subject_rules_review', 'v1', 'k8s'),
+    'k8s_v1_service':
+        ('service', 'v1', 'k8s'),
+    'k8s_v1_service_account':
+        ('service_account', 'v1', 'k8s'),
+    'k8s_v1_service_account_list':
+        ('service_account_list', 'v1', 'k8s'),
+    'k8s_v1_service_list':
+        ('service_list', 'v1', 'k8s'),
+    'k8s_v1_status':
+        ('status', 'v1', 'k8s'),
+    'k8s_v1_storage_class':
+        ('storage_class', 'v1', 'k8s'),
+    'k8s_v1_storage_class_list':
+        ('storage_class_list', 'v1', 'k8s'),
+    'k8s_v1_subject_access_review':
+        ('subject_access_review', 'v1', 'k8s'),
+    'k8s_v1_token_review':
+        ('token_review', 'v1', 'k8s'),
+    'k8s_v1alpha1_cluster_role':
+        ('cluster_role', 'v1alpha1', 'k8s'),
+    'k8s_v1alpha1_cluster_role_binding':
+        ('cluster_role_binding', 'v1alpha1', 'k8s'),
+    'k8s_v1alpha1_cluster_role_binding_list':
+        ('cluster_role_binding_list', 'v1alpha1', 'k8s'),
+    'k8s_v1alpha1_cluster_role_list':
+        ('cluster_role_list', 'v1alpha1', 'k8s'),
+    'k8s_v1alpha1_external_admission_hook_configuration':
+        ('external_admission_hook_configuration', 'v1alpha1', 'k8s'),
+    'k8s_v1alpha1_external_admission_hook_configuration_list':
+        ('external_admission_hook_configuration_list', 'v1alpha1', 'k8s'),
+    'k8s_v1alpha1_initializer_configuration':
+        ('initializer_configuration', 'v1alpha1', 'k8s'),
+    'k8s_v1alpha1_initializer_configuration_list':
+        ('initializer_configuration_list', 'v1alpha1', 'k8s'),
+    'k8s_v1alpha1_pod_preset':
+        ('pod_preset', 'v1alpha1', 'k8s'),
+    'k8s_v1alpha1_pod_preset_list':
+        ('pod_preset_list', 'v1alpha1', 'k8s'),
+    'k8s_v1alpha1_priority_class':
+        ('priority_class', 'v1alpha1', 'k8s'),
+    'k8s_v1alpha1_priority_class_list':
+        ('priority_class_list', 'v1alpha1', 'k8s'),
+    'k8s_v1alpha1_role':
+        ('role', 'v1alpha1', 'k8s'),
+    'k8s_v1alpha1_role_binding':
+        ('role_binding', 'v1alpha1', 'k8s'),
+    'k8s_v1alpha1_role_binding_list':
+        ('role_binding_list', 'v1alpha1', 'k8s'),
+    'k8s_v1alpha1_role_list':
+        ('role_list', 'v1alpha1', 'k8s'),
+    'k8s_v1beta1_api_service':
+        ('api_service', 'v1beta1', 'k8s'),
+    'k8s_v1beta1_api_service_list':
+        ('api_service_list', 'v1beta1', 'k8s'),
+    'k8s_v1beta1_certificate_signing_request':
+        ('certificate_signing_request', 'v1beta1', 'k8s'),
+    'k8s_v1beta1_certificate_signing_request_list':
+        ('certificate_signing_request_list', 'v1beta1', 'k8s'),
+    'k8s_v1beta1_cluster_role':
+        ('cluster_role', 'v1beta1', 'k8s'),
+    'k8s_v1beta1_cluster_role_binding':
+        ('cluster_role_binding', 'v1beta1', 'k8s'),
+    'k8s_v1beta1_cluster_role_binding_list':
+        ('cluster_role_binding_list', 'v1beta1', 'k8s'),
+    'k8s_v1beta1_cluster_role_list':
+        ('cluster_role_list', 'v1beta1', 'k8s'),
+    'k8s_v1beta1_controller_revision':
+        ('controller_revision', 'v1beta1', 'k8s'),
+    'k8s_v1beta1_controller_revision_list':
+        ('controller_revision_list', 'v1beta1', 'k8s'),
+    'k8s_v1beta1_cron_job':
+        ('cron_job', 'v1beta1', 'k8s'),
+    'k8s_v1beta1_cron_job_list':
+        ('cron_job_list', 'v1beta1', 'k8s'),
+    'k8s_v1beta1_custom_resource_definition':
+        ('custom_resource_definition', 'v1beta1', 'k8s'),
+    'k8s_v1beta1_custom_resource_definition_list':
+        ('custom_resource_definition_list', 'v1beta1', 'k8s'),
+    'k8s_v1beta1_daemon_set':
+        ('daemon_set', 'v1beta1', 'k8s'),
+    'k8s_v1beta1_daemon_set_list':
+        ('daemon_set_list', 'v1beta1', 'k8s'),
+    'k8s_v1beta1_eviction':
+        ('eviction', 'v1beta1', 'k8s'),
+    'k8s_v1beta1_ingress':
+        ('ingress', 'v1beta1', 'k8s'),
+    'k8s_v1beta1_ingress_list':
+        ('ingress_list', 'v1beta1', 'k8s'),
+    'k8s_v1beta1_local_subject_access_review':
+        ('local_subject_access_review', 'v1beta1', 'k8s'),
+    'k8s_v1beta1_network_policy':
+        ('network_policy', 'v1beta1', 'k8s'),
+    'k8s_v1beta1_network_policy_list':
+        ('network_policy_list', 'v1beta1', 'k8s'),
+    'k8s_v1beta1_pod_disruption_budget':
+        ('pod_disruption_budget', 'v1beta1', 'k8s'),
+    'k8s_v1beta1_pod_disruption_budget_list':
+        ('pod_disruption_budget_list', 'v1beta1', 'k8s'),
+    'k8s_v1beta1_pod_security_policy':
+        ('pod_security_policy', 'v1beta1', 'k8s'),
+    'k8s_v1beta1_pod_security_policy_list':
+        ('pod_security_policy_list', 'v1beta1', 'k8s'),
+    'k8s_v1beta1_replica_set':
+        ('replica_set', 'v1beta1', 'k8s'),
+    'k8s_v1beta1_replica_set_list':
+        ('replica_set_list', 'v1beta1', 'k8s'),
+    'k8s_v1beta1_role':
+        ('role', 'v1beta1', 'k8s'),
+    'k8s_v1beta1_role_binding':
+        ('role_binding', 'v1beta1', 'k8s'),
+    'k8s_v1beta1_role_binding_list':
+        ('role_binding_list', 'v1beta1', 'k8s'),
+    'k8s_v1beta1_role_list':
+        ('role_list', 'v1beta1', 'k8s'),
+    'k8s_v1beta1_self_subject_access_review':
+        ('self_subject_access_review', 'v1beta1', 'k8s'),
+    'k8s_v1beta1_self_subject_rules_review':
+        ('self_subject_rules_review', 'v1beta1', 'k8s'),
+    'k8s_v1beta1_stateful_set':
+        ('stateful_set', 'v1beta1', 'k8s'),
+    'k8s_v1beta1_stateful_set_list':
+        ('stateful_set_list', 'v1beta1', 'k8s'),
+    'k8s_v1beta1_storage_class':
+        ('storage_class', 'v1beta1', 'k8s'),
+    'k8s_v1beta1_storage_class_list':
+        ('storage_class_list', 'v1beta1', 'k8s'),
+    'k8s_v1beta1_subject_access_review':
+        ('subject_access_review', 'v1beta1', 'k8s'),
+    'k8s_v1beta1_token_review':
+        ('token_review', 'v1beta1', 'k8s'),
+    'k8s_v1beta2_controller_revision':
+        ('controller_revision', 'v1beta2', 'k8s'),
+    'k8s_v1beta2_controller_revision_list':
+        ('controller_revision_list', 'v1beta2', 'k8s'),
+    'k8s_v1beta2_daemon_set':
+        ('daemon_set', 'v1beta2', 'k8s'),
+    'k8s_v1beta2_daemon_set_list':
+        ('daemon_set_list', 'v1beta2', 'k8s'),
+    'k8s_v1beta2_deployment':
+        ('deployment', 'v1beta2', 'k8s'),
+    'k8s_v1beta2_deployment_list':
+        ('deployment_list', 'v1beta2', 'k8s'),
+    'k8s_v1beta2_replica_set':
+        ('replica_set', 'v1beta2', 'k8s'),
+    'k8s_v1beta2_replica_set_list':
+        ('replica_set_list', 'v1beta2', 'k8s'),
+    'k8s_v1beta2_scale':
+        ('scale', 'v1beta2', 'k8s'),
+    'k8s_v1beta2_stateful_set':
+        ('stateful_set', 'v1beta2', 'k8s'),
+    'k8s_v1beta2_stateful_set_list':
+        ('stateful_set_list', 'v1beta2', 'k8s'),
+    'k8s_v2alpha1_cron_job':
+        ('cron_job', 'v2alpha1', 'k8s'),
+    'k8s_v2alpha1_cron_job_list':
+        ('cron_job_list', 'v2alpha1', 'k8s'),
+    'k8s_v2beta1_horizontal_pod_autoscaler':
+        ('horizontal_pod_autoscaler', 'v2beta1', 'k8s'),
+    'k8s_v2beta1_horizontal_pod_autoscaler_list':
+        ('horizontal_pod_autoscaler_list', 'v2beta1', 'k8s'),
+    'openshift_v1_applied_cluster_resource_quota':
+        ('applied_cluster_resource_quota', 'v1', 'openshift'),
+    'openshift_v1_applied_cluster_resource_quota_list':
+        ('applied_cluster_resource_quota_list', 'v1', 'openshift'),
+    'openshift_v1_broker_template_instance':
+        ('broker_template_instance', 'v1', 'openshift'),
+    'openshift_v1_broker_template_instance_list':
+        ('broker_template_instance_list', 'v1', 'openshift'),
+    'openshift_v1_build':
+        ('build', 'v1', 'openshift'),
+    'openshift_v1_build_config':
+        ('build_config', 'v1', 'openshift'),
+    'openshift_v1_build_config_list':
+        ('build_config_list', 'v1', 'openshift'),
+    'openshift_v1_build_list':
+        ('build_list', 'v1', 'openshift'),
+    'openshift_v1_build_request':
+        ('build_request', 'v1', 'openshift'),
+    'openshift_v1_cluster_network':
+        ('cluster_network', 'v1', 'openshift'),
+    'openshift_v1_cluster_network_list':
+        ('cluster_network_list', 'v1', 'openshift'),
+    'openshift_v1_cluster_resource_quota':
+        ('cluster_resource_quota', 'v1', 'openshift'),
+    'openshift_v1_cluster_resource_quota_list':
+        ('cluster_resource_quota_list', 'v1', 'openshift'),
+    'openshift_v1_cluster_role':
+        ('cluster_role', 'v1', 'openshift'),
+    'openshift_v1_cluster_role_binding':
+        ('cluster_role_binding', 'v1', 'openshift'),
+    'openshift_v1_cluster_role_binding_list':
+        ('cluster_role_binding_list', 'v1', 'openshift'),
+    'openshift_v1_cluster_role_list':
+        ('cluster_role_list', 'v1', 'openshift'),
+    'openshift_v1_controller_revision':
+        ('controller_revision', 'v1', 'openshift'),
+    'openshift_v1_controller_revision_list':
+        ('controller_revision_list', 'v1', 'openshift'),
+    'openshift_v1_daemon_set':
+        ('daemon_set', 'v1', 'openshift'),
+    'openshift_v1_daemon_set_list':
+        ('daemon_set_list', 'v1', 'openshift'),
+    'openshift_v1_deployment':
+        ('deployment', 'v1', 'openshift'),
+    'openshift_v1_deployment_config':
+        ('deployment_config', 'v1', 'openshift'),
+    'openshift_v1_deployment_config_list':
+        ('deployment_config_list', 'v1', 'openshift'),
+    'openshift_v1_deployment_config_rollback':
+        ('deployment_config_rollback', 'v1', 'openshift'),
+    'openshift_v1_deployment_list':
+        ('deployment_list', 'v1', 'openshift'),
+    'openshift_v1_egress_network_policy':
+        ('egress_network_policy', 'v1', 'openshift'),
+    'openshift_v1_egress_network_policy_list':
+        ('egress_network_policy_list', 'v1', 'openshift'),
+    'openshift_v1_group':
+        ('group', 'v1', 'openshift'),
+    'openshift_v1_group_list':
+        ('group_list', 'v1', 'openshift'),
+    'openshift_v1_host_subnet':
+        ('host_subnet', 'v1', 'openshift'),
+    'openshift_v1_host_subnet_list':
+        ('host_subnet_list', 'v1', 'openshift'),
+    'openshift_v1_identity':
+        ('identity', 'v1', 'openshift'),
+    'openshift_v1_identity_list':
+        ('identity_list', 'v1', 'openshift'),
+    'openshift_v1_image':
+        ('image', 'v1', 'openshift'),
+    'openshift_v1_image_list':
+        ('image_list', 'v1', 'openshift'),
+    'openshift_v1_image_signature':
+        ('image_signature', 'v1', 'openshift'),
+    'openshift_v1_image_stream':
+        ('image_stream', 'v1', 'openshift'),
+    'openshift_v1_image_stream_image':
+        ('image_stream_image', 'v1', 'openshift'),
+    'openshift_v1_image_stream_import':
+        ('image_stream_import', 'v1', 'openshift'),
+    'openshift_v1_image_stream_list':
+        ('image_stream_list', 'v1', 'openshift'),
+    'openshift_v1_image_stream_mapping':
+        ('image_stream_mapping', 'v1', 'openshift'),
+    'openshift_v1_image_stream_tag':
+        ('image_stream_tag', 'v1', 'openshift'),
+    'openshift_v1_image_stream_tag_list':
+        ('image_stream_tag_list', 'v1', 'openshift'),
+    'openshift_v1_net_namespace':
+        ('net_namespace', 'v1', 'openshift'),
+    'openshift_v1_net_namespace_list':
+        ('net_namespace_list', 'v1', 'openshift'),
+    'openshift_v1_o_auth_access_token':
+        ('o_auth_access_token', 'v1', 'openshift'),
+    'openshift_v1_o_auth_access_token_list':
+        ('o_auth_access_token_list', 'v1', 'openshift'),
+    'openshift_v1_o_auth_authorize_token':
+        ('o_auth_authorize_token', 'v1', 'openshift'),
+    'openshift_v1_o_auth_authorize_token_list':
+        ('o_auth_authorize_token_list', 'v1', 'openshift'),
+    'openshift_v1_o_auth_client':
+        ('o_auth_client', 'v1', 'openshift'),
+    'openshift_v1_o_auth_client_authorization':
+        ('o_auth_client_authorization', 'v1', 'openshift'),
+    'openshift_v1_o_auth_client_authorization_list':
+        ('o_auth_client_authorization_list', 'v1', 'openshift'),
+    'openshift_v1_o_auth_client_list':
+        ('o_auth_client_list', 'v1', 'openshift'),
+    'openshift_v1_pod_security_policy_review':
+        ('pod_security_policy_review', 'v1', 'openshift'),
+    'openshift_v1_pod_security_policy_self_subject_review':
+        ('pod_security_policy_self_subject_review', 'v1', 'openshift'),
+    'openshift_v1_pod_security_policy_subject_review':
+        ('pod_security_policy_subject_review', 'v1', 'openshift'),
+    'openshift_v1_project':
+        ('project', 'v1', 'openshift'),
+    'openshift_v1_project_list':
+        ('project_list', 'v1', 'openshift'),
+    'openshift_v1_replica_set':
+        ('replica_set', 'v1', 'openshift'),
+    'openshift_v1_replica_set_list':
+        ('replica_set_list', 'v1', 'openshift'),
+    'openshift_v1_role':
+        ('role', 'v1', 'openshift'),
+    'openshift_v1_role_binding':
+        ('role_binding', 'v1', 'openshift'),
+    'openshift_v1_role_binding_list':
+        ('role_binding_list', 'v1', 'openshift'),
+    'openshift_v1_role_binding_restriction':
+        ('role_binding_restriction', 'v1', 'openshift'),
+    'openshift_v1_role_binding_restriction_list':
+        ('role_binding_restriction_list', 'v1', 'openshift'),
+    'openshift_v1_role_list':
+        ('role_list', 'v1', 'openshift'),
+    'openshift_v1_route':
+        ('route', 'v1', 'openshift'),
+    'openshift_v1_route_list':
+        ('route_list', 'v1', 'openshift'),
+    'openshift_v1_security_context_constraints':
+        ('security_context_constraints', 'v1', 'openshift'),
+    'openshift_v1_security_context_constraints_list':
+        ('security_context_constraints_list', 'v1', 'openshift'),
+    'openshift_v1_self_subject_rules_review':
+        ('self_subject_rules_review', 'v1', 'openshift'),
+    'openshift_v1_stateful_set':
+        ('stateful_set', 'v1', 'openshift'),
+    'openshift_v1_stateful_set_list':
+        ('stateful_set_list', 'v1', 'openshift'),
+    'openshift_v1_subject_rules_review':
+        ('subject_rules_review', 'v1', 'openshift'),
+    'openshift_v1_template':
+        ('template', 'v1', 'openshift'),
+    'openshift_v1_template_instance':
+        ('template_instance', 'v1', 'openshift'),
+    'openshift_v1_template_instance_list':
+        ('template_instance_list', 'v1', 'openshift'),
+    'openshift_v1_template_list':
+        ('template_list', 'v1', 'openshift'),
+    'openshift_v1_user':
+        ('user', 'v1', 'openshift'),
+    'openshift_v1_user_identity_mapping':
+        ('user_identity_mapping', 'v1', 'openshift'),
+    'openshift_v1_user_list':
+        ('user_list', 'v1', 'openshift'),
+    'openshift_v1beta1_event':
+        ('event', 'v1beta1', 'openshift'),
+    'openshift_v1beta1_event_list':
+        ('event_list', 'v1beta1', 'openshift'),
+    'openshift_v1beta1_mutating_webhook_configuration':
+        ('mutating_webhook_configuration', 'v1beta1', 'openshift'),
+    'openshift_v1beta1_mutating_webhook_configuration_list':
+        ('mutating_webhook_configuration_list', 'v1beta1', 'openshift'),
+    'openshift_v1beta1_validating_webhook_configuration':
+        ('validating_webhook_configuration', 'v1beta1', 'openshift'),
+    'openshift_v1beta1_validating_webhook_configuration_list':
+        ('validating_webhook_configuration_list', 'v1beta1', 'openshift'),
+}
@@ -0,0 +1,379 @@
+#
+#  Copyright 2017 Red Hat | Ansible
+#
+# This file is part of Ansible
+#
+# Ansible is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Ansible is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Ansible.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Drains a node, as kubectl drain does: cordons it, then evicts its pods through the eviction subresource, so
+that PodDisruptionBudgets are honored.
+
+Evictions are issued concurrently, in rounds. Each round reads the budgets, and evicts the pods whose budgets
+all have headroom, up to that headroom, leaving the others for a later round, once the replacements of the
+pods evicted so far are ready and the budgets allow more disruptions. A 429 from the server, when a budget
+changed between the read and the eviction, is retried with exponential backoff. The pods are tracked to their
+deletion with a single watch of the node's pods, rather than a poll of each pod.
+"""
+
+import random
+import threading
+import time
+
+from ansible.module_utils.k8s_common import KubernetesAnsibleModule
+from ansible.module_utils.k8s_discovery import Resource, api_request
+from ansible.module_utils.k8s_engine import DEFAULT_WORKERS, restart_watch
+from ansible.module_utils.k8s_mixins import KubernetesModuleMixin
+from ansible.module_utils.k8s_raw import RawResourceHelper, error_message
+
+try:
+    from openshift.helper.exceptions import KubernetesException
+    from kubernetes.client.rest import ApiException
+    HAS_K8S_MODULE_HELPER = True
+except ImportError:
+    HAS_K8S_MODULE_HELPER = False
+
+DEFAULT_DRAIN_TIMEOUT = 600
+
+# Longest wait between retries of an eviction refused with a 429
+MAX_BACKOFF = 30
+
+# Seconds between reads of the budgets, while none of the remaining pods may be evicted
+BUDGET_POLL_INTERVAL = 2
+
+# Seconds each watch of the node's pods lasts before it is started again
+WATCH_TIMEOUT = 60
+
+MIRROR_ANNOTATION = 'kubernetes.io/config.mirror'
+
+PODS = Resource('v1', '/api/v1', {'kind': 'Pod', 'name': 'pods', 'namespaced': True})
+NODES = Resource('v1', '/api/v1', {'kind': 'Node', 'name': 'nodes', 'namespaced': False})
+BUDGETS = Resource('policy/v1beta1', '/apis/policy/v1beta1', {'kind': 'PodDisruptionBudget',
+                                                              'name': 'poddisruptionbudgets', 'namespaced': True})
+
+
+def selector_matches(selector, labels):
+    """
+    True when a label selector, a dict of matchLabels and matchExpressions, selects labels. An empty selector
+    selects nothing, as it does for a PodDisruptionBudget.
+    """
+    selector = selector or {}
+    if not selector.get('matchLabels') and not selector.get('matchExpressions'):
+        return False
+    labels = labels or {}
+    for key, value in (selector.get('matchLabels') or {}).items():
+        if labels.get(key) != value:
+            return False
+    for expression in selector.get('matchExpressions') or []:
+        key, operator, values = expression.get('key'), expression.get('operator'), expression.get('values') or []
+        if operator == 'In' and labels.get(key) not in values:
+            return False
+        if operator == 'NotIn' and key in labels and labels[key] in values:
+            return False
+        if operator == 'Exists' and key not in labels:
+            return False
+        if operator == 'DoesNotExist' and key in labels:
+            return False
+    return True
+
+
+def pod_ref(pod, **fields):
+    metadata = pod['metadata']
+    return dict(fields, name=metadata['name'], namespace=metadata.get('namespace'))
+
+
+def controller_of(pod):
+    """ The owner reference of the pod's controller, or None """
+    for reference in pod['metadata'].get('ownerReferences') or []:
+        if reference.get('controller'):
+            return reference
+    return None
+
+
+def classify_pods(pods, force=False, delete_local_data=False):
+    """
+    Sort the pods of a node as kubectl drain does.
+
+    :return: tuple of (pods to evict, refs of pods skipped, refs of pods that prevent the drain), each ref
+        with the reason
+    """
+    evict, skipped, blocking = [], [], []
+    for pod in pods:
+        metadata = pod['metadata']
+        controller = controller_of(pod)
+        if MIRROR_ANNOTATION in (metadata.get('annotations') or {}):
+            skipped.append(pod_ref(pod, reason="mirror pod, managed by the kubelet"))
+        elif controller and controller.get('kind') == 'DaemonSet':
+            skipped.append(pod_ref(pod, reason="managed by DaemonSet {0}".format(controller.get('name'))))
+        elif not controller and not force:
+            blocking.append(pod_ref(pod, reason="not managed by a controller, set force to delete it"))
+        elif any('emptyDir' in volume for volume in (pod.get('spec') or {}).get('volumes') or []) and \
+                not delete_local_data:
+            blocking.append(pod_ref(pod, reason="uses emptyDir volumes, set delete_local_data to delete it"))
+        else:
+            evict.append(pod)
+    return evict, skipped, blocking
+
+
+def schedule_evictions(pods, budgets):
+    """
+    Choose the pods that may be evicted now: those whose budgets, in the same namespace, all allow one more
+    disruption, counting the pods already chosen.
+
+    :return: tuple of (pods to evict now, pods to evict later)
+    """
+    headroom = dict((budget['metadata']['uid'], (budget.get('status') or {}).get('disruptionsAllowed', 0))
+                    for budget in budgets)
+    now, later = [], []
+    for pod in pods:
+        metadata = pod['metadata']
+        covering = [budget['metadata']['uid'] for budget in budgets
+                    if budget['metadata'].get('namespace') == metadata.get('namespace') and
+                    selector_matches((budget.get('spec') or {}).get('selector'), metadata.get('labels'))]
+        if all(headroom[uid] > 0 for uid in covering):
+            for uid in covering:
+                headroom[uid] -= 1
+            now.append(pod)
+        else:
+            later.append(pod)
+    return now, later
+
+
+class TerminationWatch(object):
+    """
+    Records the deletion of the pods of a node, by uid, with one watch of all the node's pods. The watch is
+    restarted when it expires or its connection drops. Any other error stops it, and is raised by wait().
+    """
+
+    def __init__(self, helper, node, pods, resource_version):
+        self.helper = helper
+        self.field_selector = 'spec.nodeName={0}'.format(node)
+        self.known = set(pod['metadata']['uid'] for pod in pods)
+        self.resource_version = resource_version
+        self.deleted = set()
+        self.condition = threading.Condition()
+        self.stopped = False
+        self.error = None
+
+    def start(self):
+        thread = threading.Thread(target=self.run)
+        thread.daemon = True
+        thread.start()
+        return self
+
+    def stop(self):
+        self.stopped = True
+
+    def mark_deleted(self, uids):
+        with self.condition:
+            self.deleted.update(uids)
+            self.condition.notify_all()
+
+    def run(self):
+        resource_version = self.resource_version
+        while not self.stopped:
+            try:
+                if resource_version is None:
+                    # Start again from the current pods. Those no longer listed were deleted meanwhile.
+                    items, resource_version = self.helper.list_objects(fieldSelector=self.field_selector)
+                    self.mark_deleted(self.known - set(item['metadata']['uid'] for item in items))
+                events = self.helper.watch(None, resource_version, WATCH_TIMEOUT, fieldSelector=self.field_selector)
+                try:
+                    for event in events:
+                        obj = event.get('object') or {}
+                        if event.get('type') == 'ERROR':
+                            # The resourceVersion expired
+                            raise KubernetesException(obj.get('message', 'watch failed'), status=obj.get('code'))
+                        resource_version = obj['metadata'].get('resourceVersion')
+                        if event['type'] == 'DELETED':
+                            self.mark_deleted([obj['metadata']['uid']])
+                        if self.stopped:
+                            break
+                finally:
+                    events.close()
+            except Exception as exc:
+                if not restart_watch(exc):
+                    with self.condition:
+                        self.error = exc
+                        self.condition.notify_all()
+                    return
+                resource_version = None
+                time.sleep(1)
+
+    def wait(self, uids, deadline):
+        """
+        Wait for the pods with uids to be deleted. Returns the uids of those that were not by the deadline. Raises
+        the error that stopped the watch before then.
+        """
+        uids = set(uids)
+        with self.condition:
+            while not uids <= self.deleted and time.time() < deadline:
+                if self.error is not None:
+                    raise self.error
+                self.condition.wait(deadline - time.time())
+            return uids - self.deleted
+
+
+class KubernetesDrainModule(KubernetesModuleMixin, KubernetesAnsibleModule):
+    """ Cordons, drains and uncordons nodes """
+
+    def __init__(self):
+        self.drain_argspec = {
+            'node': {'required': True},
+            'state': {'default': 'drained', 'choices': ['drained', 'cordoned', 'uncordoned']},
+            'force': {'type': 'bool', 'default': False},
+            'delete_local_data': {'type': 'bool', 'default': False},
+            'grace_period': {'type': 'int'},
+            'timeout': {'type': 'int', 'default': DEFAULT_DRAIN_TIMEOUT},
+            'wait': {'type': 'bool', 'default': True},
+            'workers': {'type': 'int', 'default': DEFAULT_WORKERS},
+        }
+        super(KubernetesDrainModule, self).__init__('pod', 'v1')
+
+    @property
+    def argspec(self):
+        if not self.argspec_cache:
+            spec = self.auth_argspec
+            spec.update(self.drain_argspec)
+            self.argspec_cache = spec
+        return self.argspec_cache
+
+    def evict(self, pod, deadline):
+        """
+        Evict a pod, retrying while the server answers 429, as it does when a budget allows no more
+        disruptions. Returns False when the pod no longer exists.
+        """
+        ref = pod_ref(pod)
+        body = {'apiVersion': 'policy/v1beta1', 'kind': 'Eviction', 'metadata': ref}
+        if self.params.get('grace_period') is not None:
+            body['deleteOptions'] = {'gracePeriodSeconds': self.params['grace_period']}
+        path = PODS.path(ref['name'], ref['namespace']) + '/eviction'
+        delay = 1
+        while True:
+            try:
+                api_request(self.helper.api_client, 'POST', path, body=body)
+                return True
+            except ApiException as exc:
+                if exc.status == 404:
+                    return False
+                retry_after = (getattr(exc, 'headers', None) or {}).get('Retry-After')
+                pause = int(retry_after) if retry_after and retry_after.isdigit() else \
+                    delay + random.uniform(0, delay / 2.0)
+                if exc.status != 429 or time.time() + pause > deadline:
+                    raise KubernetesException(error_message(exc), status=exc.status)
+            time.sleep(pause)
+            delay = min(delay * 2, MAX_BACKOFF)
+
+    def evict_pods(self, pods, deadline):
+        """
+        Evict pods in rounds, within the headroom of their budgets.
+
+        :return: tuple of (pods evicted, refs of the pods that failed, pods the budgets kept until the deadline)
+        """
+        budgets_helper = RawResourceHelper(self.helper.api_client, BUDGETS)
+        engine = self.get_engine(self.params['workers'])
+        pending = list(pods)
+        evicted, failed = [], []
+        while pending:
+            with self.phase('get'):
+                try:
+                    budgets = budgets_helper.list_objects()[0]
+                except KubernetesException as exc:
+                    if exc.value.get('status') != 404:
+                        raise
+                    # The server does not serve policy/v1beta1, so there are no budgets
+                    budgets = []
+            batch, pending = schedule_evictions(pending, budgets)
+            if not batch:
+                if time.time() + BUDGET_POLL_INTERVAL > deadline:
+                    break
+                time.sleep(BUDGET_POLL_INTERVAL)
+                continue
+            with self.phase('evict'):
+                results = engine.map(lambda pod: self.evict(pod, deadline), batch, return_exceptions=True)
+            for pod, result in zip(batch, results):
+                if isinstance(result, Exception):
+                    failed.append(pod_ref(pod, error=getattr(result, 'message', str(result))))
+                else:
+                    evicted.append(pod)
+        return evicted, failed, pending
+
+    def execute_module(self):
+        if self.params.get('debug'):
+            self.enable_debug()
+
+        try:
+            self.configure_client()
+        except KubernetesException as exc:
+            self.fail_json(msg='Error loading config', error=str(exc))
+
+        node_name = self.params['node']
+        state = self.params['state']
+        nodes = RawResourceHelper(self.helper.api_client, NODES)
+        pods = RawResourceHelper(self.helper.api_client, PODS)
+        try:
+            with self.phase('get'):
+                node = nodes.get_object(node_name)
+            if node is None:
+                self.fail_json(msg="Node {0} not found".format(node_name))
+
+            unschedulable = state != 'uncordoned'
+            changed = bool((node.get('spec') or {}).get('unschedulable')) != unschedulable
+            if changed and not self.check_mode:
+                with self.phase('patch'):
+                    nodes.patch_object(node_name, None, {'spec': {'unschedulable': unschedulable}})
+            return_attributes = dict(changed=changed, node=node_name, unschedulable=unschedulable)
+            if state != 'drained':
+                self.exit_json(**return_attributes)
+
+            field_selector = 'spec.nodeName={0}'.format(node_name)
+            with self.phase('get'):
+                items, resource_version = pods.list_objects(fieldSelector=field_selector)
+        except KubernetesException as exc:
+            self.fail_json(msg="Failed to drain node {0}: {1}".format(node_name, exc.message),
+                           error=exc.value.get('status'))
+
+        to_evict, skipped, blocking = classify_pods(items, self.params['force'], self.params['delete_local_data'])
+        return_attributes.update(skipped=skipped, evicted=[pod_ref(pod) for pod in to_evict])
+        if blocking:
+            self.fail_json(msg="Cannot drain node {0}: {1} pods can not be evicted".format(node_name, len(blocking)),
+                           pods=blocking, **return_attributes)
+        return_attributes['changed'] = changed or bool(to_evict)
+        if self.check_mode or not to_evict:
+            self.exit_json(**return_attributes)
+
+        # Watch from the list, so no deletion is missed while the evictions are issued
+        watch = TerminationWatch(pods, node_name, items, resource_version).start()
+        deadline = time.time() + self.params['timeout']
+        try:
+            evicted, failed, blocked = self.evict_pods(to_evict, deadline)
+            not_terminated = []
+            if self.params['wait'] and evicted:
+                with self.phase('wait'):
+                    remaining = watch.wait([pod['metadata']['uid'] for pod in evicted], deadline)
+                not_terminated = [pod_ref(pod) for pod in evicted if pod['metadata']['uid'] in remaining]
+        except KubernetesException as exc:
+            self.fail_json(msg="Failed to drain node {0}: {1}".format(node_name, exc.message),
+                           error=exc.value.get('status'), **return_attributes)
+        finally:
+            watch.stop()
+
+        return_attributes.update(evicted=[pod_ref(pod) for pod in evicted], failed=failed,
+                                 blocked=[pod_ref(pod) for pod in blocked], not_terminated=not_terminated)
+        if failed or blocked or not_terminated:
+            self.fail_json(msg="Failed to drain node {0}: {1} pods failed to be evicted, {2} were kept by their "
+                               "disruption budgets and {3} did not terminate before the timeout".format(
+                                   node_name, len(failed), len(blocked), len(not_terminated)),
+                           **return_attributes)
+        self.exit_json(**return_attributes)
@@ -0,0 +1,357 @@
+#
+#  Copyright 2017 Red Hat | Ansible
+#
+# This file is part of Ansible
+#
+# Ansible is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Ansible is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Ansible.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Content negotiation for large responses: gzip compression, and the Kubernetes protobuf encoding.
+
+The API server compresses a response with gzip when the request asks for it, and lists, which repeat the
+same field names for every object, shrink several times over. set_compression() asks for it on the requests
+made through an API client. Watches are left alone, as their events are read as they are streamed.
+
+The server also encodes the kinds built into Kubernetes as protobuf. Decoding a kind takes its message
+definition, which the Python client does not ship, so only the messages of meta.k8s.io are decoded here:
+the PartialObjectMetadataList the list modules ask for with metadata_only. Custom resources are not served
+as protobuf, and the server answers those with the JSON listed after it in the Accept header.
+
+KUBE_MODULES_COMPRESS=1 asks for compressed responses in every module that takes the compress option.
+"""
+
+import calendar
+import copy
+import json
+import os
+import time
+
+COMPRESS_ENV = 'KUBE_MODULES_COMPRESS'
+
+COMPRESS_ARGSPEC = {
+    'compress': {
+        'type': 'bool',
+        'default': False,
+        'description': [
+            "If set to C(True) the module asks the API server for gzip compressed responses, which are several "
+            "times smaller for lists. Also enabled by setting the KUBE_MODULES_COMPRESS environment variable."
+        ]
+    },
+}
+
+PROTOBUF = 'application/vnd.kubernetes.protobuf'
+
+# Every protobuf response starts with these bytes, followed by a runtime.Unknown holding the object
+MAGIC = b'k8s\x00'
+
+# Wire types
+VARINT = 0
+FIXED64 = 1
+LENGTH_DELIMITED = 2
+FIXED32 = 5
+
+TIME_FORMAT = '%Y-%m-%dT%H:%M:%SZ'
+
+# Messages, as field number: (JSON name, type, repeated). A type is string, bytes, int, bool, time, map, or
+# the dict of a message. Fields not listed, such as managedFields, are skipped.
+TYPE_META = {
+    1: ('apiVersion', 'string', False),
+    2: ('kind', 'string', False),
+}
+
+UNKNOWN = {
+    1: ('typeMeta', TYPE_META, False),
+    2: ('raw', 'bytes', False),
+    3: ('contentEncoding', 'string', False),
+    4: ('contentType', 'string', False),
+}
+
+TIME = {
+    1: ('seconds', 'int', False),
+    2: ('nanos', 'int', False),
+}
+
+MAP_ENTRY = {
+    1: ('key', 'string', False),
+    2: ('value', 'string', False),
+}
+
+OWNER_REFERENCE = {
+    1: ('kind', 'string', False),
+    3: ('name', 'string', False),
+    4: ('uid', 'string', False),
+    5: ('apiVersion', 'string', False),
+    6: ('controller', 'bool', False),
+    7: ('blockOwnerDeletion', 'bool', False),
+}
+
+OBJECT_META = {
+    1: ('name', 'string', False),
+    2: ('generateName', 'string', False),
+    3: ('namespace', 'string', False),
+    4: ('selfLink', 'string', False),
+    5: ('uid', 'string', False),
+    6: ('resourceVersion', 'string', False),
+    7: ('generation', 'int', False),
+    8: ('creationTimestamp', 'time', False),
+    9: ('deletionTimestamp', 'time', False),
+    10: ('deletionGracePeriodSeconds', 'int', False),
+    11: ('labels', 'map', False),
+    12: ('annotations', 'map', False),
+    13: ('ownerReferences', OWNER_REFERENCE, True),
+    14: ('finalizers', 'string', True),
+    15: ('clusterName', 'string', False),
+}
+
+LIST_META = {
+    1: ('selfLink', 'string', False),
+    2: ('resourceVersion', 'string', False),
+    3: ('continue', 'string', False),
+}
+
+PARTIAL_OBJECT_METADATA = {
+    1: ('metadata', OBJECT_META, False),
+}
+
+PARTIAL_OBJECT_METADATA_LIST = {
+    1: ('metadata', LIST_META, False),
+    2: ('items', PARTIAL_OBJECT_METADATA, True),
+}
+
+# The list of meta.k8s.io/v1beta1 numbers its fields the other way round
+PARTIAL_OBJECT_METADATA_LIST_V1BETA1 = {
+    1: ('items', PARTIAL_OBJECT_METADATA, True),
+    2: ('metadata', LIST_META, False),
+}
+
+# Messages by (apiVersion, kind), for the kinds that may be decoded. Field numbers differ between versions.
+KINDS = {
+    ('meta.k8s.io/v1', 'PartialObjectMetadata'): PARTIAL_OBJECT_METADATA,
+    ('meta.k8s.io/v1', 'PartialObjectMetadataList'): PARTIAL_OBJECT_METADATA_LIST,
+    ('meta.k8s.io/v1beta1', 'PartialObjectMetadata'): PARTIAL_OBJECT_METADATA,
+    ('meta.k8s.io/v1beta1', 'PartialObjectMetadataList'): PARTIAL_OBJECT_METADATA_LIST_V1BETA1,
+}
+
+
+class EncodingError(Exception):
+    pass
+
+
+def compression_enabled(param=None):
+    """ Compression is enabled by the module's compress option, or by setting KUBE_MODULES_COMPRESS """
+    if param:
+        return True
+    return os.environ.get(COMPRESS_ENV, '').lower() in ('1', 'true', 'yes', 'on')
+
+
+def is_watch(query_params):
+    return any(key == 'watch' and str(value).lower() in ('1', 'true') for key, value in query_params or [])
+
+
+def set_compression(api_client, enabled):
+    """
+    Ask for gzip compressed responses to the GET requests made through api_client, or stop asking. urllib3
+    decompresses the responses as they are read. API clients are shared by the modules run in one process, so
+    the setting is changed in place rather than wrapping the client again.
+    """
+    api_client._compress = enabled
+    if not enabled or getattr(api_client, '_compression_installed', False):
+        return
+    request = api_client.request
+
+    def negotiated_request(method, url, query_params=None, headers=None, post_params=None, body=None,
+                           _preload_content=True, _request_timeout=None):
+        if api_client._compress and method == 'GET' and not is_watch(query_params):
+            headers = dict(headers or {})
+            headers.setdefault('Accept-Encoding', 'gzip')
+        return request(method, url, query_params=query_params, headers=headers, post_params=post_params,
+                       body=body, _preload_content=_preload_content, _request_timeout=_request_timeout)
+
+    api_client.request = negotiated_request
+    api_client._compression_installed = True
+
+
+def read_varint(data, pos):
+    result = shift = 0
+    while True:
+        if pos >= len(data):
+            raise EncodingError("Truncated protobuf message")
+        byte = data[pos]
+        result |= (byte & 0x7f) << shift
+        pos += 1
+        if not byte & 0x80:
+            return result, pos
+        shift += 7
+
+
+def iter_fields(data):
+    """ Yield (field number, wire type, value) for each field of a message, in a bytearray """
+    pos = 0
+    while pos < len(data):
+        key, pos = read_varint(data, pos)
+        number, wire_type = key >> 3, key & 7
+        if wire_type == VARINT:
+            value, pos = read_varint(data, pos)
+        elif wire_type == LENGTH_DELIMITED:
+            length, pos = read_varint(data, pos)
+            value = data[pos:pos + length]
+            pos += length
+        elif wire_type in (FIXED64, FIXED32):
+            length = 8 if wire_type == FIXED64 else 4
+            value = data[pos:pos + length]
+            pos += length
+        else:
+            raise EncodingError("Unsupported protobuf wire type {0}".format(wire_type))
+        if pos > len(data):
+            raise EncodingError("Truncated protobuf message")
+        yield number, wire_type, value
+
+
+def decode_value(value, field_type):
+    if field_type == 'string':
+        return bytes(value).decode('utf-8')
+    if field_type == 'bytes':
+        return bytes(value)
+    if field_type == 'int':
+        # int64 fields hold negative numbers in two's complement
+        return value - (1 << 64) if value >= 1 << 63 else value
+    if field_type == 'bool':
+        return bool(value)
+    if field_type == 'time':
+        seconds = decode_message(value, TIME).get('seconds')
+        return time.strftime(TIME_FORMAT, time.gmtime(seconds)) if seconds else None
+    return decode_message(value, field_type)
+
+
+def decode_message(data, message):
+    """
+    Decode a message, as a dict keyed by the JSON names of its fields. Empty strings and zero numbers are
+    left out, as they are from JSON.
+    """
+    result = {}
+    for number, wire_type, value in iter_fields(data):
+        field = message.get(number)
+        if field is None:
+            continue
+        name, field_type, repeated = field
+        if field_type == 'map':
+            entry = decode_message(value, MAP_ENTRY)
+            result.setdefault(name, {})[entry.get('key', '')] = entry.get('value', '')
+            continue
+        value = decode_value(value, field_type)
+        if repeated:
+            result.setdefault(name, []).append(value)
+        elif value or field_type == 'bool':
+            result[name] = value
+    return result
+
+
+def message_for(obj):
+    """ The message definition of the apiVersion and kind of obj """
+    message = KINDS.get((obj.get('apiVersion'), obj.get('kind')))
+    if message is None:
+        raise EncodingError("No protobuf message definition for {0} {1}".format(
+            obj.get('apiVersion'), obj.get('kind')))
+    return message
+
+
+def decode_object(data):
+    """ Decode the protobuf body of a response, as the dict its JSON body decodes to """
+    if not data.startswith(MAGIC):
+        raise EncodingError("The response is not a Kubernetes protobuf message")
+    unknown = decode_message(bytearray(data[len(MAGIC):]), UNKNOWN)
+    type_meta = unknown.get('typeMeta') or {}
+    message = message_for(type_meta)
+    obj = decode_message(bytearray(unknown.get('raw') or b''), message)
+    obj.update(type_meta)
+    return obj
+
+
+def decode_body(data, content_type):
+    """ Decode the body of a response, by its Content-Type, JSON or protobuf """
+    if (content_type or '').split(';')[0].strip() == PROTOBUF:
+        return decode_object(bytes(data))
+    if isinstance(data, bytes):
+        data = data.decode('utf-8')
+    return json.loads(data) if data else None
+
+
+def encode_varint(value):
+    value &= (1 << 64) - 1
+    result = bytearray()
+    while True:
+        byte = value & 0x7f
+        value >>= 7
+        if not value:
+            result.append(byte)
+            return bytes(result)
+        result.append(byte | 0x80)
+
+
+def encode_field(number, field_type, value):
+    if field_type in ('int', 'bool'):
+        return encode_varint(number << 3 | VARINT) + encode_varint(int(value))
+    if field_type == 'string':
+        payload = value.encode('utf-8')
+    elif field_type == 'bytes':
+        payload = value
+    elif field_type == 'time':
+        payload = encode_message({'seconds': calendar.timegm(time.strptime(value, TIME_FORMAT))}, TIME)
+    else:
+        payload = encode_message(value, field_type)
+    return encode_varint(number << 3 | LENGTH_DELIMITED) + encode_varint(len(payload)) + payload
+
+
+def encode_message(obj, message):
+    """ Encode a dict keyed by JSON names as a message. The fake API server uses it to serve protobuf. """
+    result = b''
+    for number in sorted(message):
+        name, field_type, repeated = message[number]
+        value = obj.get(name)
+        if value is None:
+            continue
+        if field_type == 'map':
+            for key in sorted(value):
+                result += encode_field(number, MAP_ENTRY, {'key': key, 'value': value[key]})
+            continue
+        for item in value if repeated else [value]:
+            result += encode_field(number, field_type, item)
+    return result
+
+
+def encode_object(obj):
+    """ Encode obj, of one of KINDS, as the body of a protobuf response """
+    message = message_for(obj)
+    unknown = {'typeMeta': {'apiVersion': obj.get('apiVersion'), 'kind': obj['kind']},
+               'raw': encode_message(obj, message)}
+    return MAGIC + encode_message(unknown, UNKNOWN)
+
+
+class CompressMixin(object):
+    """ Adds the compress option to a KubernetesAnsibleModule """
+
+    def __init__(self, *args, **kwargs):
+        super(CompressMixin, self).__init__(*args, **kwargs)
+        # The helper rejects parameters it does not know about
+        self.compress = compression_enabled(self.params.pop('compress', False))
+
+    @property
+    def extra_argspec(self):
+        spec = super(CompressMixin, self).extra_argspec
+        spec.update(copy.deepcopy(COMPRESS_ARGSPEC))
+        return spec
+
+    def configure_client(self):
+        super(CompressMixin, self).configure_client()
+        set_compression(self.helper.api_client, self.compress)
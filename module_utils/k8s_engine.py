@@ -0,0 +1,335 @@
+#
+#  Copyright 2017 Red Hat | Ansible
+#
+# This file is part of Ansible
+#
+# Ansible is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Ansible is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Ansible.  If not, see <http://www.gnu.org/licenses/>.
+
+import json
+import sys
+import threading
+import time
+
+from ansible.module_utils.six import reraise
+from ansible.module_utils.six.moves import queue
+
+try:
+    from kubernetes import watch
+    from kubernetes.client.rest import ApiException
+    from urllib3.exceptions import HTTPError
+    HAS_K8S_WATCH = True
+except ImportError:
+    HAS_K8S_WATCH = False
+
+DEFAULT_WORKERS = 10
+DEFAULT_PAGE_SIZE = 500
+
+# Status of a watch, or a list, from a resourceVersion the server no longer has
+GONE = 410
+
+
+def error_message(exc):
+    """ The message of the Status in the body of an ApiException, or its reason """
+    body = exc.body or ''
+    if isinstance(body, bytes):
+        body = body.decode('utf-8', 'replace')
+    return json.loads(body).get('message', exc.reason) if body.startswith('{') else body or exc.reason
+
+
+def restart_watch(exc):
+    """
+    Whether a watch that failed with exc should be started again: its resourceVersion expired, or its
+    connection dropped or timed out. Other errors, such as a 403, are not retried.
+    """
+    if HAS_K8S_WATCH and isinstance(exc, HTTPError):
+        return True
+    status = getattr(exc, 'status', None)
+    if status is None and isinstance(getattr(exc, 'value', None), dict):
+        # KubernetesException
+        status = exc.value.get('status')
+    return status == GONE
+
+
+class EngineFuture(object):
+    """ Result of a call submitted to the ReconcileEngine """
+
+    def __init__(self):
+        self._done = threading.Event()
+        self._result = None
+        self._exc_info = None
+
+    def set_result(self, result):
+        self._result = result
+        self._done.set()
+
+    def set_exception(self, exc_info):
+        self._exc_info = exc_info
+        self._done.set()
+
+    def done(self):
+        return self._done.is_set()
+
+    def exception(self, timeout=None):
+        self._done.wait(timeout)
+        return self._exc_info[1] if self._exc_info else None
+
+    def result(self, timeout=None):
+        """ Wait for the call to finish. Returns its result, or re-raises the exception it raised. """
+        self._done.wait(timeout)
+        if not self._done.is_set():
+            raise RuntimeError("Timed out waiting for result")
+        if self._exc_info:
+            reraise(*self._exc_info)
+        return self._result
+
+
+class ReconcileEngine(object):
+    """
+    Runs blocking API calls on a bounded pool of worker threads, so that many requests can be in flight at
+    once. The openshift client is synchronous, so each worker holds one request at a time; the calling
+    thread submits work and collects results in order.
+    """
+
+    def __init__(self, workers=DEFAULT_WORKERS):
+        self.workers = max(1, int(workers or DEFAULT_WORKERS))
+        self._queue = queue.Queue()
+        self._threads = []
+        self._lock = threading.Lock()
+        self._shutdown = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.shutdown()
+
+    def _worker(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            future, func, args, kwargs = item
+            try:
+                future.set_result(func(*args, **kwargs))
+            except Exception:
+                future.set_exception(sys.exc_info())
+
+    def _start_worker(self):
+        with self._lock:
+            if len(self._threads) < self.workers:
+                thread = threading.Thread(target=self._worker)
+                thread.daemon = True
+                thread.start()
+                self._threads.append(thread)
+
+    def submit(self, func, *args, **kwargs):
+        """ Schedule func(*args, **kwargs) on a worker thread. Returns an EngineFuture. """
+        if self._shutdown:
+            raise RuntimeError("Cannot submit to an engine that has been shut down")
+        future = EngineFuture()
+        self._queue.put((future, func, args, kwargs))
+        if len(self._threads) < self.workers:
+            self._start_worker()
+        return future
+
+    def map(self, func, items, return_exceptions=False):
+        """
+        Call func once per item, concurrently, and return the results in the order of items. By default
+        the first exception raised is re-raised once all calls have finished; with return_exceptions=True
+        the exception instance is returned in place of the result.
+        """
+        futures = [self.submit(func, item) for item in items]
+        results = []
+        first_error = None
+        for future in futures:
+            try:
+                results.append(future.result())
+            except Exception:
+                if return_exceptions:
+                    results.append(sys.exc_info()[1])
+                elif first_error is None:
+                    first_error = sys.exc_info()
+        if first_error:
+            reraise(*first_error)
+        return results
+
+    def shutdown(self):
+        with self._lock:
+            if self._shutdown:
+                return
+            self._shutdown = True
+            for _ in self._threads:
+                self._queue.put(None)
+
+    @staticmethod
+    def tune_client(api_client, workers):
+        """
+        Allow as many pooled connections per host as there are workers. urllib3 defaults to 4, and discards
+        the connections of any requests beyond that.
+        """
+        try:
+            api_client.rest_client.pool_manager.connection_pool_kw['maxsize'] = max(workers, 4)
+        except AttributeError:
+            pass
+
+    # Object operations. Each takes the helper for the kind being operated on, and a list of requests, and
+    # returns one result per request.
+
+    def get_objects(self, helper, refs):
+        """ GET each (name, namespace) in refs """
+        return self.map(lambda ref: helper.get_object(ref[0], ref[1]), refs, return_exceptions=True)
+
+    def create_objects(self, helper, requests):
+        """ POST each (namespace, body) in requests """
+        return self.map(lambda req: helper.create_object(req[0], body=req[1]), requests, return_exceptions=True)
+
+    def patch_objects(self, helper, requests):
+        """ PATCH each (name, namespace, k8s_obj) in requests """
+        return self.map(lambda req: helper.patch_object(req[0], req[1], req[2]), requests, return_exceptions=True)
+
+    def delete_objects(self, helper, refs):
+        """ DELETE each (name, namespace) in refs """
+        return self.map(lambda ref: helper.delete_object(ref[0], ref[1]), refs, return_exceptions=True)
+
+    def list_objects(self, helper, namespaces, page_size=DEFAULT_PAGE_SIZE, **list_kwargs):
+        """
+        List the helper's kind in each namespace, following continue tokens. Pages within a namespace are
+        fetched in sequence, as each depends on the previous token; the namespaces are listed concurrently.
+        Pass None in namespaces to list at the cluster scope, or across all namespaces for a namespaced kind.
+        Returns a dict of namespace: list of items.
+        """
+        def list_all(namespace):
+            list_method = None
+            if namespace is None:
+                kind = helper.kind[:-len('_list')] if helper.kind.endswith('_list') else helper.kind
+                try:
+                    list_method = helper.lookup_method(method_name='list_{0}_for_all_namespaces'.format(kind))
+                except helper.get_exception_class():
+                    pass
+            list_method = list_method or helper.lookup_method('list', namespace)
+            args = (namespace,) if namespace else ()
+            items = []
+            token = None
+            while True:
+                kwargs = dict(list_kwargs, limit=page_size)
+                if token:
+                    kwargs['_continue'] = token
+                result = list_method(*args, **kwargs)
+                items.extend(result.items or [])
+                token = getattr(result.metadata, '_continue', None)
+                if not token:
+                    break
+            return items
+
+        results = self.map(list_all, namespaces)
+        return dict(zip(namespaces, results))
+
+    def wait_for_objects(self, helper, refs, condition, timeout=None):
+        """
+        Wait for every (name, namespace) in refs to satisfy condition(obj), using one watch per namespace
+        rather than polling each object. condition receives None once an object has been deleted.
+        Returns a dict of (name, namespace): last object seen, containing only the refs that were satisfied
+        before the timeout.
+        """
+        if not HAS_K8S_WATCH:
+            raise RuntimeError("Waiting for objects requires the kubernetes Python client")
+        timeout = timeout or helper.timeout
+        by_namespace = {}
+        for name, namespace in refs:
+            by_namespace.setdefault(namespace, set()).add(name)
+
+        def wait_namespace(namespace):
+            try:
+                return watch_namespace(namespace)
+            except ApiException as exc:
+                raise helper.get_exception_class()(error_message(exc), status=exc.status)
+
+        def watch_namespace(namespace):
+            pending = set(by_namespace[namespace])
+            satisfied = {}
+            deadline = time.time() + timeout
+            list_method = helper.lookup_method('list', namespace)
+            args = (namespace,) if namespace else ()
+
+            # Start from a consistent snapshot, then watch from its resourceVersion so no events are missed
+            snapshot = list_method(*args)
+            seen = set()
+            for obj in snapshot.items or []:
+                seen.add(obj.metadata.name)
+                if obj.metadata.name in pending and condition(obj):
+                    satisfied[(obj.metadata.name, namespace)] = obj
+                    pending.discard(obj.metadata.name)
+            for name in list(pending - seen):
+                if condition(None):
+                    satisfied[(name, namespace)] = None
+                    pending.discard(name)
+
+            resource_version = snapshot.metadata.resource_version
+            while pending and time.time() < deadline:
+                remaining = max(1, int(deadline - time.time()))
+                watcher = watch.Watch()
+                watcher._api_client = helper.api_client  # for access to OpenShift models
+                # The client sends a resource_version of None as the text None
+                kwargs = {'resource_version': resource_version} if resource_version else {}
+                try:
+                    for event in watcher.stream(list_method, *args, timeout_seconds=remaining,
+                                                _request_timeout=remaining + 5, **kwargs):
+                        if event['type'] == 'ERROR':
+                            status = event['raw_object']
+                            raise helper.get_exception_class()(status.get('message', 'watch failed'),
+                                                               status=status.get('code'))
+                        obj = event['object']
+                        resource_version = obj.metadata.resource_version
+                        name = obj.metadata.name
+                        if name not in pending:
+                            continue
+                        if event['type'] == 'DELETED':
+                            obj = None
+                        if condition(obj):
+                            satisfied[(name, namespace)] = obj
+                            pending.discard(name)
+                            if not pending:
+                                watcher.stop()
+                except Exception as exc:
+                    if not restart_watch(exc):
+                        raise
+                    # The watch expired or the connection dropped. Re-establish it without a resourceVersion,
+                    # which replays the current state of every object as ADDED events.
+                    resource_version = None
+                    time.sleep(1)
+            return satisfied
+
+        result = {}
+        for satisfied in self.map(wait_namespace, list(by_namespace.keys())):
+            result.update(satisfied)
+        return result
+
+
+class EngineMixin(object):
+    """ Runs the API requests of a KubernetesAnsibleModule that manages many objects concurrently """
+
+    engine_cache = None
+
+    def get_engine(self, workers=DEFAULT_WORKERS):
+        """
+        Return the engine used to run many API requests concurrently. The single object operations
+        performed by execute_module do not go through the engine.
+
+        :param workers: maximum number of requests in flight
+        :return: ReconcileEngine
+        """
+        if self.engine_cache is None:
+            ReconcileEngine.tune_client(self.helper.api_client, workers)
+            self.engine_cache = ReconcileEngine(workers)
+        return self.engine_cache
@@ -0,0 +1,301 @@
+#
+#  Copyright 2017 Red Hat | Ansible
+#
+# This file is part of Ansible
+#
+# Ansible is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Ansible is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Ansible.  If not, see <http://www.gnu.org/licenses/>.
+
+
+"""
+Imports many image tags at once. The tags are grouped by ImageStream, and each group is imported with one
+ImageStreamImport request, or a few for large groups, rather than one openshift_v1_image_stream_import task
+per tag. The requests for different streams are made concurrently on the reconcile engine.
+
+Only the digest and status of each tag is returned, not the image metadata the server sends back. Imports
+are confirmed by a watch of the ImageStreams of each namespace, which also completes the imports whose
+requests timed out while the server went on importing. In check mode, the images are resolved without being
+imported, with spec.import false.
+"""
+
+import threading
+import time
+
+from collections import OrderedDict
+
+from ansible.module_utils.k8s_discovery import DiscoveryError, ResourceNotFoundError
+from ansible.module_utils.k8s_engine import DEFAULT_WORKERS
+from ansible.module_utils.k8s_mixins import KubernetesModuleMixin
+from ansible.module_utils.k8s_raw import ObjectTracker, RawResourceHelper
+from ansible.module_utils.openshift_build import parse_time
+from ansible.module_utils.openshift_common import OpenShiftAnsibleModule
+
+try:
+    from openshift.helper.exceptions import KubernetesException
+    HAS_K8S_MODULE_HELPER = True
+except ImportError:
+    HAS_K8S_MODULE_HELPER = False
+
+# ImageStreams are served by the image.openshift.io group, and by /oapi/v1 on servers older than OpenShift 3.6
+IMAGE_VERSIONS = ('image.openshift.io/v1', 'v1')
+
+DEFAULT_BATCH_SIZE = 50
+DEFAULT_IMPORT_TIMEOUT = 600
+
+# Statuses of requests that timed out, while the server may still be importing
+TIMEOUT_STATUSES = (504,)
+
+SUCCESS = 'Success'
+FAILURE = 'Failure'
+PENDING = 'Pending'
+
+
+class ImageImportError(Exception):
+    pass
+
+
+def resolve_image_resource(discovery, kind):
+    """ The resource of kind the server serves. Raises ImageImportError when it is not served. """
+    for api_version in IMAGE_VERSIONS:
+        try:
+            return discovery.resolve(api_version, kind)
+        except ResourceNotFoundError:
+            continue
+    raise ImageImportError("The server does not serve {0}".format(kind))
+
+
+def default_target(source):
+    """ The stream:tag an image is imported to by default: the last part of its repository, and its tag """
+    repository, _, tag = source.split('@')[0].rpartition('/')[2].partition(':')
+    if not tag:
+        raise ImageImportError("Image {0} has no tag, so the tag to import it to is required, as to".format(source))
+    return repository, tag
+
+
+def normalize_image(image, defaults):
+    """ An entry of the images option, as a dict with from, image_stream, tag, namespace and import policy """
+    if not isinstance(image, dict) or not image.get('from'):
+        raise ImageImportError("Every image requires from, the image to import: {0}".format(image))
+    unknown = sorted(set(image) - set(['from', 'to', 'namespace', 'insecure', 'scheduled', 'reference_policy']))
+    if unknown:
+        raise ImageImportError("Unknown fields {0} in image {1}".format(', '.join(unknown), image))
+    if image.get('to'):
+        stream, _, tag = str(image['to']).partition(':')
+        tag = tag or 'latest'
+    else:
+        stream, tag = default_target(image['from'])
+    result = dict((key, defaults[key] if image.get(key) is None else image[key]) for key in defaults)
+    result.update({'from': image['from'], 'image_stream': stream, 'tag': tag})
+    if not result['namespace']:
+        raise ImageImportError("Image {0} requires a namespace, with the namespace option".format(image['from']))
+    return result
+
+
+def import_batches(images, batch_size):
+    """ The indexes of images, grouped by (namespace, image stream), in batches of up to batch_size tags """
+    groups = OrderedDict()
+    for index, image in enumerate(images):
+        groups.setdefault((image['namespace'], image['image_stream']), []).append(index)
+    batches = []
+    for key, indexes in groups.items():
+        for start in range(0, len(indexes), batch_size):
+            batches.append((key, indexes[start:start + batch_size]))
+    return batches
+
+
+def latest_item(stream, tag):
+    """ The newest entry of a tag's history in the status of an ImageStream, and the tag's conditions """
+    for entry in ((stream or {}).get('status') or {}).get('tags') or []:
+        if entry.get('tag') == tag:
+            items = entry.get('items') or []
+            return (items[0] if items else {}), entry.get('conditions') or []
+    return {}, []
+
+
+class KubernetesImageImportModule(KubernetesModuleMixin, OpenShiftAnsibleModule):
+    """ Imports many image tags, with one ImageStreamImport request per ImageStream """
+
+    def __init__(self):
+        self.import_argspec = {
+            'images': {'type': 'list', 'required': True},
+            'namespace': {},
+            'insecure': {'type': 'bool', 'default': False},
+            'scheduled': {'type': 'bool', 'default': False},
+            'reference_policy': {'default': 'Source', 'choices': ['Source', 'Local']},
+            'batch_size': {'type': 'int', 'default': DEFAULT_BATCH_SIZE},
+            'wait': {'type': 'bool', 'default': True},
+            'timeout': {'type': 'int', 'default': DEFAULT_IMPORT_TIMEOUT},
+            'workers': {'type': 'int', 'default': DEFAULT_WORKERS},
+        }
+        super(KubernetesImageImportModule, self).__init__('image_stream_import', 'v1')
+
+    @property
+    def argspec(self):
+        if not self.argspec_cache:
+            spec = self.auth_argspec
+            spec.update(self.import_argspec)
+            self.argspec_cache = spec
+        return self.argspec_cache
+
+    def import_batch(self, imports, key, images):
+        """
+        Import a batch of tags of one ImageStream. Returns the status of each image, as dicts with status,
+        reason, message and digest, or PENDING for every image when the request timed out.
+        """
+        namespace, stream = key
+        body = {
+            'apiVersion': imports.api_version,
+            'kind': 'ImageStreamImport',
+            'metadata': {'name': stream, 'namespace': namespace},
+            'spec': {
+                'import': not self.check_mode,
+                'images': [{
+                    'from': {'kind': 'DockerImage', 'name': image['from']},
+                    'to': {'name': image['tag']},
+                    'importPolicy': {'insecure': image['insecure'], 'scheduled': image['scheduled']},
+                    'referencePolicy': {'type': image['reference_policy']},
+                } for image in images],
+            },
+        }
+        try:
+            response = imports.create_object(namespace, body)
+        except KubernetesException as exc:
+            if exc.value.get('status') not in TIMEOUT_STATUSES:
+                raise
+            return [{'status': PENDING, 'message': exc.message} for _ in images]
+        statuses = ((response or {}).get('status') or {}).get('images') or []
+        results = []
+        for index in range(len(images)):
+            entry = statuses[index] if index < len(statuses) else {}
+            status = entry.get('status') or {}
+            results.append({
+                'status': status.get('status') or FAILURE,
+                'reason': status.get('reason'),
+                'message': status.get('message'),
+                'digest': ((entry.get('image') or {}).get('metadata') or {}).get('name'),
+            })
+        return results
+
+    def confirmed(self, trackers, image, result, triggered):
+        """
+        Whether the ImageStream shows the import of an image: the imported digest, for a successful import, or a
+        change since the import was triggered, for one whose request timed out. Called with the condition held.
+        Raises the error that stopped the watch of its namespace.
+        """
+        tracker = trackers[image['namespace']]
+        tracker.check()
+        item, conditions = latest_item(tracker.objects.get((image['namespace'], image['image_stream'])),
+                                       image['tag'])
+        if result['status'] == SUCCESS:
+            return item.get('image') == result['digest']
+        for condition in conditions:
+            if condition.get('type') == 'ImportSuccess' and condition.get('status') == 'False' and \
+                    (parse_time(condition.get('lastTransitionTime')) or 0) >= int(triggered):
+                result.update(status=FAILURE, reason=condition.get('reason'), message=condition.get('message'))
+                return True
+        if item.get('image') and (parse_time(item.get('created')) or 0) >= int(triggered):
+            result.update(status=SUCCESS, digest=item['image'], message=None)
+            return True
+        return False
+
+    def execute_module(self):
+        if self.params.get('debug'):
+            self.enable_debug()
+
+        defaults = dict((key, self.params.get(key)) for key in ('namespace', 'insecure', 'scheduled',
+                                                                'reference_policy'))
+        try:
+            images = [normalize_image(image, defaults) for image in self.params['images']]
+        except ImageImportError as exc:
+            self.fail_json(msg=str(exc))
+        if self.params['batch_size'] < 1:
+            self.fail_json(msg="batch_size must be at least 1")
+
+        try:
+            self.configure_client()
+        except KubernetesException as exc:
+            self.fail_json(msg='Error loading config', error=str(exc))
+
+        batches = import_batches(images, self.params['batch_size'])
+        wait = self.params['wait'] and not self.check_mode
+        try:
+            with self.phase('discovery'):
+                discovery = self.get_discovery()
+                imports = RawResourceHelper(self.helper.api_client,
+                                            resolve_image_resource(discovery, 'ImageStreamImport'))
+                streams = RawResourceHelper(self.helper.api_client, resolve_image_resource(discovery, 'ImageStream'))
+            # The digest each tag had, and the resourceVersion from which the watch sees every later change
+            previous = {}
+            trackers = {}
+            condition = threading.Condition()
+            with self.phase('get'):
+                for namespace in sorted(set(image['namespace'] for image in images)):
+                    items, resource_version = streams.list_objects(namespace)
+                    for stream in items:
+                        for entry in (stream.get('status') or {}).get('tags') or []:
+                            previous[(namespace, stream['metadata']['name'], entry.get('tag'))] = \
+                                latest_item(stream, entry.get('tag'))[0].get('image')
+                    trackers[namespace] = ObjectTracker(streams, namespace, condition, resource_version)
+        except (ImageImportError, DiscoveryError, KubernetesException) as exc:
+            self.fail_json(msg="Failed to read the image streams: {0}".format(getattr(exc, 'message', str(exc))))
+
+        if wait:
+            for tracker in trackers.values():
+                tracker.start()
+        triggered = time.time()
+        engine = self.get_engine(self.params['workers'])
+        with self.phase('create'):
+            responses = engine.map(lambda batch: self.import_batch(imports, batch[0],
+                                                                   [images[index] for index in batch[1]]),
+                                   batches, return_exceptions=True)
+        results = [None] * len(images)
+        for (key, indexes), response in zip(batches, responses):
+            for position, index in enumerate(indexes):
+                if isinstance(response, Exception):
+                    results[index] = {'status': FAILURE, 'message': getattr(response, 'message', str(response))}
+                else:
+                    results[index] = response[position]
+
+        if wait:
+            waiting = [index for index, result in enumerate(results) if result['status'] in (SUCCESS, PENDING)]
+            try:
+                with self.phase('wait'):
+                    # Every image is checked on each change, as confirming a timed out import records its outcome
+                    trackers[images[0]['namespace']].wait(
+                        lambda: all([self.confirmed(trackers, images[index], results[index], triggered)
+                                     for index in waiting]), triggered + self.params['timeout'])
+            except KubernetesException as exc:
+                self.fail_json(msg="Failed to watch the image streams: {0}".format(exc.message),
+                               error=exc.value.get('status'))
+            finally:
+                for tracker in trackers.values():
+                    tracker.stop()
+
+        return_images = []
+        for image, result in zip(images, results):
+            entry = {'image_stream': image['image_stream'], 'tag': image['tag'], 'namespace': image['namespace'],
+                     'from': image['from']}
+            entry.update((key, value) for key, value in result.items() if value is not None)
+            entry['changed'] = result['status'] == SUCCESS and \
+                result.get('digest') != previous.get((image['namespace'], image['image_stream'], image['tag']))
+            return_images.append(entry)
+
+        statuses = [entry['status'] for entry in return_images]
+        return_attributes = dict(changed=any(entry['changed'] for entry in return_images), images=return_images,
+                                 requests=len(batches), imported=statuses.count(SUCCESS),
+                                 failed=statuses.count(FAILURE), pending=statuses.count(PENDING))
+        if return_attributes['failed'] or return_attributes['pending']:
+            self.fail_json(msg="{0} of {1} images failed to import, and {2} did not finish before the "
+                           "timeout".format(return_attributes['failed'], len(images), return_attributes['pending']),
+                           **return_attributes)
+        self.exit_json(**return_attributes)
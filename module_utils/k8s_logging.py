@@ -0,0 +1,151 @@
+#
+#  Copyright 2017 Red Hat | Ansible
+#
+# This file is part of Ansible
+#
+# Ansible is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Ansible is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Ansible.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Debug logging for the modules.
+
+Messages are logged at DEBUG level, with any structured data passed as fields, e.g.
+
+    logger.debug("Request to parameters", extra=fields(parameters=parameters))
+
+Nothing is formatted or serialized unless debug logging has been enabled with enable_debug(). Once enabled,
+records are buffered in memory and written as JSON lines to a rotating log file when the buffer fills, an
+error is logged, or the module exits. Field values are serialized when written, so they must not be changed
+after they are logged. Wrap a value in Lazy to defer computing it until then.
+"""
+
+import json
+import logging
+import os
+import time
+
+from logging.handlers import MemoryHandler, RotatingFileHandler
+
+LOGGER_NAME = 'ansible.kube_modules'
+
+# The openshift helper logs its requests to this logger
+HELPER_LOGGER_NAME = 'openshift.helper'
+
+LOG_FILE_ENV = 'KUBE_MODULES_LOG_FILE'
+DEFAULT_LOG_FILE = 'kube_modules.log.jsonl'
+
+BUFFER_CAPACITY = 1000
+MAX_BYTES = 10 * 1024 * 1024
+BACKUP_COUNT = 3
+
+logger = logging.getLogger(LOGGER_NAME)
+logger.addHandler(logging.NullHandler())
+logger.propagate = False
+
+
+class Lazy(object):
+    """ A log field whose value is computed by calling func, and only when the record is written """
+
+    def __init__(self, func, *args, **kwargs):
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+
+    def value(self):
+        return self.func(*self.args, **self.kwargs)
+
+    def __str__(self):
+        return str(self.value())
+
+
+def fields(**kwargs):
+    """ Structured data to attach to a record, passed as the extra argument of a logger call """
+    return {'fields': kwargs}
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """ Formats each record as a JSON document on a single line """
+
+    @staticmethod
+    def _default(value):
+        if isinstance(value, Lazy):
+            return value.value()
+        if hasattr(value, 'to_dict'):
+            return value.to_dict()
+        return str(value)
+
+    def format(self, record):
+        document = {
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(record.created)),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        if getattr(record, 'fields', None):
+            document['fields'] = record.fields
+        if record.exc_info:
+            document['exception'] = self.formatException(record.exc_info)
+        return json.dumps(document, default=self._default, sort_keys=True)
+
+
+def debug_enabled():
+    return logger.isEnabledFor(logging.DEBUG)
+
+
+def enable_debug(filename=None, capacity=BUFFER_CAPACITY, max_bytes=MAX_BYTES, backup_count=BACKUP_COUNT):
+    """
+    Write the DEBUG records of the modules, and of the openshift helper, to a rotating JSON lines file.
+    Calling it again has no effect.
+
+    :param filename: path of the log file. Defaults to KUBE_MODULES_LOG_FILE, or kube_modules.log.jsonl.
+    :param capacity: number of records to buffer before writing them
+    :param max_bytes: size at which the file is rotated
+    :param backup_count: number of rotated files to keep
+    :return: None
+    """
+    if debug_enabled():
+        return
+    filename = os.path.expanduser(filename or os.environ.get(LOG_FILE_ENV) or DEFAULT_LOG_FILE)
+    target = RotatingFileHandler(filename, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8')
+    target.setFormatter(JsonLinesFormatter())
+    handler = MemoryHandler(capacity, flushLevel=logging.ERROR, target=target)
+    for name in (LOGGER_NAME, HELPER_LOGGER_NAME):
+        named_logger = logging.getLogger(name)
+        named_logger.addHandler(handler)
+        named_logger.setLevel(logging.DEBUG)
+        named_logger.propagate = False
+
+
+def flush():
+    """ Write the buffered records. Processes that end with os._exit(), such as forked workers, skip atexit. """
+    for name in (LOGGER_NAME, HELPER_LOGGER_NAME):
+        for handler in logging.getLogger(name).handlers:
+            handler.flush()
+
+
+class LoggingMixin(object):
+    """ Writes the debug log of a KubernetesAnsibleModule as buffered JSON lines, with enable_debug() """
+
+    def enable_debug(self):
+        enable_debug()
+
+    def exit_json(self, **kwargs):
+        flush()
+        super(LoggingMixin, self).exit_json(**kwargs)
+
+    def fail_json(self, **kwargs):
+        flush()
+        super(LoggingMixin, self).fail_json(**kwargs)
+
+    def log_debug(self, msg, **kwargs):
+        logger.debug(msg, extra=fields(**kwargs))
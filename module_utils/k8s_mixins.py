@@ -0,0 +1,38 @@
+#
+#  Copyright 2017 Red Hat | Ansible
+#
+# This file is part of Ansible
+#
+# Ansible is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Ansible is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Ansible.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+The optional features of the modules, as mixins of KubernetesAnsibleModule. Each feature lives in the
+module_utils that implements it, so a module ships the code of the features it uses, and no more.
+
+The generated modules run KubernetesAnsibleModule alone. The modules written by hand, and k8s_object, mix in
+KubernetesModuleMixin, as do the generated modules when they run in-process on the controller.
+"""
+
+from ansible.module_utils.k8s_cassette import CassetteMixin
+from ansible.module_utils.k8s_discovery import DiscoveryMixin
+from ansible.module_utils.k8s_encoding import CompressMixin
+from ansible.module_utils.k8s_engine import EngineMixin
+from ansible.module_utils.k8s_logging import LoggingMixin
+from ansible.module_utils.k8s_profile import ProfileMixin
+
+
+class KubernetesModuleMixin(ProfileMixin, LoggingMixin, CassetteMixin, DiscoveryMixin, CompressMixin,
+                            EngineMixin):
+    """ Every optional feature. List it ahead of the module class in the bases. """
+    pass
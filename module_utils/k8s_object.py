@@ -0,0 +1,109 @@
+#
+#  Copyright 2017 Red Hat | Ansible
+#
+# This file is part of Ansible
+#
+# Ansible is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Ansible is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Ansible.  If not, see <http://www.gnu.org/licenses/>.
+
+import re
+
+from ansible.module_utils.basic import AnsibleModule, _load_params
+from ansible.module_utils.k8s_common import KubernetesAnsibleModule
+from ansible.module_utils.k8s_dispatch import dispatch
+from ansible.module_utils.k8s_dispatch_table import DISPATCH_TABLE
+from ansible.module_utils.k8s_mixins import KubernetesModuleMixin
+from ansible.module_utils.k8s_raw import MetadataListMixin
+from ansible.module_utils.openshift_build import OpenShiftBuildRequestModule
+from ansible.module_utils.openshift_common import OpenShiftAnsibleModule
+from ansible.module_utils.openshift_template_instance import OpenShiftTemplateInstanceModule
+
+MODULE_CLASSES = {
+    'k8s': KubernetesAnsibleModule,
+    'openshift': OpenShiftAnsibleModule,
+}
+
+# Modules with options of their own, run by a class other than their family's
+KIND_MODULE_CLASSES = {
+    'openshift_v1_build_request': OpenShiftBuildRequestModule,
+    'openshift_v1_template_instance': OpenShiftTemplateInstanceModule,
+}
+
+# Options of the k8s_object module, used to select the kind to manage
+OBJECT_OPTIONS = ('kind', 'api_version')
+
+
+def kind_to_snake(kind):
+    """ Convert a kind, such as ConfigMap or APIService, to the form used in module names """
+    return re.sub(r'[a-z][A-Z]|[A-Z]{2}[a-z]', lambda m: m.group(0)[0] + '_' + m.group(0)[1:], kind).lower()
+
+
+def find_module(kind, api_version='v1'):
+    """
+    Return the name of the module that manages kind at api_version, or None. Kubernetes modules are preferred
+    over the OpenShift modules of the same kind.
+
+    :param kind: kind, in CamelCase or snake_case
+    :param api_version: an apiVersion, with or without the API group
+    :return: module name
+    """
+    kind = kind_to_snake(kind)
+    version = api_version.split('/')[-1]
+    candidates = ['{0}_{1}'.format(version, kind)]
+    if '/' in api_version:
+        candidates.insert(0, '{0}_{1}_{2}'.format(api_version.split('/')[0].split('.')[0], version, kind))
+    for family in ('k8s', 'openshift'):
+        for candidate in candidates:
+            name = '{0}_{1}'.format(family, candidate)
+            if name in DISPATCH_TABLE:
+                return name
+    return None
+
+
+def object_module_class(base_class):
+    """ Extend a module class with the kind and api_version options of k8s_object """
+
+    class ObjectModule(base_class):
+        @property
+        def argspec(self):
+            if not self.argspec_cache:
+                spec = super(ObjectModule, self).argspec
+                for arg_properties in spec.values():
+                    if arg_properties.get('aliases'):
+                        arg_properties['aliases'] = [alias for alias in arg_properties['aliases']
+                                                     if alias not in OBJECT_OPTIONS]
+                spec['kind'] = {'required': True}
+                spec['api_version'] = {'default': 'v1'}
+            return self.argspec_cache
+
+        def execute_module(self):
+            for option in OBJECT_OPTIONS:
+                self.params.pop(option, None)
+            return super(ObjectModule, self).execute_module()
+
+    return ObjectModule
+
+
+def dispatch_object():
+    """ Run the module for the kind and api_version requested in the task's parameters """
+    params = _load_params()
+    module_name = find_module(params.get('kind') or '', params.get('api_version') or 'v1')
+    if module_name is None:
+        module = AnsibleModule(argument_spec={}, bypass_checks=True, check_invalid_arguments=False)
+        module.fail_json(msg="No module found for kind {0} and api_version {1}. Manage kinds without a kind "
+                             "specific module, such as custom resources, with k8s_custom_resource.".format(
+                                 params.get('kind'), params.get('api_version') or 'v1'))
+    kind, api_version, family = DISPATCH_TABLE[module_name]
+    module_class = KIND_MODULE_CLASSES.get(module_name, MODULE_CLASSES[family])
+    mixins = (KubernetesModuleMixin, MetadataListMixin) if kind.endswith('_list') else (KubernetesModuleMixin,)
+    dispatch(object_module_class(module_class), kind, api_version, *mixins)
@@ -0,0 +1,202 @@
+#
+#  Copyright 2017 Red Hat | Ansible
+#
+# This file is part of Ansible
+#
+# Ansible is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Ansible is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Ansible.  If not, see <http://www.gnu.org/licenses/>.
+
+import copy
+import json
+import os
+import threading
+import time
+
+from collections import OrderedDict
+from contextlib import contextmanager
+
+# time.monotonic is not available on Python 2
+monotonic = getattr(time, 'monotonic', time.time)
+
+PROFILE_ENV = 'KUBE_MODULES_PROFILE'
+PROFILE_FILE_ENV = 'KUBE_MODULES_PROFILE_FILE'
+
+PROFILE_ARGSPEC = {
+    'profile': {
+        'type': 'bool',
+        'default': False,
+        'description': [
+            "If set to C(True) the module result includes a C(_timings) key with the time spent, and the "
+            "number of API requests and bytes transferred, in each phase of the run. Also enabled by setting "
+            "the KUBE_MODULES_PROFILE environment variable."
+        ]
+    },
+    'profile_file': {
+        'type': 'path',
+        'description': [
+            "Path of a file to append the timings to, as one JSON document per line. Defaults to the value of "
+            "the KUBE_MODULES_PROFILE_FILE environment variable."
+        ]
+    },
+}
+
+
+def profile_enabled(param=None):
+    """ Profiling is enabled by the module's profile option, or by setting KUBE_MODULES_PROFILE """
+    if param:
+        return True
+    return os.environ.get(PROFILE_ENV, '').lower() in ('1', 'true', 'yes', 'on')
+
+
+class PhaseTimer(object):
+    """
+    Records the time spent in each phase of a module run, along with the number of API requests made and
+    the bytes sent and received during the phase. Phases entered more than once accumulate.
+    """
+
+    def __init__(self, started=None):
+        self.started = started if started is not None else monotonic()
+        self.phases = OrderedDict()
+        self.active = []
+        self.lock = threading.Lock()
+
+    def _stats(self, name):
+        if name not in self.phases:
+            self.phases[name] = {'seconds': 0.0, 'api_calls': 0, 'bytes_sent': 0, 'bytes_received': 0}
+        return self.phases[name]
+
+    @property
+    def current(self):
+        """ Name of the innermost phase in progress. Requests made by worker threads count against it too. """
+        return self.active[-1][0] if self.active else None
+
+    def record(self, name, seconds):
+        with self.lock:
+            self._stats(name)['seconds'] += seconds
+
+    @contextmanager
+    def phase(self, name):
+        """ Attribute the time and API requests of the enclosed block to the named phase """
+        self.active.append((name, monotonic()))
+        try:
+            yield
+        finally:
+            name, start = self.active.pop()
+            self.record(name, monotonic() - start)
+
+    def instrument(self, api_client):
+        """ Count the requests made through api_client, and their payload sizes, against the current phase """
+        if getattr(api_client, '_phase_timer', None) is self:
+            return
+        request = api_client.request
+        timer = self
+
+        def timed_request(method, url, query_params=None, headers=None, post_params=None, body=None,
+                          _preload_content=True, _request_timeout=None):
+            phase = timer.current or 'other'
+            sent = 0
+            if body is not None:
+                sent = len(body) if isinstance(body, (bytes, str)) else len(json.dumps(body))
+            response = request(method, url, query_params=query_params, headers=headers, post_params=post_params,
+                               body=body, _preload_content=_preload_content, _request_timeout=_request_timeout)
+            # Count the bytes on the wire, which are fewer than those of the body when it was compressed
+            length = response.getheader('Content-Length') if hasattr(response, 'getheader') else None
+            if length:
+                received = int(length)
+            else:
+                received = len(response.data) if _preload_content and getattr(response, 'data', None) else 0
+            with timer.lock:
+                stats = timer._stats(phase)
+                stats['api_calls'] += 1
+                stats['bytes_sent'] += sent
+                stats['bytes_received'] += received
+            return response
+
+        api_client.request = timed_request
+        api_client._phase_timer = self
+
+    def as_dict(self):
+        """ Timings so far. Phases still in progress, as when a module fails part way, include their time so far. """
+        now = monotonic()
+        with self.lock:
+            phases = OrderedDict((name, dict(stats)) for name, stats in self.phases.items())
+        for name, start in self.active:
+            phases.setdefault(name, {'seconds': 0.0, 'api_calls': 0, 'bytes_sent': 0, 'bytes_received': 0})
+            phases[name]['seconds'] += now - start
+        for stats in phases.values():
+            stats['seconds'] = round(stats['seconds'], 6)
+        result = OrderedDict()
+        result['total_seconds'] = round(now - self.started, 6)
+        result['api_calls'] = sum(stats['api_calls'] for stats in phases.values())
+        result['phases'] = phases
+        return result
+
+    def append_to(self, path, timings=None, **extra):
+        """ Append the timings, and any extra fields, as one JSON line """
+        record = OrderedDict(extra)
+        record['timestamp'] = time.time()
+        record.update(timings or self.as_dict())
+        with open(os.path.expanduser(path), 'a') as f:
+            f.write(json.dumps(record) + '\n')
+
+
+class ProfileMixin(object):
+    """
+    Adds the profile and profile_file options to a KubernetesAnsibleModule, timing each phase of the run and
+    reporting the timings with the module's result.
+    """
+
+    def __init__(self, *args, **kwargs):
+        self.timer = PhaseTimer()
+        self.timer.record('imports', self.imports_seconds)
+        self.profile = profile_enabled()
+        self.profile_file = os.environ.get(PROFILE_FILE_ENV)
+        super(ProfileMixin, self).__init__(*args, **kwargs)
+        # The helper rejects parameters it does not know about
+        self.profile = profile_enabled(self.params.pop('profile', False))
+        self.profile_file = self.params.pop('profile_file', None) or self.profile_file
+
+    @property
+    def extra_argspec(self):
+        spec = super(ProfileMixin, self).extra_argspec
+        spec.update(copy.deepcopy(PROFILE_ARGSPEC))
+        return spec
+
+    def phase(self, name):
+        return self.timer.phase(name)
+
+    def configure_client(self):
+        super(ProfileMixin, self).configure_client()
+        if self.profile:
+            self.timer.instrument(self.helper.api_client)
+
+    def exit_json(self, **kwargs):
+        self.report_timings(kwargs)
+        super(ProfileMixin, self).exit_json(**kwargs)
+
+    def fail_json(self, **kwargs):
+        self.report_timings(kwargs, failed=True)
+        super(ProfileMixin, self).fail_json(**kwargs)
+
+    def report_timings(self, result, failed=False):
+        """ When profiling, add the timings of the run to the result, and append them to the profile file """
+        if not self.profile:
+            return
+        timings = self.timer.as_dict()
+        result['_timings'] = timings
+        if self.profile_file:
+            try:
+                self.timer.append_to(self.profile_file, timings, kind=self.kind, api_version=self.api_version,
+                                     changed=result.get('changed', False), failed=failed)
+            except (IOError, OSError) as exc:
+                self.warn("Failed to write timings to {0}: {1}".format(self.profile_file, exc))
@@ -0,0 +1,420 @@
+#
+#  Copyright 2017 Red Hat | Ansible
+#
+# This file is part of Ansible
+#
+# Ansible is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Ansible is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Ansible.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Operations on objects of any kind, as dicts, for kinds that have no generated model.
+
+The kind is resolved at run time through the cached discovery in k8s_discovery, and requests are made to the
+resource's paths directly, so custom resources, and kinds served by aggregated APIs, are managed the same way
+as the kinds of the generated modules.
+"""
+
+import copy
+import json
+import threading
+import time
+
+from ansible.module_utils.k8s_discovery import DiscoveryError, DiscoveryMixin, api_request
+from ansible.module_utils.k8s_encoding import PROTOBUF, EncodingError, decode_body
+from ansible.module_utils.k8s_engine import DEFAULT_PAGE_SIZE, error_message, restart_watch
+
+try:
+    from openshift.helper.exceptions import KubernetesException
+    from kubernetes.client.rest import ApiException
+    HAS_K8S_MODULE_HELPER = True
+except ImportError:
+    HAS_K8S_MODULE_HELPER = False
+
+# Seconds to wait for objects, as the generated modules do
+DEFAULT_TIMEOUT = 20
+
+# Seconds each watch of an ObjectTracker lasts before it is started again
+WATCH_TIMEOUT = 60
+
+MERGE_PATCH = 'application/merge-patch+json'
+
+# Lists of the objects' metadata alone, as servers from 1.15 and 1.10 serve them. Older servers return the
+# objects whole.
+METADATA_ACCEPT = ('application/json;as=PartialObjectMetadataList;v=v1;g=meta.k8s.io,'
+                   'application/json;as=PartialObjectMetadataList;v=v1beta1;g=meta.k8s.io,'
+                   'application/json')
+
+# The same, preferring protobuf, which the server does not offer for custom resources
+METADATA_PROTOBUF_ACCEPT = (PROTOBUF + ';as=PartialObjectMetadataList;v=v1;g=meta.k8s.io,' +
+                            PROTOBUF + ';as=PartialObjectMetadataList;v=v1beta1;g=meta.k8s.io,' +
+                            METADATA_ACCEPT)
+
+METADATA_ONLY_ARGSPEC = {
+    'metadata_only': {
+        'type': 'bool',
+        'default': False,
+        'description': [
+            "If set to C(True) only the metadata of each object is listed and returned, such as its name, "
+            "labels, annotations and owner references. Servers from Kubernetes 1.10 send the metadata alone, "
+            "which makes large lists much smaller."
+        ]
+    },
+    'protobuf': {
+        'type': 'bool',
+        'default': False,
+        'description': [
+            "With I(metadata_only), ask for the metadata in the Kubernetes protobuf encoding, which is smaller "
+            "and faster to decode than JSON. Kinds the server does not encode as protobuf, such as custom "
+            "resources, are read as JSON."
+        ]
+    },
+}
+
+
+def iter_lines(response):
+    """ Yield the lines of a streamed response, such as the events of a watch """
+    pending = ''
+    for chunk in response.read_chunked(decode_content=False):
+        if isinstance(chunk, bytes):
+            chunk = chunk.decode('utf-8')
+        lines = (pending + chunk).split('\n')
+        pending = lines.pop()
+        for line in lines:
+            if line:
+                yield line
+    if pending:
+        yield pending
+
+
+class RawResourceHelper(object):
+    """
+    Gets, creates, patches, replaces, deletes, lists and watches the objects of a discovered resource, as the
+    helpers of the generated modules do for their model, with objects as dicts.
+    """
+
+    def __init__(self, api_client, resource, timeout=DEFAULT_TIMEOUT):
+        self.api_client = api_client
+        self.resource = resource
+        self.api_version = resource.api_version
+        self.kind = resource.kind
+        self.namespaced = resource.namespaced
+        self.timeout = timeout
+
+    @staticmethod
+    def get_exception_class():
+        return KubernetesException
+
+    def request(self, method, name=None, namespace=None, body=None, content_type=None, query=None, accept=None,
+                _preload_content=True, _request_timeout=None):
+        headers = {}
+        if content_type:
+            headers['Content-Type'] = content_type
+        if accept:
+            headers['Accept'] = accept
+        # The client decodes the bodies it preloads as UTF-8, which protobuf is not, so read those here
+        binary = _preload_content and PROTOBUF in (accept or '')
+        try:
+            response = api_request(self.api_client, method, self.resource.path(name, namespace),
+                                   query_params=list((query or {}).items()), headers=headers, body=body,
+                                   _preload_content=_preload_content and not binary,
+                                   _request_timeout=_request_timeout)
+        except ApiException as exc:
+            raise KubernetesException(error_message(exc), status=exc.status)
+        if binary:
+            try:
+                return decode_body(response.data, response.getheader('Content-Type'))
+            except (EncodingError, ValueError) as exc:
+                raise KubernetesException("Failed to decode the response: {0}".format(exc))
+            finally:
+                response.release_conn()
+        if not _preload_content:
+            return response
+        return json.loads(response.data) if response.data else None
+
+    def get_object(self, name, namespace=None):
+        """ The object, or None if it does not exist """
+        try:
+            return self.request('GET', name, namespace)
+        except KubernetesException as exc:
+            if exc.value.get('status') == 404:
+                return None
+            raise
+
+    def create_object(self, namespace, body):
+        return self.request('POST', namespace=namespace, body=body)
+
+    def patch_object(self, name, namespace, body):
+        """ Apply body as a JSON merge patch. Custom resources do not support strategic merge patches. """
+        return self.request('PATCH', name, namespace, body=body, content_type=MERGE_PATCH)
+
+    def replace_object(self, name, namespace, body):
+        return self.request('PUT', name, namespace, body=body)
+
+    def delete_object(self, name, namespace, propagation_policy='Foreground'):
+        body = {'apiVersion': 'v1', 'kind': 'DeleteOptions', 'propagationPolicy': propagation_policy}
+        return self.request('DELETE', name, namespace, body=body)
+
+    def call(self, operation, name, namespace, body):
+        """ Perform operation, one of create, patch, replace or delete, as ResourceApplier does on models """
+        if operation == 'create':
+            return self.create_object(namespace, body)
+        if operation == 'delete':
+            return self.delete_object(name, namespace)
+        return getattr(self, '{0}_object'.format(operation))(name, namespace, body)
+
+    def pages(self, namespace=None, page_size=DEFAULT_PAGE_SIZE, accept=None, **query):
+        """
+        Yield the pages of a list of the objects in namespace, or in all namespaces, following continue tokens.
+
+        :param accept: media type to ask for, e.g. a PartialObjectMetadataList
+        :param query: query parameters, e.g. labelSelector
+        """
+        token = None
+        while True:
+            params = dict(query, limit=page_size)
+            if token:
+                params['continue'] = token
+            page = self.request('GET', namespace=namespace, query=params, accept=accept)
+            yield page
+            token = (page.get('metadata') or {}).get('continue')
+            if not token:
+                return
+
+    def list_objects(self, namespace=None, page_size=DEFAULT_PAGE_SIZE, **query):
+        """
+        List the objects in namespace, or in all namespaces.
+
+        :return: tuple of (list of objects, resourceVersion of the list)
+        """
+        items = []
+        resource_version = None
+        for page in self.pages(namespace, page_size, **query):
+            items.extend(page.get('items') or [])
+            resource_version = (page.get('metadata') or {}).get('resourceVersion')
+        return items, resource_version
+
+    def watch(self, namespace=None, resource_version=None, timeout=None, **query):
+        """ Yield the events of a watch, as dicts with type and object, until the server ends it """
+        params = dict(query, watch='true')
+        if resource_version:
+            params['resourceVersion'] = resource_version
+        if timeout:
+            params['timeoutSeconds'] = int(timeout)
+        response = self.request('GET', namespace=namespace, query=params, _preload_content=False,
+                                _request_timeout=timeout + 5 if timeout else None)
+        try:
+            for line in iter_lines(response):
+                yield json.loads(line)
+        finally:
+            response.close()
+            response.release_conn()
+
+    def wait_for_objects(self, refs, condition, timeout=None, engine=None):
+        """
+        Wait for every (name, namespace) in refs to satisfy condition(obj), with one watch per namespace.
+        condition receives None once an object has been deleted. With an engine, the namespaces are watched
+        concurrently.
+
+        :return: dict of (name, namespace): last object seen, for the refs satisfied before the timeout
+        """
+        timeout = timeout or self.timeout
+        by_namespace = {}
+        for name, namespace in refs:
+            by_namespace.setdefault(namespace, set()).add(name)
+
+        def wait_namespace(namespace):
+            pending = set(by_namespace[namespace])
+            satisfied = {}
+            deadline = time.time() + timeout
+
+            def check(name, obj):
+                if name in pending and condition(obj):
+                    satisfied[(name, namespace)] = obj
+                    pending.discard(name)
+
+            items, resource_version = self.list_objects(namespace)
+            existing = dict((obj['metadata']['name'], obj) for obj in items)
+            for name in list(pending):
+                check(name, existing.get(name))
+
+            while pending and time.time() < deadline:
+                events = self.watch(namespace, resource_version, max(1, deadline - time.time()))
+                try:
+                    for event in events:
+                        obj = event.get('object') or {}
+                        if event.get('type') == 'ERROR':
+                            # The resourceVersion expired
+                            raise KubernetesException(obj.get('message', 'watch failed'), status=obj.get('code'))
+                        resource_version = obj['metadata'].get('resourceVersion')
+                        check(obj['metadata']['name'], None if event['type'] == 'DELETED' else obj)
+                        if not pending:
+                            break
+                except Exception as exc:
+                    if not restart_watch(exc):
+                        raise
+                    # Start again from the current state, which replays every object as ADDED
+                    resource_version = None
+                    time.sleep(1)
+                finally:
+                    events.close()
+            return satisfied
+
+        namespaces = list(by_namespace.keys())
+        results = engine.map(wait_namespace, namespaces) if engine else [wait_namespace(ns) for ns in namespaces]
+        result = {}
+        for satisfied in results:
+            result.update(satisfied)
+        return result
+
+
+class ObjectTracker(object):
+    """
+    Records the latest state of the objects of a resource, by (namespace, name), with one watch of a namespace,
+    or of all namespaces, run on a thread. Deleted objects are recorded as None. Trackers may share a condition,
+    which is notified of every change, to wait on the objects of several resources at once.
+
+    Without a resource_version, the watch starts from a list of the objects, which are recorded first. The watch
+    is restarted when it expires or its connection drops. Any other error stops it, and is raised by wait().
+    """
+
+    def __init__(self, helper, namespace=None, condition=None, resource_version=None, **query):
+        self.helper = helper
+        self.namespace = namespace
+        self.query = query
+        self.resource_version = resource_version
+        self.objects = {}
+        self.condition = condition or threading.Condition()
+        self.stopped = False
+        self.error = None
+
+    def start(self):
+        thread = threading.Thread(target=self.run)
+        thread.daemon = True
+        thread.start()
+        return self
+
+    def stop(self):
+        self.stopped = True
+
+    def record(self, key, obj):
+        with self.condition:
+            self.objects[key] = obj
+            self.condition.notify_all()
+
+    def run(self):
+        resource_version = self.resource_version
+        while not self.stopped:
+            try:
+                if resource_version is None:
+                    items, resource_version = self.helper.list_objects(self.namespace, **self.query)
+                    for item in items:
+                        self.record((item['metadata'].get('namespace'), item['metadata']['name']), item)
+                events = self.helper.watch(self.namespace, resource_version, WATCH_TIMEOUT, **self.query)
+                try:
+                    for event in events:
+                        obj = event.get('object') or {}
+                        if event.get('type') == 'ERROR':
+                            # The resourceVersion expired
+                            raise KubernetesException(obj.get('message', 'watch failed'), status=obj.get('code'))
+                        metadata = obj['metadata']
+                        resource_version = metadata.get('resourceVersion')
+                        self.record((metadata.get('namespace'), metadata['name']),
+                                    None if event['type'] == 'DELETED' else obj)
+                        if self.stopped:
+                            break
+                finally:
+                    events.close()
+            except Exception as exc:
+                if not restart_watch(exc):
+                    with self.condition:
+                        self.error = exc
+                        self.condition.notify_all()
+                    return
+                resource_version = None
+                time.sleep(1)
+
+    def check(self):
+        """ Raise the error that stopped the watch, if any. Called with the condition held. """
+        if self.error is not None:
+            raise self.error
+
+    def wait(self, done, deadline):
+        """
+        Wait until done(), called with the condition held, is true, or until deadline. Returns done(). Raises the
+        error that stopped the watch before then.
+        """
+        with self.condition:
+            while not done() and time.time() < deadline:
+                self.check()
+                self.condition.wait(deadline - time.time())
+            return done()
+
+
+class MetadataListMixin(DiscoveryMixin):
+    """ Adds the metadata_only and protobuf options to the list modules """
+
+    def __init__(self, *args, **kwargs):
+        super(MetadataListMixin, self).__init__(*args, **kwargs)
+        # The helper rejects parameters it does not know about
+        self.metadata_only = self.params.pop('metadata_only', False)
+        self.protobuf = self.params.pop('protobuf', False)
+
+    @property
+    def extra_argspec(self):
+        spec = super(MetadataListMixin, self).extra_argspec
+        spec.update(copy.deepcopy(METADATA_ONLY_ARGSPEC))
+        return spec
+
+    def _read_list(self, namespace):
+        """
+        With metadata_only, list the metadata of the objects rather than the objects, a page at a time, keeping
+        only the metadata of each page.
+        """
+        if not self.metadata_only:
+            return super(MetadataListMixin, self)._read_list(namespace)
+        kind = self.kind[:-len('_list')]
+        try:
+            list_method = self._list_method(namespace)
+        except KubernetesException as exc:
+            self.fail_json(msg='Failed to retrieve requested object: {}'.format(exc.message))
+        with self.phase('discovery'):
+            try:
+                resource = self.get_discovery().resolve_api_class(type(list_method.__self__).__name__, kind)
+            except DiscoveryError as exc:
+                self.fail_json(msg=str(exc))
+        helper = RawResourceHelper(self.helper.api_client, resource)
+        items = []
+        resource_version = None
+        try:
+            with self.phase('get'):
+                # Recordings of API traffic keep bodies as text, so protobuf is not asked for while recording
+                recording = getattr(self, 'cassette', None)
+                accept = METADATA_PROTOBUF_ACCEPT if self.protobuf and not recording else METADATA_ACCEPT
+                for page in helper.pages(namespace, accept=accept):
+                    items.extend({'metadata': self._metadata_to_snake(item.get('metadata') or {})}
+                                 for item in page.get('items') or [])
+                    resource_version = (page.get('metadata') or {}).get('resourceVersion')
+        except KubernetesException as exc:
+            self.fail_json(msg='Failed to retrieve requested object', error=exc.value.get('status'))
+        return {'api_version': resource.api_version, 'kind': resource.kind + 'List', 'items': items,
+                'metadata': {'resource_version': resource_version}}
+
+    def _metadata_to_snake(self, metadata):
+        """ Convert the attribute names of ObjectMeta, and of its owner references, to snake case """
+        result = {}
+        for key, value in metadata.items():
+            if key == 'ownerReferences':
+                value = [dict((self.helper.attribute_to_snake(ref_key), ref_value)
+                              for ref_key, ref_value in reference.items()) for reference in value or []]
+            result[self.helper.attribute_to_snake(key)] = value
+        return result
@@ -0,0 +1,95 @@
+#
+#  Copyright 2017 Red Hat | Ansible
+#
+# This file is part of Ansible
+#
+# Ansible is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Ansible is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Ansible.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Permission checks in memory, from the rules of the module's credentials.
+
+A SelfSubjectRulesReview returns every rule that applies to the credentials in one namespace. RulesIndex
+answers checks from those rules, so that k8s_apply can check every operation it plans, with one request per
+namespace, before it changes anything.
+"""
+
+from ansible.module_utils.k8s_discovery import ResourceNotFoundError
+from ansible.module_utils.k8s_raw import RawResourceHelper
+
+# The apiVersions that serve SelfSubjectRulesReview, in order of preference. OpenShift serves its own, in each
+# namespace, to servers older than Kubernetes 1.8.
+RULES_REVIEW_VERSIONS = ('authorization.k8s.io/v1', 'authorization.openshift.io/v1')
+
+
+def rule_matches(rule, verb, group, resource, name=None):
+    """ Whether a PolicyRule grants verb on resource, which may be resource/subresource, as RBAC matches them """
+    def has(values, value):
+        return '*' in values or value in values
+
+    if not has(rule.get('verbs') or [], verb):
+        return False
+    # OpenShift leaves out the API groups of the rules of its legacy roles, which cover the core group
+    if not has(rule.get('apiGroups') or [''], group):
+        return False
+    resources = rule.get('resources') or []
+    if not has(resources, resource) and not ('/' in resource and '*/' + resource.split('/', 1)[1] in resources):
+        return False
+    names = rule.get('resourceNames') or []
+    # Names are not known to the authorizer when objects are created, so rules restricted to names never match
+    return not names or (verb != 'create' and name in names)
+
+
+class RulesIndex(object):
+    """
+    The rules of the module's credentials in one namespace, as returned by a SelfSubjectRulesReview. When the
+    review is incomplete, as it is when an authorizer other than RBAC is configured, a check the rules do not
+    allow may still be allowed by the server.
+    """
+
+    def __init__(self, namespace, status):
+        self.namespace = namespace
+        self.incomplete = bool(status.get('incomplete') or status.get('evaluationError'))
+        self.evaluation_error = status.get('evaluationError')
+        # authorization.k8s.io returns resourceRules, authorization.openshift.io returns rules
+        rules = status.get('resourceRules') or status.get('rules') or []
+        self.rules = {}
+        for rule in rules:
+            for verb in rule.get('verbs') or []:
+                self.rules.setdefault(verb, []).append(rule)
+
+    def allows(self, verb, group, resource, name=None):
+        return any(rule_matches(rule, verb, group, resource, name)
+                   for rule in self.rules.get(verb, []) + self.rules.get('*', []))
+
+
+def rules_review_resource(discovery):
+    """ The SelfSubjectRulesReview resource the server serves, or None """
+    for api_version in RULES_REVIEW_VERSIONS:
+        try:
+            return discovery.resolve(api_version, 'SelfSubjectRulesReview')
+        except ResourceNotFoundError:
+            continue
+    return None
+
+
+def review_rules(api_client, resource, namespace=None):
+    """
+    The RulesIndex of the credentials of api_client in namespace, or without a namespace, of the cluster scoped
+    rules. resource is the SelfSubjectRulesReview resource. OpenShift's is namespaced, and so requires one.
+    """
+    body = {'apiVersion': resource.api_version, 'kind': 'SelfSubjectRulesReview', 'spec': {}}
+    if not resource.namespaced:
+        body['spec']['namespace'] = namespace or ''
+    response = RawResourceHelper(api_client, resource).create_object(namespace, body)
+    return RulesIndex(namespace, response.get('status') or {})
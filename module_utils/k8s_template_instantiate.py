@@ -0,0 +1,164 @@
+#
+#  Copyright 2017 Red Hat | Ansible
+#
+# This file is part of Ansible
+#
+# Ansible is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Ansible is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Ansible.  If not, see <http://www.gnu.org/licenses/>.
+
+
+"""
+Instantiates an OpenShift Template in one task: the template is processed, locally by default, and the objects
+it generates are applied as k8s_apply applies a set of objects, in dependency order, with the objects of each
+level created concurrently.
+
+Local processing substitutes the parameters, generates the values of generate: expression parameters, and
+checks required parameters, without a request to the server. With process: server, the template is processed
+by the server's processedtemplates resource instead, as oc process does.
+"""
+
+import os
+
+from ansible.module_utils.k8s_apply import KubernetesApplyModule, flatten_resources, load_resource_definitions
+from ansible.module_utils.k8s_discovery import DiscoveryError
+from ansible.module_utils.k8s_engine import DEFAULT_WORKERS
+from ansible.module_utils.k8s_raw import RawResourceHelper
+from ansible.module_utils.openshift_template import (TEMPLATE_VERSIONS, TemplateError, parameter_text, parameter_values,
+                                                     process_template)
+
+try:
+    from openshift.helper.exceptions import KubernetesException
+    HAS_K8S_MODULE_HELPER = True
+except ImportError:
+    HAS_K8S_MODULE_HELPER = False
+
+try:
+    import yaml
+    HAS_YAML = True
+except ImportError:
+    HAS_YAML = False
+
+
+def template_resources(discovery):
+    """
+    The templates and processedtemplates resources the server serves, by name. Both are of kind Template, so
+    they are told apart by name rather than resolved by kind.
+    """
+    for api_version in TEMPLATE_VERSIONS:
+        for prefix in discovery.prefixes(api_version):
+            resources = dict((resource.name, resource) for resource in discovery.resource_list(prefix, api_version)
+                             if resource.name in ('templates', 'processedtemplates'))
+            if len(resources) == 2:
+                return resources
+    raise TemplateError("The server does not serve templates")
+
+
+class KubernetesTemplateInstantiateModule(KubernetesApplyModule):
+    """ Processes a Template, and applies the objects it generates """
+
+    def __init__(self):
+        self.template_argspec = {
+            'template': {'type': 'raw'},
+            'src': {'type': 'path'},
+            'template_namespace': {},
+            'parameters': {'type': 'dict', 'default': {}},
+            'ignore_unknown_parameters': {'type': 'bool', 'default': False},
+            'process': {'default': 'local', 'choices': ['local', 'server']},
+            'namespace': {},
+            'state': {'default': 'present', 'choices': ['present', 'absent']},
+            'preflight': {'type': 'bool', 'default': True},
+            'workers': {'type': 'int', 'default': DEFAULT_WORKERS},
+        }
+        super(KubernetesTemplateInstantiateModule, self).__init__()
+
+    @property
+    def argspec(self):
+        if not self.argspec_cache:
+            spec = self.auth_argspec
+            spec.update(self.template_argspec)
+            self.argspec_cache = spec
+        return self.argspec_cache
+
+    def load_template(self, resources):
+        """ The Template of the template option, as a definition or the name of a Template on the server, or of src """
+        template = self.params.get('template')
+        if self.params.get('src'):
+            if not os.path.exists(self.params['src']):
+                self.fail_json(msg="Error accessing {0}. Does the file exist?".format(self.params['src']))
+            try:
+                documents = load_resource_definitions(self.params['src'])
+            except (IOError, yaml.YAMLError) as exc:
+                self.fail_json(msg="Error loading the template: {0}".format(exc))
+            if len(documents) != 1:
+                self.fail_json(msg="{0} must hold one Template".format(self.params['src']))
+            return documents[0]
+        if isinstance(template, dict):
+            return template
+        namespace = self.params.get('template_namespace') or self.params.get('namespace')
+        if not namespace:
+            raise TemplateError("Template {0} requires a namespace, with the template_namespace or namespace "
+                                "option".format(template))
+        with self.phase('get'):
+            obj = RawResourceHelper(self.helper.api_client, resources['templates']).get_object(str(template),
+                                                                                               namespace)
+        if obj is None:
+            raise TemplateError("Template {0} was not found in namespace {1}".format(template, namespace))
+        return obj
+
+    def process_on_server(self, resource, template):
+        """ Process template with the server's processedtemplates resource. Returns the objects. """
+        namespace = self.params.get('namespace') or self.params.get('template_namespace') or \
+            (template.get('metadata') or {}).get('namespace')
+        if not namespace:
+            raise TemplateError("Processing a template on the server requires a namespace")
+        body = dict(template, apiVersion=resource.api_version, kind='Template')
+        body['parameters'] = []
+        for parameter in template.get('parameters') or []:
+            if parameter.get('name') in self.params['parameters']:
+                parameter = dict(parameter, value=parameter_text(self.params['parameters'][parameter['name']]))
+            body['parameters'].append(parameter)
+        processed = RawResourceHelper(self.helper.api_client, resource).create_object(namespace, body)
+        return processed.get('objects') or []
+
+    def execute_module(self):
+        if self.params.get('debug'):
+            self.enable_debug()
+
+        if bool(self.params.get('template')) == bool(self.params.get('src')):
+            self.fail_json(msg="One of template or src is required")
+
+        try:
+            self.configure_client()
+        except KubernetesException as exc:
+            self.fail_json(msg='Error loading config', error=str(exc))
+
+        try:
+            resources = None
+            if self.params['process'] == 'server' or not isinstance(self.params.get('template'), dict):
+                with self.phase('discovery'):
+                    resources = template_resources(self.get_discovery())
+            template = self.load_template(resources)
+            with self.phase('process'):
+                if self.params['process'] == 'server':
+                    # Unknown and required parameters are checked here, as oc process does
+                    _, generated = parameter_values(template, self.params['parameters'],
+                                                    self.params['ignore_unknown_parameters'])
+                    objects = self.process_on_server(resources['processedtemplates'], template)
+                else:
+                    objects, _, generated = process_template(template, self.params['parameters'],
+                                                             self.params['ignore_unknown_parameters'])
+        except (TemplateError, DiscoveryError, KubernetesException) as exc:
+            self.fail_json(msg="Failed to process the template: {0}".format(getattr(exc, 'message', str(exc))))
+
+        objects = self.check_resources(flatten_resources(objects))
+        self.apply_resources(objects, generated_parameters=generated)
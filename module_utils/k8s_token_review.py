@@ -0,0 +1,143 @@
+#
+#  Copyright 2017 Red Hat | Ansible
+#
+# This file is part of Ansible
+#
+# Ansible is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Ansible is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Ansible.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Token reviews in batches.
+
+Each token is validated with a TokenReview, concurrently on the reconcile engine, and a token given more than
+once is reviewed once. Results are cached on disk for a short TTL, in a file per cluster, credentials and
+audiences, keyed by the SHA-256 of each token. Tokens themselves are never written, and never returned.
+"""
+
+import hashlib
+
+from ansible.module_utils.k8s_access_review import ReviewCache
+from ansible.module_utils.k8s_cache import AUTH_OPTIONS, cache_key
+from ansible.module_utils.k8s_common import KubernetesAnsibleModule
+from ansible.module_utils.k8s_discovery import Resource
+from ansible.module_utils.k8s_engine import DEFAULT_WORKERS
+from ansible.module_utils.k8s_mixins import KubernetesModuleMixin
+from ansible.module_utils.k8s_raw import RawResourceHelper
+
+try:
+    from openshift.helper.exceptions import KubernetesException
+    HAS_K8S_MODULE_HELPER = True
+except ImportError:
+    HAS_K8S_MODULE_HELPER = False
+
+# Tokens are revoked by deleting them, so their results are only kept briefly
+DEFAULT_CACHE_TTL = 60
+
+TOKEN_REVIEWS = Resource('authentication.k8s.io/v1', '/apis/authentication.k8s.io/v1',
+                         {'kind': 'TokenReview', 'name': 'tokenreviews'})
+
+
+def token_hash(token):
+    return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+
+class KubernetesTokenReviewModule(KubernetesModuleMixin, KubernetesAnsibleModule):
+    """ Validates many tokens, with a TokenReview for each distinct token not cached """
+
+    def __init__(self):
+        self.review_argspec = {
+            'tokens': {'type': 'list', 'required': True, 'no_log': True},
+            'audiences': {'type': 'list'},
+            'cache_ttl': {'type': 'int', 'default': DEFAULT_CACHE_TTL},
+            'workers': {'type': 'int', 'default': DEFAULT_WORKERS},
+        }
+        super(KubernetesTokenReviewModule, self).__init__('token_review', 'v1')
+
+    @property
+    def argspec(self):
+        if not self.argspec_cache:
+            spec = self.auth_argspec
+            spec.update(self.review_argspec)
+            self.argspec_cache = spec
+        return self.argspec_cache
+
+    def review(self, token):
+        """ Review one token. Returns the status of the review. """
+        spec = {'token': token}
+        if self.params.get('audiences'):
+            spec['audiences'] = self.params['audiences']
+        body = {'apiVersion': TOKEN_REVIEWS.api_version, 'kind': TOKEN_REVIEWS.kind, 'spec': spec}
+        status = RawResourceHelper(self.helper.api_client, TOKEN_REVIEWS).create_object(None, body).get('status') or {}
+        return {
+            'authenticated': bool(status.get('authenticated')),
+            'user': status.get('user') or {},
+            'audiences': status.get('audiences'),
+            'review_error': status.get('error'),
+        }
+
+    def execute_module(self):
+        if self.params.get('debug'):
+            self.enable_debug()
+
+        tokens = [str(token) for token in self.params['tokens']]
+        if not all(tokens):
+            self.fail_json(msg="Every token must be a non-empty string")
+
+        try:
+            self.configure_client()
+        except KubernetesException as exc:
+            self.fail_json(msg='Error loading config', error=str(exc))
+
+        keys = [token_hash(token) for token in tokens]
+        unique = dict(zip(keys, tokens))
+
+        cache = None
+        if self.params['cache_ttl'] > 0:
+            auth = dict((key, self.params.get(key)) for key in AUTH_OPTIONS if self.params.get(key) is not None)
+            cache = ReviewCache(cache_key(host=self.helper.api_client.configuration.host, auth=auth,
+                                          audiences=sorted(self.params.get('audiences') or [])),
+                                self.params['cache_ttl'], name='token_reviews')
+
+        results = {}
+        if cache:
+            results = dict((key, cache.get(key)) for key in unique if cache.get(key) is not None)
+        pending = [key for key in unique if key not in results]
+        engine = self.get_engine(self.params['workers'])
+        with self.phase('create'):
+            reviews = engine.map(lambda key: self.review(unique[key]), pending, return_exceptions=True)
+        errors = {}
+        reviewed = {}
+        for key, review in zip(pending, reviews):
+            if isinstance(review, Exception):
+                errors[key] = getattr(review, 'message', str(review))
+            else:
+                reviewed[key] = review
+        if cache and reviewed:
+            cache.update(reviewed)
+
+        return_results = []
+        for key in keys:
+            # Results are matched to tokens by their order, and by the hash, never by the token
+            result = {'token_sha256': key}
+            if key in errors:
+                result['error'] = errors[key]
+            else:
+                result.update(results.get(key) or reviewed[key], cached=key in results)
+            return_results.append(result)
+
+        return_attributes = dict(changed=False, results=return_results, unique=len(unique), reviews=len(pending),
+                                 authenticated=sum(1 for result in return_results if result.get('authenticated')))
+        if errors:
+            self.fail_json(msg="{0} of {1} token reviews failed".format(len(errors), len(pending)),
+                           **return_attributes)
+        self.exit_json(**return_attributes)
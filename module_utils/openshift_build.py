@@ -0,0 +1,275 @@
+#
+#  Copyright 2017 Red Hat | Ansible
+#
+# This file is part of Ansible
+#
+# Ansible is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Ansible is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Ansible.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Follows a build to its end: watches the Build object through its phases, and streams the build's log as it is
+written, a chunk at a time, to a file. Only the last lines of the log are kept in memory, and returned.
+
+One watch of the build, and one request for its log, replace the loops of openshift_v1_build tasks that poll
+the build until it completes.
+"""
+
+import calendar
+import collections
+import copy
+import io
+import time
+
+from ansible.module_utils.k8s_discovery import DiscoveryError, DiscoveryMixin, ResourceNotFoundError
+from ansible.module_utils.k8s_engine import restart_watch
+from ansible.module_utils.k8s_raw import RawResourceHelper
+from ansible.module_utils.openshift_common import OpenShiftAnsibleModule
+
+try:
+    from openshift.helper.exceptions import KubernetesException
+    from urllib3.exceptions import HTTPError
+    HAS_K8S_MODULE_HELPER = True
+except ImportError:
+    HAS_K8S_MODULE_HELPER = False
+
+# Builds and BuildConfigs are served by the build.openshift.io group, and by /oapi/v1 on servers older than
+# OpenShift 3.6
+BUILD_VERSIONS = ('build.openshift.io/v1', 'v1')
+
+TERMINAL_PHASES = ('Complete', 'Failed', 'Error', 'Cancelled')
+STARTED_PHASES = ('Running',) + TERMINAL_PHASES
+
+DEFAULT_FOLLOW_TIMEOUT = 1800
+DEFAULT_LOG_TAIL = 50
+
+LOG_CHUNK_SIZE = 64 * 1024
+
+# Seconds each watch of the build lasts before it is started again
+WATCH_TIMEOUT = 60
+
+TIME_FORMAT = '%Y-%m-%dT%H:%M:%SZ'
+
+FOLLOW_ARGSPEC = {
+    'follow': {
+        'type': 'bool',
+        'default': False,
+        'description': [
+            "If set to C(True) the module waits for the build it started to end, watching the Build, and "
+            "streams the build's log. Fails unless the build completes."
+        ]
+    },
+    'follow_timeout': {
+        'type': 'int',
+        'default': DEFAULT_FOLLOW_TIMEOUT,
+        'description': ["With I(follow), seconds to wait for the build to end."]
+    },
+    'log_file': {
+        'type': 'path',
+        'description': ["With I(follow), path of a file to write the whole build log to."]
+    },
+    'log_tail': {
+        'type': 'int',
+        'default': DEFAULT_LOG_TAIL,
+        'description': ["With I(follow), number of lines from the end of the build log to return."]
+    },
+}
+
+
+class BuildError(Exception):
+    pass
+
+
+def resolve_build_resource(discovery, kind='Build'):
+    """ The resource of Build or BuildConfig the server serves. Raises BuildError when it serves neither. """
+    for api_version in BUILD_VERSIONS:
+        try:
+            return discovery.resolve(api_version, kind)
+        except ResourceNotFoundError:
+            continue
+    raise BuildError("The server does not serve {0}".format(kind))
+
+
+def parse_time(value):
+    return calendar.timegm(time.strptime(value, TIME_FORMAT)) if value else None
+
+
+class LogTail(object):
+    """ Writes a log to a file as it is read, keeping only its last lines in memory """
+
+    def __init__(self, lines=DEFAULT_LOG_TAIL, path=None):
+        self.tail = collections.deque(maxlen=max(lines, 0))
+        self.partial = b''
+        self.bytes = 0
+        self.file = io.open(path, 'wb') if path else None
+
+    def write(self, chunk):
+        self.bytes += len(chunk)
+        if self.file:
+            self.file.write(chunk)
+        lines = (self.partial + chunk).split(b'\n')
+        self.partial = lines.pop()
+        # A chunk with no newline grows the partial line, which is cut at the chunk size
+        self.partial = self.partial[-LOG_CHUNK_SIZE:]
+        for line in lines[-self.tail.maxlen:] if self.tail.maxlen else []:
+            self.tail.append(line)
+
+    def close(self):
+        if self.partial and self.tail.maxlen:
+            self.tail.append(self.partial)
+            self.partial = b''
+        if self.file:
+            self.file.close()
+
+    @property
+    def lines(self):
+        return [line.decode('utf-8', 'replace') for line in self.tail]
+
+
+def build_timings(build, started):
+    """ Seconds the build was queued and ran for, from its timestamps, and that the module waited for it """
+    metadata = build.get('metadata') or {}
+    status = build.get('status') or {}
+    created = parse_time(metadata.get('creationTimestamp'))
+    start = parse_time(status.get('startTimestamp'))
+    completion = parse_time(status.get('completionTimestamp'))
+    return {
+        'queued': start - created if start is not None and created is not None else None,
+        'running': completion - start if completion is not None and start is not None else None,
+        'waited': round(time.time() - started, 3),
+    }
+
+
+class BuildFollower(object):
+    """ Follows one build, with one watch of the Build object and one streaming request for its log """
+
+    def __init__(self, api_client, discovery, name, namespace):
+        self.api_client = api_client
+        self.name = name
+        self.namespace = namespace
+        self.helper = RawResourceHelper(api_client, resolve_build_resource(discovery))
+        self.field_selector = 'metadata.name={0}'.format(name)
+        self.resource_version = None
+        self.build = None
+
+    def wait_for(self, phases, deadline):
+        """ Wait for the build to reach one of phases. Returns the build, or raises BuildError at the deadline. """
+        while True:
+            if self.resource_version is None:
+                items, self.resource_version = self.helper.list_objects(self.namespace,
+                                                                        fieldSelector=self.field_selector)
+                if not items:
+                    raise BuildError("Build {0} was deleted".format(self.name))
+                self.build = items[0]
+            if (self.build.get('status') or {}).get('phase') in phases:
+                return self.build
+            if time.time() >= deadline:
+                raise BuildError("Timed out waiting for build {0}, in phase {1}".format(
+                    self.name, (self.build.get('status') or {}).get('phase')))
+            events = self.helper.watch(self.namespace, self.resource_version,
+                                       max(1, min(WATCH_TIMEOUT, deadline - time.time())),
+                                       fieldSelector=self.field_selector)
+            try:
+                for event in events:
+                    obj = event.get('object') or {}
+                    if event.get('type') == 'ERROR':
+                        # The resourceVersion expired
+                        raise KubernetesException(obj.get('message', 'watch failed'), status=obj.get('code'))
+                    self.resource_version = obj['metadata'].get('resourceVersion')
+                    if event['type'] == 'DELETED':
+                        raise BuildError("Build {0} was deleted".format(self.name))
+                    self.build = obj
+                    if (obj.get('status') or {}).get('phase') in phases:
+                        break
+            except Exception as exc:
+                if not restart_watch(exc):
+                    raise
+                # Start again from a list
+                self.resource_version = None
+                time.sleep(1)
+            finally:
+                events.close()
+
+    def stream_log(self, log, deadline):
+        """ Stream the build's log into log, a LogTail, until the build's container exits """
+        response = self.helper.request('GET', self.name + '/log', self.namespace, query={'follow': 'true'},
+                                       _preload_content=False,
+                                       _request_timeout=max(1, deadline - time.time()))
+        try:
+            for chunk in response.stream(LOG_CHUNK_SIZE):
+                log.write(chunk)
+        finally:
+            response.close()
+            response.release_conn()
+
+    def follow(self, log, timeout=DEFAULT_FOLLOW_TIMEOUT):
+        """
+        Wait for the build to start, stream its log, and wait for it to end.
+
+        :return: tuple of (the build, as a dict, timings, log error or None)
+        """
+        started = time.time()
+        deadline = started + timeout
+        self.wait_for(STARTED_PHASES, deadline)
+        log_error = None
+        try:
+            self.stream_log(log, deadline)
+        except Exception as exc:
+            # The build's pod may be gone, or the log may not be readable; the build itself is still followed
+            log_error = getattr(exc, 'message', str(exc))
+        finally:
+            log.close()
+        build = self.wait_for(TERMINAL_PHASES, deadline)
+        return build, build_timings(build, started), log_error
+
+
+class OpenShiftBuildRequestModule(DiscoveryMixin, OpenShiftAnsibleModule):
+    """ openshift_v1_build_request, with the follow option """
+
+    def __init__(self, kind, api_version):
+        super(OpenShiftBuildRequestModule, self).__init__(kind, api_version)
+        # The helper rejects parameters it does not know about
+        self.follow_options = dict((option, self.params.pop(option, None)) for option in FOLLOW_ARGSPEC)
+
+    @property
+    def argspec(self):
+        spec = super(OpenShiftBuildRequestModule, self).argspec
+        if 'follow' not in spec:
+            spec.update(copy.deepcopy(FOLLOW_ARGSPEC))
+        return spec
+
+    def _after_create(self, k8s_obj, return_attributes):
+        """ With follow, wait for the build a build request started to end, streaming its log """
+        if not self.follow_options.get('follow') or k8s_obj is None:
+            return
+        build = self.to_dict(k8s_obj)
+        metadata = build.get('metadata') or {}
+        try:
+            follower = BuildFollower(self.helper.api_client, self.get_discovery(), metadata.get('name'),
+                                     metadata.get('namespace'))
+            log = LogTail(self.follow_options['log_tail'], self.follow_options.get('log_file'))
+            with self.phase('wait'):
+                build, timings, log_error = follower.follow(log, self.follow_options['follow_timeout'])
+        except (BuildError, DiscoveryError, KubernetesException, HTTPError, IOError, OSError) as exc:
+            self.fail_json(msg="Failed to follow build {0}: {1}".format(metadata.get('name'),
+                                                                        getattr(exc, 'message', str(exc))),
+                           **return_attributes)
+        phase = (build.get('status') or {}).get('phase')
+        return_attributes['build'] = dict(name=metadata.get('name'), namespace=metadata.get('namespace'),
+                                          phase=phase, reason=(build.get('status') or {}).get('reason'),
+                                          log_tail=log.lines, log_bytes=log.bytes,
+                                          log_file=self.follow_options.get('log_file'), timings=timings)
+        if log_error:
+            self.warn("Failed to read the log of build {0}: {1}".format(metadata.get('name'), log_error))
+        if phase != 'Complete':
+            self.fail_json(msg="Build {0} ended in phase {1}".format(metadata.get('name'), phase),
+                           **return_attributes)
@@ -19,8 +19,8 @@
 from ansible.module_utils.k8s_common import KubernetesAnsibleException, KubernetesAnsibleModule
 
 try:
-    from openshift.helper.ansible import OpenShiftAnsibleModuleHelper, ARG_ATTRIBUTES_BLACKLIST
-    from openshift.helper.exceptions import KubernetesException, OpenShiftException
+    from openshift.helper.ansible import OpenShiftAnsibleModuleHelper
+    from openshift.helper.exceptions import KubernetesException
     HAS_OPENSHIFT_HELPER = True
 except ImportError as exc:
     HAS_OPENSHIFT_HELPER = False
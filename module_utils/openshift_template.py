@@ -0,0 +1,219 @@
+#
+#  Copyright 2017 Red Hat | Ansible
+#
+# This file is part of Ansible
+#
+# Ansible is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Ansible is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Ansible.  If not, see <http://www.gnu.org/licenses/>.
+
+
+"""
+Processes OpenShift Templates locally, as the server's processedtemplates resource does: the values of the
+parameters are taken from those given, from their defaults, or generated from their expressions, required
+parameters are checked, and the parameters are substituted into the template's objects, which are given the
+template's labels.
+
+A string that is exactly ${{NAME}} is replaced by the value of NAME parsed as JSON, so that numbers and
+booleans keep their type. ${NAME} is replaced as text anywhere in a string, or a key. References to unknown
+parameters are left as they are.
+
+Imports nothing from Ansible, so that the fake API server processes templates the same way.
+"""
+
+import copy
+import json
+import random
+import re
+
+# Templates are served by the template.openshift.io group, and by /oapi/v1 on servers older than OpenShift 3.6
+TEMPLATE_VERSIONS = ('template.openshift.io/v1', 'v1')
+
+STRING_TYPES = (str, type(u''))
+
+PARAMETER_EXP = re.compile(r'\$\{([a-zA-Z0-9_]+?)\}')
+NON_STRING_PARAMETER_EXP = re.compile(r'^\$\{\{([a-zA-Z0-9_]+)\}\}$')
+
+# An expression of a generated value, e.g. [a-zA-Z0-9]{16}: the characters to pick from, and how many
+GENERATOR_EXP = re.compile(r'\[([a-zA-Z0-9\-\\]+)\]\{(\w+)\}')
+
+ALPHABET = 'abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ'
+NUMERALS = '0123456789'
+SYMBOLS = '~!@#$%^&*()-_+={}[]\\|<,>.?/"\';:`'
+
+CHARACTER_CLASSES = {
+    '\\w': ALPHABET + NUMERALS + '_',
+    '\\d': NUMERALS,
+    '\\a': ALPHABET + NUMERALS,
+    '\\A': SYMBOLS,
+}
+
+MAX_GENERATED_LENGTH = 255
+
+RANDOM = random.SystemRandom()
+
+
+class TemplateError(Exception):
+    pass
+
+
+def expression_alphabet(expression):
+    """ The characters of a bracket expression, e.g. a-zA-Z0-9 or \\w, without duplicates """
+    alphabet = []
+    i = 0
+    while i < len(expression):
+        char = expression[i]
+        if char == '\\':
+            chars = CHARACTER_CLASSES.get(expression[i:i + 2])
+            if chars is None:
+                raise TemplateError("'[{0}]' is not a valid expression".format(expression))
+            i += 2
+        elif expression[i + 1:i + 2] == '-' and i + 2 < len(expression):
+            start, end = ord(char), ord(expression[i + 2])
+            if start > end:
+                raise TemplateError("Invalid range {0}-{1} in '[{2}]'".format(char, expression[i + 2], expression))
+            chars = ''.join(chr(code) for code in range(start, end + 1))
+            i += 3
+        else:
+            chars = char
+            i += 1
+        alphabet.extend(c for c in chars if c not in alphabet)
+    return ''.join(alphabet)
+
+
+def generate_value(expression):
+    """ Replace each [characters]{length} in expression with that many random characters """
+    def generate(match):
+        if not match.group(2).isdigit():
+            raise TemplateError("'{0}' is not a valid length in '{1}'".format(match.group(2), expression))
+        length = int(match.group(2))
+        if not 0 < length <= MAX_GENERATED_LENGTH:
+            raise TemplateError("The length of '{0}' must be from 1 to {1}".format(expression,
+                                                                                   MAX_GENERATED_LENGTH))
+        alphabet = expression_alphabet(match.group(1))
+        return ''.join(RANDOM.choice(alphabet) for _ in range(length))
+    return GENERATOR_EXP.sub(generate, expression)
+
+
+def parameter_text(value):
+    """ A parameter value given as another type, as the text a template parameter holds """
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    return value if isinstance(value, STRING_TYPES) else str(value)
+
+
+def parameter_values(template, values=None, ignore_unknown=False):
+    """
+    The value of each parameter of template: the one in values, the parameter's own, or one generated from its
+    expression. Raises TemplateError for unknown parameters in values, unless ignore_unknown is set, and for
+    required parameters without a value.
+
+    :return: tuple of (dict of name: value, list of the names of the generated parameters)
+    """
+    values = values or {}
+    parameters = template.get('parameters') or []
+    unknown = sorted(set(values) - set(parameter.get('name') for parameter in parameters))
+    if unknown and not ignore_unknown:
+        raise TemplateError("The template has no parameters {0}".format(', '.join(unknown)))
+    result = {}
+    generated = []
+    missing = []
+    for parameter in parameters:
+        name = parameter.get('name')
+        if not name:
+            raise TemplateError("Every template parameter requires a name")
+        if name in values:
+            value = parameter_text(values[name])
+        else:
+            value = parameter_text(parameter.get('value'))
+            if not value and parameter.get('generate'):
+                if parameter['generate'] != 'expression':
+                    raise TemplateError("Unknown generator '{0}' of parameter {1}".format(
+                        parameter['generate'], name))
+                value = generate_value(parameter.get('from') or '')
+                generated.append(name)
+        if parameter.get('required') and not value:
+            missing.append(name)
+        result[name] = value
+    if missing:
+        raise TemplateError("The required parameters {0} have no value".format(', '.join(missing)))
+    return result, generated
+
+
+def substitute(value, parameters):
+    """ value, a decoded JSON document, with the parameters substituted into its strings and keys """
+    if isinstance(value, dict):
+        return dict((substitute_text(key, parameters) if isinstance(key, STRING_TYPES) else key,
+                     substitute(item, parameters)) for key, item in value.items())
+    if isinstance(value, list):
+        return [substitute(item, parameters) for item in value]
+    if isinstance(value, STRING_TYPES):
+        match = NON_STRING_PARAMETER_EXP.match(value)
+        if match and match.group(1) in parameters:
+            try:
+                return json.loads(parameters[match.group(1)])
+            except ValueError:
+                raise TemplateError("The value of parameter {0} is not valid JSON, as {1} requires".format(
+                    match.group(1), value))
+        return substitute_text(value, parameters)
+    return value
+
+
+def substitute_text(text, parameters):
+    return PARAMETER_EXP.sub(lambda match: parameters.get(match.group(1), match.group(0)), text)
+
+
+def add_labels(obj, labels):
+    """ Add labels to the object's, failing on a label the object gives another value """
+    existing = obj.setdefault('metadata', {}).setdefault('labels', {})
+    if existing is None:
+        existing = obj['metadata']['labels'] = {}
+    for key, value in labels.items():
+        if key in existing and existing[key] != value:
+            raise TemplateError("The label {0}={1} of the template conflicts with {0}={2} on {3} {4}".format(
+                key, value, existing[key], obj.get('kind'), obj['metadata'].get('name')))
+        existing[key] = value
+
+
+def process_template(template, values=None, ignore_unknown=False):
+    """
+    Process template locally, with the parameter values in values.
+
+    :return: tuple of (list of objects, dict of parameter values, list of the names of generated parameters)
+    """
+    if not isinstance(template, dict) or template.get('kind') != 'Template':
+        raise TemplateError("The template must be a Template object")
+    parameters, generated = parameter_values(template, values, ignore_unknown)
+    labels = substitute(template.get('labels') or {}, parameters)
+    objects = []
+    for obj in template.get('objects') or []:
+        if not isinstance(obj, dict):
+            raise TemplateError("Every object of the template must be a dict, not {0}".format(obj))
+        obj = substitute(copy.deepcopy(obj), parameters)
+        if labels:
+            add_labels(obj, labels)
+        objects.append(obj)
+    return objects, parameters, generated
+
+
+def processed_template(template, values=None, ignore_unknown=False):
+    """ The template with its objects processed, and the values of its parameters set, as the server returns it """
+    objects, parameters, _ = process_template(template, values, ignore_unknown)
+    result = copy.deepcopy(template)
+    result['objects'] = objects
+    for parameter in result.get('parameters') or []:
+        parameter['value'] = parameters[parameter['name']]
+    return result
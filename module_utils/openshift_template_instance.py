@@ -0,0 +1,260 @@
+#
+#  Copyright 2017 Red Hat | Ansible
+#
+# This file is part of Ansible
+#
+# Ansible is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Ansible is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Ansible.  If not, see <http://www.gnu.org/licenses/>.
+
+
+"""
+Tracks a TemplateInstance to readiness: its Ready and InstantiateFailure conditions, and the readiness of each
+object it created, as listed in its status. The objects are tracked with one watch per kind, in the namespace
+of the TemplateInstance, rather than a poll of each object, and a watch is started the first time an object
+of its kind appears in the status.
+
+Objects of the kinds that report progress are ready when they have rolled out, completed or been bound or
+admitted, and objects of other kinds once they exist.
+"""
+
+import copy
+import threading
+import time
+
+from ansible.module_utils.k8s_discovery import DiscoveryError, DiscoveryMixin, ResourceNotFoundError
+from ansible.module_utils.k8s_raw import ObjectTracker, RawResourceHelper
+from ansible.module_utils.openshift_build import TERMINAL_PHASES
+from ansible.module_utils.openshift_common import OpenShiftAnsibleModule
+from ansible.module_utils.openshift_template import TEMPLATE_VERSIONS, TemplateError
+
+try:
+    from openshift.helper.exceptions import KubernetesException
+    HAS_K8S_MODULE_HELPER = True
+except ImportError:
+    HAS_K8S_MODULE_HELPER = False
+
+DEFAULT_WAIT_TIMEOUT = 600
+
+READY = 'ready'
+PENDING = 'pending'
+FAILED = 'failed'
+
+WAIT_ARGSPEC = {
+    'wait': {
+        'type': 'bool',
+        'default': False,
+    },
+    'wait_timeout': {
+        'type': 'int',
+        'default': DEFAULT_WAIT_TIMEOUT,
+    },
+}
+
+REPLICATED_KINDS = ('StatefulSet', 'ReplicaSet', 'ReplicationController')
+
+
+def find_condition(obj, condition_type):
+    for condition in (obj.get('status') or {}).get('conditions') or []:
+        if condition.get('type') == condition_type:
+            return condition
+    return {}
+
+
+def condition_is(obj, condition_type, status):
+    return find_condition(obj, condition_type).get('status') == status
+
+
+def generation_observed(obj):
+    return (obj.get('status') or {}).get('observedGeneration', 0) >= (obj.get('metadata') or {}).get('generation', 0)
+
+
+def readiness(obj):
+    """ The readiness of an object, as a tuple of READY, PENDING or FAILED, and a message or None """
+    if obj is None:
+        return PENDING, 'not created yet'
+    kind = obj.get('kind')
+    status = obj.get('status') or {}
+    replicas = (obj.get('spec') or {}).get('replicas', 1)
+    if kind == 'Build':
+        phase = status.get('phase')
+        if phase == 'Complete':
+            return READY, None
+        return FAILED if phase in TERMINAL_PHASES else PENDING, status.get('message') or phase
+    if kind == 'Job':
+        if condition_is(obj, 'Complete', 'True'):
+            return READY, None
+        if condition_is(obj, 'Failed', 'True'):
+            return FAILED, find_condition(obj, 'Failed').get('message')
+        return PENDING, None
+    if kind in ('Deployment', 'DeploymentConfig'):
+        if condition_is(obj, 'Progressing', 'False'):
+            progressing = find_condition(obj, 'Progressing')
+            return FAILED, progressing.get('message') or progressing.get('reason')
+        if generation_observed(obj) and status.get('updatedReplicas', 0) >= replicas and \
+                status.get('availableReplicas', 0) >= replicas:
+            return READY, None
+        return PENDING, '{0} of {1} replicas available'.format(status.get('availableReplicas', 0), replicas)
+    if kind in REPLICATED_KINDS:
+        if generation_observed(obj) and status.get('readyReplicas', 0) >= replicas:
+            return READY, None
+        return PENDING, '{0} of {1} replicas ready'.format(status.get('readyReplicas', 0), replicas)
+    if kind == 'Pod':
+        if status.get('phase') == 'Succeeded' or condition_is(obj, 'Ready', 'True'):
+            return READY, None
+        return FAILED if status.get('phase') == 'Failed' else PENDING, status.get('message') or status.get('phase')
+    if kind == 'PersistentVolumeClaim':
+        return READY if status.get('phase') == 'Bound' else PENDING, status.get('phase')
+    if kind == 'Route':
+        admitted = [condition.get('status') for ingress in status.get('ingress') or []
+                    for condition in ingress.get('conditions') or [] if condition.get('type') == 'Admitted']
+        if 'True' in admitted:
+            return READY, None
+        return FAILED if 'False' in admitted else PENDING, None
+    return READY, None
+
+
+def object_refs(instance):
+    """ The refs of the objects a TemplateInstance created, from its status """
+    return [entry['ref'] for entry in ((instance or {}).get('status') or {}).get('objects') or []
+            if entry.get('ref')]
+
+
+class TemplateInstanceTracker(object):
+    """ Waits for a TemplateInstance, and each object it created, to be ready """
+
+    def __init__(self, api_client, discovery, name, namespace):
+        self.api_client = api_client
+        self.discovery = discovery
+        self.name = name
+        self.namespace = namespace
+        self.condition = threading.Condition()
+        self.instances = ObjectTracker(self.resource_helper(TEMPLATE_VERSIONS, 'TemplateInstance'), namespace,
+                                       self.condition, fieldSelector='metadata.name=' + name)
+        # Trackers by (apiVersion, kind), and the time each object was first seen ready, by ref key
+        self.trackers = {}
+        self.ready_at = {}
+        self.errors = {}
+
+    def resource_helper(self, api_versions, kind):
+        for api_version in api_versions:
+            try:
+                return RawResourceHelper(self.api_client, self.discovery.resolve(api_version, kind))
+            except ResourceNotFoundError:
+                continue
+        raise TemplateError("The server does not serve {0}".format(kind))
+
+    def track(self, ref):
+        """ Start the watch of the kind of ref, unless it is watched already. Called with the condition held. """
+        key = (ref.get('apiVersion'), ref.get('kind'))
+        if key in self.trackers or key in self.errors:
+            return
+        try:
+            helper = self.resource_helper([ref.get('apiVersion')], ref.get('kind'))
+        except TemplateError as exc:
+            self.errors[key] = str(exc)
+            return
+        self.trackers[key] = ObjectTracker(helper, self.namespace if helper.namespaced else None,
+                                           self.condition).start()
+
+    def object_state(self, ref, started):
+        key = (ref.get('apiVersion'), ref.get('kind'))
+        result = dict(api_version=ref.get('apiVersion'), kind=ref.get('kind'), name=ref.get('name'),
+                      namespace=ref.get('namespace'))
+        if key in self.errors:
+            result.update(state=FAILED, message=self.errors[key])
+            return result
+        tracker = self.trackers[key]
+        if tracker.error is not None:
+            result.update(state=FAILED, message=getattr(tracker.error, 'message', str(tracker.error)))
+            return result
+        obj = tracker.objects.get((ref.get('namespace') if tracker.namespace else None, ref.get('name')))
+        state, message = readiness(obj)
+        ref_key = key + (ref.get('namespace'), ref.get('name'))
+        if state == READY:
+            self.ready_at.setdefault(ref_key, round(time.time() - started, 3))
+        result.update(state=state, message=message, ready_after=self.ready_at.get(ref_key))
+        return result
+
+    def status(self, started):
+        """ The readiness of the TemplateInstance and its objects. Called with the condition held. """
+        instance = self.instances.objects.get((self.namespace, self.name))
+        refs = object_refs(instance)
+        for ref in refs:
+            self.track(ref)
+        objects = [self.object_state(ref, started) for ref in refs]
+        failure = find_condition(instance or {}, 'InstantiateFailure')
+        ready = condition_is(instance or {}, 'Ready', 'True') and all(obj['state'] == READY for obj in objects)
+        failed = failure.get('status') == 'True' or any(obj['state'] == FAILED for obj in objects)
+        return dict(ready=ready, failed=failed, exists=instance is not None,
+                    conditions=copy.deepcopy(((instance or {}).get('status') or {}).get('conditions') or []),
+                    objects=objects, message=failure.get('message') if failure.get('status') == 'True' else None)
+
+    def wait(self, timeout):
+        """ Wait for the TemplateInstance to be ready, or to fail. Returns its last status, with timings. """
+        started = time.time()
+        self.instances.start()
+        result = {}
+
+        def done():
+            result.update(self.status(started))
+            return result['ready'] or result['failed']
+
+        try:
+            self.instances.wait(done, started + timeout)
+        finally:
+            for tracker in [self.instances] + list(self.trackers.values()):
+                tracker.stop()
+        result.update(elapsed=round(time.time() - started, 3), watches=1 + len(self.trackers))
+        return result
+
+
+class OpenShiftTemplateInstanceModule(DiscoveryMixin, OpenShiftAnsibleModule):
+    """ openshift_v1_template_instance, with the wait option """
+
+    def __init__(self, kind, api_version):
+        super(OpenShiftTemplateInstanceModule, self).__init__(kind, api_version)
+        # The helper rejects parameters it does not know about
+        self.wait_options = dict((option, self.params.pop(option, None)) for option in WAIT_ARGSPEC)
+
+    @property
+    def argspec(self):
+        spec = super(OpenShiftTemplateInstanceModule, self).argspec
+        if 'wait' not in spec:
+            spec.update(copy.deepcopy(WAIT_ARGSPEC))
+        return spec
+
+    def _after_present(self, k8s_obj, return_attributes):
+        """ With wait, wait for a TemplateInstance, and every object it created, to be ready """
+        if not self.wait_options.get('wait') or k8s_obj is None:
+            return
+        metadata = self.to_dict(k8s_obj).get('metadata') or {}
+        try:
+            with self.phase('discovery'):
+                tracker = TemplateInstanceTracker(self.helper.api_client, self.get_discovery(), metadata.get('name'),
+                                                  metadata.get('namespace'))
+            with self.phase('wait'):
+                readiness = tracker.wait(self.wait_options['wait_timeout'])
+        except (TemplateError, DiscoveryError, KubernetesException) as exc:
+            self.fail_json(msg="Failed to wait for template instance {0}: {1}".format(
+                metadata.get('name'), getattr(exc, 'message', str(exc))), **return_attributes)
+        return_attributes['readiness'] = readiness
+        if readiness['failed']:
+            failed = [obj for obj in readiness['objects'] if obj['state'] == FAILED]
+            self.fail_json(msg="Template instance {0} failed: {1}".format(
+                metadata.get('name'), readiness['message'] or '{0} objects failed'.format(len(failed))),
+                **return_attributes)
+        if not readiness['ready']:
+            pending = [obj for obj in readiness['objects'] if obj['state'] != READY]
+            self.fail_json(msg="Template instance {0} was not ready after {1} seconds, with {2} objects "
+                           "pending".format(metadata.get('name'), self.wait_options['wait_timeout'], len(pending)),
+                           **return_attributes)
@@ -0,0 +1,20 @@
+#!/usr/bin/env python
+"""
+Print a protobuf encoded response, decoded with the role's module_utils, as JSON:
+
+    $ python decode_protobuf.py config-maps.v1.pb
+"""
+
+import json
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.realpath(__file__))))))
+
+# k8s_encoding has no dependencies, so it is imported without Ansible
+sys.path.insert(0, os.path.join(ROOT, 'module_utils'))
+
+from k8s_encoding import decode_body, PROTOBUF  # noqa: E402
+
+with open(sys.argv[1], 'rb') as f:
+    print(json.dumps(decode_body(f.read(), PROTOBUF)))